@@ -662,6 +662,100 @@ where sites.id is null limit 1000"""
     click.echo(click.style("Fix for missing app-related sites completed successfully!", fg="green"))
 
 
+@click.command("migrate-keyword-index", help="Build the inverted keyword index from segment keywords.")
+def migrate_keyword_index():
+    """
+    Build the posting lists used by the jieba_inverted_index keyword store from the keywords saved on segments.
+    """
+    click.echo(click.style("Starting keyword index migration.", fg="green"))
+    from core.rag.datasource.keyword.jieba.jieba_inverted_index import JiebaInvertedIndex
+
+    total_count = 0
+    page = 1
+    while True:
+        try:
+            datasets = db.session.query(Dataset).order_by(Dataset.created_at.desc()).paginate(page=page, per_page=50)
+        except NotFound:
+            break
+
+        page += 1
+        for dataset in datasets:
+            total_count += 1
+            click.echo(f"Processing the {total_count} dataset {dataset.id}.")
+            try:
+                keyword_index = JiebaInvertedIndex(dataset)
+                segment_page = 1
+                while True:
+                    try:
+                        segments = (
+                            db.session.query(DocumentSegment)
+                            .filter(
+                                DocumentSegment.dataset_id == dataset.id,
+                                DocumentSegment.status == "completed",
+                                DocumentSegment.enabled == True,
+                            )
+                            .order_by(DocumentSegment.created_at)
+                            .paginate(page=segment_page, per_page=1000)
+                        )
+                    except NotFound:
+                        break
+
+                    segment_page += 1
+                    keyword_index.multi_create_segment_keywords(
+                        [{"segment": segment, "keywords": segment.keywords} for segment in segments]
+                    )
+            except Exception as e:
+                click.echo(click.style(f"Failed to build keyword index for dataset {dataset.id}: {e}", fg="red"))
+                logging.exception(f"Keyword index migration failed for dataset {dataset.id}")
+
+    click.echo(click.style(f"Keyword index migration finished, {total_count} datasets processed.", fg="green"))
+
+
+@click.command("create-pgvector-indexes", help="Create the missing indexes of existing pgvector collections.")
+def create_pgvector_indexes():
+    """
+    Build the HNSW and GIN indexes of the pgvector collections created before they existed. The indexes are built
+    with CREATE INDEX CONCURRENTLY, the collections stay writable meanwhile.
+    """
+    click.echo(click.style("Starting pgvector index creation.", fg="green"))
+    if dify_config.VECTOR_STORE != VectorType.PGVECTOR:
+        click.echo(click.style("This command only supports pgvector vector store.", fg="red"))
+        return
+    from core.rag.datasource.vdb.pgvector.pgvector import PGVector, PGVectorFactory
+
+    collection_names = {binding.collection_name for binding in db.session.query(DatasetCollectionBinding).all()}
+    page = 1
+    while True:
+        try:
+            datasets = (
+                db.session.query(Dataset)
+                .filter(Dataset.indexing_technique == "high_quality", Dataset.index_struct.isnot(None))
+                .order_by(Dataset.created_at.desc())
+                .paginate(page=page, per_page=50)
+            )
+        except NotFound:
+            break
+
+        page += 1
+        for dataset in datasets:
+            index_struct = dataset.index_struct_dict
+            if index_struct and index_struct.get("type") == VectorType.PGVECTOR:
+                collection_names.add(index_struct["vector_store"]["class_prefix"])
+
+    config = PGVectorFactory.get_config()
+    create_count = 0
+    for collection_name in sorted(collection_names):
+        try:
+            if PGVector(collection_name=collection_name, config=config).create_indexes_concurrently():
+                create_count += 1
+                click.echo(f"Indexed collection {collection_name}.")
+        except Exception as e:
+            click.echo(click.style(f"Failed to create the indexes of collection {collection_name}: {e}", fg="red"))
+            logging.exception(f"pgvector index creation failed for collection {collection_name}")
+
+    click.echo(click.style(f"Index creation complete. Indexed {create_count} collections.", fg="green"))
+
+
 def register_commands(app):
     app.cli.add_command(reset_password)
     app.cli.add_command(reset_email)
@@ -672,3 +766,5 @@ def register_commands(app):
     app.cli.add_command(create_tenant)
     app.cli.add_command(upgrade_db)
     app.cli.add_command(fix_app_site_missing)
+    app.cli.add_command(migrate_keyword_index)
+    app.cli.add_command(create_pgvector_indexes)
@@ -1,6 +1,16 @@
 from typing import Annotated, Optional
 
-from pydantic import AliasChoices, Field, HttpUrl, NegativeInt, NonNegativeInt, PositiveInt, computed_field
+from pydantic import (
+    AliasChoices,
+    Field,
+    HttpUrl,
+    NegativeInt,
+    NonNegativeFloat,
+    NonNegativeInt,
+    PositiveFloat,
+    PositiveInt,
+    computed_field,
+)
 from pydantic_settings import BaseSettings
 
 from configs.feature.hosted_service import HostedServiceConfig
@@ -23,6 +33,16 @@ class SecurityConfig(BaseSettings):
         default=24,
     )
 
+    DECRYPTED_TOKEN_CACHE_SIZE: NonNegativeInt = Field(
+        description="Maximum number of decrypted credentials cached in process, 0 to disable",
+        default=1000,
+    )
+
+    DECRYPTED_TOKEN_CACHE_TTL: PositiveInt = Field(
+        description="Time-to-live in seconds of the decrypted credentials cached in process",
+        default=300,
+    )
+
 
 class AppExecutionConfig(BaseSettings):
     """
@@ -37,6 +57,19 @@ class AppExecutionConfig(BaseSettings):
         description="Maximum number of concurrent active requests per app (0 for unlimited)",
         default=0,
     )
+    APP_QUEUE_REDIS_STREAM_ENABLED: bool = Field(
+        description="Pass the events of chat, agent and completion apps through Redis Streams instead of"
+        " an in-process queue, so a generation can be listened to from any process",
+        default=False,
+    )
+    APP_QUEUE_STREAM_MAX_LEN: PositiveInt = Field(
+        description="Approximate maximum number of events kept in the Redis stream of a generation",
+        default=10000,
+    )
+    APP_QUEUE_STREAM_TTL: PositiveInt = Field(
+        description="Time-to-live in seconds of the Redis stream of a generation after its last event",
+        default=600,
+    )
 
 
 class CodeExecutionSandboxConfig(BaseSettings):
@@ -109,6 +142,25 @@ class CodeExecutionSandboxConfig(BaseSettings):
         default=1000,
     )
 
+    CODE_EXECUTION_BATCH_MAX_SIZE: PositiveInt = Field(
+        description="Maximum number of input sets sent to the code execution service in one batch request",
+        default=50,
+    )
+
+    CODE_EXECUTION_BATCH_WAIT_TIME: NonNegativeFloat = Field(
+        description="Time in seconds concurrent executions of the same code in parallel iterations wait"
+        " to be sent as one batch request, 0 to disable batching. Batched executions share the sandbox timeout,"
+        " each one runs the code in a new namespace",
+        default=0,
+    )
+
+    TEMPLATE_TRANSFORM_LOCAL_SANDBOX_ENABLED: bool = Field(
+        description="Render Jinja2 templates in the process with the Jinja2 sandboxed environment"
+        " instead of sending them to the code execution service,"
+        " templates with loops or macros are still sent to the code execution service",
+        default=False,
+    )
+
 
 class EndpointConfig(BaseSettings):
     """
@@ -122,7 +174,7 @@ class EndpointConfig(BaseSettings):
     )
 
     CONSOLE_WEB_URL: str = Field(
-        description="Base URL for the console web interface," "used for frontend references and CORS configuration",
+        description="Base URL for the console web interface,used for frontend references and CORS configuration",
         default="",
     )
 
@@ -247,6 +299,33 @@ class HttpConfig(BaseSettings):
         default=None,
     )
 
+    HTTP_CLIENT_MAX_CONNECTIONS: PositiveInt = Field(
+        description="Maximum number of connections of each shared HTTP client used for outgoing requests"
+        " of HTTP request nodes, tools and the code sandbox",
+        default=100,
+    )
+
+    HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS: NonNegativeInt = Field(
+        description="Maximum number of idle connections each shared HTTP client keeps alive",
+        default=20,
+    )
+
+    HTTP_CLIENT_KEEPALIVE_EXPIRY: PositiveFloat = Field(
+        description="Time in seconds after which an idle connection of the shared HTTP clients is closed",
+        default=5.0,
+    )
+
+    HTTP_CLIENT_MAX_CONNECTIONS_PER_HOST: NonNegativeInt = Field(
+        description="Maximum number of concurrent requests to the same host through the shared HTTP clients,"
+        " 0 for no limit other than HTTP_CLIENT_MAX_CONNECTIONS",
+        default=0,
+    )
+
+    HTTP_CLIENT_HTTP2_ENABLED: bool = Field(
+        description="Negotiate HTTP/2 with the servers supporting it, requires the h2 package",
+        default=True,
+    )
+
 
 class InnerAPIConfig(BaseSettings):
     """
@@ -348,6 +427,35 @@ class WorkflowConfig(BaseSettings):
         default=5,
     )
 
+    WORKFLOW_THREAD_POOL_MAX_WORKERS: PositiveInt = Field(
+        description="Maximum number of worker threads shared by all workflow runs of a process"
+        " for parallel branches and parallel iterations",
+        default=100,
+    )
+
+    WORKFLOW_MAX_SUBMIT_COUNT: PositiveInt = Field(
+        description="Maximum number of tasks a single workflow run can have waiting for a worker,"
+        " further tasks are held back until queued ones start",
+        default=100,
+    )
+
+    WORKFLOW_MAX_ITERATION_PARALLEL_NUMS: PositiveInt = Field(
+        description="Maximum number of items a parallel iteration node can run concurrently,"
+        " caps the parallel_nums configured on each node",
+        default=10,
+    )
+
+    WORKFLOW_WRITE_BEHIND_ENABLED: bool = Field(
+        description="Write workflow runs and node executions to the database in the background,"
+        " in batches, instead of before each stream response. Runs are always fully written before they finish.",
+        default=True,
+    )
+
+    WORKFLOW_WRITE_BEHIND_MAX_WORKERS: PositiveInt = Field(
+        description="Maximum number of threads of a process writing workflow runs and node executions",
+        default=10,
+    )
+
     MAX_VARIABLE_SIZE: PositiveInt = Field(
         description="Maximum size in bytes for a single variable in workflows. Default to 5KB.",
         default=5 * 1024,
@@ -395,6 +503,17 @@ class ModerationConfig(BaseSettings):
         default=300,
     )
 
+    MODERATION_BUFFER_OVERLAP: NonNegativeInt = Field(
+        description="Number of characters of the text already moderated checked again with the new text,"
+        " so content across two buffers is not missed",
+        default=50,
+    )
+
+    MODERATION_MAX_WORKERS: PositiveInt = Field(
+        description="Maximum number of threads shared by the output moderation of all the messages",
+        default=20,
+    )
+
 
 class ToolConfig(BaseSettings):
     """
@@ -489,6 +608,12 @@ class RagEtlConfig(BaseSettings):
         default=None,
     )
 
+    EXTRACT_CACHE_ENABLED: bool = Field(
+        description="Save the documents extracted from uploaded files in the storage, so a file is only extracted"
+        " once by the estimates, indexing runs and retries of the file and of the files with the same content",
+        default=True,
+    )
+
 
 class DataSetConfig(BaseSettings):
     """
@@ -505,6 +630,17 @@ class DataSetConfig(BaseSettings):
         default=False,
     )
 
+    RETRIEVAL_THREAD_POOL_MAX_WORKERS: PositiveInt = Field(
+        description="Maximum number of threads retrieving from datasets concurrently, per pool",
+        default=32,
+    )
+
+    RETRIEVAL_SOURCE_TIMEOUT: PositiveFloat = Field(
+        description="Timeout in seconds for a dataset or search backend to answer a retrieval,"
+        " slower sources are skipped and the results of the others are returned",
+        default=30.0,
+    )
+
 
 class WorkspaceConfig(BaseSettings):
     """
@@ -517,6 +653,37 @@ class WorkspaceConfig(BaseSettings):
     )
 
 
+class EmbeddingCacheConfig(BaseSettings):
+    """
+    Configuration for query embedding cache
+    """
+
+    EMBEDDING_QUERY_CACHE_TTL: PositiveInt = Field(
+        description="Time-to-live in seconds for cached query embeddings",
+        default=600,
+    )
+
+    EMBEDDING_QUERY_CACHE_MODEL_TTLS: str = Field(
+        description="Comma-separated overrides of the query embedding cache TTL per model,"
+        " e.g. 'openai/text-embedding-3-small=3600,cohere/embed-english-v3.0=1200'",
+        default="",
+    )
+
+    EMBEDDING_QUERY_CACHE_LOCAL_SIZE: NonNegativeInt = Field(
+        description="Maximum number of query embeddings cached in process in front of Redis, 0 to disable",
+        default=1000,
+    )
+
+    @computed_field
+    def EMBEDDING_QUERY_CACHE_MODEL_TTLS_DICT(self) -> dict[str, int]:
+        model_ttls = {}
+        for item in self.EMBEDDING_QUERY_CACHE_MODEL_TTLS.split(","):
+            model, _, ttl = item.strip().rpartition("=")
+            if model and ttl:
+                model_ttls[model.strip()] = int(ttl)
+        return model_ttls
+
+
 class IndexingConfig(BaseSettings):
     """
     Configuration for indexing operations
@@ -527,6 +694,18 @@ class IndexingConfig(BaseSettings):
         default=1000,
     )
 
+    INDEXING_EMBEDDING_MAX_CONCURRENT_BATCHES: PositiveInt = Field(
+        description="Maximum number of embedding model batches requested concurrently during indexing,"
+        " keep it within the rate limits of the model provider",
+        default=1,
+    )
+
+    INDEXING_PIPELINE_PROCESS_WORKERS: NonNegativeInt = Field(
+        description="Number of worker processes parsing files when indexing several documents in a pipeline,"
+        " 0 to index the documents one after another",
+        default=0,
+    )
+
 
 class ImageFormatConfig(BaseSettings):
     MULTIMODAL_SEND_IMAGE_FORMAT: str = Field(
@@ -542,6 +721,22 @@ class CeleryBeatConfig(BaseSettings):
     )
 
 
+class ProviderConfigurationsCacheConfig(BaseSettings):
+    """
+    Configuration for the in-process cache of the model provider configurations of the tenants
+    """
+
+    PROVIDER_CONFIGURATIONS_CACHE_SIZE: NonNegativeInt = Field(
+        description="Maximum number of tenants whose provider configurations are cached in process, 0 to disable",
+        default=256,
+    )
+
+    PROVIDER_CONFIGURATIONS_CACHE_TTL: PositiveInt = Field(
+        description="Time-to-live in seconds of the provider configurations cached in process",
+        default=60,
+    )
+
+
 class PositionConfig(BaseSettings):
     POSITION_PROVIDER_PINS: str = Field(
         description="Comma-separated list of pinned model providers",
@@ -604,6 +799,7 @@ class FeatureConfig(
     BillingConfig,
     CodeExecutionSandboxConfig,
     DataSetConfig,
+    EmbeddingCacheConfig,
     EndpointConfig,
     FileAccessConfig,
     FileUploadConfig,
@@ -616,6 +812,7 @@ class FeatureConfig(
     ModelLoadBalanceConfig,
     ModerationConfig,
     OAuthConfig,
+    ProviderConfigurationsCacheConfig,
     RagEtlConfig,
     SecurityConfig,
     ToolConfig,
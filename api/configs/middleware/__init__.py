@@ -41,6 +41,12 @@ class StorageConfig(BaseSettings):
         default="storage",
     )
 
+    STORAGE_STREAM_CHUNK_SIZE: PositiveInt = Field(
+        description="Size in bytes of the chunks read from storage when streaming"
+        " and of the parts of multipart uploads, raised to the minimum part size of the storage. Default is 8 MB.",
+        default=8 * 1024 * 1024,
+    )
+
 
 class VectorStoreConfig(BaseSettings):
     VECTOR_STORE: Optional[str] = Field(
@@ -49,11 +55,18 @@ class VectorStoreConfig(BaseSettings):
         default=None,
     )
 
+    VECTOR_CLIENT_HEALTH_CHECK_INTERVAL: PositiveFloat = Field(
+        description="Interval in seconds between health checks of the vector database clients shared"
+        " by the threads of a process. A client failing its check is recreated.",
+        default=30.0,
+    )
+
 
 class KeywordStoreConfig(BaseSettings):
     KEYWORD_STORE: str = Field(
         description="Method for keyword extraction and storage."
-        " Default is 'jieba', a Chinese text segmentation library.",
+        " Default is 'jieba', a Chinese text segmentation library."
+        " 'jieba_inverted_index' stores keywords as posting lists with incremental updates and BM25 ranking.",
         default="jieba",
     )
 
@@ -1,6 +1,6 @@
 from typing import Optional
 
-from pydantic import Field, PositiveInt
+from pydantic import Field, PositiveFloat, PositiveInt
 from pydantic_settings import BaseSettings
 
 
@@ -33,3 +33,43 @@ class PGVectorConfig(BaseSettings):
         description="Name of the PostgreSQL database to connect to",
         default=None,
     )
+
+    PGVECTOR_MIN_CONNECTION: PositiveInt = Field(
+        description="Min connection of the PostgreSQL database",
+        default=1,
+    )
+
+    PGVECTOR_MAX_CONNECTION: PositiveInt = Field(
+        description="Max connection of the PostgreSQL database,"
+        " the connection pool is shared by all the threads and greenlets of a process,"
+        " retrievals and indexing tasks of the process wait for a free connection",
+        default=5,
+    )
+
+    PGVECTOR_CONNECTION_TIMEOUT: PositiveFloat = Field(
+        description="Seconds to wait for a free connection of the pool when all of them are in use,"
+        " the query fails after this time",
+        default=30,
+    )
+
+    PGVECTOR_HNSW_M: PositiveInt = Field(
+        description="Max number of connections per layer of the HNSW index of the embeddings",
+        default=16,
+    )
+
+    PGVECTOR_HNSW_EF_CONSTRUCTION: PositiveInt = Field(
+        description="Size of the candidate list used to build the HNSW index,"
+        " higher values build a more accurate index more slowly",
+        default=64,
+    )
+
+    PGVECTOR_HNSW_EF_SEARCH: PositiveInt = Field(
+        description="Size of the candidate list used by searches, higher values improve recall at the cost of latency",
+        default=40,
+    )
+
+    PGVECTOR_TEXT_SEARCH_CONFIG: Optional[str] = Field(
+        description="Text search configuration of the full text search, e.g. english."
+        " When set, the texts are indexed with a GIN index, the database default configuration is used otherwise",
+        default=None,
+    )
@@ -1,3 +1,4 @@
+import json
 import uuid
 from datetime import datetime, timezone
 
@@ -378,13 +379,12 @@ class DatasetDocumentSegmentBatchImportApi(Resource):
         try:
             # Skip the first row
             df = pd.read_csv(file)
-            result = []
-            for index, row in df.iterrows():
-                if document.doc_form == "qa_model":
-                    data = {"content": row[0], "answer": row[1]}
-                else:
-                    data = {"content": row[0]}
-                result.append(data)
+            if document.doc_form == "qa_model":
+                result = [
+                    {"content": content, "answer": answer} for content, answer in zip(df.iloc[:, 0], df.iloc[:, 1])
+                ]
+            else:
+                result = [{"content": content} for content in df.iloc[:, 0]]
             if len(result) == 0:
                 raise ValueError("The CSV file is empty.")
             # async job
@@ -409,7 +409,13 @@ class DatasetDocumentSegmentBatchImportApi(Resource):
         if cache_result is None:
             raise ValueError("The job is not exist.")
 
-        return {"job_id": job_id, "job_status": cache_result.decode()}, 200
+        response = {"job_id": job_id, "job_status": cache_result.decode()}
+        # number of segments indexed, while the job is processing
+        progress = redis_client.get("segment_batch_import_{}_progress".format(job_id))
+        if progress is not None:
+            response.update(json.loads(progress))
+
+        return response, 200
 
 
 api.add_resource(DatasetDocumentSegmentListApi, "/datasets/<uuid:dataset_id>/documents/<uuid:document_id>/segments")
@@ -8,6 +8,7 @@ from typing import Any
 from sqlalchemy.orm import DeclarativeMeta
 
 from configs import dify_config
+from core.app.apps.redis_stream_app_queue import RedisStreamAppQueue
 from core.app.entities.app_invoke_entities import InvokeFrom
 from core.app.entities.queue_entities import (
     AppQueueEvent,
@@ -37,9 +38,7 @@ class AppQueueManager:
             AppQueueManager._generate_task_belong_cache_key(self._task_id), 1800, f"{user_prefix}-{self._user_id}"
         )
 
-        q = queue.Queue()
-
-        self._q = q
+        self._q = self._create_queue()
 
     def listen(self) -> Generator:
         """
@@ -50,27 +49,32 @@ class AppQueueManager:
         listen_timeout = dify_config.APP_MAX_EXECUTION_TIME
         start_time = time.time()
         last_ping_time = 0
+        # stop flag and ping are checked once per second instead of after every message
+        next_check_time = start_time + 1
         while True:
             try:
-                message = self._q.get(timeout=1)
+                message = self._q.get(timeout=max(next_check_time - time.time(), 0))
                 if message is None:
                     break
 
                 yield message
             except queue.Empty:
+                pass
+
+            current_time = time.time()
+            if current_time < next_check_time:
                 continue
-            finally:
-                elapsed_time = time.time() - start_time
-                if elapsed_time >= listen_timeout or self._is_stopped():
-                    # publish two messages to make sure the client can receive the stop signal
-                    # and stop listening after the stop signal processed
-                    self.publish(
-                        QueueStopEvent(stopped_by=QueueStopEvent.StopBy.USER_MANUAL), PublishFrom.TASK_PIPELINE
-                    )
-
-                if elapsed_time // 10 > last_ping_time:
-                    self.publish(QueuePingEvent(), PublishFrom.TASK_PIPELINE)
-                    last_ping_time = elapsed_time // 10
+
+            next_check_time = current_time + 1
+            elapsed_time = current_time - start_time
+            if elapsed_time >= listen_timeout or self._is_stopped():
+                # publish two messages to make sure the client can receive the stop signal
+                # and stop listening after the stop signal processed
+                self.publish(QueueStopEvent(stopped_by=QueueStopEvent.StopBy.USER_MANUAL), PublishFrom.TASK_PIPELINE)
+
+            if elapsed_time // 10 > last_ping_time:
+                self.publish(QueuePingEvent(), PublishFrom.TASK_PIPELINE)
+                last_ping_time = elapsed_time // 10
 
     def stop_listen(self) -> None:
         """
@@ -79,6 +83,13 @@ class AppQueueManager:
         """
         self._q.put(None)
 
+    def _create_queue(self) -> queue.Queue | RedisStreamAppQueue:
+        """
+        Create the queue passing the messages from the generator to the listener
+        :return:
+        """
+        return queue.Queue()
+
     def publish_error(self, e, pub_from: PublishFrom) -> None:
         """
         Publish error
@@ -125,11 +136,18 @@ class AppQueueManager:
         stopped_cache_key = cls._generate_stopped_cache_key(task_id)
         redis_client.setex(stopped_cache_key, 600, 1)
 
+        if dify_config.APP_QUEUE_REDIS_STREAM_ENABLED:
+            # the listener reading the stream of the task is stopped without checking the flag
+            RedisStreamAppQueue.signal_stop(task_id)
+
     def _is_stopped(self) -> bool:
         """
         Check if task is stopped
         :return:
         """
+        if isinstance(self._q, RedisStreamAppQueue) and self._q.reading:
+            return self._q.stop_signaled
+
         stopped_cache_key = AppQueueManager._generate_stopped_cache_key(self._task_id)
         result = redis_client.get(stopped_cache_key)
         if result is not None:
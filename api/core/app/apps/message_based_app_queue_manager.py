@@ -1,4 +1,8 @@
+import queue
+
+from configs import dify_config
 from core.app.apps.base_app_queue_manager import AppQueueManager, GenerateTaskStoppedError, PublishFrom
+from core.app.apps.redis_stream_app_queue import RedisStreamAppQueue
 from core.app.entities.app_invoke_entities import InvokeFrom
 from core.app.entities.queue_entities import (
     AppQueueEvent,
@@ -9,18 +13,30 @@ from core.app.entities.queue_entities import (
     QueueMessageEndEvent,
     QueueStopEvent,
 )
+from models.model import AppMode
 
 
 class MessageBasedAppQueueManager(AppQueueManager):
     def __init__(
         self, task_id: str, user_id: str, invoke_from: InvokeFrom, conversation_id: str, app_mode: str, message_id: str
     ) -> None:
-        super().__init__(task_id, user_id, invoke_from)
-
         self._conversation_id = str(conversation_id)
         self._app_mode = app_mode
         self._message_id = str(message_id)
 
+        super().__init__(task_id, user_id, invoke_from)
+
+    def _create_queue(self) -> queue.Queue | RedisStreamAppQueue:
+        """
+        Create the queue passing the messages from the generator to the listener
+        :return:
+        """
+        # events of workflows share the runtime state of the graph with the listener, they are passed in process
+        if dify_config.APP_QUEUE_REDIS_STREAM_ENABLED and self._app_mode != AppMode.ADVANCED_CHAT.value:
+            return RedisStreamAppQueue(self._task_id)
+
+        return super()._create_queue()
+
     def construct_queue_message(self, event: AppQueueEvent) -> QueueMessage:
         return MessageQueueMessage(
             task_id=self._task_id,
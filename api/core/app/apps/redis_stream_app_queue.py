@@ -0,0 +1,271 @@
+import json
+import queue
+from collections import deque
+from typing import Any, Optional
+
+from configs import dify_config
+from core.app.entities.queue_entities import (
+    AppQueueEvent,
+    MessageQueueMessage,
+    QueueErrorEvent,
+    QueueEvent,
+    QueueMessage,
+    WorkflowQueueMessage,
+)
+from core.errors.error import (
+    AppInvokeQuotaExceededError,
+    ModelCurrentlyNotSupportError,
+    ProviderTokenNotInitError,
+    QuotaExceededError,
+)
+from core.model_runtime.entities.message_entities import (
+    AssistantPromptMessage,
+    ImagePromptMessageContent,
+    PromptMessage,
+    PromptMessageContentType,
+    PromptMessageRole,
+    SystemPromptMessage,
+    TextPromptMessageContent,
+    ToolPromptMessage,
+    UserPromptMessage,
+)
+from core.model_runtime.errors.invoke import (
+    InvokeAuthorizationError,
+    InvokeBadRequestError,
+    InvokeConnectionError,
+    InvokeError,
+    InvokeRateLimitError,
+    InvokeServerUnavailableError,
+)
+from extensions.ext_redis import redis_client
+
+# errors rebuilt with their type after passing through the stream, the others are rebuilt as Exception
+_ERROR_CLASSES = {
+    error_class.__name__: error_class
+    for error_class in (
+        InvokeAuthorizationError,
+        InvokeBadRequestError,
+        InvokeConnectionError,
+        InvokeRateLimitError,
+        InvokeServerUnavailableError,
+        InvokeError,
+        QuotaExceededError,
+        AppInvokeQuotaExceededError,
+        ProviderTokenNotInitError,
+        ModelCurrentlyNotSupportError,
+        ValueError,
+    )
+}
+
+# prompt messages of LLM results are declared with the base classes, the concrete classes are rebuilt
+# from the role and content type so tool calls and image details survive the stream
+_PROMPT_MESSAGE_CLASSES = {
+    PromptMessageRole.SYSTEM: SystemPromptMessage,
+    PromptMessageRole.USER: UserPromptMessage,
+    PromptMessageRole.ASSISTANT: AssistantPromptMessage,
+    PromptMessageRole.TOOL: ToolPromptMessage,
+}
+
+_PROMPT_MESSAGE_CONTENT_CLASSES = {
+    PromptMessageContentType.TEXT: TextPromptMessageContent,
+    PromptMessageContentType.IMAGE: ImagePromptMessageContent,
+}
+
+_MESSAGE_CLASSES = {
+    message_class.__name__: message_class for message_class in (MessageQueueMessage, WorkflowQueueMessage)
+}
+
+
+def _get_event_classes(event_class: type[AppQueueEvent]) -> dict[QueueEvent, type[AppQueueEvent]]:
+    event_classes = {}
+    for subclass in event_class.__subclasses__():
+        event_classes[subclass.model_fields["event"].default] = subclass
+        event_classes.update(_get_event_classes(subclass))
+
+    return event_classes
+
+
+class RedisStreamAppQueue:
+    """
+    Queue of the messages of a generation backed by a Redis stream, with the `put` and `get` methods of
+    `queue.Queue` used by the app queue managers.
+
+    Messages are serialized, so the generator and the listener of a task do not have to share a process, and
+    are kept in the stream for `APP_QUEUE_STREAM_TTL` seconds after the last one, so a listener can be created
+    again from the id of the last message it read. Stop signals are added to the stream and seen by the
+    listener as soon as they are read, without polling the stop flag.
+    """
+
+    _event_classes: dict[QueueEvent, type[AppQueueEvent]] = {}
+
+    def __init__(self, task_id: str, last_id: str = "0") -> None:
+        """
+        :param task_id: task id
+        :param last_id: id of the last stream entry read, messages are read from the start of the stream by default
+        """
+        self.task_id = task_id
+        self.stream_key = self.generate_stream_key(task_id)
+        self.last_id = last_id
+        # stop signals are only known by the process reading the stream
+        self.reading = False
+        self.stop_signaled = False
+        self._entries: deque[tuple[bytes, dict[bytes, bytes]]] = deque()
+
+    def put(self, message: Optional[QueueMessage]) -> None:
+        """
+        Add a message to the stream, None marks the end of the messages
+        :param message: queue message
+        :return:
+        """
+        if message is None:
+            self._add_entry(self.stream_key, {"type": "end"})
+        else:
+            self._add_entry(self.stream_key, {"type": "message", "data": self._dump_message(message)})
+
+    def get(self, timeout: Optional[float] = None) -> Optional[QueueMessage]:
+        """
+        Get the next message of the stream
+        :param timeout: seconds to wait for a message, wait until a message is added by default
+        :return: queue message, None at the end of the messages
+        :raises queue.Empty: when no message is added before the timeout or only a stop signal is read
+        """
+        self.reading = True
+        if not self._entries:
+            if timeout is None:
+                block = 0
+            else:
+                # a timeout under a millisecond reads the stream without blocking
+                block = max(int(timeout * 1000), 0) or None
+
+            response = redis_client.xread({self.stream_key: self.last_id}, count=100, block=block)
+            for _, entries in response or []:
+                self._entries.extend(entries)
+
+        while self._entries:
+            entry_id, fields = self._entries.popleft()
+            self.last_id = entry_id.decode()
+            entry_type = fields[b"type"]
+            if entry_type == b"stop":
+                self.stop_signaled = True
+            elif entry_type == b"end":
+                return None
+            else:
+                return self._load_message(fields[b"data"])
+
+        raise queue.Empty
+
+    @classmethod
+    def signal_stop(cls, task_id: str) -> None:
+        """
+        Add a stop signal to the stream of a task, the stream is created if no message was added yet
+        :param task_id: task id
+        :return:
+        """
+        cls._add_entry(cls.generate_stream_key(task_id), {"type": "stop"})
+
+    @classmethod
+    def generate_stream_key(cls, task_id: str) -> str:
+        """
+        Generate stream key
+        :param task_id: task id
+        :return:
+        """
+        return f"generate_task_stream:{task_id}"
+
+    @staticmethod
+    def _add_entry(stream_key: str, fields: dict[str, str]) -> None:
+        with redis_client.pipeline() as pipe:
+            pipe.xadd(stream_key, fields, maxlen=dify_config.APP_QUEUE_STREAM_MAX_LEN, approximate=True)
+            pipe.expire(stream_key, dify_config.APP_QUEUE_STREAM_TTL)
+            pipe.execute()
+
+    @staticmethod
+    def _dump_message(message: QueueMessage) -> str:
+        event = message.event
+        if isinstance(event, QueueErrorEvent):
+            event_data = {"event": event.event.value, "error": _dump_error(event.error)}
+        else:
+            # fields of the concrete classes of prompt messages are kept, e.g. tool calls and image details
+            event_data = event.model_dump(mode="json", serialize_as_any=True)
+
+        return json.dumps(
+            {
+                "type": type(message).__name__,
+                "message": message.model_dump(mode="json", exclude={"event"}),
+                "event": event_data,
+            }
+        )
+
+    @classmethod
+    def _load_message(cls, data: bytes) -> QueueMessage:
+        if not cls._event_classes:
+            cls._event_classes = _get_event_classes(AppQueueEvent)
+
+        message_data = json.loads(data)
+        event_data = message_data["event"]
+        event_class = cls._event_classes[QueueEvent(event_data["event"])]
+        if event_class is QueueErrorEvent:
+            event = QueueErrorEvent(error=_load_error(event_data["error"]))
+        else:
+            for field_name in ("chunk", "llm_result"):
+                if event_data.get(field_name):
+                    event_data[field_name] = _load_llm_result(event_data[field_name])
+            event = event_class.model_validate(event_data)
+
+        return _MESSAGE_CLASSES[message_data["type"]](**message_data["message"], event=event)
+
+
+def _load_llm_result(result_data: dict) -> dict:
+    # data of an LLMResult or an LLMResultChunk
+    result_data = {
+        **result_data,
+        "prompt_messages": [
+            _load_prompt_message(prompt_message_data) for prompt_message_data in result_data["prompt_messages"]
+        ],
+    }
+    if "delta" in result_data:
+        result_data["delta"] = {
+            **result_data["delta"],
+            "message": _load_prompt_message(result_data["delta"]["message"]),
+        }
+    else:
+        result_data["message"] = _load_prompt_message(result_data["message"])
+
+    return result_data
+
+
+def _load_prompt_message(prompt_message_data: dict) -> PromptMessage:
+    content = prompt_message_data.get("content")
+    if isinstance(content, list):
+        prompt_message_data = {
+            **prompt_message_data,
+            "content": [
+                _PROMPT_MESSAGE_CONTENT_CLASSES[PromptMessageContentType(content_data["type"])].model_validate(
+                    content_data
+                )
+                for content_data in content
+            ],
+        }
+
+    prompt_message_class = _PROMPT_MESSAGE_CLASSES[PromptMessageRole(prompt_message_data["role"])]
+    return prompt_message_class.model_validate(prompt_message_data)
+
+
+def _dump_error(error: Any) -> dict:
+    error_type = next(
+        (
+            error_class.__name__
+            for error_class in type(error).__mro__
+            if _ERROR_CLASSES.get(error_class.__name__) is error_class
+        ),
+        None,
+    )
+    return {"type": error_type, "message": str(error), "description": getattr(error, "description", None)}
+
+
+def _load_error(error_data: dict) -> Exception:
+    error = _ERROR_CLASSES.get(error_data["type"], Exception)(error_data["message"])
+    if error_data["description"] is not None:
+        error.description = error_data["description"]
+
+    return error
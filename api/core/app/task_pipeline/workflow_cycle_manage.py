@@ -1,5 +1,6 @@
 import json
 import time
+import uuid
 from datetime import datetime, timezone
 from typing import Any, Optional, Union, cast
 
@@ -27,6 +28,10 @@ from core.app.entities.task_entities import (
     WorkflowStartStreamResponse,
     WorkflowTaskState,
 )
+from core.app.task_pipeline.workflow_write_behind import (
+    WorkflowWriteBehindBuffer,
+    get_next_workflow_run_sequence_number,
+)
 from core.file.file_obj import FileVar
 from core.model_runtime.utils.encoders import jsonable_encoder
 from core.ops.entities.trace_entity import TraceTaskName
@@ -57,16 +62,12 @@ class WorkflowCycleManage:
     _user: Union[Account, EndUser]
     _task_state: WorkflowTaskState
     _workflow_system_variables: dict[SystemVariableKey, Any]
+    _workflow_write_behind: WorkflowWriteBehindBuffer
+    # node_execution_id -> node execution, kept in memory until the run finishes
+    _workflow_node_executions: dict[str, WorkflowNodeExecution]
 
     def _handle_workflow_run_start(self) -> WorkflowRun:
-        max_sequence = (
-            db.session.query(db.func.max(WorkflowRun.sequence_number))
-            .filter(WorkflowRun.tenant_id == self._workflow.tenant_id)
-            .filter(WorkflowRun.app_id == self._workflow.app_id)
-            .scalar()
-            or 0
-        )
-        new_sequence_number = max_sequence + 1
+        new_sequence_number = get_next_workflow_run_sequence_number(self._workflow.tenant_id, self._workflow.app_id)
 
         inputs = {**self._application_generate_entity.inputs}
         for key, value in (self._workflow_system_variables or {}).items():
@@ -83,8 +84,9 @@ class WorkflowCycleManage:
             else WorkflowRunTriggeredFrom.APP_RUN
         )
 
-        # init workflow run
+        # init workflow run, its row is written behind the stream responses
         workflow_run = WorkflowRun()
+        workflow_run.id = str(uuid.uuid4())
         workflow_run.tenant_id = self._workflow.tenant_id
         workflow_run.app_id = self._workflow.app_id
         workflow_run.sequence_number = new_sequence_number
@@ -99,11 +101,9 @@ class WorkflowCycleManage:
             CreatedByRole.ACCOUNT.value if isinstance(self._user, Account) else CreatedByRole.END_USER.value
         )
         workflow_run.created_by = self._user.id
+        workflow_run.created_at = datetime.now(timezone.utc).replace(tzinfo=None)
 
-        db.session.add(workflow_run)
-        db.session.commit()
-        db.session.refresh(workflow_run)
-        db.session.close()
+        self._workflow_write_behind.add(workflow_run)
 
         return workflow_run
 
@@ -127,6 +127,7 @@ class WorkflowCycleManage:
         :param conversation_id: conversation id
         :return:
         """
+        self._workflow_write_behind.flush(wait=True)
         workflow_run = self._refetch_workflow_run(workflow_run.id)
 
         workflow_run.status = WorkflowRunStatus.SUCCEEDED.value
@@ -174,6 +175,7 @@ class WorkflowCycleManage:
         :param error: error message
         :return:
         """
+        self._workflow_write_behind.flush(wait=True)
         workflow_run = self._refetch_workflow_run(workflow_run.id)
 
         workflow_run.status = status.value
@@ -225,8 +227,9 @@ class WorkflowCycleManage:
     def _handle_node_execution_start(
         self, workflow_run: WorkflowRun, event: QueueNodeStartedEvent
     ) -> WorkflowNodeExecution:
-        # init workflow node execution
+        # init workflow node execution, its row is written behind the stream responses
         workflow_node_execution = WorkflowNodeExecution()
+        workflow_node_execution.id = str(uuid.uuid4())
         workflow_node_execution.tenant_id = workflow_run.tenant_id
         workflow_node_execution.app_id = workflow_run.app_id
         workflow_node_execution.workflow_id = workflow_run.workflow_id
@@ -243,10 +246,8 @@ class WorkflowCycleManage:
         workflow_node_execution.created_by = workflow_run.created_by
         workflow_node_execution.created_at = datetime.now(timezone.utc).replace(tzinfo=None)
 
-        db.session.add(workflow_node_execution)
-        db.session.commit()
-        db.session.refresh(workflow_node_execution)
-        db.session.close()
+        self._workflow_write_behind.add(workflow_node_execution)
+        self._workflow_node_executions[event.node_execution_id] = workflow_node_execution
 
         return workflow_node_execution
 
@@ -256,7 +257,7 @@ class WorkflowCycleManage:
         :param event: queue node succeeded event
         :return:
         """
-        workflow_node_execution = self._refetch_workflow_node_execution(event.node_execution_id)
+        workflow_node_execution = self._get_workflow_node_execution(event.node_execution_id)
 
         inputs = WorkflowEntry.handle_special_values(event.inputs)
         outputs = WorkflowEntry.handle_special_values(event.outputs)
@@ -271,9 +272,7 @@ class WorkflowCycleManage:
         workflow_node_execution.finished_at = datetime.now(timezone.utc).replace(tzinfo=None)
         workflow_node_execution.elapsed_time = (workflow_node_execution.finished_at - event.start_at).total_seconds()
 
-        db.session.commit()
-        db.session.refresh(workflow_node_execution)
-        db.session.close()
+        self._workflow_write_behind.update(workflow_node_execution)
 
         return workflow_node_execution
 
@@ -283,7 +282,7 @@ class WorkflowCycleManage:
         :param event: queue node failed event
         :return:
         """
-        workflow_node_execution = self._refetch_workflow_node_execution(event.node_execution_id)
+        workflow_node_execution = self._get_workflow_node_execution(event.node_execution_id)
 
         inputs = WorkflowEntry.handle_special_values(event.inputs)
         outputs = WorkflowEntry.handle_special_values(event.outputs)
@@ -296,9 +295,7 @@ class WorkflowCycleManage:
         workflow_node_execution.outputs = json.dumps(outputs) if outputs else None
         workflow_node_execution.elapsed_time = (workflow_node_execution.finished_at - event.start_at).total_seconds()
 
-        db.session.commit()
-        db.session.refresh(workflow_node_execution)
-        db.session.close()
+        self._workflow_write_behind.update(workflow_node_execution)
 
         return workflow_node_execution
 
@@ -669,6 +666,19 @@ class WorkflowCycleManage:
 
         return workflow_run
 
+    def _get_workflow_node_execution(self, node_execution_id: str) -> WorkflowNodeExecution:
+        """
+        Get workflow node execution started by this pipeline
+        :param node_execution_id: workflow node execution id
+        :return:
+        """
+        workflow_node_execution = self._workflow_node_executions.get(node_execution_id)
+        if workflow_node_execution:
+            return workflow_node_execution
+
+        self._workflow_write_behind.flush(wait=True)
+        return self._refetch_workflow_node_execution(node_execution_id)
+
     def _refetch_workflow_node_execution(self, node_execution_id: str) -> WorkflowNodeExecution:
         """
         Refetch workflow node execution
@@ -0,0 +1,153 @@
+import logging
+import threading
+from typing import Optional, Union
+
+from flask import Flask, current_app
+from sqlalchemy import insert, update
+
+from configs import dify_config
+from core.helper.shared_thread_pool import SharedThreadPool
+from extensions.ext_database import db
+from extensions.ext_redis import redis_client
+from models.workflow import WorkflowNodeExecution, WorkflowRun
+
+logger = logging.getLogger(__name__)
+
+WorkflowModel = Union[WorkflowRun, WorkflowNodeExecution]
+
+
+class WorkflowWriteBehindBuffer:
+    """
+    Write-behind persistence of the workflow run and node executions of one task pipeline.
+
+    The pipeline keeps its rows in memory and only records their state here, a flush writes every row changed
+    since the previous flush in one transaction with batched inserts and updates. Flushes run on a pool shared
+    by all the pipelines of the process, one at a time per buffer, so the stream responses never wait for the
+    database. `flush(wait=True)` writes everything synchronously and is called before the run is finished,
+    readers of the run (tracing, logs, the API) always see its final state.
+    """
+
+    def __init__(self, flask_app: Optional[Flask] = None) -> None:
+        self._flask_app = flask_app or current_app._get_current_object()
+        # (model, id) -> (is_new, column values), inserts and updates of a row before a flush are merged
+        self._pending: dict[tuple[type[WorkflowModel], str], tuple[bool, dict]] = {}
+        self._pending_lock = threading.Lock()
+        # only one flush of the buffer at a time keeps the writes of a row in order
+        self._flush_lock = threading.Lock()
+        self._flush_scheduled = False
+
+    def add(self, instance: WorkflowModel) -> None:
+        """
+        Record a new row, it is inserted by the next flush
+        :param instance: workflow run or node execution with its id set
+        """
+        self._record(instance, is_new=True)
+
+    def update(self, instance: WorkflowModel) -> None:
+        """
+        Record the changes of a row, it is updated by the next flush
+        :param instance: workflow run or node execution
+        """
+        self._record(instance, is_new=False)
+
+    def flush(self, wait: bool = False) -> None:
+        """
+        Write the pending rows
+        :param wait: write synchronously and raise on failure, otherwise schedule a flush on the shared pool
+        """
+        if wait:
+            self._flush()
+            return
+
+        with self._pending_lock:
+            if self._flush_scheduled:
+                # the scheduled flush writes the pending rows until none are left, this change included
+                return
+            self._flush_scheduled = True
+        _flush_pool.submit(self._flush_in_background)
+
+    def _record(self, instance: WorkflowModel, is_new: bool) -> None:
+        values = {
+            column.key: getattr(instance, column.key)
+            for column in instance.__table__.columns
+            if getattr(instance, column.key) is not None
+        }
+        key = (type(instance), values["id"])
+        with self._pending_lock:
+            pending = self._pending.get(key)
+            # a row not inserted yet stays an insert
+            self._pending[key] = (is_new or (pending is not None and pending[0]), values)
+
+        if dify_config.WORKFLOW_WRITE_BEHIND_ENABLED:
+            self.flush()
+        else:
+            self.flush(wait=True)
+
+    def _flush_in_background(self) -> None:
+        with self._flask_app.app_context():
+            try:
+                while True:
+                    with self._pending_lock:
+                        if not self._pending:
+                            self._flush_scheduled = False
+                            return
+                    self._flush()
+            except Exception:
+                # the rows are kept pending, the next flush retries them
+                with self._pending_lock:
+                    self._flush_scheduled = False
+                logger.exception("Failed to flush workflow executions")
+            finally:
+                db.session.close()
+
+    def _flush(self) -> None:
+        with self._flush_lock:
+            with self._pending_lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return
+
+            inserts: dict[type[WorkflowModel], list[dict]] = {}
+            updates: dict[type[WorkflowModel], list[dict]] = {}
+            for (model, _), (is_new, values) in pending.items():
+                (inserts if is_new else updates).setdefault(model, []).append(values)
+
+            try:
+                for model, rows in inserts.items():
+                    db.session.execute(insert(model), rows)
+                for model, rows in updates.items():
+                    db.session.execute(update(model), rows)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                with self._pending_lock:
+                    for key, value in pending.items():
+                        # keep the newer state of rows changed during the flush, they are still not inserted
+                        newer = self._pending.get(key)
+                        self._pending[key] = (value[0] or newer[0], newer[1]) if newer else value
+                raise
+
+
+def get_next_workflow_run_sequence_number(tenant_id: str, app_id: str) -> int:
+    """
+    Allocate the next sequence number of the workflow runs of an app from a Redis counter,
+    the counter is initialized from the database the first time
+    :param tenant_id: tenant id
+    :param app_id: app id
+    :return: sequence number
+    """
+    cache_key = f"workflow_run_sequence:{tenant_id}:{app_id}"
+    if not redis_client.exists(cache_key):
+        max_sequence = (
+            db.session.query(db.func.max(WorkflowRun.sequence_number))
+            .filter(WorkflowRun.tenant_id == tenant_id, WorkflowRun.app_id == app_id)
+            .scalar()
+            or 0
+        )
+        # only the first process initializes the counter, the others increment it
+        redis_client.set(cache_key, max_sequence, nx=True)
+
+    return int(redis_client.incr(cache_key))
+
+
+_flush_pool = SharedThreadPool(dify_config.WORKFLOW_WRITE_BEHIND_MAX_WORKERS, thread_name_prefix="workflow-flush")
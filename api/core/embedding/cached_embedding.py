@@ -1,10 +1,15 @@
-import base64
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, cast
 
 import numpy as np
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError
 
+from configs import dify_config
+from core.helper.lru_cache import LRUCache
 from core.model_manager import ModelInstance
 from core.model_runtime.entities.model_entities import ModelPropertyKey
 from core.model_runtime.model_providers.__base.text_embedding_model import TextEmbeddingModel
@@ -16,6 +21,13 @@ from models.dataset import Embedding
 
 logger = logging.getLogger(__name__)
 
+# number of hashes per IN query and rows per INSERT statement
+EMBEDDING_CACHE_PAGE_SIZE = 1000
+
+# in process tier of the query embedding cache, in front of Redis
+_local_query_embedding_cache = LRUCache(capacity=dify_config.EMBEDDING_QUERY_CACHE_LOCAL_SIZE)
+_local_query_embedding_cache_lock = threading.Lock()
+
 
 class CacheEmbedding(Embeddings):
     def __init__(self, model_instance: ModelInstance, user: Optional[str] = None) -> None:
@@ -23,100 +35,187 @@ class CacheEmbedding(Embeddings):
         self._user = user
 
     def embed_documents(self, texts: list[str]) -> list[list[float]]:
-        """Embed search docs in batches of 10."""
+        """Embed search docs, cached embeddings are looked up and new ones stored in bulk."""
+        text_hashes = [helper.generate_text_hash(text) for text in texts]
         # use doc embedding cache or store if not exists
-        text_embeddings = [None for _ in range(len(texts))]
-        embedding_queue_indices = []
-        for i, text in enumerate(texts):
-            hash = helper.generate_text_hash(text)
-            embedding = (
-                db.session.query(Embedding)
-                .filter_by(
-                    model_name=self._model_instance.model, hash=hash, provider_name=self._model_instance.provider
-                )
-                .first()
-            )
-            if embedding:
-                text_embeddings[i] = embedding.get_embedding()
-            else:
-                embedding_queue_indices.append(i)
-        if embedding_queue_indices:
-            embedding_queue_texts = [texts[i] for i in embedding_queue_indices]
-            embedding_queue_embeddings = []
+        cached_embeddings = self._load_cached_embeddings(set(text_hashes))
+        text_embeddings = [cached_embeddings.get(hash) for hash in text_hashes]
+
+        # every distinct text is embedded only once
+        embedding_queue_texts = {}
+        for hash, text in zip(text_hashes, texts):
+            if hash not in cached_embeddings and hash not in embedding_queue_texts:
+                embedding_queue_texts[hash] = text
+
+        if embedding_queue_texts:
             try:
-                model_type_instance = cast(TextEmbeddingModel, self._model_instance.model_type_instance)
-                model_schema = model_type_instance.get_model_schema(
-                    self._model_instance.model, self._model_instance.credentials
-                )
-                max_chunks = (
-                    model_schema.model_properties[ModelPropertyKey.MAX_CHUNKS]
-                    if model_schema and ModelPropertyKey.MAX_CHUNKS in model_schema.model_properties
-                    else 1
-                )
-                for i in range(0, len(embedding_queue_texts), max_chunks):
-                    batch_texts = embedding_queue_texts[i : i + max_chunks]
-
-                    embedding_result = self._model_instance.invoke_text_embedding(texts=batch_texts, user=self._user)
-
-                    for vector in embedding_result.embeddings:
-                        try:
-                            normalized_embedding = (vector / np.linalg.norm(vector)).tolist()
-                            embedding_queue_embeddings.append(normalized_embedding)
-                        except IntegrityError:
-                            db.session.rollback()
-                        except Exception as e:
-                            logging.exception("Failed transform embedding: %s", e)
-                cache_embeddings = []
-                try:
-                    for i, embedding in zip(embedding_queue_indices, embedding_queue_embeddings):
-                        text_embeddings[i] = embedding
-                        hash = helper.generate_text_hash(texts[i])
-                        if hash not in cache_embeddings:
-                            embedding_cache = Embedding(
-                                model_name=self._model_instance.model,
-                                hash=hash,
-                                provider_name=self._model_instance.provider,
-                            )
-                            embedding_cache.set_embedding(embedding)
-                            db.session.add(embedding_cache)
-                            cache_embeddings.append(hash)
-                    db.session.commit()
-                except IntegrityError:
-                    db.session.rollback()
+                embedding_queue_embeddings = self._embed_texts(list(embedding_queue_texts.values()))
+                new_embeddings = {
+                    hash: embedding
+                    for hash, embedding in zip(embedding_queue_texts.keys(), embedding_queue_embeddings)
+                    if embedding is not None
+                }
+                self._save_embeddings(new_embeddings)
             except Exception as ex:
                 db.session.rollback()
                 logger.error("Failed to embed documents: %s", ex)
                 raise ex
 
+            for i, hash in enumerate(text_hashes):
+                if text_embeddings[i] is None:
+                    text_embeddings[i] = new_embeddings.get(hash)
+
         return text_embeddings
 
+    def _load_cached_embeddings(self, text_hashes: set[str]) -> dict[str, list[float]]:
+        """
+        Load cached embeddings with paged IN queries
+        :param text_hashes: hashes of the texts
+        :return: text hash -> embedding
+        """
+        cached_embeddings = {}
+        text_hashes = list(text_hashes)
+        for i in range(0, len(text_hashes), EMBEDDING_CACHE_PAGE_SIZE):
+            embeddings = (
+                db.session.query(Embedding.hash, Embedding.embedding)
+                .filter(
+                    Embedding.model_name == self._model_instance.model,
+                    Embedding.provider_name == self._model_instance.provider,
+                    Embedding.hash.in_(text_hashes[i : i + EMBEDDING_CACHE_PAGE_SIZE]),
+                )
+                .all()
+            )
+            for hash, embedding in embeddings:
+                cached_embeddings[hash] = Embedding.decode_embedding(embedding)
+
+        return cached_embeddings
+
+    def _embed_texts(self, texts: list[str]) -> list[Optional[list[float]]]:
+        """
+        Invoke the embedding model in batches of the model's max chunks,
+        up to INDEXING_EMBEDDING_MAX_CONCURRENT_BATCHES batches are requested concurrently
+        :param texts: texts to embed
+        :return: normalized embeddings in the order of the texts, None if an embedding could not be normalized
+        """
+        model_type_instance = cast(TextEmbeddingModel, self._model_instance.model_type_instance)
+        model_schema = model_type_instance.get_model_schema(
+            self._model_instance.model, self._model_instance.credentials
+        )
+        max_chunks = (
+            model_schema.model_properties[ModelPropertyKey.MAX_CHUNKS]
+            if model_schema and ModelPropertyKey.MAX_CHUNKS in model_schema.model_properties
+            else 1
+        )
+        batches = [texts[i : i + max_chunks] for i in range(0, len(texts), max_chunks)]
+
+        max_workers = min(dify_config.INDEXING_EMBEDDING_MAX_CONCURRENT_BATCHES, len(batches))
+        if max_workers > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                batch_embeddings = list(executor.map(self._embed_batch, batches))
+        else:
+            batch_embeddings = [self._embed_batch(batch_texts) for batch_texts in batches]
+
+        return [embedding for embeddings in batch_embeddings for embedding in embeddings]
+
+    def _embed_batch(self, batch_texts: list[str]) -> list[Optional[list[float]]]:
+        embedding_result = self._model_instance.invoke_text_embedding(texts=batch_texts, user=self._user)
+
+        embeddings = []
+        for vector in embedding_result.embeddings:
+            try:
+                embeddings.append((vector / np.linalg.norm(vector)).tolist())
+            except Exception as e:
+                logging.exception("Failed transform embedding: %s", e)
+                embeddings.append(None)
+
+        return embeddings
+
+    def _save_embeddings(self, embeddings: dict[str, list[float]]) -> None:
+        """
+        Bulk insert new embeddings, rows stored concurrently by other workers are kept
+        :param embeddings: text hash -> embedding
+        """
+        rows = [
+            {
+                "model_name": self._model_instance.model,
+                "hash": hash,
+                "provider_name": self._model_instance.provider,
+                "embedding": Embedding.encode_embedding(embedding),
+            }
+            for hash, embedding in embeddings.items()
+        ]
+        if not rows:
+            return
+
+        try:
+            for i in range(0, len(rows), EMBEDDING_CACHE_PAGE_SIZE):
+                db.session.execute(
+                    insert(Embedding)
+                    .values(rows[i : i + EMBEDDING_CACHE_PAGE_SIZE])
+                    .on_conflict_do_nothing(constraint="embedding_hash_idx")
+                )
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+
     def embed_query(self, text: str) -> list[float]:
         """Embed query text."""
-        # use doc embedding cache or store if not exists
+        return self.embed_query_array(text).tolist()
+
+    def embed_query_array(self, text: str) -> np.ndarray:
+        """
+        Embed query text, the embedding is cached in process and in Redis as float32 bytes
+        :param text: query text
+        :return: normalized float32 embedding, read-only as it may be shared with other callers
+        """
         hash = helper.generate_text_hash(text)
-        embedding_cache_key = f"{self._model_instance.provider}_{self._model_instance.model}_{hash}"
-        embedding = redis_client.get(embedding_cache_key)
-        if embedding:
-            redis_client.expire(embedding_cache_key, 600)
-            return list(np.frombuffer(base64.b64decode(embedding), dtype="float"))
-        try:
-            embedding_result = self._model_instance.invoke_text_embedding(texts=[text], user=self._user)
+        embedding_cache_key = f"embedding_query:{self._model_instance.provider}:{self._model_instance.model}:{hash}"
+        embedding_cache_ttl = dify_config.EMBEDDING_QUERY_CACHE_MODEL_TTLS_DICT.get(
+            f"{self._model_instance.provider}/{self._model_instance.model}", dify_config.EMBEDDING_QUERY_CACHE_TTL
+        )
 
-            embedding_results = embedding_result.embeddings[0]
-            embedding_results = (embedding_results / np.linalg.norm(embedding_results)).tolist()
-        except Exception as ex:
-            raise ex
+        embedding = self._get_local_query_embedding(embedding_cache_key)
+        if embedding is not None:
+            return embedding
+
+        embedding_bytes = redis_client.get(embedding_cache_key)
+        if embedding_bytes:
+            redis_client.expire(embedding_cache_key, embedding_cache_ttl)
+            # frombuffer over bytes gives a read-only array
+            embedding = np.frombuffer(embedding_bytes, dtype=np.float32)
+            self._put_local_query_embedding(embedding_cache_key, embedding, embedding_cache_ttl)
+            return embedding
+
+        embedding_result = self._model_instance.invoke_text_embedding(texts=[text], user=self._user)
+        vector = np.asarray(embedding_result.embeddings[0], dtype=np.float32)
+        embedding = vector / np.linalg.norm(vector)
+        embedding.flags.writeable = False
 
         try:
-            # encode embedding to base64
-            embedding_vector = np.array(embedding_results)
-            vector_bytes = embedding_vector.tobytes()
-            # Transform to Base64
-            encoded_vector = base64.b64encode(vector_bytes)
-            # Transform to string
-            encoded_str = encoded_vector.decode("utf-8")
-            redis_client.setex(embedding_cache_key, 600, encoded_str)
+            redis_client.setex(embedding_cache_key, embedding_cache_ttl, embedding.tobytes())
         except Exception as ex:
             logging.exception("Failed to add embedding to redis %s", ex)
+        self._put_local_query_embedding(embedding_cache_key, embedding, embedding_cache_ttl)
+
+        return embedding
+
+    @staticmethod
+    def _get_local_query_embedding(embedding_cache_key: str) -> Optional[np.ndarray]:
+        if not dify_config.EMBEDDING_QUERY_CACHE_LOCAL_SIZE:
+            return None
+
+        with _local_query_embedding_cache_lock:
+            cached = _local_query_embedding_cache.get(embedding_cache_key)
+        if not cached:
+            return None
+
+        expire_at, embedding = cached
+        return embedding if expire_at > time.monotonic() else None
+
+    @staticmethod
+    def _put_local_query_embedding(embedding_cache_key: str, embedding: np.ndarray, ttl: int) -> None:
+        if not dify_config.EMBEDDING_QUERY_CACHE_LOCAL_SIZE:
+            return
 
-        return embedding_results
+        with _local_query_embedding_cache_lock:
+            _local_query_embedding_cache.put(embedding_cache_key, (time.monotonic() + ttl, embedding))
@@ -18,6 +18,7 @@ from core.entities.provider_entities import (
 )
 from core.helper import encrypter
 from core.helper.model_provider_cache import ProviderCredentialsCache, ProviderCredentialsCacheType
+from core.helper.provider_configurations_cache import ProviderConfigurationsCache
 from core.model_runtime.entities.model_entities import FetchFrom, ModelType
 from core.model_runtime.entities.provider_entities import (
     ConfigurateMethod,
@@ -122,7 +123,8 @@ class ProviderConfiguration(BaseModel):
             if self.custom_configuration.provider:
                 credentials = self.custom_configuration.provider.credentials
 
-            return credentials
+            # configurations are shared by the invocations of the tenant, callers get their own credentials
+            return credentials.copy() if credentials else credentials
 
     def get_system_configuration_status(self) -> SystemConfigurationStatus:
         """
@@ -258,6 +260,7 @@ class ProviderConfiguration(BaseModel):
         )
 
         provider_model_credentials_cache.delete()
+        ProviderConfigurationsCache(tenant_id=self.tenant_id).delete()
 
         self.switch_preferred_provider_type(ProviderType.CUSTOM)
 
@@ -291,6 +294,7 @@ class ProviderConfiguration(BaseModel):
             )
 
             provider_model_credentials_cache.delete()
+            ProviderConfigurationsCache(tenant_id=self.tenant_id).delete()
 
     def get_custom_model_credentials(
         self, model_type: ModelType, model: str, obfuscated: bool = False
@@ -415,6 +419,7 @@ class ProviderConfiguration(BaseModel):
         )
 
         provider_model_credentials_cache.delete()
+        ProviderConfigurationsCache(tenant_id=self.tenant_id).delete()
 
     def delete_custom_model_credentials(self, model_type: ModelType, model: str) -> None:
         """
@@ -447,6 +452,7 @@ class ProviderConfiguration(BaseModel):
             )
 
             provider_model_credentials_cache.delete()
+            ProviderConfigurationsCache(tenant_id=self.tenant_id).delete()
 
     def enable_model(self, model_type: ModelType, model: str) -> ProviderModelSetting:
         """
@@ -481,6 +487,8 @@ class ProviderConfiguration(BaseModel):
             db.session.add(model_setting)
             db.session.commit()
 
+        ProviderConfigurationsCache(tenant_id=self.tenant_id).delete()
+
         return model_setting
 
     def disable_model(self, model_type: ModelType, model: str) -> ProviderModelSetting:
@@ -516,6 +524,8 @@ class ProviderConfiguration(BaseModel):
             db.session.add(model_setting)
             db.session.commit()
 
+        ProviderConfigurationsCache(tenant_id=self.tenant_id).delete()
+
         return model_setting
 
     def get_provider_model_setting(self, model_type: ModelType, model: str) -> Optional[ProviderModelSetting]:
@@ -583,6 +593,8 @@ class ProviderConfiguration(BaseModel):
             db.session.add(model_setting)
             db.session.commit()
 
+        ProviderConfigurationsCache(tenant_id=self.tenant_id).delete()
+
         return model_setting
 
     def disable_model_load_balancing(self, model_type: ModelType, model: str) -> ProviderModelSetting:
@@ -618,6 +630,8 @@ class ProviderConfiguration(BaseModel):
             db.session.add(model_setting)
             db.session.commit()
 
+        ProviderConfigurationsCache(tenant_id=self.tenant_id).delete()
+
         return model_setting
 
     def get_provider_instance(self) -> ModelProvider:
@@ -673,6 +687,7 @@ class ProviderConfiguration(BaseModel):
             db.session.add(preferred_model_provider)
 
         db.session.commit()
+        ProviderConfigurationsCache(tenant_id=self.tenant_id).delete()
 
     def extract_secret_variables(self, credential_form_schemas: list[CredentialFormSchema]) -> list[str]:
         """
@@ -0,0 +1,102 @@
+import hashlib
+import threading
+from typing import Optional
+
+from configs import dify_config
+from core.helper.code_executor.code_executor import CodeExecutionError, CodeExecutor, CodeLanguage
+from core.helper.shared_thread_pool import register_fork_reset
+
+
+class _PendingBatch:
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self.inputs_list: list[dict] = []
+        self.results: list[dict | CodeExecutionError] = []
+        self.full = threading.Event()
+        self.done = threading.Event()
+
+
+class CodeExecutionBatcher:
+    """
+    Coalesce concurrent executions of the same code into batch requests to the code execution service.
+
+    The first execution of a code in a batch scope, e.g. a run of a parallel iteration, opens a batch and waits up
+    to `max_wait_time` for the executions of other threads of the same scope, then sends all their input sets with
+    the code once. Executions of different scopes, such as other workflow runs or tenants, are never batched
+    together.
+    Every execution gets the result or error of its own input set.
+    """
+
+    def __init__(self, max_wait_time: float) -> None:
+        self.max_wait_time = max_wait_time
+        self._batches: dict[tuple[str, CodeLanguage, str], _PendingBatch] = {}
+        self._lock = threading.Lock()
+
+    def execute(
+        self,
+        language: CodeLanguage,
+        code: str,
+        inputs: dict,
+        max_batch_size: Optional[int] = None,
+        batch_scope: Optional[str] = None,
+    ) -> dict:
+        """
+        Execute code in the batch of the concurrent executions of the same code
+        :param language: code language
+        :param code: code
+        :param inputs: inputs
+        :param max_batch_size: number of executions expected at the same time, the batch is sent as soon as
+            it is reached
+        :param batch_scope: only executions of the same scope are batched together, not batched if None
+        :return: result
+        """
+        max_batch_size = min(
+            max_batch_size or dify_config.CODE_EXECUTION_BATCH_MAX_SIZE, dify_config.CODE_EXECUTION_BATCH_MAX_SIZE
+        )
+        if self.max_wait_time <= 0 or max_batch_size <= 1 or batch_scope is None:
+            return CodeExecutor.execute_workflow_code_template(language=language, code=code, inputs=inputs)
+
+        key = (batch_scope, language, hashlib.sha256(code.encode()).hexdigest())
+        with self._lock:
+            batch = self._batches.get(key)
+            is_leader = batch is None
+            if batch is None:
+                batch = self._batches[key] = _PendingBatch(max_batch_size)
+            index = len(batch.inputs_list)
+            batch.inputs_list.append(inputs)
+            if len(batch.inputs_list) >= batch.max_size:
+                # closed, the following executions open a new batch
+                self._batches.pop(key)
+                batch.full.set()
+
+        if is_leader:
+            batch.full.wait(self.max_wait_time)
+            with self._lock:
+                if self._batches.get(key) is batch:
+                    self._batches.pop(key)
+            try:
+                batch.results = CodeExecutor.execute_workflow_code_template_batch(
+                    language=language, code=code, inputs_list=batch.inputs_list
+                )
+            except Exception as e:
+                batch.results = [CodeExecutionError(str(e)) for _ in batch.inputs_list]
+            finally:
+                batch.done.set()
+        else:
+            batch.done.wait()
+
+        result = batch.results[index]
+        if isinstance(result, CodeExecutionError):
+            raise result
+
+        return result
+
+    def _reset(self) -> None:
+        # batches of the parent are led by threads which do not exist in the child process
+        self._batches = {}
+        self._lock = threading.Lock()
+
+
+code_execution_batcher = CodeExecutionBatcher(max_wait_time=dify_config.CODE_EXECUTION_BATCH_WAIT_TIME)
+
+register_fork_reset(code_execution_batcher._reset)
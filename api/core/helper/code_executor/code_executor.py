@@ -1,17 +1,20 @@
 import logging
+from collections.abc import Sequence
 from enum import Enum
 from threading import Lock
 from typing import Optional
 
-from httpx import Timeout, post
+from httpx import Timeout
 from pydantic import BaseModel
 from yarl import URL
 
 from configs import dify_config
 from core.helper.code_executor.javascript.javascript_transformer import NodeJsTemplateTransformer
+from core.helper.code_executor.jinja2.jinja2_sandbox import can_render_locally, render_template
 from core.helper.code_executor.jinja2.jinja2_transformer import Jinja2TemplateTransformer
 from core.helper.code_executor.python3.python3_transformer import Python3TemplateTransformer
 from core.helper.code_executor.template_transformer import TemplateTransformer
+from core.helper.http_client_pool import http_client_pool
 
 logger = logging.getLogger(__name__)
 
@@ -74,7 +77,8 @@ class CodeExecutor:
         }
 
         try:
-            response = post(
+            response = http_client_pool.request(
+                "POST",
                 str(url),
                 json=data,
                 headers=headers,
@@ -129,6 +133,9 @@ class CodeExecutor:
         if not template_transformer:
             raise CodeExecutionError(f"Unsupported language {language}")
 
+        if cls._is_rendered_locally(language, code):
+            return cls._render_jinja2_template_locally(code, inputs)
+
         runner, preload = template_transformer.transform_caller(code, inputs)
 
         try:
@@ -137,3 +144,83 @@ class CodeExecutor:
             raise e
 
         return template_transformer.transform_response(response)
+
+    @classmethod
+    def execute_workflow_code_template_batch(
+        cls, language: CodeLanguage, code: str, inputs_list: Sequence[dict]
+    ) -> list[dict | CodeExecutionError]:
+        """
+        Execute code once for every input set, the code is sent once per batch of
+        CODE_EXECUTION_BATCH_MAX_SIZE input sets instead of once per input set.
+        The input sets of a batch share the sandbox timeout, each one runs the code in a new namespace.
+        If the result of a batch cannot be parsed, its input sets are executed one by one
+        :param language: code language
+        :param code: code
+        :param inputs_list: input sets
+        :return: result or error of every input set, in the order of the input sets
+        """
+        template_transformer = cls.code_template_transformers.get(language)
+        if not template_transformer:
+            raise CodeExecutionError(f"Unsupported language {language}")
+
+        results: list[dict | CodeExecutionError] = []
+        if cls._is_rendered_locally(language, code):
+            for inputs in inputs_list:
+                try:
+                    results.append(cls._render_jinja2_template_locally(code, inputs))
+                except CodeExecutionError as e:
+                    results.append(e)
+            return results
+
+        batch_size = dify_config.CODE_EXECUTION_BATCH_MAX_SIZE
+        for start in range(0, len(inputs_list), batch_size):
+            batch = inputs_list[start : start + batch_size]
+            runner, preload = template_transformer.transform_batch_caller(code, batch)
+            try:
+                response = cls.execute_code(language, preload, runner)
+            except CodeExecutionError as e:
+                # e.g. a timeout, running the input sets again would run the ones already done twice
+                results.extend(CodeExecutionError(str(e)) for _ in batch)
+                continue
+
+            try:
+                batch_results = template_transformer.transform_batch_response(response)
+                if len(batch_results) != len(batch):
+                    raise CodeExecutionError("Failed to parse batch result")
+            except Exception as e:
+                if len(batch) == 1:
+                    results.append(CodeExecutionError(str(e)))
+                    continue
+
+                # the result could not be parsed, e.g. the code exited or printed to stdout,
+                # every input set runs on its own
+                logger.warning(f"Batch result of {len(batch)} input sets not parsed, executing them one by one: {e}")
+                for inputs in batch:
+                    try:
+                        results.append(cls.execute_workflow_code_template(language, code, inputs))
+                    except CodeExecutionError as item_error:
+                        results.append(item_error)
+                    except Exception as item_error:
+                        results.append(CodeExecutionError(str(item_error)))
+                continue
+
+            results.extend(
+                result if isinstance(result, dict) else CodeExecutionError(str(result)) for result in batch_results
+            )
+
+        return results
+
+    @classmethod
+    def _is_rendered_locally(cls, language: CodeLanguage, code: str) -> bool:
+        return (
+            language == CodeLanguage.JINJA2
+            and dify_config.TEMPLATE_TRANSFORM_LOCAL_SANDBOX_ENABLED
+            and can_render_locally(code)
+        )
+
+    @classmethod
+    def _render_jinja2_template_locally(cls, code: str, inputs: dict) -> dict:
+        try:
+            return {"result": render_template(code, inputs)}
+        except Exception as e:
+            raise CodeExecutionError(f"{type(e).__name__}: {e}")
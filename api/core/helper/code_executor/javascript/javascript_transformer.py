@@ -1,3 +1,4 @@
+from base64 import b64encode
 from textwrap import dedent
 
 from core.helper.code_executor.template_transformer import TemplateTransformer
@@ -24,3 +25,35 @@ class NodeJsTemplateTransformer(TemplateTransformer):
             """
         )
         return runner_script
+
+    @classmethod
+    def get_batch_runner_script(cls) -> str:
+        runner_script = dedent(
+            f"""
+            // compile the code once, it runs in a new scope for every input object
+            var code = Buffer.from('{cls._code_placeholder}', 'base64').toString('utf-8')
+            var load_main = new Function('require', code + '\\nreturn main')
+            
+            // decode and prepare input object list
+            var inputs_list = JSON.parse(Buffer.from('{cls._inputs_placeholder}', 'base64').toString('utf-8'))
+            
+            // execute main function for every input object
+            var results = inputs_list.map(function (inputs_obj) {{
+                try {{
+                    return {{result: JSON.stringify(load_main(require)(inputs_obj))}}
+                }} catch (e) {{
+                    return {{error: String(e)}}
+                }}
+            }})
+            
+            // convert results to json and print
+            var output_json = JSON.stringify(results)
+            var result = `<<RESULT>>${{output_json}}<<RESULT>>`
+            console.log(result)
+            """
+        )
+        return runner_script
+
+    @classmethod
+    def serialize_batch_code(cls, code: str) -> str:
+        return b64encode(code.encode()).decode("utf-8")
@@ -0,0 +1,51 @@
+import json
+from functools import lru_cache
+from typing import Optional
+
+from jinja2 import Template, TemplateSyntaxError, nodes
+from jinja2.sandbox import ImmutableSandboxedEnvironment
+
+_environment = ImmutableSandboxedEnvironment()
+
+# loops and macros can keep the process busy without bound, templates using them are left to the
+# code execution service, which limits the time and resources of the rendering
+_UNBOUNDED_NODES = (nodes.For, nodes.Macro, nodes.CallBlock)
+
+
+@lru_cache(maxsize=256)
+def _compile_template(template: str) -> Optional[Template]:
+    if next(_environment.parse(template).find_all(_UNBOUNDED_NODES), None) is not None:
+        return None
+
+    return _environment.from_string(template)
+
+
+def can_render_locally(template: str) -> bool:
+    """
+    Check if a template can be rendered in the process, templates with loops or macros can not
+    :param template: template
+    :return: True if the template can be rendered in the process
+    """
+    try:
+        return _compile_template(template) is not None
+    except TemplateSyntaxError:
+        # the error is reported by the rendering
+        return True
+
+
+def render_template(template: str, inputs: dict) -> str:
+    """
+    Render a template in the process with the Jinja2 sandboxed environment, the template can not
+    call unsafe methods nor modify the inputs. Compiled templates are cached by their source.
+    :param template: template, without loops nor macros
+    :param inputs: inputs
+    :return: rendered template
+    """
+    compiled_template = _compile_template(template)
+    if compiled_template is None:
+        raise ValueError("Templates with loops or macros are not rendered in the process")
+
+    # inputs go through JSON like with the code execution service, templates see the same values
+    inputs = json.loads(json.dumps(inputs, ensure_ascii=False))
+
+    return compiled_template.render(**inputs)
@@ -5,13 +5,13 @@ from core.helper.code_executor.template_transformer import TemplateTransformer
 
 class Jinja2TemplateTransformer(TemplateTransformer):
     @classmethod
-    def transform_response(cls, response: str) -> dict:
+    def transform_result_str(cls, result_str: str) -> dict:
         """
-        Transform response to dict
-        :param response: response
+        Transform the rendered template to dict
+        :param result_str: rendered template
         :return:
         """
-        return {"result": cls.extract_result_str_from_response(response)}
+        return {"result": result_str}
 
     @classmethod
     def get_runner_script(cls) -> str:
@@ -38,6 +38,33 @@ class Jinja2TemplateTransformer(TemplateTransformer):
             """)
         return runner_script
 
+    @classmethod
+    def get_batch_runner_script(cls) -> str:
+        runner_script = dedent(f"""
+            import jinja2
+            import json
+            from base64 import b64decode
+            
+            template = jinja2.Template('''{cls._code_placeholder}''')
+            
+            # decode and prepare input dict list
+            inputs_list = json.loads(b64decode('{cls._inputs_placeholder}').decode('utf-8'))
+            
+            # render template for every input dict
+            results = []
+            for inputs_obj in inputs_list:
+                try:
+                    results.append({{'result': template.render(**inputs_obj)}})
+                except Exception as e:
+                    results.append({{'error': f'{{type(e).__name__}}: {{e}}'}})
+            
+            # convert results to json and print
+            output_json = json.dumps(results)
+            result = f'''<<RESULT>>{{output_json}}<<RESULT>>'''
+            print(result)
+            """)
+        return runner_script
+
     @classmethod
     def get_preload_script(cls) -> str:
         preload_script = dedent("""
@@ -1,3 +1,4 @@
+from base64 import b64encode
 from textwrap import dedent
 
 from core.helper.code_executor.template_transformer import TemplateTransformer
@@ -25,3 +26,36 @@ class Python3TemplateTransformer(TemplateTransformer):
             print(result)
             """)
         return runner_script
+
+    @classmethod
+    def get_batch_runner_script(cls) -> str:
+        runner_script = dedent(f"""
+            import json
+            from base64 import b64decode
+            
+            # compile the code once, it runs in a new namespace for every input dict
+            code_obj = compile(b64decode('{cls._code_placeholder}').decode('utf-8'), '<code>', 'exec')
+            
+            # decode and prepare input dict list
+            inputs_list = json.loads(b64decode('{cls._inputs_placeholder}').decode('utf-8'))
+            
+            # execute main function for every input dict
+            results = []
+            for inputs_obj in inputs_list:
+                try:
+                    namespace = {{'__name__': '__main__'}}
+                    exec(code_obj, namespace)
+                    results.append({{'result': json.dumps(namespace['main'](**inputs_obj))}})
+                except Exception as e:
+                    results.append({{'error': f'{{type(e).__name__}}: {{e}}'}})
+            
+            # convert results to json and print
+            output_json = json.dumps(results)
+            result = f'''<<RESULT>>{{output_json}}<<RESULT>>'''
+            print(result)
+            """)
+        return runner_script
+
+    @classmethod
+    def serialize_batch_code(cls, code: str) -> str:
+        return b64encode(code.encode()).decode("utf-8")
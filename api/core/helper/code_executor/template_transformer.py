@@ -1,7 +1,14 @@
+import hashlib
 import json
 import re
+import threading
 from abc import ABC, abstractmethod
 from base64 import b64encode
+from collections.abc import Sequence
+
+_BATCH_RUNNER_CACHE_SIZE = 128
+_batch_runner_cache: dict[tuple[type, str], tuple[str, str]] = {}
+_batch_runner_cache_lock = threading.Lock()
 
 
 class TemplateTransformer(ABC):
@@ -37,7 +44,36 @@ class TemplateTransformer(ABC):
         :param response: response
         :return:
         """
-        return json.loads(cls.extract_result_str_from_response(response))
+        return cls.transform_result_str(cls.extract_result_str_from_response(response))
+
+    @classmethod
+    def transform_result_str(cls, result_str: str) -> dict:
+        """
+        Transform the result printed by the runner to dict
+        :param result_str: result between the result tags
+        :return:
+        """
+        return json.loads(result_str)
+
+    @classmethod
+    def transform_batch_response(cls, response: str) -> list[dict | Exception]:
+        """
+        Transform the response of a batch runner to the result or error of each input set
+        :param response: response
+        :return: results, in the order of the input sets
+        """
+        items = json.loads(cls.extract_result_str_from_response(response))
+        results: list[dict | Exception] = []
+        for item in items:
+            if "error" in item:
+                results.append(RuntimeError(item["error"]))
+                continue
+            try:
+                results.append(cls.transform_result_str(item["result"]))
+            except ValueError as e:
+                results.append(e)
+
+        return results
 
     @classmethod
     @abstractmethod
@@ -47,12 +83,32 @@ class TemplateTransformer(ABC):
         """
         pass
 
+    @classmethod
+    @abstractmethod
+    def get_batch_runner_script(cls) -> str:
+        """
+        Get runner script executing the code once for every input set of a list,
+        each input set runs the code again so state of the code does not leak between input sets.
+        The runner prints a JSON list between the result tags, every item being either
+        {"result": <result printed by the single runner>} or {"error": <error message>}
+        """
+        pass
+
     @classmethod
     def serialize_inputs(cls, inputs: dict) -> str:
         inputs_json_str = json.dumps(inputs, ensure_ascii=False).encode()
         input_base64_encoded = b64encode(inputs_json_str).decode("utf-8")
         return input_base64_encoded
 
+    @classmethod
+    def serialize_batch_code(cls, code: str) -> str:
+        """
+        Serialize the code put in the batch runner script
+        :param code: code
+        :return: code, as it replaces the code placeholder
+        """
+        return code
+
     @classmethod
     def assemble_runner_script(cls, code: str, inputs: dict) -> str:
         # assemble runner script
@@ -62,6 +118,40 @@ class TemplateTransformer(ABC):
         script = script.replace(cls._inputs_placeholder, inputs_str)
         return script
 
+    @classmethod
+    def transform_batch_caller(cls, code: str, inputs_list: Sequence[dict]) -> tuple[str, str]:
+        """
+        Transform code to a runner of many input sets
+        :param code: code
+        :param inputs_list: input sets
+        :return: runner, preload
+        """
+        prefix, suffix = cls._get_batch_runner_parts(code)
+        inputs_str = cls.serialize_inputs(list(inputs_list))
+
+        return f"{prefix}{inputs_str}{suffix}", cls.get_preload_script()
+
+    @classmethod
+    def _get_batch_runner_parts(cls, code: str) -> tuple[str, str]:
+        # the runner of a code is cached by its hash, only the inputs change between batches
+        code_hash = hashlib.sha256(code.encode()).hexdigest()
+        cache_key = (cls, code_hash)
+        parts = _batch_runner_cache.get(cache_key)
+        if parts is None:
+            # split on the inputs placeholder first, the code may contain the placeholder itself
+            prefix, suffix = cls.get_batch_runner_script().split(cls._inputs_placeholder, 1)
+            batch_code = cls.serialize_batch_code(code)
+            parts = (
+                prefix.replace(cls._code_placeholder, batch_code),
+                suffix.replace(cls._code_placeholder, batch_code),
+            )
+            with _batch_runner_cache_lock:
+                _batch_runner_cache[cache_key] = parts
+                while len(_batch_runner_cache) > _BATCH_RUNNER_CACHE_SIZE:
+                    _batch_runner_cache.pop(next(iter(_batch_runner_cache)))
+
+        return parts
+
     @classmethod
     def get_preload_script(cls) -> str:
         """
@@ -1,9 +1,82 @@
 import base64
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from typing import Optional
 
+from configs import dify_config
 from extensions.ext_database import db
 from libs import rsa
 
 
+class DecryptedTokenCache:
+    """
+    In process cache of decrypted tokens, keyed by tenant and the hash of the encrypted token.
+
+    An encrypted token always decrypts to the same value, updated credentials are new tokens and never
+    read a stale value. The values of a tenant are still dropped when its credentials change, and every
+    value leaving the cache is overwritten in memory. Values handed to callers are regular strings.
+    """
+
+    def __init__(self, max_size: int, ttl: float) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self._values: OrderedDict[tuple[str, str], tuple[bytearray, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, tenant_id: str, token: str) -> Optional[str]:
+        if not self.max_size:
+            return None
+
+        key = (tenant_id, self._hash_token(token))
+        with self._lock:
+            entry = self._values.get(key)
+            if not entry:
+                return None
+            if entry[1] <= time.monotonic():
+                self._evict(key)
+                return None
+            self._values.move_to_end(key)
+            return entry[0].decode()
+
+    def set(self, tenant_id: str, token: str, value: str) -> None:
+        if not self.max_size:
+            return
+
+        key = (tenant_id, self._hash_token(token))
+        with self._lock:
+            if key in self._values:
+                self._evict(key)
+            self._values[key] = (bytearray(value.encode()), time.monotonic() + self.ttl)
+            while len(self._values) > self.max_size:
+                self._evict(next(iter(self._values)))
+
+    def invalidate(self, tenant_id: str) -> None:
+        """
+        Drop the decrypted tokens of a tenant
+        :param tenant_id: tenant id
+        """
+        with self._lock:
+            for key in [key for key in self._values if key[0] == tenant_id]:
+                self._evict(key)
+
+    def _evict(self, key: tuple[str, str]) -> None:
+        value, _ = self._values.pop(key)
+        # zeroize the decrypted value
+        value[:] = bytes(len(value))
+
+    @staticmethod
+    def _hash_token(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+
+decrypted_token_cache = DecryptedTokenCache(
+    max_size=dify_config.DECRYPTED_TOKEN_CACHE_SIZE, ttl=dify_config.DECRYPTED_TOKEN_CACHE_TTL
+)
+
+
 def obfuscated_token(token: str):
     if not token:
         return token
@@ -22,13 +95,64 @@ def encrypt_token(tenant_id: str, token: str):
 
 
 def decrypt_token(tenant_id: str, token: str):
-    return rsa.decrypt(base64.b64decode(token), tenant_id)
+    decrypted_token = decrypted_token_cache.get(tenant_id, token)
+    if decrypted_token is None:
+        decrypted_token = rsa.decrypt(base64.b64decode(token), tenant_id)
+        decrypted_token_cache.set(tenant_id, token, decrypted_token)
+
+    return decrypted_token
 
 
 def batch_decrypt_token(tenant_id: str, tokens: list[str]):
+    decrypted_tokens = [decrypted_token_cache.get(tenant_id, token) for token in tokens]
+    if all(decrypted_token is not None for decrypted_token in decrypted_tokens):
+        return decrypted_tokens
+
+    # the private key is only loaded when some tokens are not cached
     rsa_key, cipher_rsa = rsa.get_decrypt_decoding(tenant_id)
+    for i, token in enumerate(tokens):
+        if decrypted_tokens[i] is None:
+            decrypted_tokens[i] = rsa.decrypt_token_with_decoding(base64.b64decode(token), rsa_key, cipher_rsa)
+            decrypted_token_cache.set(tenant_id, token, decrypted_tokens[i])
+
+    return decrypted_tokens
+
+
+def decrypt_secret_variables(tenant_id: str, credentials: dict, secret_variables: Iterable[str]) -> dict:
+    """
+    Decrypt the secret variables of credentials in place, values which can not be decrypted are kept as is
+    :param tenant_id: tenant id
+    :param credentials: credentials
+    :param secret_variables: names of the secret variables
+    :return: credentials
+    """
+    decoding = None
+    for variable in secret_variables:
+        token = credentials.get(variable)
+        if token is None:
+            continue
+
+        decrypted_token = decrypted_token_cache.get(tenant_id, token)
+        if decrypted_token is None:
+            # the private key is loaded once for all the variables
+            decoding = decoding or rsa.get_decrypt_decoding(tenant_id)
+            try:
+                decrypted_token = decrypt_token_with_decoding(token, *decoding)
+            except ValueError:
+                continue
+            decrypted_token_cache.set(tenant_id, token, decrypted_token)
+
+        credentials[variable] = decrypted_token
+
+    return credentials
+
 
-    return [rsa.decrypt_token_with_decoding(base64.b64decode(token), rsa_key, cipher_rsa) for token in tokens]
+def clear_decrypted_tokens(tenant_id: str) -> None:
+    """
+    Drop the decrypted tokens of a tenant cached by the process, called when its credentials change
+    :param tenant_id: tenant id
+    """
+    decrypted_token_cache.invalidate(tenant_id)
 
 
 def get_decrypt_decoding(tenant_id: str):
@@ -0,0 +1,210 @@
+"""
+Shared HTTP clients keeping connections alive across requests
+"""
+
+import importlib.util
+import logging
+import threading
+from collections.abc import Generator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from typing import Optional
+
+import httpx
+
+from configs import dify_config
+from core.helper.shared_thread_pool import register_fork_reset
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class HttpClientMetrics:
+    requests: int = 0
+    errors: int = 0
+    connections: int = 0
+    idle_connections: int = 0
+
+
+class HttpClientPool:
+    """
+    httpx clients shared by all the threads of a process, one per transport configuration (proxies and TLS
+    verification). Connections are kept alive and reused by the following requests instead of paying the TCP,
+    TLS and proxy CONNECT handshakes on every HTTP request node, tool call or code execution.
+
+    The clients never store cookies, responses received for one user must not send cookies in the requests of
+    another one. Cookies given to a request are still sent.
+    """
+
+    def __init__(
+        self,
+        max_connections: int,
+        max_keepalive_connections: int,
+        keepalive_expiry: float,
+        max_connections_per_host: int,
+        http2: bool,
+    ) -> None:
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.max_connections_per_host = max_connections_per_host
+        # HTTP/2 needs the optional h2 package
+        self.http2 = http2 and importlib.util.find_spec("h2") is not None
+        self._clients: dict[tuple, httpx.Client] = {}
+        self._metrics: dict[tuple, HttpClientMetrics] = {}
+        self._host_semaphores: dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def get_client(
+        self,
+        proxy: Optional[str] = None,
+        proxies: Optional[dict[str, str]] = None,
+        verify: bool = True,
+    ) -> httpx.Client:
+        """
+        Get the shared client of a transport configuration
+        :param proxy: proxy of all the requests
+        :param proxies: proxy of each scheme, e.g. {"http://": ..., "https://": ...}
+        :param verify: verify TLS certificates
+        :return: client
+        """
+        key = self._key(proxy, proxies, verify)
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    client = self._create_client(proxy, proxies, verify)
+                    self._clients[key] = client
+                    self._metrics[key] = HttpClientMetrics()
+
+        return client
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        proxy: Optional[str] = None,
+        proxies: Optional[dict[str, str]] = None,
+        verify: bool = True,
+        **kwargs,
+    ) -> httpx.Response:
+        """
+        Send a request with the shared client of its transport configuration
+        :param method: HTTP method
+        :param url: URL
+        :param proxy: proxy of all the requests
+        :param proxies: proxy of each scheme
+        :param verify: verify TLS certificates
+        :param kwargs: arguments of httpx.Client.request
+        :return: response
+        """
+        key = self._key(proxy, proxies, verify)
+        client = self.get_client(proxy, proxies, verify)
+        metrics = self._metrics[key]
+        try:
+            with self._host_slot(httpx.URL(url).host):
+                response = client.request(method=method, url=url, **kwargs)
+        except httpx.RequestError:
+            metrics.errors += 1
+            raise
+        finally:
+            metrics.requests += 1
+
+        return response
+
+    def get_metrics(self) -> dict[str, HttpClientMetrics]:
+        """
+        Get request counts and connection pool sizes of the shared clients
+        :return: client description -> metrics
+        """
+        with self._lock:
+            clients = list(self._clients.items())
+
+        metrics = {}
+        for key, client in clients:
+            client_metrics = HttpClientMetrics(requests=self._metrics[key].requests, errors=self._metrics[key].errors)
+            for transport in [client._transport, *client._mounts.values()]:
+                connections = getattr(getattr(transport, "_pool", None), "connections", [])
+                client_metrics.connections += len(connections)
+                client_metrics.idle_connections += sum(1 for connection in connections if connection.is_idle())
+            metrics[self._describe(key)] = client_metrics
+
+        return metrics
+
+    def close(self) -> None:
+        """
+        Close the connections of all the clients
+        """
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+            self._metrics.clear()
+
+        for client in clients:
+            client.close()
+
+    @contextmanager
+    def _host_slot(self, host: str) -> Generator[None, None, None]:
+        if not self.max_connections_per_host:
+            yield
+            return
+
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            with self._lock:
+                semaphore = self._host_semaphores.setdefault(
+                    host, threading.BoundedSemaphore(self.max_connections_per_host)
+                )
+
+        with semaphore:
+            yield
+
+    def _create_client(self, proxy: Optional[str], proxies: Optional[dict[str, str]], verify: bool) -> httpx.Client:
+        mounts = None
+        if proxies:
+            mounts = {
+                scheme: httpx.HTTPTransport(proxy=url, verify=verify, http2=self.http2, limits=self.limits)
+                for scheme, url in proxies.items()
+            }
+
+        return httpx.Client(
+            proxy=proxy,
+            mounts=mounts,
+            verify=verify,
+            http2=self.http2,
+            limits=self.limits,
+            cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
+        )
+
+    @staticmethod
+    def _key(proxy: Optional[str], proxies: Optional[dict[str, str]], verify: bool) -> tuple:
+        return proxy, tuple(sorted((proxies or {}).items())), verify
+
+    @staticmethod
+    def _describe(key: tuple) -> str:
+        proxy, proxies, verify = key
+        proxy_urls = [url for url in [proxy, *(url for _, url in proxies)] if url]
+        description = f"proxy={','.join(proxy_urls)}" if proxy_urls else "direct"
+        return description if verify else f"{description},insecure"
+
+    def _reset(self) -> None:
+        # connections of the parent must not be used by the child process, they are dropped without closing
+        self._clients = {}
+        self._metrics = {}
+        self._host_semaphores = {}
+        self._lock = threading.Lock()
+
+
+http_client_pool = HttpClientPool(
+    max_connections=dify_config.HTTP_CLIENT_MAX_CONNECTIONS,
+    max_keepalive_connections=dify_config.HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry=dify_config.HTTP_CLIENT_KEEPALIVE_EXPIRY,
+    max_connections_per_host=dify_config.HTTP_CLIENT_MAX_CONNECTIONS_PER_HOST,
+    http2=dify_config.HTTP_CLIENT_HTTP2_ENABLED,
+)
+
+register_fork_reset(http_client_pool._reset)
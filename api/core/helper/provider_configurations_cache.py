@@ -0,0 +1,89 @@
+import threading
+import time
+from typing import TYPE_CHECKING, Optional
+
+from configs import dify_config
+from core.helper.lru_cache import LRUCache
+from extensions.ext_redis import redis_client
+
+if TYPE_CHECKING:
+    from core.entities.provider_configuration import ProviderConfigurations
+
+# provider configurations built by the process, tenant id -> (version, expiry time, configurations)
+_local_configurations_cache = LRUCache(capacity=dify_config.PROVIDER_CONFIGURATIONS_CACHE_SIZE)
+_local_configurations_cache_lock = threading.Lock()
+
+# the version key outlives the local entries, an expired key can not make a stale entry current again
+VERSION_KEY_TTL = 86400
+
+
+class ProviderConfigurationsCache:
+    """
+    In process cache of the provider configurations of a tenant.
+
+    Entries are stamped with the version of the tenant configurations stored in Redis, every change of the
+    providers, models, settings or quotas of the tenant increments the version so the entries of all the
+    processes become stale. The version must be read before loading the configurations, a change committed
+    while they are loaded leaves them stamped with the previous version.
+    """
+
+    def __init__(self, tenant_id: str):
+        self.tenant_id = tenant_id
+        self.version_key = f"provider_configurations_version:tenant_id:{tenant_id}"
+
+    def get_version(self) -> str:
+        """
+        Get the current version of the tenant configurations.
+
+        :return:
+        """
+        version = redis_client.get(self.version_key)
+        return version.decode("utf-8") if version else "0"
+
+    def get(self, version: str) -> Optional["ProviderConfigurations"]:
+        """
+        Get the configurations cached by the process for a version.
+
+        :param version: current version
+        :return:
+        """
+        if not dify_config.PROVIDER_CONFIGURATIONS_CACHE_SIZE:
+            return None
+
+        with _local_configurations_cache_lock:
+            entry = _local_configurations_cache.get(self.tenant_id)
+
+        if not entry:
+            return None
+
+        cached_version, expires_at, configurations = entry
+        if cached_version != version or expires_at < time.monotonic():
+            return None
+
+        return configurations
+
+    def set(self, version: str, configurations: "ProviderConfigurations") -> None:
+        """
+        Cache configurations loaded at a version.
+
+        :param version: version read before loading the configurations
+        :param configurations: provider configurations
+        :return:
+        """
+        if not dify_config.PROVIDER_CONFIGURATIONS_CACHE_SIZE:
+            return
+
+        expires_at = time.monotonic() + dify_config.PROVIDER_CONFIGURATIONS_CACHE_TTL
+        with _local_configurations_cache_lock:
+            _local_configurations_cache.put(self.tenant_id, (version, expires_at, configurations))
+
+    def delete(self) -> None:
+        """
+        Invalidate the cached configurations of the tenant in all the processes.
+
+        :return:
+        """
+        with redis_client.pipeline() as pipe:
+            pipe.incr(self.version_key)
+            pipe.expire(self.version_key, VERSION_KEY_TTL)
+            pipe.execute()
@@ -0,0 +1,85 @@
+import os
+import threading
+import weakref
+from collections.abc import Callable, Generator
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Optional
+
+
+def register_fork_reset(reset: Callable[[], None]) -> None:
+    """
+    Call `reset` in the child process after a fork, threads and locks held by them do not survive the fork
+    :param reset: callback resetting the state shared by the threads of the process
+    :return:
+    """
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=reset)
+
+
+class SharedThreadPool:
+    """
+    Thread pool shared by the whole process, created on first use.
+
+    A child process created by fork starts with no pool and creates its own. A pool whose workers are held by
+    tasks that will not return in time can be retired: it runs the tasks already submitted and the following
+    tasks go to a new pool.
+    """
+
+    def __init__(self, max_workers: int, thread_name_prefix: str) -> None:
+        self.max_workers = max_workers
+        self.thread_name_prefix = thread_name_prefix
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+        # the pools are module singletons, a weak reference keeps the ones of tests collectable
+        ref = weakref.ref(self)
+
+        def reset_in_child() -> None:
+            shared_pool = ref()
+            if shared_pool is not None:
+                shared_pool._reset()
+
+        register_fork_reset(reset_in_child)
+
+    @contextmanager
+    def acquire(self) -> Generator[ThreadPoolExecutor, None, None]:
+        """
+        Get the current pool, it is not retired before the context exits
+        :return: pool
+        """
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix=self.thread_name_prefix
+                )
+            yield self._pool
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        """
+        Run a task in the current pool
+        :param fn: task
+        :param args: positional arguments of the task
+        :param kwargs: keyword arguments of the task
+        :return: future of the task
+        """
+        with self.acquire() as pool:
+            return pool.submit(fn, *args, **kwargs)
+
+    def retire(self, pool: ThreadPoolExecutor) -> bool:
+        """
+        Stop giving tasks to a pool, its idle threads exit and the running tasks still complete
+        :param pool: pool got from `acquire`
+        :return: False if the pool was already retired
+        """
+        with self._lock:
+            if self._pool is not pool:
+                return False
+            self._pool = None
+
+        pool.shutdown(wait=False)
+        return True
+
+    def _reset(self) -> None:
+        self._pool = None
+        self._lock = threading.Lock()
@@ -8,6 +8,8 @@ import time
 
 import httpx
 
+from core.helper.http_client_pool import http_client_pool
+
 SSRF_PROXY_ALL_URL = os.getenv("SSRF_PROXY_ALL_URL", "")
 SSRF_PROXY_HTTP_URL = os.getenv("SSRF_PROXY_HTTP_URL", "")
 SSRF_PROXY_HTTPS_URL = os.getenv("SSRF_PROXY_HTTPS_URL", "")
@@ -22,6 +24,9 @@ proxies = (
 BACKOFF_FACTOR = 0.5
 STATUS_FORCELIST = [429, 500, 502, 503, 504]
 
+# options of the transport, requests using them are not sent with the shared clients
+CLIENT_ONLY_OPTIONS = {"cert", "trust_env"}
+
 
 def make_request(method, url, max_retries=SSRF_DEFAULT_MAX_RETRIES, **kwargs):
     if "allow_redirects" in kwargs:
@@ -32,12 +37,19 @@ def make_request(method, url, max_retries=SSRF_DEFAULT_MAX_RETRIES, **kwargs):
     retries = 0
     while retries <= max_retries:
         try:
-            if SSRF_PROXY_ALL_URL:
-                response = httpx.request(method=method, url=url, proxy=SSRF_PROXY_ALL_URL, **kwargs)
+            if CLIENT_ONLY_OPTIONS & kwargs.keys():
+                if SSRF_PROXY_ALL_URL:
+                    response = httpx.request(method=method, url=url, proxy=SSRF_PROXY_ALL_URL, **kwargs)
+                elif proxies:
+                    response = httpx.request(method=method, url=url, proxies=proxies, **kwargs)
+                else:
+                    response = httpx.request(method=method, url=url, **kwargs)
+            elif SSRF_PROXY_ALL_URL:
+                response = http_client_pool.request(method=method, url=url, proxy=SSRF_PROXY_ALL_URL, **kwargs)
             elif proxies:
-                response = httpx.request(method=method, url=url, proxies=proxies, **kwargs)
+                response = http_client_pool.request(method=method, url=url, proxies=proxies, **kwargs)
             else:
-                response = httpx.request(method=method, url=url, **kwargs)
+                response = http_client_pool.request(method=method, url=url, **kwargs)
 
             if response.status_code not in STATUS_FORCELIST:
                 return response
@@ -3,6 +3,7 @@ from enum import Enum
 from json import JSONDecodeError
 from typing import Optional
 
+from core.helper import encrypter
 from extensions.ext_redis import redis_client
 
 
@@ -12,6 +13,7 @@ class ToolProviderCredentialsCacheType(Enum):
 
 class ToolProviderCredentialsCache:
     def __init__(self, tenant_id: str, identity_id: str, cache_type: ToolProviderCredentialsCacheType):
+        self.tenant_id = tenant_id
         self.cache_key = f"{cache_type.value}_credentials:tenant_id:{tenant_id}:id:{identity_id}"
 
     def get(self) -> Optional[dict]:
@@ -48,3 +50,5 @@ class ToolProviderCredentialsCache:
         :return:
         """
         redis_client.delete(self.cache_key)
+        # credentials changed, the previous secrets decrypted by this process are dropped as well
+        encrypter.clear_decrypted_tokens(self.tenant_id)
@@ -2,6 +2,7 @@ import concurrent.futures
 import datetime
 import json
 import logging
+import multiprocessing
 import re
 import threading
 import time
@@ -37,6 +38,9 @@ from models.dataset import Document as DatasetDocument
 from models.model import UploadFile
 from services.feature_service import FeatureService
 
+# number of documents extracted ahead of the document being transformed in the pipelined mode
+PIPELINE_EXTRACT_LOOKAHEAD = 2
+
 
 class IndexingRunner:
     def __init__(self):
@@ -45,6 +49,10 @@ class IndexingRunner:
 
     def run(self, dataset_documents: list[DatasetDocument]):
         """Run the indexing process."""
+        if dify_config.INDEXING_PIPELINE_PROCESS_WORKERS and len(dataset_documents) > 1:
+            self._run_pipeline(dataset_documents)
+            return
+
         for dataset_document in dataset_documents:
             try:
                 # get dataset
@@ -78,21 +86,176 @@ class IndexingRunner:
                     dataset_document=dataset_document,
                     documents=documents,
                 )
-            except DocumentIsPausedError:
-                raise DocumentIsPausedError("Document paused, document id: {}".format(dataset_document.id))
-            except ProviderTokenNotInitError as e:
-                dataset_document.indexing_status = "error"
-                dataset_document.error = str(e.description)
-                dataset_document.stopped_at = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
-                db.session.commit()
-            except ObjectDeletedError:
-                logging.warning("Document deleted, document id: {}".format(dataset_document.id))
             except Exception as e:
-                logging.exception("consume document failed")
-                dataset_document.indexing_status = "error"
-                dataset_document.error = str(e)
-                dataset_document.stopped_at = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
-                db.session.commit()
+                self._handle_run_error(dataset_document, e)
+
+    def _run_pipeline(self, dataset_documents: list[DatasetDocument]):
+        """
+        Run the indexing process of several documents in overlapping stages.
+        Documents are extracted up to PIPELINE_EXTRACT_LOOKAHEAD ahead with the CPU bound parsing done in a process
+        pool, while the main thread cleans and splits one document the segments of the previous one are embedded and
+        loaded into the index.
+        """
+        flask_app = current_app._get_current_object()
+        max_workers = dify_config.INDEXING_PIPELINE_PROCESS_WORKERS
+        metrics = {stage: IndexingStageMetrics(stage) for stage in ("extract", "transform", "load")}
+
+        process_pool = concurrent.futures.ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        extract_executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+        load_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        extract_futures: dict[int, concurrent.futures.Future] = {}
+
+        def submit_extract(index: int) -> None:
+            if index < len(dataset_documents) and index not in extract_futures:
+                extract_futures[index] = extract_executor.submit(
+                    self._extract_in_pipeline,
+                    flask_app,
+                    dataset_documents[index].id,
+                    process_pool,
+                    metrics["extract"],
+                )
+
+        try:
+            pending_load = None
+            for index, dataset_document in enumerate(dataset_documents):
+                # documents are extracted at most PIPELINE_EXTRACT_LOOKAHEAD ahead, so only a few stay in memory
+                for lookahead_index in range(index, index + PIPELINE_EXTRACT_LOOKAHEAD + 1):
+                    submit_extract(lookahead_index)
+                extract_future = extract_futures.pop(index)
+                try:
+                    # get dataset
+                    dataset = Dataset.query.filter_by(id=dataset_document.dataset_id).first()
+
+                    if not dataset:
+                        raise ValueError("no dataset found")
+
+                    # get the process rule
+                    processing_rule = (
+                        db.session.query(DatasetProcessRule)
+                        .filter(DatasetProcessRule.id == dataset_document.dataset_process_rule_id)
+                        .first()
+                    )
+                    index_processor = IndexProcessorFactory(dataset_document.doc_form).init_index_processor()
+                    # extract
+                    text_docs = extract_future.result()
+
+                    # transform
+                    transform_start_at = time.perf_counter()
+                    documents = self._transform(
+                        index_processor, dataset, text_docs, dataset_document.doc_language, processing_rule.to_dict()
+                    )
+                    # save segment
+                    self._load_segments(dataset, dataset_document, documents)
+                    metrics["transform"].record(len(documents), time.perf_counter() - transform_start_at)
+                except Exception as e:
+                    self._handle_run_error(dataset_document, e)
+                    continue
+
+                # load, at most one document at a time, overlapping the transform of the next one
+                self._wait_pipeline_load(pending_load)
+                pending_load = (
+                    dataset_document,
+                    load_executor.submit(
+                        self._load_in_pipeline,
+                        flask_app,
+                        index_processor,
+                        dataset.id,
+                        dataset_document.id,
+                        documents,
+                        metrics["load"],
+                    ),
+                )
+
+            self._wait_pipeline_load(pending_load)
+        finally:
+            extract_executor.shutdown(wait=True, cancel_futures=True)
+            load_executor.shutdown(wait=True, cancel_futures=True)
+            process_pool.shutdown(wait=True, cancel_futures=True)
+            for stage_metrics in metrics.values():
+                stage_metrics.log()
+
+    def _extract_in_pipeline(
+        self,
+        flask_app: Flask,
+        dataset_document_id: str,
+        process_pool: concurrent.futures.Executor,
+        metrics: "IndexingStageMetrics",
+    ) -> list[Document]:
+        with flask_app.app_context():
+            extract_start_at = time.perf_counter()
+            dataset_document = DatasetDocument.query.filter_by(id=dataset_document_id).first()
+            if not dataset_document:
+                raise DocumentIsDeletedPausedError()
+
+            processing_rule = (
+                db.session.query(DatasetProcessRule)
+                .filter(DatasetProcessRule.id == dataset_document.dataset_process_rule_id)
+                .first()
+            )
+            index_processor = IndexProcessorFactory(dataset_document.doc_form).init_index_processor()
+            text_docs = self._extract(
+                index_processor, dataset_document, processing_rule.to_dict(), process_pool=process_pool
+            )
+            metrics.record(len(text_docs), time.perf_counter() - extract_start_at)
+
+            return text_docs
+
+    def _load_in_pipeline(
+        self,
+        flask_app: Flask,
+        index_processor: BaseIndexProcessor,
+        dataset_id: str,
+        dataset_document_id: str,
+        documents: list[Document],
+        metrics: "IndexingStageMetrics",
+    ) -> None:
+        with flask_app.app_context():
+            load_start_at = time.perf_counter()
+            # the models of the main thread belong to its session, they are queried again in this thread
+            dataset = Dataset.query.filter_by(id=dataset_id).first()
+            if not dataset:
+                raise ValueError("no dataset found")
+            dataset_document = DatasetDocument.query.filter_by(id=dataset_document_id).first()
+            if not dataset_document:
+                raise DocumentIsDeletedPausedError()
+
+            self._load(
+                index_processor=index_processor,
+                dataset=dataset,
+                dataset_document=dataset_document,
+                documents=documents,
+            )
+            metrics.record(len(documents), time.perf_counter() - load_start_at)
+
+    def _wait_pipeline_load(self, pending_load: Optional[tuple[DatasetDocument, concurrent.futures.Future]]) -> None:
+        if not pending_load:
+            return
+
+        dataset_document, load_future = pending_load
+        try:
+            load_future.result()
+        except Exception as e:
+            self._handle_run_error(dataset_document, e)
+
+    @staticmethod
+    def _handle_run_error(dataset_document: DatasetDocument, e: Exception) -> None:
+        if isinstance(e, DocumentIsPausedError):
+            raise DocumentIsPausedError("Document paused, document id: {}".format(dataset_document.id))
+        elif isinstance(e, ProviderTokenNotInitError):
+            dataset_document.indexing_status = "error"
+            dataset_document.error = str(e.description)
+            dataset_document.stopped_at = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+            db.session.commit()
+        elif isinstance(e, ObjectDeletedError):
+            logging.warning("Document deleted, document id: {}".format(dataset_document.id))
+        else:
+            logging.exception("consume document failed")
+            dataset_document.indexing_status = "error"
+            dataset_document.error = str(e)
+            dataset_document.stopped_at = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+            db.session.commit()
 
     def run_in_splitting_status(self, dataset_document: DatasetDocument):
         """Run the indexing process when the index_status is splitting."""
@@ -289,7 +452,11 @@ class IndexingRunner:
         return {"total_segments": total_segments, "preview": preview_texts}
 
     def _extract(
-        self, index_processor: BaseIndexProcessor, dataset_document: DatasetDocument, process_rule: dict
+        self,
+        index_processor: BaseIndexProcessor,
+        dataset_document: DatasetDocument,
+        process_rule: dict,
+        process_pool: Optional[concurrent.futures.Executor] = None,
     ) -> list[Document]:
         # load file
         if dataset_document.data_source_type not in {"upload_file", "notion_import", "website_crawl"}:
@@ -309,7 +476,9 @@ class IndexingRunner:
                 extract_setting = ExtractSetting(
                     datasource_type="upload_file", upload_file=file_detail, document_model=dataset_document.doc_form
                 )
-                text_docs = index_processor.extract(extract_setting, process_rule_mode=process_rule["mode"])
+                text_docs = index_processor.extract(
+                    extract_setting, process_rule_mode=process_rule["mode"], process_pool=process_pool
+                )
         elif dataset_document.data_source_type == "notion_import":
             if (
                 not data_source_info
@@ -875,6 +1044,43 @@ class IndexingRunner:
         pass
 
 
+class IndexingStageMetrics:
+    """
+    Throughput of a stage of the pipelined indexing process.
+    """
+
+    def __init__(self, stage: str) -> None:
+        self.stage = stage
+        self.documents = 0
+        self.chunks = 0
+        self.busy_time = 0.0
+        self._start_at = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def record(self, chunks: int, elapsed: float) -> None:
+        """
+        Record a document processed by the stage
+        :param chunks: number of text documents or segments produced
+        :param elapsed: seconds spent on the document
+        """
+        with self._lock:
+            self.documents += 1
+            self.chunks += chunks
+            self.busy_time += elapsed
+
+    def log(self) -> None:
+        wall_time = time.perf_counter() - self._start_at
+        logging.info(
+            "Indexing stage %s: %d documents, %d chunks, busy %.2fs, %.2f documents/s, %.2f chunks/s",
+            self.stage,
+            self.documents,
+            self.chunks,
+            self.busy_time,
+            self.documents / wall_time if wall_time else 0,
+            self.chunks / wall_time if wall_time else 0,
+        )
+
+
 class DocumentIsPausedError(Exception):
     pass
 
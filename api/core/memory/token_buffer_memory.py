@@ -1,6 +1,9 @@
+import hashlib
+from collections import defaultdict
 from typing import Optional
 
 from core.app.app_config.features.file_upload.manager import FileUploadConfigManager
+from core.file.file_obj import FileExtraConfig
 from core.file.message_file_parser import MessageFileParser
 from core.model_manager import ModelInstance
 from core.model_runtime.entities.message_entities import (
@@ -13,8 +16,11 @@ from core.model_runtime.entities.message_entities import (
 )
 from core.prompt.utils.extract_thread_messages import extract_thread_messages
 from extensions.ext_database import db
+from extensions.ext_redis import redis_client
 from models.model import AppMode, Conversation, Message, MessageFile
-from models.workflow import WorkflowRun
+from models.workflow import Workflow, WorkflowRun
+
+PROMPT_MESSAGE_TOKENS_CACHE_TTL = 86400
 
 
 class TokenBufferMemory:
@@ -62,23 +68,22 @@ class TokenBufferMemory:
         messages = list(reversed(thread_messages))
 
         message_file_parser = MessageFileParser(tenant_id=app_record.tenant_id, app_id=app_record.id)
+        message_files = self._get_message_files([message.id for message in messages])
+        workflow_run_file_extra_configs = {}
+        if self.conversation.mode in {AppMode.ADVANCED_CHAT.value, AppMode.WORKFLOW.value}:
+            workflow_run_file_extra_configs = self._get_workflow_run_file_extra_configs(
+                [message.workflow_run_id for message in messages if message.id in message_files]
+            )
+
         prompt_messages = []
         for message in messages:
-            files = db.session.query(MessageFile).filter(MessageFile.message_id == message.id).all()
+            files = message_files.get(message.id)
             if files:
                 file_extra_config = None
                 if self.conversation.mode not in {AppMode.ADVANCED_CHAT.value, AppMode.WORKFLOW.value}:
                     file_extra_config = FileUploadConfigManager.convert(self.conversation.model_config)
-                else:
-                    if message.workflow_run_id:
-                        workflow_run = (
-                            db.session.query(WorkflowRun).filter(WorkflowRun.id == message.workflow_run_id).first()
-                        )
-
-                        if workflow_run:
-                            file_extra_config = FileUploadConfigManager.convert(
-                                workflow_run.workflow.features_dict, is_vision=False
-                            )
+                elif message.workflow_run_id:
+                    file_extra_config = workflow_run_file_extra_configs.get(message.workflow_run_id)
 
                 if file_extra_config:
                     file_objs = message_file_parser.transform_message_files(files, file_extra_config)
@@ -101,16 +106,137 @@ class TokenBufferMemory:
         if not prompt_messages:
             return []
 
-        # prune the chat message if it exceeds the max token limit
-        curr_message_tokens = self.model_instance.get_llm_num_tokens(prompt_messages)
+        # prune the chat message if it exceeds the max token limit, with the cached token count of each message
+        prompt_messages_tokens = self._get_prompt_messages_tokens(prompt_messages)
+        curr_message_tokens = sum(prompt_messages_tokens)
+        start = 0
+        while curr_message_tokens > max_token_limit and start < len(prompt_messages) - 1:
+            curr_message_tokens -= prompt_messages_tokens[start]
+            start += 1
+
+        return prompt_messages[start:]
+
+    @staticmethod
+    def _get_message_files(message_ids: list[str]) -> dict[str, list[MessageFile]]:
+        """
+        Get the files of messages in one query.
+        :param message_ids: message ids
+        :return: message id -> files
+        """
+        if not message_ids:
+            return {}
+
+        message_files = defaultdict(list)
+        files = db.session.query(MessageFile).filter(MessageFile.message_id.in_(message_ids)).all()
+        for file in files:
+            message_files[file.message_id].append(file)
+
+        return message_files
+
+    @staticmethod
+    def _get_workflow_run_file_extra_configs(workflow_run_ids: list[str]) -> dict[str, FileExtraConfig]:
+        """
+        Get the file upload configs of the workflows of workflow runs in one query.
+        :param workflow_run_ids: workflow run ids
+        :return: workflow run id -> file upload config
+        """
+        workflow_run_ids = [workflow_run_id for workflow_run_id in set(workflow_run_ids) if workflow_run_id]
+        if not workflow_run_ids:
+            return {}
+
+        rows = (
+            db.session.query(WorkflowRun.id, Workflow)
+            .join(Workflow, Workflow.id == WorkflowRun.workflow_id)
+            .filter(WorkflowRun.id.in_(workflow_run_ids))
+            .all()
+        )
+
+        # runs of the same workflow share its config
+        workflow_file_extra_configs = {}
+        file_extra_configs = {}
+        for workflow_run_id, workflow in rows:
+            if workflow.id not in workflow_file_extra_configs:
+                workflow_file_extra_configs[workflow.id] = FileUploadConfigManager.convert(
+                    workflow.features_dict, is_vision=False
+                )
+            file_extra_config = workflow_file_extra_configs[workflow.id]
+            if file_extra_config:
+                file_extra_configs[workflow_run_id] = file_extra_config
+
+        return file_extra_configs
+
+    def _get_prompt_messages_tokens(self, prompt_messages: list[PromptMessage]) -> list[int]:
+        """
+        Get the number of tokens of each prompt message, counts are cached by model and message content
+        so messages of the history are only counted once.
+        The messages not cached are counted with a single call, as the token counters of some providers are remote,
+        and the count is split between them by the size of their text.
+        :param prompt_messages: prompt messages
+        :return: number of tokens of each prompt message
+        """
+        serialized_messages = [prompt_message.model_dump_json() for prompt_message in prompt_messages]
+        cache_keys = [
+            "prompt_message_tokens:{}:{}:{}".format(
+                self.model_instance.provider,
+                self.model_instance.model,
+                hashlib.sha256(serialized_message.encode()).hexdigest(),
+            )
+            for serialized_message in serialized_messages
+        ]
+        cached_tokens = redis_client.mget(cache_keys)
+
+        prompt_messages_tokens = [int(tokens) if tokens is not None else 0 for tokens in cached_tokens]
+        missed_indexes = [i for i, tokens in enumerate(cached_tokens) if tokens is None]
+        if not missed_indexes:
+            return prompt_messages_tokens
+
+        missed_tokens = self.model_instance.get_llm_num_tokens([prompt_messages[i] for i in missed_indexes])
+        split_tokens = self._split_tokens(
+            missed_tokens, [self._get_text_size(prompt_messages[i]) for i in missed_indexes]
+        )
+        with redis_client.pipeline() as pipe:
+            for i, tokens in zip(missed_indexes, split_tokens):
+                prompt_messages_tokens[i] = tokens
+                pipe.setex(cache_keys[i], PROMPT_MESSAGE_TOKENS_CACHE_TTL, tokens)
+            pipe.execute()
+
+        return prompt_messages_tokens
+
+    @staticmethod
+    def _get_text_size(prompt_message: PromptMessage) -> int:
+        """
+        Get the number of characters of the text content of a prompt message.
+        :param prompt_message: prompt message
+        :return: number of characters
+        """
+        if not prompt_message.content:
+            return 0
+        if isinstance(prompt_message.content, str):
+            return len(prompt_message.content)
+
+        return sum(
+            len(content.data) for content in prompt_message.content if isinstance(content, TextPromptMessageContent)
+        )
+
+    @staticmethod
+    def _split_tokens(tokens: int, weights: list[int]) -> list[int]:
+        """
+        Split a number of tokens in proportion to weights, the parts add up to the number of tokens.
+        :param tokens: number of tokens
+        :param weights: weights
+        :return: parts
+        """
+        total_weight = sum(weights)
+        if total_weight <= 0:
+            return [tokens // len(weights) + (1 if i < tokens % len(weights) else 0) for i in range(len(weights))]
 
-        if curr_message_tokens > max_token_limit:
-            pruned_memory = []
-            while curr_message_tokens > max_token_limit and len(prompt_messages) > 1:
-                pruned_memory.append(prompt_messages.pop(0))
-                curr_message_tokens = self.model_instance.get_llm_num_tokens(prompt_messages)
+        parts = [tokens * weight // total_weight for weight in weights]
+        # the tokens lost by rounding down go to the largest remainders
+        remainders = sorted(range(len(weights)), key=lambda i: tokens * weights[i] % total_weight, reverse=True)
+        for i in remainders[: tokens - sum(parts)]:
+            parts[i] += 1
 
-        return prompt_messages
+        return parts
 
     def get_history_prompt_text(
         self,
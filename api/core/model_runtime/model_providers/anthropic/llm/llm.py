@@ -43,6 +43,7 @@ from core.model_runtime.errors.invoke import (
 )
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
 from core.model_runtime.model_providers.__base.large_language_model import LargeLanguageModel
+from core.model_runtime.utils.client_cache import model_client_cache
 
 ANTHROPIC_BLOCK_MODE_PROMPT = """You should always follow the instructions and output a valid {{block}} object.
 The structure of the {{block}} object you can found in the instructions, use {"answer": "$your_answer"} as the default structure
@@ -113,7 +114,7 @@ class AnthropicLargeLanguageModel(LargeLanguageModel):
             model_parameters["max_tokens"] = model_parameters.pop("max_tokens_to_sample")
 
         # init model client
-        client = Anthropic(**credentials_kwargs)
+        client = model_client_cache.get_client("anthropic", Anthropic, credentials_kwargs)
 
         extra_model_kwargs = {}
         if stop:
@@ -254,7 +255,7 @@ class AnthropicLargeLanguageModel(LargeLanguageModel):
         """
         prompt = self._convert_messages_to_prompt_anthropic(prompt_messages)
 
-        client = Anthropic(api_key="")
+        client = model_client_cache.get_client("anthropic", Anthropic, {"api_key": ""})
         tokens = client.count_tokens(prompt)
 
         tool_call_inner_prompts_tokens_map = {
@@ -29,6 +29,7 @@ from core.model_runtime.model_providers.__base.large_language_model import Large
 from core.model_runtime.model_providers.azure_openai._common import _CommonAzureOpenAI
 from core.model_runtime.model_providers.azure_openai._constant import LLM_BASE_MODELS
 from core.model_runtime.utils import helper
+from core.model_runtime.utils.client_cache import model_client_cache
 
 logger = logging.getLogger(__name__)
 
@@ -117,7 +118,7 @@ class AzureOpenAILargeLanguageModel(_CommonAzureOpenAI, LargeLanguageModel):
             raise CredentialsValidateFailedError(f'Base Model Name {credentials["base_model_name"]} is invalid')
 
         try:
-            client = AzureOpenAI(**self._to_credential_kwargs(credentials))
+            client = model_client_cache.get_client("azure_openai", AzureOpenAI, self._to_credential_kwargs(credentials))
 
             if ai_model_entity.entity.model_properties.get(ModelPropertyKey.MODE) == LLMMode.CHAT.value:
                 # chat model
@@ -157,7 +158,7 @@ class AzureOpenAILargeLanguageModel(_CommonAzureOpenAI, LargeLanguageModel):
         stream: bool = True,
         user: Optional[str] = None,
     ) -> Union[LLMResult, Generator]:
-        client = AzureOpenAI(**self._to_credential_kwargs(credentials))
+        client = model_client_cache.get_client("azure_openai", AzureOpenAI, self._to_credential_kwargs(credentials))
 
         extra_model_kwargs = {}
 
@@ -279,7 +280,7 @@ class AzureOpenAILargeLanguageModel(_CommonAzureOpenAI, LargeLanguageModel):
         stream: bool = True,
         user: Optional[str] = None,
     ) -> Union[LLMResult, Generator]:
-        client = AzureOpenAI(**self._to_credential_kwargs(credentials))
+        client = model_client_cache.get_client("azure_openai", AzureOpenAI, self._to_credential_kwargs(credentials))
 
         response_format = model_parameters.get("response_format")
         if response_format:
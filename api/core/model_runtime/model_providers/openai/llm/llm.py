@@ -27,6 +27,7 @@ from core.model_runtime.entities.model_entities import AIModelEntity, FetchFrom,
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
 from core.model_runtime.model_providers.__base.large_language_model import LargeLanguageModel
 from core.model_runtime.model_providers.openai._common import _CommonOpenAI
+from core.model_runtime.utils.client_cache import model_client_cache
 
 logger = logging.getLogger(__name__)
 
@@ -294,7 +295,7 @@ class OpenAILargeLanguageModel(_CommonOpenAI, LargeLanguageModel):
         try:
             # transform credentials to kwargs for model instance
             credentials_kwargs = self._to_credential_kwargs(credentials)
-            client = OpenAI(**credentials_kwargs)
+            client = model_client_cache.get_client("openai", OpenAI, credentials_kwargs)
 
             # handle fine tune remote models
             base_model = model
@@ -345,7 +346,7 @@ class OpenAILargeLanguageModel(_CommonOpenAI, LargeLanguageModel):
 
         # transform credentials to kwargs for model instance
         credentials_kwargs = self._to_credential_kwargs(credentials)
-        client = OpenAI(**credentials_kwargs)
+        client = model_client_cache.get_client("openai", OpenAI, credentials_kwargs)
 
         # get all remote models
         remote_models = client.models.list()
@@ -405,7 +406,7 @@ class OpenAILargeLanguageModel(_CommonOpenAI, LargeLanguageModel):
         credentials_kwargs = self._to_credential_kwargs(credentials)
 
         # init model client
-        client = OpenAI(**credentials_kwargs)
+        client = model_client_cache.get_client("openai", OpenAI, credentials_kwargs)
 
         extra_model_kwargs = {}
 
@@ -576,7 +577,7 @@ class OpenAILargeLanguageModel(_CommonOpenAI, LargeLanguageModel):
         credentials_kwargs = self._to_credential_kwargs(credentials)
 
         # init model client
-        client = OpenAI(**credentials_kwargs)
+        client = model_client_cache.get_client("openai", OpenAI, credentials_kwargs)
 
         response_format = model_parameters.get("response_format")
         if response_format:
@@ -7,6 +7,7 @@ from core.model_runtime.entities.model_entities import ModelPropertyKey
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
 from core.model_runtime.model_providers.__base.moderation_model import ModerationModel
 from core.model_runtime.model_providers.openai._common import _CommonOpenAI
+from core.model_runtime.utils.client_cache import model_client_cache
 
 
 class OpenAIModerationModel(_CommonOpenAI, ModerationModel):
@@ -28,7 +29,7 @@ class OpenAIModerationModel(_CommonOpenAI, ModerationModel):
         credentials_kwargs = self._to_credential_kwargs(credentials)
 
         # init model client
-        client = OpenAI(**credentials_kwargs)
+        client = model_client_cache.get_client("openai", OpenAI, credentials_kwargs)
 
         # chars per chunk
         length = self._get_max_characters_per_chunk(model, credentials)
@@ -57,7 +58,7 @@ class OpenAIModerationModel(_CommonOpenAI, ModerationModel):
         try:
             # transform credentials to kwargs for model instance
             credentials_kwargs = self._to_credential_kwargs(credentials)
-            client = OpenAI(**credentials_kwargs)
+            client = model_client_cache.get_client("openai", OpenAI, credentials_kwargs)
 
             # call moderation model
             self._moderation_invoke(
@@ -5,6 +5,7 @@ from openai import OpenAI
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
 from core.model_runtime.model_providers.__base.speech2text_model import Speech2TextModel
 from core.model_runtime.model_providers.openai._common import _CommonOpenAI
+from core.model_runtime.utils.client_cache import model_client_cache
 
 
 class OpenAISpeech2TextModel(_CommonOpenAI, Speech2TextModel):
@@ -53,7 +54,7 @@ class OpenAISpeech2TextModel(_CommonOpenAI, Speech2TextModel):
         credentials_kwargs = self._to_credential_kwargs(credentials)
 
         # init model client
-        client = OpenAI(**credentials_kwargs)
+        client = model_client_cache.get_client("openai", OpenAI, credentials_kwargs)
 
         response = client.audio.transcriptions.create(model=model, file=file)
 
@@ -11,6 +11,7 @@ from core.model_runtime.entities.text_embedding_entities import EmbeddingUsage,
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
 from core.model_runtime.model_providers.__base.text_embedding_model import TextEmbeddingModel
 from core.model_runtime.model_providers.openai._common import _CommonOpenAI
+from core.model_runtime.utils.client_cache import model_client_cache
 
 
 class OpenAITextEmbeddingModel(_CommonOpenAI, TextEmbeddingModel):
@@ -33,7 +34,7 @@ class OpenAITextEmbeddingModel(_CommonOpenAI, TextEmbeddingModel):
         # transform credentials to kwargs for model instance
         credentials_kwargs = self._to_credential_kwargs(credentials)
         # init model client
-        client = OpenAI(**credentials_kwargs)
+        client = model_client_cache.get_client("openai", OpenAI, credentials_kwargs)
 
         extra_model_kwargs = {}
         if user:
@@ -133,7 +134,7 @@ class OpenAITextEmbeddingModel(_CommonOpenAI, TextEmbeddingModel):
         try:
             # transform credentials to kwargs for model instance
             credentials_kwargs = self._to_credential_kwargs(credentials)
-            client = OpenAI(**credentials_kwargs)
+            client = model_client_cache.get_client("openai", OpenAI, credentials_kwargs)
 
             # call embedding model
             self._embedding_invoke(model=model, client=client, texts=["ping"], extra_model_kwargs={})
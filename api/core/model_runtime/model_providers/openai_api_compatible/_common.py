@@ -1,3 +1,6 @@
+from collections.abc import Mapping
+from http.cookiejar import DefaultCookiePolicy
+
 import requests
 
 from core.model_runtime.errors.invoke import (
@@ -8,9 +11,27 @@ from core.model_runtime.errors.invoke import (
     InvokeRateLimitError,
     InvokeServerUnavailableError,
 )
+from core.model_runtime.utils.client_cache import model_client_cache
+
+
+def _create_session() -> requests.Session:
+    session = requests.Session()
+    # responses of the endpoint must not set cookies sent with the following requests
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    return session
 
 
 class _CommonOaiApiCompat:
+    @staticmethod
+    def _get_session(credentials: Mapping) -> requests.Session:
+        """
+        Get the session shared by the requests of the credentials, keeping connections to the endpoint alive
+
+        :param credentials: model credentials
+        :return: session
+        """
+        return model_client_cache.get_client("openai_api_compatible", _create_session, credentials=credentials)
+
     @property
     def _invoke_error_mapping(self) -> dict[type[InvokeError], list[type[Exception]]]:
         """
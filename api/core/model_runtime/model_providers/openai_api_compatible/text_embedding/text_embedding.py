@@ -5,7 +5,6 @@ from typing import Optional
 from urllib.parse import urljoin
 
 import numpy as np
-import requests
 
 from core.model_runtime.entities.common_entities import I18nObject
 from core.model_runtime.entities.model_entities import (
@@ -88,7 +87,9 @@ class OAICompatEmbeddingModel(_CommonOaiApiCompat, TextEmbeddingModel):
             payload = {"input": inputs[i : i + max_chunks], "model": model, **extra_model_kwargs}
 
             # Make the request to the OpenAI API
-            response = requests.post(endpoint_url, headers=headers, data=json.dumps(payload), timeout=(10, 300))
+            response = self._get_session(credentials).post(
+                endpoint_url, headers=headers, data=json.dumps(payload), timeout=(10, 300)
+            )
 
             response.raise_for_status()  # Raise an exception for HTTP errors
             response_data = response.json()
@@ -140,7 +141,9 @@ class OAICompatEmbeddingModel(_CommonOaiApiCompat, TextEmbeddingModel):
 
             payload = {"input": "ping", "model": model}
 
-            response = requests.post(url=endpoint_url, headers=headers, data=json.dumps(payload), timeout=(10, 300))
+            response = self._get_session(credentials).post(
+                url=endpoint_url, headers=headers, data=json.dumps(payload), timeout=(10, 300)
+            )
 
             if response.status_code != 200:
                 raise CredentialsValidateFailedError(
@@ -24,6 +24,7 @@ from core.model_runtime.entities.message_entities import (
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
 from core.model_runtime.model_providers.__base.large_language_model import LargeLanguageModel
 from core.model_runtime.model_providers.upstage._common import _CommonUpstage
+from core.model_runtime.utils.client_cache import model_client_cache
 
 logger = logging.getLogger(__name__)
 
@@ -187,7 +188,7 @@ class UpstageLargeLanguageModel(_CommonUpstage, LargeLanguageModel):
         """
         try:
             credentials_kwargs = self._to_credential_kwargs(credentials)
-            client = OpenAI(**credentials_kwargs)
+            client = model_client_cache.get_client("upstage", OpenAI, credentials_kwargs)
 
             client.chat.completions.create(
                 messages=[{"role": "user", "content": "ping"}], model=model, temperature=0, max_tokens=10, stream=False
@@ -207,7 +208,7 @@ class UpstageLargeLanguageModel(_CommonUpstage, LargeLanguageModel):
         user: Optional[str] = None,
     ) -> Union[LLMResult, Generator]:
         credentials_kwargs = self._to_credential_kwargs(credentials)
-        client = OpenAI(**credentials_kwargs)
+        client = model_client_cache.get_client("upstage", OpenAI, credentials_kwargs)
 
         extra_model_kwargs = {}
 
@@ -12,6 +12,7 @@ from core.model_runtime.entities.text_embedding_entities import EmbeddingUsage,
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
 from core.model_runtime.model_providers.__base.text_embedding_model import TextEmbeddingModel
 from core.model_runtime.model_providers.upstage._common import _CommonUpstage
+from core.model_runtime.utils.client_cache import model_client_cache
 
 
 class UpstageTextEmbeddingModel(_CommonUpstage, TextEmbeddingModel):
@@ -34,7 +35,7 @@ class UpstageTextEmbeddingModel(_CommonUpstage, TextEmbeddingModel):
         """
 
         credentials_kwargs = self._to_credential_kwargs(credentials)
-        client = OpenAI(**credentials_kwargs)
+        client = model_client_cache.get_client("upstage", OpenAI, credentials_kwargs)
 
         extra_model_kwargs = {}
         if user:
@@ -131,7 +132,7 @@ class UpstageTextEmbeddingModel(_CommonUpstage, TextEmbeddingModel):
         try:
             # transform credentials to kwargs for model instance
             credentials_kwargs = self._to_credential_kwargs(credentials)
-            client = OpenAI(**credentials_kwargs)
+            client = model_client_cache.get_client("upstage", OpenAI, credentials_kwargs)
 
             # call embedding model
             self._embedding_invoke(model=model, client=client, texts=["ping"], extra_model_kwargs={})
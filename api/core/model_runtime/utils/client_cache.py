@@ -0,0 +1,85 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Mapping
+from typing import Any, Optional, TypeVar
+
+from core.helper.shared_thread_pool import register_fork_reset
+
+T = TypeVar("T")
+
+
+class ModelClientCache:
+    """
+    Provider SDK clients shared by the invocations using the same credentials, so requests reuse the connections
+    kept alive by the client instead of opening a new one (and paying the TLS handshake) on every invocation.
+
+    Clients are keyed by provider, client type and the hash of the credentials, which include the base URL.
+    The cache keeps at most `max_size` clients for at most `ttl` seconds, a client leaving the cache is not
+    closed since an invocation may still stream a response with it, its connections are released once it is
+    garbage collected.
+    """
+
+    def __init__(self, max_size: int = 256, ttl: float = 600) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clients: OrderedDict[tuple, tuple[Any, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_client(
+        self,
+        provider: str,
+        client_factory: Callable[..., T],
+        client_kwargs: Optional[Mapping] = None,
+        credentials: Optional[Mapping] = None,
+    ) -> T:
+        """
+        Get the cached client of credentials, the client is created on first use or once expired
+        :param provider: provider name
+        :param client_factory: client class or function creating the client
+        :param client_kwargs: kwargs of the client factory
+        :param credentials: credentials the client is bound to, client_kwargs by default
+        :return: client
+        """
+        client_kwargs = client_kwargs or {}
+        key = (provider, client_factory, self._hash_credentials(credentials or client_kwargs))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._clients.get(key)
+            if entry and entry[1] > now:
+                self._clients.move_to_end(key)
+                return entry[0]
+
+        client = client_factory(**client_kwargs)
+        with self._lock:
+            self._clients[key] = (client, now + self.ttl)
+            self._clients.move_to_end(key)
+            while len(self._clients) > self.max_size:
+                self._clients.popitem(last=False)
+
+        return client
+
+    def clear(self) -> None:
+        """
+        Drop all the cached clients
+        """
+        with self._lock:
+            self._clients.clear()
+
+    @staticmethod
+    def _hash_credentials(credentials: Mapping) -> str:
+        # values which are not JSON serializable (e.g. timeouts) are hashed by their representation
+        credentials_str = json.dumps(credentials, sort_keys=True, default=repr)
+        return hashlib.sha256(credentials_str.encode()).hexdigest()
+
+    def _reset(self) -> None:
+        # connections of the parent must not be used by the child process
+        self._clients = OrderedDict()
+        self._lock = threading.Lock()
+
+
+model_client_cache = ModelClientCache()
+
+register_fork_reset(model_client_cache._reset)
@@ -0,0 +1,77 @@
+from collections import deque
+from functools import lru_cache
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton of a list of keywords, finds whether a text contains any of them, ignoring case,
+    in a single scan of the text whatever the number of keywords.
+    """
+
+    def __init__(self, keywords: list[str]) -> None:
+        # transitions, failure links and whether a keyword ends at the state, state 0 is the root
+        self._transitions: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._matches: list[bool] = [False]
+
+        for keyword in keywords:
+            self._add_keyword(keyword.lower())
+
+        self._build_fail_links()
+
+    def search(self, text: str) -> bool:
+        """
+        Check if the text contains any of the keywords
+        :param text: text
+        :return:
+        """
+        transitions = self._transitions
+        fail = self._fail
+        matches = self._matches
+        state = 0
+        for char in text.lower():
+            while state and char not in transitions[state]:
+                state = fail[state]
+            state = transitions[state].get(char, 0)
+            if matches[state]:
+                return True
+
+        return False
+
+    def _add_keyword(self, keyword: str) -> None:
+        state = 0
+        for char in keyword:
+            next_state = self._transitions[state].get(char)
+            if next_state is None:
+                next_state = len(self._transitions)
+                self._transitions.append({})
+                self._fail.append(0)
+                self._matches.append(False)
+                self._transitions[state][char] = next_state
+            state = next_state
+
+        self._matches[state] = True
+
+    def _build_fail_links(self) -> None:
+        queue = deque(self._transitions[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._transitions[state].items():
+                queue.append(next_state)
+                fail_state = self._fail[state]
+                while fail_state and char not in self._transitions[fail_state]:
+                    fail_state = self._fail[fail_state]
+                self._fail[next_state] = self._transitions[fail_state].get(char, 0)
+                # a keyword ending at the failure state also ends here
+                self._matches[next_state] = self._matches[next_state] or self._matches[self._fail[next_state]]
+
+
+@lru_cache(maxsize=128)
+def get_keyword_matcher(keywords: str) -> KeywordMatcher:
+    """
+    Get the matcher of the keywords of a moderation config, compiled once per distinct config
+    :param keywords: keywords separated by new lines
+    :return: keyword matcher
+    """
+    # Filter out empty values
+    return KeywordMatcher([keyword for keyword in keywords.split("\n") if keyword])
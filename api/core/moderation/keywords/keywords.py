@@ -1,4 +1,5 @@
 from core.moderation.base import Moderation, ModerationAction, ModerationInputsResult, ModerationOutputsResult
+from core.moderation.keywords.keyword_matcher import KeywordMatcher, get_keyword_matcher
 
 
 class KeywordsModeration(Moderation):
@@ -31,10 +32,7 @@ class KeywordsModeration(Moderation):
             if query:
                 inputs["query__"] = query
 
-            # Filter out empty values
-            keywords_list = [keyword for keyword in self.config["keywords"].split("\n") if keyword]
-
-            flagged = self._is_violated(inputs, keywords_list)
+            flagged = self._is_violated(inputs, get_keyword_matcher(self.config["keywords"]))
 
         return ModerationInputsResult(
             flagged=flagged, action=ModerationAction.DIRECT_OUTPUT, preset_response=preset_response
@@ -45,18 +43,12 @@ class KeywordsModeration(Moderation):
         preset_response = ""
 
         if self.config["outputs_config"]["enabled"]:
-            # Filter out empty values
-            keywords_list = [keyword for keyword in self.config["keywords"].split("\n") if keyword]
-
-            flagged = self._is_violated({"text": text}, keywords_list)
+            flagged = self._is_violated({"text": text}, get_keyword_matcher(self.config["keywords"]))
             preset_response = self.config["outputs_config"]["preset_response"]
 
         return ModerationOutputsResult(
             flagged=flagged, action=ModerationAction.DIRECT_OUTPUT, preset_response=preset_response
         )
 
-    def _is_violated(self, inputs: dict, keywords_list: list) -> bool:
-        return any(self._check_keywords_in_value(keywords_list, value) for value in inputs.values())
-
-    def _check_keywords_in_value(self, keywords_list, value) -> bool:
-        return any(keyword.lower() in value.lower() for keyword in keywords_list)
+    def _is_violated(self, inputs: dict, keyword_matcher: KeywordMatcher) -> bool:
+        return any(keyword_matcher.search(value) for value in inputs.values())
@@ -1,39 +1,124 @@
 import logging
 import threading
 import time
+from collections.abc import Callable
+from concurrent.futures import Future
+from dataclasses import dataclass
 from typing import Any, Optional
 
 from flask import Flask, current_app
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, PrivateAttr
 
 from configs import dify_config
 from core.app.apps.base_app_queue_manager import AppQueueManager, PublishFrom
 from core.app.entities.queue_entities import QueueMessageReplaceEvent
+from core.helper.shared_thread_pool import SharedThreadPool, register_fork_reset
 from core.moderation.base import ModerationAction, ModerationOutputsResult
 from core.moderation.factory import ModerationFactory
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class OutputModerationMetrics:
+    checks: int = 0
+    errors: int = 0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+    total_lag: float = 0.0
+    max_lag: float = 0.0
+
+
+class OutputModerationExecutor:
+    """
+    Thread pool shared by the output moderation of all the messages of the process.
+
+    The metrics of each app report the latency of the moderation checks and their lag, the time from the last
+    token checked being generated to the end of the check, which includes the time waiting for a worker.
+    """
+
+    def __init__(self, max_workers: int) -> None:
+        self._pool = SharedThreadPool(max_workers, thread_name_prefix="moderation")
+        self._metrics: dict[str, OutputModerationMetrics] = {}
+        self._metrics_lock = threading.Lock()
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        """
+        Run a moderation task in the pool
+        :param fn: task
+        :param args: arguments of the task
+        :return: future of the task
+        """
+        return self._pool.submit(fn, *args)
+
+    def record(self, app_id: str, latency: float, lag: float, error: bool = False) -> None:
+        """
+        Record a moderation check
+        :param app_id: app id
+        :param latency: seconds taken by the moderation
+        :param lag: seconds from the last token checked being generated to the end of the check
+        :param error: whether the moderation failed
+        :return:
+        """
+        with self._metrics_lock:
+            metrics = self._metrics.setdefault(app_id, OutputModerationMetrics())
+            metrics.checks += 1
+            metrics.errors += 1 if error else 0
+            metrics.total_latency += latency
+            metrics.max_latency = max(metrics.max_latency, latency)
+            metrics.total_lag += lag
+            metrics.max_lag = max(metrics.max_lag, lag)
+
+    def get_metrics(self) -> dict[str, OutputModerationMetrics]:
+        """
+        Get the moderation metrics of each app since the start of the process
+        :return: app id -> metrics
+        """
+        with self._metrics_lock:
+            return {app_id: OutputModerationMetrics(**vars(metrics)) for app_id, metrics in self._metrics.items()}
+
+    def _reset_metrics_lock(self) -> None:
+        self._metrics_lock = threading.Lock()
+
+
+output_moderation_executor = OutputModerationExecutor(max_workers=dify_config.MODERATION_MAX_WORKERS)
+register_fork_reset(output_moderation_executor._reset_metrics_lock)
+
+
 class ModerationRule(BaseModel):
     type: str
     config: dict[str, Any]
 
 
 class OutputModeration(BaseModel):
+    """
+    Moderation of the output of a message while it is generated.
+
+    A check is submitted to the shared pool as soon as `MODERATION_BUFFER_SIZE` characters are generated after the
+    text already checked, and only covers the new text with the last `MODERATION_BUFFER_OVERLAP` characters checked.
+    """
+
     tenant_id: str
     app_id: str
 
     rule: ModerationRule
     queue_manager: AppQueueManager
 
-    thread: Optional[threading.Thread] = None
-    thread_running: bool = True
+    running: bool = True
     buffer: str = ""
-    is_final_chunk: bool = False
+    # length of the buffer checked without being flagged
+    checked_length: int = 0
+    # whether a check of the buffer is submitted to the pool
+    checking: bool = False
+    # whether the moderation replaced some of the text, which is then checked as a whole
+    overridden: bool = False
     final_output: Optional[str] = None
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _flask_app: Optional[Flask] = PrivateAttr(default=None)
+    _buffer_updated_at: float = PrivateAttr(default=0.0)
+
     def should_direct_output(self) -> bool:
         return self.final_output is not None
 
@@ -42,15 +127,19 @@ class OutputModeration(BaseModel):
 
     def append_new_token(self, token: str) -> None:
         self.buffer += token
-
-        if not self.thread:
-            self.thread = self.start_thread()
+        self._buffer_updated_at = time.perf_counter()
+        self.schedule_check()
 
     def moderation_completion(self, completion: str, public_event: bool = False) -> str:
-        self.buffer = completion
-        self.is_final_chunk = True
+        # the text checked while generating the output is not checked again
+        window_start = 0
+        if not self.overridden and completion.startswith(self.buffer[: self.checked_length]):
+            if len(completion) <= self.checked_length:
+                return completion
+            window_start = max(self.checked_length - dify_config.MODERATION_BUFFER_OVERLAP, 0)
 
-        result = self.moderation(tenant_id=self.tenant_id, app_id=self.app_id, moderation_buffer=completion)
+        self.buffer = completion
+        result = self.moderation_from(completion, window_start)
 
         if not result or not result.flagged:
             return completion
@@ -65,57 +154,91 @@ class OutputModeration(BaseModel):
 
         return final_output
 
-    def start_thread(self) -> threading.Thread:
-        buffer_size = dify_config.MODERATION_BUFFER_SIZE
-        thread = threading.Thread(
-            target=self.worker,
-            kwargs={
-                "flask_app": current_app._get_current_object(),
-                "buffer_size": buffer_size if buffer_size > 0 else dify_config.MODERATION_BUFFER_SIZE,
-            },
-        )
+    def schedule_check(self) -> None:
+        """
+        Submit a check of the buffer if enough text was generated since the last one
+        """
+        with self._lock:
+            if self.checking or not self.running or self.final_output is not None:
+                return
+
+            if len(self.buffer) - self.checked_length < dify_config.MODERATION_BUFFER_SIZE:
+                return
+
+            self.checking = True
 
-        thread.start()
+        if self._flask_app is None:
+            self._flask_app = current_app._get_current_object()
 
-        return thread
+        output_moderation_executor.submit(self.worker, self._flask_app)
 
-    def stop_thread(self):
-        if self.thread and self.thread.is_alive():
-            self.thread_running = False
+    def stop(self) -> None:
+        self.running = False
 
-    def worker(self, flask_app: Flask, buffer_size: int):
+    def worker(self, flask_app: Flask) -> None:
         with flask_app.app_context():
-            current_length = 0
-            while self.thread_running:
-                moderation_buffer = self.buffer
-                buffer_length = len(moderation_buffer)
-                if not self.is_final_chunk:
-                    chunk_length = buffer_length - current_length
-                    if 0 <= chunk_length < buffer_size:
-                        time.sleep(1)
-                        continue
-
-                current_length = buffer_length
-
-                result = self.moderation(
-                    tenant_id=self.tenant_id, app_id=self.app_id, moderation_buffer=moderation_buffer
-                )
-
-                if not result or not result.flagged:
-                    continue
-
-                if result.action == ModerationAction.DIRECT_OUTPUT:
-                    final_output = result.preset_response
-                    self.final_output = final_output
-                else:
-                    final_output = result.text + self.buffer[len(moderation_buffer) :]
-
-                # trigger replace event
-                if self.thread_running:
-                    self.queue_manager.publish(QueueMessageReplaceEvent(text=final_output), PublishFrom.TASK_PIPELINE)
-
-                if result.action == ModerationAction.DIRECT_OUTPUT:
-                    break
+            try:
+                self.check_buffer()
+            finally:
+                with self._lock:
+                    self.checking = False
+
+            # the text generated during the check
+            self.schedule_check()
+
+    def check_buffer(self) -> None:
+        """
+        Check the text generated since the last check
+        """
+        moderation_buffer = self.buffer
+        window_start = max(self.checked_length - dify_config.MODERATION_BUFFER_OVERLAP, 0)
+        result = self.moderation_from(moderation_buffer, window_start, buffer_updated_at=self._buffer_updated_at)
+
+        if not result or not result.flagged:
+            self.checked_length = len(moderation_buffer)
+            return
+
+        if result.action == ModerationAction.DIRECT_OUTPUT:
+            final_output = result.preset_response
+            self.final_output = final_output
+        else:
+            final_output = result.text + self.buffer[len(moderation_buffer) :]
+            self.overridden = True
+            self.checked_length = len(moderation_buffer)
+
+        # trigger replace event
+        if self.running:
+            self.queue_manager.publish(QueueMessageReplaceEvent(text=final_output), PublishFrom.TASK_PIPELINE)
+
+    def moderation_from(
+        self, text: str, window_start: int, buffer_updated_at: Optional[float] = None
+    ) -> Optional[ModerationOutputsResult]:
+        """
+        Moderate the text from a position
+        :param text: text
+        :param window_start: position of the first character to check
+        :param buffer_updated_at: time the last character of the text was generated, for the lag metrics
+        :return: moderation result
+        """
+        result = self._timed_moderation(text[window_start:], buffer_updated_at)
+        if result and result.flagged and result.action != ModerationAction.DIRECT_OUTPUT and window_start > 0:
+            # text overridden by the moderation replaces the whole text
+            result = self._timed_moderation(text, buffer_updated_at)
+
+        return result
+
+    def _timed_moderation(self, text: str, buffer_updated_at: Optional[float]) -> Optional[ModerationOutputsResult]:
+        start_at = time.perf_counter()
+        result = self.moderation(tenant_id=self.tenant_id, app_id=self.app_id, moderation_buffer=text)
+        finished_at = time.perf_counter()
+        output_moderation_executor.record(
+            self.app_id,
+            latency=finished_at - start_at,
+            lag=finished_at - (buffer_updated_at or start_at),
+            error=result is None,
+        )
+
+        return result
 
     def moderation(self, tenant_id: str, app_id: str, moderation_buffer: str) -> Optional[ModerationOutputsResult]:
         try:
@@ -10,7 +10,7 @@ from uuid import UUID
 
 from flask import current_app
 
-from core.helper.encrypter import decrypt_token, encrypt_token, obfuscated_token
+from core.helper.encrypter import batch_decrypt_token, encrypt_token, obfuscated_token
 from core.ops.entities.config_entity import (
     LangfuseConfig,
     LangSmithConfig,
@@ -103,9 +103,10 @@ class OpsTraceManager:
             provider_config_map[tracing_provider]["other_keys"],
         )
         new_config = {}
-        for key in secret_keys:
-            if key in tracing_config:
-                new_config[key] = decrypt_token(tenant_id, tracing_config[key])
+        present_secret_keys = [key for key in secret_keys if key in tracing_config]
+        # the private key is loaded once for all the secrets
+        decrypted_tokens = batch_decrypt_token(tenant_id, [tracing_config[key] for key in present_secret_keys])
+        new_config.update(zip(present_secret_keys, decrypted_tokens))
 
         for key in other_keys:
             new_config[key] = tracing_config.get(key, "")
@@ -20,6 +20,7 @@ from core.entities.provider_entities import (
 from core.helper import encrypter
 from core.helper.model_provider_cache import ProviderCredentialsCache, ProviderCredentialsCacheType
 from core.helper.position_helper import is_filtered
+from core.helper.provider_configurations_cache import ProviderConfigurationsCache
 from core.model_runtime.entities.model_entities import ModelType
 from core.model_runtime.entities.provider_entities import CredentialFormSchema, FormType, ProviderEntity
 from core.model_runtime.model_providers import model_provider_factory
@@ -44,10 +45,6 @@ class ProviderManager:
     ProviderManager is a class that manages the model providers includes Hosting and Customize Model Providers.
     """
 
-    def __init__(self) -> None:
-        self.decoding_rsa_key = None
-        self.decoding_cipher_rsa = None
-
     def get_configurations(self, tenant_id: str) -> ProviderConfigurations:
         """
         Get model provider configurations.
@@ -82,9 +79,18 @@ class ProviderManager:
         - Get provider instance
         - Switch selection priority
 
+        Configurations are cached in process until the configurations of the tenant change.
+
         :param tenant_id:
         :return:
         """
+        # the version is read first, changes committed while loading make the loaded configurations stale
+        provider_configurations_cache = ProviderConfigurationsCache(tenant_id=tenant_id)
+        cache_version = provider_configurations_cache.get_version()
+        cached_provider_configurations = provider_configurations_cache.get(cache_version)
+        if cached_provider_configurations is not None:
+            return cached_provider_configurations
+
         # Get all provider records of the workspace
         provider_name_to_provider_records_dict = self._get_all_providers(tenant_id)
 
@@ -186,6 +192,8 @@ class ProviderManager:
 
             provider_configurations[provider_name] = provider_configuration
 
+        provider_configurations_cache.set(cache_version, provider_configurations)
+
         # Return the encapsulated object
         return provider_configurations
 
@@ -581,18 +589,10 @@ class ProviderManager:
                 except JSONDecodeError:
                     provider_credentials = {}
 
-                # Get decoding rsa key and cipher for decrypting credentials
-                if self.decoding_rsa_key is None or self.decoding_cipher_rsa is None:
-                    self.decoding_rsa_key, self.decoding_cipher_rsa = encrypter.get_decrypt_decoding(tenant_id)
-
-                for variable in provider_credential_secret_variables:
-                    if variable in provider_credentials:
-                        try:
-                            provider_credentials[variable] = encrypter.decrypt_token_with_decoding(
-                                provider_credentials.get(variable), self.decoding_rsa_key, self.decoding_cipher_rsa
-                            )
-                        except ValueError:
-                            pass
+                # Decrypt secret variables, the private key is loaded once for all of them
+                encrypter.decrypt_secret_variables(
+                    tenant_id, provider_credentials, provider_credential_secret_variables
+                )
 
                 # cache provider credentials
                 provider_credentials_cache.set(credentials=provider_credentials)
@@ -627,20 +627,10 @@ class ProviderManager:
                 except JSONDecodeError:
                     continue
 
-                # Get decoding rsa key and cipher for decrypting credentials
-                if self.decoding_rsa_key is None or self.decoding_cipher_rsa is None:
-                    self.decoding_rsa_key, self.decoding_cipher_rsa = encrypter.get_decrypt_decoding(tenant_id)
-
-                for variable in model_credential_secret_variables:
-                    if variable in provider_model_credentials:
-                        try:
-                            provider_model_credentials[variable] = encrypter.decrypt_token_with_decoding(
-                                provider_model_credentials.get(variable),
-                                self.decoding_rsa_key,
-                                self.decoding_cipher_rsa,
-                            )
-                        except ValueError:
-                            pass
+                # Decrypt secret variables, the private key is loaded once for all of them
+                encrypter.decrypt_secret_variables(
+                    tenant_id, provider_model_credentials, model_credential_secret_variables
+                )
 
                 # cache provider model credentials
                 provider_model_credentials_cache.set(credentials=provider_model_credentials)
@@ -750,18 +740,10 @@ class ProviderManager:
                         else []
                     )
 
-                    # Get decoding rsa key and cipher for decrypting credentials
-                    if self.decoding_rsa_key is None or self.decoding_cipher_rsa is None:
-                        self.decoding_rsa_key, self.decoding_cipher_rsa = encrypter.get_decrypt_decoding(tenant_id)
-
-                    for variable in provider_credential_secret_variables:
-                        if variable in provider_credentials:
-                            try:
-                                provider_credentials[variable] = encrypter.decrypt_token_with_decoding(
-                                    provider_credentials.get(variable), self.decoding_rsa_key, self.decoding_cipher_rsa
-                                )
-                            except ValueError:
-                                pass
+                    # Decrypt secret variables, the private key is loaded once for all of them
+                    encrypter.decrypt_secret_variables(
+                        tenant_id, provider_credentials, provider_credential_secret_variables
+                    )
 
                     current_using_credentials = provider_credentials
 
@@ -883,22 +865,12 @@ class ProviderManager:
                             except JSONDecodeError:
                                 continue
 
-                            # Get decoding rsa key and cipher for decrypting credentials
-                            if self.decoding_rsa_key is None or self.decoding_cipher_rsa is None:
-                                self.decoding_rsa_key, self.decoding_cipher_rsa = encrypter.get_decrypt_decoding(
-                                    load_balancing_model_config.tenant_id
-                                )
-
-                            for variable in model_credential_secret_variables:
-                                if variable in provider_model_credentials:
-                                    try:
-                                        provider_model_credentials[variable] = encrypter.decrypt_token_with_decoding(
-                                            provider_model_credentials.get(variable),
-                                            self.decoding_rsa_key,
-                                            self.decoding_cipher_rsa,
-                                        )
-                                    except ValueError:
-                                        pass
+                            # Decrypt secret variables, the private key is loaded once for all of them
+                            encrypter.decrypt_secret_variables(
+                                load_balancing_model_config.tenant_id,
+                                provider_model_credentials,
+                                model_credential_secret_variables,
+                            )
 
                             # cache provider model credentials
                             provider_model_credentials_cache.set(credentials=provider_model_credentials)
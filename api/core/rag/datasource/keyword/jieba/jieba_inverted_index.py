@@ -0,0 +1,314 @@
+import heapq
+import math
+import threading
+from collections import defaultdict
+from typing import Any, Optional
+
+from pydantic import BaseModel
+from sqlalchemy import func
+
+from core.helper.lru_cache import LRUCache
+from core.rag.datasource.keyword.jieba.jieba_keyword_table_handler import JiebaKeywordTableHandler
+from core.rag.datasource.keyword.keyword_base import BaseKeyword
+from core.rag.models.document import Document
+from extensions.ext_database import db
+from extensions.ext_redis import redis_client
+from models.dataset import Dataset, DatasetKeywordPosting, DocumentSegment
+
+
+class InvertedIndexConfig(BaseModel):
+    max_keywords_per_chunk: int = 10
+    max_keyword_length: int = 255
+    bm25_k1: float = 1.2
+    bm25_b: float = 0.75
+
+
+class _DatasetIndexCache:
+    """
+    Posting lists of a dataset read so far, valid for one version of the index.
+    """
+
+    def __init__(self, version: int, total_documents: int, total_postings: int) -> None:
+        self.version = version
+        self.total_documents = total_documents
+        self.total_postings = total_postings
+        # keyword -> {index_node_id: keyword_count}
+        self.postings = LRUCache(capacity=10000)
+
+
+class JiebaInvertedIndex(BaseKeyword):
+    """
+    Keyword index stored as one posting row per (keyword, segment) instead of a single JSON keyword table.
+    Adding or deleting segments only touches their own rows, searches only read the posting lists of the query
+    keywords and rank segments with BM25. Posting lists are cached in process, every write bumps a version
+    stamp in Redis that invalidates the caches of all workers.
+    """
+
+    _cache = LRUCache(capacity=128)
+    _cache_lock = threading.Lock()
+
+    def __init__(self, dataset: Dataset):
+        super().__init__(dataset)
+        self._config = InvertedIndexConfig()
+
+    def create(self, texts: list[Document], **kwargs) -> BaseKeyword:
+        self.add_texts(texts, **kwargs)
+        return self
+
+    def add_texts(self, texts: list[Document], **kwargs):
+        keyword_table_handler = JiebaKeywordTableHandler()
+        keywords_list = kwargs.get("keywords_list")
+
+        segment_keywords = {}
+        for i, text in enumerate(texts):
+            keywords = keywords_list[i] if keywords_list else None
+            if not keywords:
+                keywords = keyword_table_handler.extract_keywords(
+                    text.page_content, self._config.max_keywords_per_chunk
+                )
+            segment_keywords[text.metadata["doc_id"]] = list(keywords)
+
+        self._update_segments_keywords(segment_keywords)
+        self._save_postings(segment_keywords)
+
+    def text_exists(self, id: str) -> bool:
+        posting = (
+            db.session.query(DatasetKeywordPosting.id)
+            .filter(DatasetKeywordPosting.dataset_id == self.dataset.id, DatasetKeywordPosting.index_node_id == id)
+            .first()
+        )
+        return posting is not None
+
+    def delete_by_ids(self, ids: list[str]) -> None:
+        if not ids:
+            return
+
+        db.session.query(DatasetKeywordPosting).filter(
+            DatasetKeywordPosting.dataset_id == self.dataset.id, DatasetKeywordPosting.index_node_id.in_(ids)
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        self._bump_version()
+
+    def delete(self) -> None:
+        db.session.query(DatasetKeywordPosting).filter(DatasetKeywordPosting.dataset_id == self.dataset.id).delete(
+            synchronize_session=False
+        )
+        db.session.commit()
+        self._bump_version()
+
+    def search(self, query: str, **kwargs: Any) -> list[Document]:
+        k = kwargs.get("top_k", 4)
+
+        keyword_table_handler = JiebaKeywordTableHandler()
+        keywords = keyword_table_handler.extract_keywords(query)
+        if not keywords:
+            return []
+
+        index_cache = self._get_index_cache()
+        postings = self._get_postings(index_cache, keywords)
+        scores = self._bm25_scores(
+            postings=postings,
+            total_documents=index_cache.total_documents,
+            average_document_length=(
+                index_cache.total_postings / index_cache.total_documents if index_cache.total_documents else 0
+            ),
+            k1=self._config.bm25_k1,
+            b=self._config.bm25_b,
+        )
+
+        sorted_chunk_indices = heapq.nlargest(k, scores.keys(), key=lambda x: scores[x])
+        if not sorted_chunk_indices:
+            return []
+
+        segments = (
+            db.session.query(DocumentSegment)
+            .filter(
+                DocumentSegment.dataset_id == self.dataset.id, DocumentSegment.index_node_id.in_(sorted_chunk_indices)
+            )
+            .all()
+        )
+        segment_mapping = {segment.index_node_id: segment for segment in segments}
+
+        documents = []
+        for chunk_index in sorted_chunk_indices:
+            segment = segment_mapping.get(chunk_index)
+            if segment:
+                documents.append(
+                    Document(
+                        page_content=segment.content,
+                        metadata={
+                            "doc_id": chunk_index,
+                            "doc_hash": segment.index_node_hash,
+                            "document_id": segment.document_id,
+                            "dataset_id": segment.dataset_id,
+                        },
+                    )
+                )
+
+        return documents
+
+    def create_segment_keywords(self, node_id: str, keywords: list[str]):
+        self._update_segments_keywords({node_id: keywords})
+        self._save_postings({node_id: keywords})
+
+    def multi_create_segment_keywords(self, pre_segment_data_list: list):
+        keyword_table_handler = JiebaKeywordTableHandler()
+        segment_keywords = {}
+        for pre_segment_data in pre_segment_data_list:
+            segment = pre_segment_data["segment"]
+            if pre_segment_data["keywords"]:
+                segment.keywords = pre_segment_data["keywords"]
+            else:
+                keywords = keyword_table_handler.extract_keywords(segment.content, self._config.max_keywords_per_chunk)
+                segment.keywords = list(keywords)
+            segment_keywords[segment.index_node_id] = segment.keywords
+
+        self._save_postings(segment_keywords)
+
+    def update_segment_keywords_index(self, node_id: str, keywords: list[str]):
+        self._save_postings({node_id: keywords})
+
+    @staticmethod
+    def _bm25_scores(
+        postings: dict[str, dict[str, int]],
+        total_documents: int,
+        average_document_length: float,
+        k1: float,
+        b: float,
+    ) -> dict[str, float]:
+        """
+        Score segments with BM25, every keyword occurs at most once per segment
+        :param postings: keyword -> {index_node_id: number of keywords of the segment}
+        :param total_documents: number of segments in the index
+        :param average_document_length: average number of keywords per segment
+        :param k1: term frequency saturation
+        :param b: document length normalization
+        :return: index_node_id -> score
+        """
+        scores: dict[str, float] = defaultdict(float)
+        for keyword_postings in postings.values():
+            document_frequency = len(keyword_postings)
+            if not document_frequency:
+                continue
+
+            idf = math.log(1 + (total_documents - document_frequency + 0.5) / (document_frequency + 0.5))
+            for index_node_id, document_length in keyword_postings.items():
+                length_norm = 1 - b + b * document_length / average_document_length if average_document_length else 1
+                scores[index_node_id] += idf * (k1 + 1) / (1 + k1 * length_norm)
+
+        return scores
+
+    def _get_postings(self, index_cache: _DatasetIndexCache, keywords: set[str]) -> dict[str, dict[str, int]]:
+        postings = {}
+        missing_keywords = []
+        with self._cache_lock:
+            for keyword in keywords:
+                keyword_postings = index_cache.postings.get(keyword)
+                if keyword_postings is None:
+                    missing_keywords.append(keyword)
+                else:
+                    postings[keyword] = keyword_postings
+
+        if missing_keywords:
+            rows = (
+                db.session.query(
+                    DatasetKeywordPosting.keyword,
+                    DatasetKeywordPosting.index_node_id,
+                    DatasetKeywordPosting.keyword_count,
+                )
+                .filter(
+                    DatasetKeywordPosting.dataset_id == self.dataset.id,
+                    DatasetKeywordPosting.keyword.in_(missing_keywords),
+                )
+                .all()
+            )
+
+            fetched_postings: dict[str, dict[str, int]] = {keyword: {} for keyword in missing_keywords}
+            for keyword, index_node_id, keyword_count in rows:
+                fetched_postings[keyword][index_node_id] = keyword_count
+
+            with self._cache_lock:
+                for keyword, keyword_postings in fetched_postings.items():
+                    index_cache.postings.put(keyword, keyword_postings)
+
+            postings.update(fetched_postings)
+
+        return postings
+
+    def _get_index_cache(self) -> _DatasetIndexCache:
+        version = self._get_version()
+        with self._cache_lock:
+            index_cache = self._cache.get(self.dataset.id)
+        if index_cache and index_cache.version == version:
+            return index_cache
+
+        total_documents, total_postings = (
+            db.session.query(
+                func.count(func.distinct(DatasetKeywordPosting.index_node_id)),
+                func.count(DatasetKeywordPosting.id),
+            )
+            .filter(DatasetKeywordPosting.dataset_id == self.dataset.id)
+            .one()
+        )
+        index_cache = _DatasetIndexCache(
+            version=version, total_documents=total_documents or 0, total_postings=total_postings or 0
+        )
+        with self._cache_lock:
+            self._cache.put(self.dataset.id, index_cache)
+
+        return index_cache
+
+    def _save_postings(self, segment_keywords: dict[str, list[str]]) -> None:
+        if not segment_keywords:
+            return
+
+        db.session.query(DatasetKeywordPosting).filter(
+            DatasetKeywordPosting.dataset_id == self.dataset.id,
+            DatasetKeywordPosting.index_node_id.in_(list(segment_keywords.keys())),
+        ).delete(synchronize_session=False)
+
+        postings = []
+        for index_node_id, keywords in segment_keywords.items():
+            keywords = {keyword for keyword in keywords if keyword and len(keyword) <= self._config.max_keyword_length}
+            for keyword in keywords:
+                postings.append(
+                    {
+                        "dataset_id": self.dataset.id,
+                        "keyword": keyword,
+                        "index_node_id": index_node_id,
+                        "keyword_count": len(keywords),
+                    }
+                )
+
+        if postings:
+            db.session.bulk_insert_mappings(DatasetKeywordPosting, postings)
+        db.session.commit()
+        self._bump_version()
+
+    def _update_segments_keywords(self, segment_keywords: dict[str, list[str]]) -> None:
+        if not segment_keywords:
+            return
+
+        document_segments = (
+            db.session.query(DocumentSegment)
+            .filter(
+                DocumentSegment.dataset_id == self.dataset.id,
+                DocumentSegment.index_node_id.in_(list(segment_keywords.keys())),
+            )
+            .all()
+        )
+        for document_segment in document_segments:
+            document_segment.keywords = segment_keywords[document_segment.index_node_id]
+            db.session.add(document_segment)
+        db.session.commit()
+
+    def _get_version(self) -> int:
+        version: Optional[bytes] = redis_client.get(self._generate_version_cache_key(self.dataset.id))
+        return int(version) if version else 0
+
+    def _bump_version(self) -> None:
+        redis_client.incr(self._generate_version_cache_key(self.dataset.id))
+
+    @staticmethod
+    def _generate_version_cache_key(dataset_id: str) -> str:
+        return f"keyword_inverted_index_version:{dataset_id}"
@@ -0,0 +1,158 @@
+import contextvars
+import logging
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import wait
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from flask import Flask, current_app
+
+from configs import dify_config
+from core.helper.shared_thread_pool import SharedThreadPool, register_fork_reset
+
+logger = logging.getLogger(__name__)
+
+# deadline of the batch a task belongs to, the batches run by the task end before it
+_batch_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "retrieval_batch_deadline", default=None
+)
+
+# share of the time left to an outer batch given to the batches nested in its tasks,
+# the rest is left to the task to process their results
+NESTED_BATCH_DEADLINE_SHARE = 0.8
+
+
+@dataclass
+class RetrievalTaskResult:
+    source: str
+    result: Any = None
+    error: Optional[Exception] = None
+    timed_out: bool = False
+    latency: float = 0.0
+
+
+@dataclass
+class RetrievalSourceMetrics:
+    count: int = 0
+    errors: int = 0
+    timeouts: int = 0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+
+
+class RetrievalExecutor:
+    """
+    Thread pool running the retrieval of several sources concurrently.
+
+    Worker threads are reused across requests and every batch of tasks is bounded by a deadline: sources that
+    did not answer in time are reported as timed out and the caller goes on with the results of the others.
+    A batch run by a task of another batch ends before the deadline of the outer batch.
+
+    Timed out tasks that did not start are cancelled. The ones still running cannot be interrupted, their
+    results are discarded and the pool they hold is retired: the following batches run on a new pool while the
+    threads of the retired one exit as soon as their tasks return.
+    """
+
+    def __init__(self, name: str, max_workers: int) -> None:
+        self.name = name
+        self._pool = SharedThreadPool(max_workers, thread_name_prefix=f"retrieval-{name}")
+        self._metrics: dict[str, RetrievalSourceMetrics] = {}
+        self._metrics_lock = threading.Lock()
+
+    def run(self, tasks: list[tuple[str, Callable[[], Any]]], timeout: float) -> list[RetrievalTaskResult]:
+        """
+        Run retrieval tasks concurrently in the app context of the caller
+        :param tasks: (source, task) pairs, source names the backend for the latency metrics
+        :param timeout: seconds to wait for all the tasks
+        :return: result of each task, in order of the tasks
+        """
+        if not tasks:
+            return []
+
+        flask_app = current_app._get_current_object()
+        start_at = time.perf_counter()
+        now = time.monotonic()
+        deadline = now + timeout
+        outer_deadline = _batch_deadline.get()
+        if outer_deadline is not None:
+            deadline = min(deadline, now + max(outer_deadline - now, 0) * NESTED_BATCH_DEADLINE_SHARE)
+        context = contextvars.copy_context()
+        context.run(_batch_deadline.set, deadline)
+
+        # a retired pool is never given tasks, all the tasks of the batch go to the same pool
+        with self._pool.acquire() as pool:
+            futures = [pool.submit(self._run_task, flask_app, context, task) for _, task in tasks]
+        wait(futures, timeout=max(deadline - time.monotonic(), 0))
+
+        results = []
+        running_timed_out = False
+        for (source, _), future in zip(tasks, futures):
+            if future.done():
+                latency, result, error = future.result()
+                results.append(RetrievalTaskResult(source=source, result=result, error=error, latency=latency))
+            else:
+                running_timed_out |= not future.cancel()
+                logger.warning(
+                    "Retrieval from %s timed out after %.2fs, returning partial results",
+                    source,
+                    time.perf_counter() - start_at,
+                )
+                results.append(
+                    RetrievalTaskResult(source=source, timed_out=True, latency=time.perf_counter() - start_at)
+                )
+
+        if running_timed_out and self._pool.retire(pool):
+            logger.warning("Retired the %s retrieval pool held by timed out tasks", self.name)
+
+        self._record(results)
+        return results
+
+    def get_metrics(self) -> dict[str, RetrievalSourceMetrics]:
+        """
+        Get the latency metrics of each source since the start of the process
+        :return: source -> metrics
+        """
+        with self._metrics_lock:
+            return {source: RetrievalSourceMetrics(**vars(metrics)) for source, metrics in self._metrics.items()}
+
+    @staticmethod
+    def _run_task(
+        flask_app: Flask, context: contextvars.Context, task: Callable[[], Any]
+    ) -> tuple[float, Any, Optional[Exception]]:
+        for var, val in context.items():
+            var.set(val)
+
+        start_at = time.perf_counter()
+        with flask_app.app_context():
+            try:
+                result = task()
+            except Exception as e:
+                return time.perf_counter() - start_at, None, e
+
+        return time.perf_counter() - start_at, result, None
+
+    def _record(self, results: list[RetrievalTaskResult]) -> None:
+        with self._metrics_lock:
+            for result in results:
+                metrics = self._metrics.setdefault(result.source, RetrievalSourceMetrics())
+                metrics.count += 1
+                metrics.errors += 1 if result.error else 0
+                metrics.timeouts += 1 if result.timed_out else 0
+                metrics.total_latency += result.latency
+                metrics.max_latency = max(metrics.max_latency, result.latency)
+
+        for result in results:
+            logger.debug("Retrieval from %s took %.3fs", result.source, result.latency)
+
+    def _reset_metrics_lock(self) -> None:
+        self._metrics_lock = threading.Lock()
+
+
+# datasets and the search methods of a dataset use separate pools,
+# a dataset task waiting for its search tasks can never take the worker they need
+dataset_retrieval_executor = RetrievalExecutor("dataset", dify_config.RETRIEVAL_THREAD_POOL_MAX_WORKERS)
+source_retrieval_executor = RetrievalExecutor("source", dify_config.RETRIEVAL_THREAD_POOL_MAX_WORKERS)
+register_fork_reset(dataset_retrieval_executor._reset_metrics_lock)
+register_fork_reset(source_retrieval_executor._reset_metrics_lock)
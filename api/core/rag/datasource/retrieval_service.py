@@ -1,11 +1,12 @@
-import threading
+import functools
 from typing import Optional
 
-from flask import Flask, current_app
-
+from configs import dify_config
 from core.rag.data_post_processor.data_post_processor import DataPostProcessor
 from core.rag.datasource.keyword.keyword_factory import Keyword
+from core.rag.datasource.retrieval_executor import source_retrieval_executor
 from core.rag.datasource.vdb.vector_factory import Vector
+from core.rag.models.document import Document
 from core.rag.rerank.constants.rerank_mode import RerankMode
 from core.rag.retrieval.retrieval_methods import RetrievalMethod
 from extensions.ext_database import db
@@ -32,68 +33,62 @@ class RetrievalService:
         reranking_model: Optional[dict] = None,
         reranking_mode: Optional[str] = "reranking_model",
         weights: Optional[dict] = None,
+        dataset: Optional[Dataset] = None,
     ):
-        dataset = db.session.query(Dataset).filter(Dataset.id == dataset_id).first()
+        if not dataset:
+            dataset = db.session.query(Dataset).filter(Dataset.id == dataset_id).first()
         if not dataset or dataset.available_document_count == 0 or dataset.available_segment_count == 0:
             return []
-        all_documents = []
-        threads = []
-        exceptions = []
+        tasks = []
         # retrieval_model source with keyword
         if retrieval_method == "keyword_search":
-            keyword_thread = threading.Thread(
-                target=RetrievalService.keyword_search,
-                kwargs={
-                    "flask_app": current_app._get_current_object(),
-                    "dataset_id": dataset_id,
-                    "query": query,
-                    "top_k": top_k,
-                    "all_documents": all_documents,
-                    "exceptions": exceptions,
-                },
+            tasks.append(
+                (
+                    "keyword_search",
+                    functools.partial(cls.keyword_search, dataset=dataset, query=query, top_k=top_k),
+                )
             )
-            threads.append(keyword_thread)
-            keyword_thread.start()
         # retrieval_model source with semantic
         if RetrievalMethod.is_support_semantic_search(retrieval_method):
-            embedding_thread = threading.Thread(
-                target=RetrievalService.embedding_search,
-                kwargs={
-                    "flask_app": current_app._get_current_object(),
-                    "dataset_id": dataset_id,
-                    "query": query,
-                    "top_k": top_k,
-                    "score_threshold": score_threshold,
-                    "reranking_model": reranking_model,
-                    "all_documents": all_documents,
-                    "retrieval_method": retrieval_method,
-                    "exceptions": exceptions,
-                },
+            tasks.append(
+                (
+                    f"embedding_search:{cls._get_vector_type(dataset)}",
+                    functools.partial(
+                        cls.embedding_search,
+                        dataset=dataset,
+                        query=query,
+                        top_k=top_k,
+                        score_threshold=score_threshold,
+                        reranking_model=reranking_model,
+                        retrieval_method=retrieval_method,
+                    ),
+                )
             )
-            threads.append(embedding_thread)
-            embedding_thread.start()
 
         # retrieval source with full text
         if RetrievalMethod.is_support_fulltext_search(retrieval_method):
-            full_text_index_thread = threading.Thread(
-                target=RetrievalService.full_text_index_search,
-                kwargs={
-                    "flask_app": current_app._get_current_object(),
-                    "dataset_id": dataset_id,
-                    "query": query,
-                    "retrieval_method": retrieval_method,
-                    "score_threshold": score_threshold,
-                    "top_k": top_k,
-                    "reranking_model": reranking_model,
-                    "all_documents": all_documents,
-                    "exceptions": exceptions,
-                },
+            tasks.append(
+                (
+                    f"full_text_search:{cls._get_vector_type(dataset)}",
+                    functools.partial(
+                        cls.full_text_index_search,
+                        dataset=dataset,
+                        query=query,
+                        retrieval_method=retrieval_method,
+                        score_threshold=score_threshold,
+                        top_k=top_k,
+                        reranking_model=reranking_model,
+                    ),
+                )
             )
-            threads.append(full_text_index_thread)
-            full_text_index_thread.start()
 
-        for thread in threads:
-            thread.join()
+        all_documents = []
+        exceptions = []
+        for result in source_retrieval_executor.run(tasks, timeout=dify_config.RETRIEVAL_SOURCE_TIMEOUT):
+            if result.error:
+                exceptions.append(str(result.error))
+            elif result.result:
+                all_documents.extend(result.result)
 
         if exceptions:
             exception_message = ";\n".join(exceptions)
@@ -109,108 +104,90 @@ class RetrievalService:
         return all_documents
 
     @classmethod
-    def keyword_search(
-        cls, flask_app: Flask, dataset_id: str, query: str, top_k: int, all_documents: list, exceptions: list
-    ):
-        with flask_app.app_context():
-            try:
-                dataset = db.session.query(Dataset).filter(Dataset.id == dataset_id).first()
+    def keyword_search(cls, dataset: Dataset, query: str, top_k: int) -> list[Document]:
+        # the dataset row is shared by the retrieval threads, attach a copy to the session of this thread
+        dataset = db.session.merge(dataset, load=False)
 
-                keyword = Keyword(dataset=dataset)
+        keyword = Keyword(dataset=dataset)
 
-                documents = keyword.search(cls.escape_query_for_search(query), top_k=top_k)
-                all_documents.extend(documents)
-            except Exception as e:
-                exceptions.append(str(e))
+        return keyword.search(cls.escape_query_for_search(query), top_k=top_k)
 
     @classmethod
     def embedding_search(
         cls,
-        flask_app: Flask,
-        dataset_id: str,
+        dataset: Dataset,
         query: str,
         top_k: int,
         score_threshold: Optional[float],
         reranking_model: Optional[dict],
-        all_documents: list,
         retrieval_method: str,
-        exceptions: list,
-    ):
-        with flask_app.app_context():
-            try:
-                dataset = db.session.query(Dataset).filter(Dataset.id == dataset_id).first()
-
-                vector = Vector(dataset=dataset)
-
-                documents = vector.search_by_vector(
-                    cls.escape_query_for_search(query),
-                    search_type="similarity_score_threshold",
-                    top_k=top_k,
-                    score_threshold=score_threshold,
-                    filter={"group_id": [dataset.id]},
-                )
+    ) -> list[Document]:
+        dataset = db.session.merge(dataset, load=False)
+
+        vector = Vector(dataset=dataset)
+
+        documents = vector.search_by_vector(
+            cls.escape_query_for_search(query),
+            search_type="similarity_score_threshold",
+            top_k=top_k,
+            score_threshold=score_threshold,
+            filter={"group_id": [dataset.id]},
+        )
+
+        if (
+            documents
+            and reranking_model
+            and reranking_model.get("reranking_model_name")
+            and reranking_model.get("reranking_provider_name")
+            and retrieval_method == RetrievalMethod.SEMANTIC_SEARCH.value
+        ):
+            data_post_processor = DataPostProcessor(
+                str(dataset.tenant_id), RerankMode.RERANKING_MODEL.value, reranking_model, None, False
+            )
+            return data_post_processor.invoke(
+                query=query, documents=documents, score_threshold=score_threshold, top_n=len(documents)
+            )
 
-                if documents:
-                    if (
-                        reranking_model
-                        and reranking_model.get("reranking_model_name")
-                        and reranking_model.get("reranking_provider_name")
-                        and retrieval_method == RetrievalMethod.SEMANTIC_SEARCH.value
-                    ):
-                        data_post_processor = DataPostProcessor(
-                            str(dataset.tenant_id), RerankMode.RERANKING_MODEL.value, reranking_model, None, False
-                        )
-                        all_documents.extend(
-                            data_post_processor.invoke(
-                                query=query, documents=documents, score_threshold=score_threshold, top_n=len(documents)
-                            )
-                        )
-                    else:
-                        all_documents.extend(documents)
-            except Exception as e:
-                exceptions.append(str(e))
+        return documents
 
     @classmethod
     def full_text_index_search(
         cls,
-        flask_app: Flask,
-        dataset_id: str,
+        dataset: Dataset,
         query: str,
         top_k: int,
         score_threshold: Optional[float],
         reranking_model: Optional[dict],
-        all_documents: list,
         retrieval_method: str,
-        exceptions: list,
-    ):
-        with flask_app.app_context():
-            try:
-                dataset = db.session.query(Dataset).filter(Dataset.id == dataset_id).first()
+    ) -> list[Document]:
+        dataset = db.session.merge(dataset, load=False)
+
+        vector_processor = Vector(
+            dataset=dataset,
+        )
+
+        documents = vector_processor.search_by_full_text(cls.escape_query_for_search(query), top_k=top_k)
+        if (
+            documents
+            and reranking_model
+            and reranking_model.get("reranking_model_name")
+            and reranking_model.get("reranking_provider_name")
+            and retrieval_method == RetrievalMethod.FULL_TEXT_SEARCH.value
+        ):
+            data_post_processor = DataPostProcessor(
+                str(dataset.tenant_id), RerankMode.RERANKING_MODEL.value, reranking_model, None, False
+            )
+            return data_post_processor.invoke(
+                query=query, documents=documents, score_threshold=score_threshold, top_n=len(documents)
+            )
 
-                vector_processor = Vector(
-                    dataset=dataset,
-                )
+        return documents
 
-                documents = vector_processor.search_by_full_text(cls.escape_query_for_search(query), top_k=top_k)
-                if documents:
-                    if (
-                        reranking_model
-                        and reranking_model.get("reranking_model_name")
-                        and reranking_model.get("reranking_provider_name")
-                        and retrieval_method == RetrievalMethod.FULL_TEXT_SEARCH.value
-                    ):
-                        data_post_processor = DataPostProcessor(
-                            str(dataset.tenant_id), RerankMode.RERANKING_MODEL.value, reranking_model, None, False
-                        )
-                        all_documents.extend(
-                            data_post_processor.invoke(
-                                query=query, documents=documents, score_threshold=score_threshold, top_n=len(documents)
-                            )
-                        )
-                    else:
-                        all_documents.extend(documents)
-            except Exception as e:
-                exceptions.append(str(e))
+    @staticmethod
+    def _get_vector_type(dataset: Dataset) -> str:
+        if dataset.index_struct_dict:
+            return dataset.index_struct_dict["type"]
+        return dify_config.VECTOR_STORE or "unknown"
 
     @staticmethod
     def escape_query_for_search(query: str) -> str:
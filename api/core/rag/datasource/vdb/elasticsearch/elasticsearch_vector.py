@@ -11,6 +11,7 @@ from pydantic import BaseModel, model_validator
 from core.rag.datasource.entity.embedding import Embeddings
 from core.rag.datasource.vdb.field import Field
 from core.rag.datasource.vdb.vector_base import BaseVector
+from core.rag.datasource.vdb.vector_client_registry import vector_client_registry
 from core.rag.datasource.vdb.vector_factory import AbstractVectorFactory
 from core.rag.datasource.vdb.vector_type import VectorType
 from core.rag.models.document import Document
@@ -43,12 +44,19 @@ class ElasticSearchConfig(BaseModel):
 class ElasticSearchVector(BaseVector):
     def __init__(self, index_name: str, config: ElasticSearchConfig, attributes: list):
         super().__init__(index_name.lower())
-        self._client = self._init_client(config)
-        self._version = self._get_version()
+        # the version is read once per shared client instead of once per instance
+        self._client, self._version = vector_client_registry.get_client(
+            backend=VectorType.ELASTICSEARCH,
+            config=config,
+            factory=lambda: self._init_client(config),
+            health_check=lambda client_version: client_version[0].ping(),
+            close=lambda client_version: client_version[0].close(),
+            owner=self,
+        )
         self._check_version()
         self._attributes = attributes
 
-    def _init_client(self, config: ElasticSearchConfig) -> Elasticsearch:
+    def _init_client(self, config: ElasticSearchConfig) -> tuple[Elasticsearch, str]:
         try:
             parsed_url = urlparse(config.host)
             if parsed_url.scheme in {"http", "https"}:
@@ -65,10 +73,11 @@ class ElasticSearchVector(BaseVector):
         except requests.exceptions.ConnectionError:
             raise ConnectionError("Vector database connection error")
 
-        return client
+        return client, self._get_version(client)
 
-    def _get_version(self) -> str:
-        info = self._client.info()
+    @staticmethod
+    def _get_version(client: Elasticsearch) -> str:
+        info = client.info()
         return info["version"]["number"]
 
     def _check_version(self):
@@ -10,6 +10,7 @@ from configs import dify_config
 from core.rag.datasource.entity.embedding import Embeddings
 from core.rag.datasource.vdb.field import Field
 from core.rag.datasource.vdb.vector_base import BaseVector
+from core.rag.datasource.vdb.vector_client_registry import vector_client_registry
 from core.rag.datasource.vdb.vector_factory import AbstractVectorFactory
 from core.rag.datasource.vdb.vector_type import VectorType
 from core.rag.models.document import Document
@@ -200,8 +201,16 @@ class MilvusVector(BaseVector):
             redis_client.set(collection_exist_cache_key, 1, ex=3600)
 
     def _init_client(self, config) -> MilvusClient:
-        client = MilvusClient(uri=config.uri, user=config.user, password=config.password, db_name=config.database)
-        return client
+        return vector_client_registry.get_client(
+            backend=VectorType.MILVUS,
+            config=config,
+            factory=lambda: MilvusClient(
+                uri=config.uri, user=config.user, password=config.password, db_name=config.database
+            ),
+            health_check=lambda client: client.list_collections() is not None,
+            close=lambda client: client.close(),
+            owner=self,
+        )
 
 
 class MilvusVectorFactory(AbstractVectorFactory):
@@ -15,6 +15,7 @@ from pydantic import BaseModel, model_validator
 from configs import dify_config
 from core.rag.datasource.entity.embedding import Embeddings
 from core.rag.datasource.vdb.vector_base import BaseVector
+from core.rag.datasource.vdb.vector_client_registry import vector_client_registry
 from core.rag.datasource.vdb.vector_factory import AbstractVectorFactory
 from core.rag.datasource.vdb.vector_type import VectorType
 from core.rag.models.document import Document
@@ -106,13 +107,20 @@ class OracleVector(BaseVector):
             )
 
     def _create_connection_pool(self, config: OracleVectorConfig):
-        return oracledb.create_pool(
-            user=config.user,
-            password=config.password,
-            dsn="{}:{}/{}".format(config.host, config.port, config.database),
-            min=1,
-            max=50,
-            increment=1,
+        return vector_client_registry.get_client(
+            backend=VectorType.ORACLE,
+            config=config,
+            factory=lambda: oracledb.create_pool(
+                user=config.user,
+                password=config.password,
+                dsn="{}:{}/{}".format(config.host, config.port, config.database),
+                min=1,
+                max=50,
+                increment=1,
+            ),
+            close=lambda pool: pool.close(force=True),
+            pool_stats=lambda pool: {"max": pool.max, "in_use": pool.busy, "idle": pool.opened - pool.busy},
+            owner=self,
         )
 
     @contextmanager
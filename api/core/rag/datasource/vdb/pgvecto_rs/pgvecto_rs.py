@@ -15,6 +15,7 @@ from configs import dify_config
 from core.rag.datasource.entity.embedding import Embeddings
 from core.rag.datasource.vdb.pgvecto_rs.collection import CollectionORM
 from core.rag.datasource.vdb.vector_base import BaseVector
+from core.rag.datasource.vdb.vector_client_registry import engine_pool_stats, vector_client_registry
 from core.rag.datasource.vdb.vector_factory import AbstractVectorFactory
 from core.rag.datasource.vdb.vector_type import VectorType
 from core.rag.models.document import Document
@@ -54,7 +55,14 @@ class PGVectoRS(BaseVector):
         self._url = (
             f"postgresql+psycopg2://{config.user}:{config.password}@{config.host}:{config.port}/{config.database}"
         )
-        self._client = create_engine(self._url)
+        self._client = vector_client_registry.get_client(
+            backend=VectorType.PGVECTO_RS,
+            config=self._client_config,
+            factory=lambda: create_engine(self._url),
+            close=lambda engine: engine.dispose(),
+            pool_stats=engine_pool_stats,
+            owner=self,
+        )
         with Session(self._client) as session:
             session.execute(text("CREATE EXTENSION IF NOT EXISTS vectors"))
             session.commit()
@@ -1,8 +1,14 @@
+import hashlib
 import json
+import logging
+import re
+import threading
 import uuid
+from collections.abc import Sequence
 from contextlib import contextmanager
-from typing import Any
+from typing import Any, Optional
 
+import numpy as np
 import psycopg2.extras
 import psycopg2.pool
 from pydantic import BaseModel, model_validator
@@ -10,12 +16,15 @@ from pydantic import BaseModel, model_validator
 from configs import dify_config
 from core.rag.datasource.entity.embedding import Embeddings
 from core.rag.datasource.vdb.vector_base import BaseVector
+from core.rag.datasource.vdb.vector_client_registry import vector_client_registry
 from core.rag.datasource.vdb.vector_factory import AbstractVectorFactory
 from core.rag.datasource.vdb.vector_type import VectorType
 from core.rag.models.document import Document
 from extensions.ext_redis import redis_client
 from models.dataset import Dataset
 
+logger = logging.getLogger(__name__)
+
 
 class PGVectorConfig(BaseModel):
     host: str
@@ -23,6 +32,15 @@ class PGVectorConfig(BaseModel):
     user: str
     password: str
     database: str
+    min_connection: int = 1
+    max_connection: int = 5
+    # seconds to wait for a free connection of the pool
+    connection_timeout: float = 30
+    hnsw_m: int = 16
+    hnsw_ef_construction: int = 64
+    hnsw_ef_search: int = 40
+    # text search configuration of the full text search, the database default when not set
+    text_search_config: Optional[str] = None
 
     @model_validator(mode="before")
     @classmethod
@@ -37,9 +55,71 @@ class PGVectorConfig(BaseModel):
             raise ValueError("config PGVECTOR_PASSWORD is required")
         if not values["database"]:
             raise ValueError("config PGVECTOR_DATABASE is required")
+        if values.get("text_search_config") and not re.fullmatch(r"[A-Za-z_][\w.]*", values["text_search_config"]):
+            raise ValueError("config PGVECTOR_TEXT_SEARCH_CONFIG should be the name of a text search configuration")
+        if values.get("min_connection") and values.get("max_connection"):
+            if values["min_connection"] > values["max_connection"]:
+                raise ValueError("config PGVECTOR_MIN_CONNECTION should less than PGVECTOR_MAX_CONNECTION")
         return values
 
 
+class BlockingConnectionPool(psycopg2.pool.ThreadedConnectionPool):
+    """
+    Thread safe connection pool shared by the threads of a process,
+    getting a connection waits for a free one instead of failing when all of them are in use,
+    up to the wait timeout.
+    """
+
+    def __init__(self, minconn: int, maxconn: int, *args, wait_timeout: Optional[float] = None, **kwargs):
+        super().__init__(minconn, maxconn, *args, **kwargs)
+        self._semaphore = threading.BoundedSemaphore(maxconn)
+        self._wait_timeout = wait_timeout
+
+    def getconn(self, key=None):
+        if not self._semaphore.acquire(timeout=self._wait_timeout):
+            raise psycopg2.pool.PoolError(
+                f"no connection of the pool got free within {self._wait_timeout} seconds, "
+                f"all the {self.maxconn} connections are in use"
+            )
+        try:
+            return super().getconn(key)
+        except Exception:
+            self._semaphore.release()
+            raise
+
+    def putconn(self, conn=None, key=None, close=False):
+        try:
+            super().putconn(conn, key, close)
+        finally:
+            self._semaphore.release()
+
+    def ping(self) -> bool:
+        """
+        Run a query on a connection of the pool, a pool whose connections are all in use is not probed
+        """
+        if self.closed:
+            return False
+        if not self._semaphore.acquire(blocking=False):
+            return True
+        try:
+            conn = super().getconn()
+        except Exception:
+            self._semaphore.release()
+            raise
+
+        broken = True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            broken = False
+            return True
+        finally:
+            self.putconn(conn, close=broken)
+
+    def get_stats(self) -> dict[str, int]:
+        return {"max": self.maxconn, "in_use": len(self._used), "idle": len(self._pool)}
+
+
 SQL_CREATE_TABLE = """
 CREATE TABLE IF NOT EXISTS {table_name} (
     id UUID PRIMARY KEY,
@@ -49,25 +129,52 @@ CREATE TABLE IF NOT EXISTS {table_name} (
 ) using heap;
 """
 
+# pgvector indexes vectors of at most 2000 dimensions
+SQL_CREATE_INDEX = """
+CREATE INDEX {concurrently}IF NOT EXISTS embedding_cosine_v1_idx_{index_hash} ON {table_name}
+USING hnsw (embedding vector_cosine_ops) WITH (m = {m}, ef_construction = {ef_construction});
+"""
+
+HNSW_MAX_DIMENSION = 2000
+
+# the text search configuration must be given explicitly for the expression to be indexable,
+# searches use the same expression
+SQL_CREATE_FULL_TEXT_INDEX = """
+CREATE INDEX {concurrently}IF NOT EXISTS text_gin_v1_idx_{index_hash} ON {table_name}
+USING gin (to_tsvector('{text_search_config}', text));
+"""
+
 
 class PGVector(BaseVector):
     def __init__(self, collection_name: str, config: PGVectorConfig):
         super().__init__(collection_name)
+        self._client_config = config
         self.pool = self._create_connection_pool(config)
         self.table_name = f"embedding_{collection_name}"
+        # index names are limited to 63 characters, longer than the table names allow
+        self.index_hash = hashlib.md5(self.table_name.encode()).hexdigest()[:8]
 
     def get_type(self) -> str:
         return VectorType.PGVECTOR
 
-    def _create_connection_pool(self, config: PGVectorConfig):
-        return psycopg2.pool.SimpleConnectionPool(
-            1,
-            5,
-            host=config.host,
-            port=config.port,
-            user=config.user,
-            password=config.password,
-            database=config.database,
+    def _create_connection_pool(self, config: PGVectorConfig) -> BlockingConnectionPool:
+        return vector_client_registry.get_client(
+            backend=VectorType.PGVECTOR,
+            config=config,
+            factory=lambda: BlockingConnectionPool(
+                config.min_connection,
+                config.max_connection,
+                host=config.host,
+                port=config.port,
+                user=config.user,
+                password=config.password,
+                database=config.database,
+                wait_timeout=config.connection_timeout,
+            ),
+            health_check=lambda pool: pool.ping(),
+            close=lambda pool: pool.closeall(),
+            pool_stats=lambda pool: pool.get_stats(),
+            owner=self,
         )
 
     @contextmanager
@@ -77,9 +184,12 @@ class PGVector(BaseVector):
         try:
             yield cur
         finally:
-            cur.close()
-            conn.commit()
-            self.pool.putconn(conn)
+            try:
+                cur.close()
+                conn.commit()
+            finally:
+                # connections closed by the server are discarded instead of going back to the shared pool
+                self.pool.putconn(conn, close=bool(conn.closed))
 
     def create(self, texts: list[Document], embeddings: list[list[float]], **kwargs):
         dimension = len(embeddings[0])
@@ -97,7 +207,7 @@ class PGVector(BaseVector):
                     doc_id,
                     doc.page_content,
                     json.dumps(doc.metadata),
-                    embeddings[i],
+                    self._vector_literal(embeddings[i]),
                 )
             )
         with self._get_cursor() as cur:
@@ -133,15 +243,19 @@ class PGVector(BaseVector):
 
         :param query_vector: The input vector to search for similar items.
         :param top_k: The number of nearest neighbors to return, default is 5.
+        :param ef_search: Size of the candidate list of the HNSW index, defaults to PGVECTOR_HNSW_EF_SEARCH.
         :return: List of Documents that are nearest to the query vector.
         """
         top_k = kwargs.get("top_k", 5)
+        # the index never returns more rows than its candidate list
+        ef_search = max(int(kwargs.get("ef_search") or self._client_config.hnsw_ef_search), top_k)
 
         with self._get_cursor() as cur:
+            cur.execute("SET LOCAL hnsw.ef_search = %s", (ef_search,))
             cur.execute(
-                f"SELECT meta, text, embedding <=> %s AS distance FROM {self.table_name}"
+                f"SELECT meta, text, embedding <=> %s::vector AS distance FROM {self.table_name}"
                 f" ORDER BY distance LIMIT {top_k}",
-                (json.dumps(query_vector),),
+                (self._vector_literal(query_vector),),
             )
             docs = []
             score_threshold = float(kwargs.get("score_threshold") or 0.0)
@@ -155,17 +269,31 @@ class PGVector(BaseVector):
 
     def search_by_full_text(self, query: str, **kwargs: Any) -> list[Document]:
         top_k = kwargs.get("top_k", 5)
+        text_search_config = self._client_config.text_search_config
 
         with self._get_cursor() as cur:
-            cur.execute(
-                f"""SELECT meta, text, ts_rank(to_tsvector(coalesce(text, '')), to_tsquery(%s)) AS score
-                FROM {self.table_name}
-                WHERE to_tsvector(text) @@ plainto_tsquery(%s)
-                ORDER BY score DESC
-                LIMIT {top_k}""",
-                # f"'{query}'" is required in order to account for whitespace in query
-                (f"'{query}'", f"'{query}'"),
-            )
+            if text_search_config:
+                # same expression as the GIN index
+                cur.execute(
+                    f"""SELECT meta, text,
+                    ts_rank(to_tsvector(%s::regconfig, text), to_tsquery(%s::regconfig, %s)) AS score
+                    FROM {self.table_name}
+                    WHERE to_tsvector(%s::regconfig, text) @@ plainto_tsquery(%s::regconfig, %s)
+                    ORDER BY score DESC
+                    LIMIT {top_k}""",
+                    # f"'{query}'" is required in order to account for whitespace in query
+                    (text_search_config, f"'{query}'", text_search_config, text_search_config, f"'{query}'"),
+                )
+            else:
+                cur.execute(
+                    f"""SELECT meta, text, ts_rank(to_tsvector(coalesce(text, '')), to_tsquery(%s)) AS score
+                    FROM {self.table_name}
+                    WHERE to_tsvector(text) @@ plainto_tsquery(%s)
+                    ORDER BY score DESC
+                    LIMIT {top_k}""",
+                    # f"'{query}'" is required in order to account for whitespace in query
+                    (f"'{query}'", f"'{query}'"),
+                )
 
             docs = []
 
@@ -190,10 +318,86 @@ class PGVector(BaseVector):
 
             with self._get_cursor() as cur:
                 cur.execute("CREATE EXTENSION IF NOT EXISTS vector")
+                cur.execute("SELECT to_regclass(%s)", (self.table_name,))
+                table_exists = cur.fetchone()[0] is not None
                 cur.execute(SQL_CREATE_TABLE.format(table_name=self.table_name, dimension=dimension))
-                # TODO: create index https://github.com/pgvector/pgvector?tab=readme-ov-file#indexing
+                # indexes of a new table are built instantly, the ones of existing tables are built
+                # without locking them by the create-pgvector-indexes command
+                if not table_exists:
+                    self._create_indexes(cur, dimension)
             redis_client.set(collection_exist_cache_key, 1, ex=3600)
 
+    def create_indexes_concurrently(self) -> bool:
+        """
+        Create the missing indexes of an existing collection with CREATE INDEX CONCURRENTLY, the collection stays
+        writable while they are built. Indexes left invalid by an interrupted build are built again.
+        :return: False if the collection does not exist
+        """
+        conn = self.pool.getconn()
+        try:
+            # concurrent index builds cannot run in a transaction
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute(
+                    "SELECT atttypmod FROM pg_attribute WHERE attrelid = to_regclass(%s) AND attname = 'embedding'",
+                    (self.table_name,),
+                )
+                row = cur.fetchone()
+                if not row:
+                    return False
+
+                cur.execute(
+                    "SELECT indexrelid::regclass::text FROM pg_index WHERE indrelid = to_regclass(%s)"
+                    " AND NOT indisvalid",
+                    (self.table_name,),
+                )
+                for (index_name,) in cur.fetchall():
+                    cur.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}")
+                self._create_indexes(cur, row[0], concurrently=True)
+            return True
+        finally:
+            conn.autocommit = False
+            self.pool.putconn(conn, close=bool(conn.closed))
+
+    def _create_indexes(self, cur, dimension: int, concurrently: bool = False) -> None:
+        """
+        Create the HNSW index of the embeddings and, with a text search configuration, the GIN index of the texts
+        """
+        concurrently_clause = "CONCURRENTLY " if concurrently else ""
+        if dimension <= HNSW_MAX_DIMENSION:
+            cur.execute(
+                SQL_CREATE_INDEX.format(
+                    concurrently=concurrently_clause,
+                    table_name=self.table_name,
+                    index_hash=self.index_hash,
+                    m=self._client_config.hnsw_m,
+                    ef_construction=self._client_config.hnsw_ef_construction,
+                )
+            )
+        else:
+            logger.warning(
+                "Embeddings of %s dimensions cannot be indexed by pgvector, %s is searched sequentially",
+                dimension,
+                self.table_name,
+            )
+        if self._client_config.text_search_config:
+            cur.execute(
+                SQL_CREATE_FULL_TEXT_INDEX.format(
+                    concurrently=concurrently_clause,
+                    table_name=self.table_name,
+                    index_hash=self.index_hash,
+                    text_search_config=self._client_config.text_search_config,
+                )
+            )
+
+    @staticmethod
+    def _vector_literal(vector: Sequence[float]) -> str:
+        """
+        Serialize a vector for pgvector, which stores float4. The shortest representation of each float32
+        is exact and about half the size of the float64 JSON
+        """
+        return "[" + ",".join(np.asarray(vector, dtype=np.float32).astype(str)) + "]"
+
 
 class PGVectorFactory(AbstractVectorFactory):
     def init_vector(self, dataset: Dataset, attributes: list, embeddings: Embeddings) -> PGVector:
@@ -205,13 +409,21 @@ class PGVectorFactory(AbstractVectorFactory):
             collection_name = Dataset.gen_collection_name_by_id(dataset_id)
             dataset.index_struct = json.dumps(self.gen_index_struct_dict(VectorType.PGVECTOR, collection_name))
 
-        return PGVector(
-            collection_name=collection_name,
-            config=PGVectorConfig(
-                host=dify_config.PGVECTOR_HOST,
-                port=dify_config.PGVECTOR_PORT,
-                user=dify_config.PGVECTOR_USER,
-                password=dify_config.PGVECTOR_PASSWORD,
-                database=dify_config.PGVECTOR_DATABASE,
-            ),
+        return PGVector(collection_name=collection_name, config=self.get_config())
+
+    @staticmethod
+    def get_config() -> PGVectorConfig:
+        return PGVectorConfig(
+            host=dify_config.PGVECTOR_HOST,
+            port=dify_config.PGVECTOR_PORT,
+            user=dify_config.PGVECTOR_USER,
+            password=dify_config.PGVECTOR_PASSWORD,
+            database=dify_config.PGVECTOR_DATABASE,
+            min_connection=dify_config.PGVECTOR_MIN_CONNECTION,
+            max_connection=dify_config.PGVECTOR_MAX_CONNECTION,
+            connection_timeout=dify_config.PGVECTOR_CONNECTION_TIMEOUT,
+            hnsw_m=dify_config.PGVECTOR_HNSW_M,
+            hnsw_ef_construction=dify_config.PGVECTOR_HNSW_EF_CONSTRUCTION,
+            hnsw_ef_search=dify_config.PGVECTOR_HNSW_EF_SEARCH,
+            text_search_config=dify_config.PGVECTOR_TEXT_SEARCH_CONFIG or None,
         )
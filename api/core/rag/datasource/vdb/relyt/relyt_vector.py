@@ -20,6 +20,7 @@ except ImportError:
 
 from configs import dify_config
 from core.rag.datasource.vdb.vector_base import BaseVector
+from core.rag.datasource.vdb.vector_client_registry import engine_pool_stats, vector_client_registry
 from core.rag.models.document import Document
 from extensions.ext_redis import redis_client
 
@@ -57,7 +58,14 @@ class RelytVector(BaseVector):
         self._url = (
             f"postgresql+psycopg2://{config.user}:{config.password}@{config.host}:{config.port}/{config.database}"
         )
-        self.client = create_engine(self._url)
+        self.client = vector_client_registry.get_client(
+            backend=VectorType.RELYT,
+            config=self._client_config,
+            factory=lambda: create_engine(self._url),
+            close=lambda engine: engine.dispose(),
+            pool_stats=engine_pool_stats,
+            owner=self,
+        )
         self._fields = []
         self._group_id = group_id
 
@@ -11,6 +11,7 @@ from sqlalchemy.orm import Session, declarative_base
 from configs import dify_config
 from core.rag.datasource.entity.embedding import Embeddings
 from core.rag.datasource.vdb.vector_base import BaseVector
+from core.rag.datasource.vdb.vector_client_registry import engine_pool_stats, vector_client_registry
 from core.rag.datasource.vdb.vector_factory import AbstractVectorFactory
 from core.rag.datasource.vdb.vector_type import VectorType
 from core.rag.models.document import Document
@@ -80,7 +81,14 @@ class TiDBVector(BaseVector):
             f"ssl_verify_cert=true&ssl_verify_identity=true&program_name={config.program_name}"
         )
         self._distance_func = distance_func.lower()
-        self._engine = create_engine(self._url)
+        self._engine = vector_client_registry.get_client(
+            backend=VectorType.TIDB_VECTOR,
+            config=self._client_config,
+            factory=lambda: create_engine(self._url),
+            close=lambda engine: engine.dispose(),
+            pool_stats=engine_pool_stats,
+            owner=self,
+        )
         self._orm_base = declarative_base()
         self._dimension = 1536
 
@@ -0,0 +1,284 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+import weakref
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any, Optional, TypeVar
+
+from pydantic import BaseModel
+
+from configs import dify_config
+from core.helper.shared_thread_pool import register_fork_reset
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class VectorClientMetrics:
+    backend: str
+    created_at: float
+    hits: int = 0
+    health_check_failures: int = 0
+    pool: dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class _VectorClientEntry:
+    backend: str
+    client: Any
+    health_check: Optional[Callable[[Any], bool]]
+    close: Optional[Callable[[Any], None]]
+    pool_stats: Optional[Callable[[Any], dict[str, int]]]
+    created_at: float
+    checked_at: float
+    hits: int = 0
+    health_check_failures: int = 0
+    # owners alive holding the client, an evicted client is closed once there are none
+    users: int = 0
+    evicted: bool = False
+    closed: bool = False
+
+
+class VectorClientRegistry:
+    """
+    Process-wide registry of vector database clients and connection pools.
+
+    Backends used to open a new client, with its TCP/TLS connections and authentication, for every
+    `Vector(dataset)`. Clients are now shared by all the threads and greenlets of the process as long as
+    the configuration of the backend does not change. A client that fails its periodic health check is
+    no longer handed out and is recreated by the next caller, it is closed once the owners still using it
+    are garbage collected.
+    """
+
+    def __init__(self, health_check_interval: float) -> None:
+        self.health_check_interval = health_check_interval
+        self._entries: dict[tuple[str, str], _VectorClientEntry] = {}
+        self._lock = threading.Lock()
+        # clients are created under a lock per configuration, a slow backend does not block the others
+        self._create_locks: dict[tuple[str, str], threading.Lock] = {}
+        # failed health checks of the clients evicted so far
+        self._health_check_failures: dict[tuple[str, str], int] = {}
+
+    def get_client(
+        self,
+        backend: str,
+        config: BaseModel | dict,
+        factory: Callable[[], T],
+        health_check: Optional[Callable[[T], bool]] = None,
+        close: Optional[Callable[[T], None]] = None,
+        pool_stats: Optional[Callable[[T], dict[str, int]]] = None,
+        owner: Optional[object] = None,
+    ) -> T:
+        """
+        Get the shared client of a backend, create it on first use
+        :param backend: vector store type
+        :param config: configuration the client is created from, clients are shared per configuration
+        :param factory: create the client
+        :param health_check: check that the client can still serve requests, it is called at most once
+            per health check interval, a failed or raising check recreates the client once per call
+        :param close: release the connections of an evicted client
+        :param pool_stats: sizes of the connection pool of the client, reported in the metrics
+        :param owner: object using the client, an evicted client is not closed while one of its owners is alive
+        :return: client
+        """
+        key = (backend, self._config_hash(config))
+        # the client recreated after a failed check is handed out unchecked, a backend that stays down fails
+        # the queries instead of making the caller recreate clients forever
+        recreated = False
+        while True:
+            entry = self._get_entry(key, factory, health_check, close, pool_stats)
+            with self._lock:
+                if entry.evicted:
+                    # replaced by another caller meanwhile
+                    continue
+                entry.users += 1
+                entry.hits += 1
+
+                now = time.monotonic()
+                check_needed = (
+                    not recreated
+                    and entry.health_check is not None
+                    and now - entry.checked_at >= self.health_check_interval
+                )
+                if check_needed:
+                    # only one caller runs the check, the others go on with the client meanwhile
+                    entry.checked_at = now
+
+            if check_needed and not self._is_healthy(entry):
+                self._evict(key, entry)
+                self._release(entry)
+                recreated = True
+                continue
+
+            break
+
+        if owner is None:
+            self._release(entry)
+        else:
+            weakref.finalize(owner, self._release, entry).atexit = False
+
+        return entry.client
+
+    def get_metrics(self) -> dict[str, VectorClientMetrics]:
+        """
+        Get usage metrics of the shared clients
+        :return: backend and configuration hash -> metrics
+        """
+        with self._lock:
+            entries = dict(self._entries)
+
+        metrics = {}
+        for key, entry in entries.items():
+            backend, config_hash = key
+            pool = {}
+            if entry.pool_stats is not None:
+                try:
+                    pool = entry.pool_stats(entry.client)
+                except Exception:
+                    logger.exception("Failed to read the pool size of the %s client", backend)
+
+            metrics[f"{backend}:{config_hash[:8]}"] = VectorClientMetrics(
+                backend=backend,
+                created_at=entry.created_at,
+                hits=entry.hits,
+                health_check_failures=self._health_check_failures.get(key, 0) + entry.health_check_failures,
+                pool=pool,
+            )
+
+        return metrics
+
+    def clear(self) -> None:
+        """
+        Forget all the clients, each one is closed once none of its owners is alive
+        """
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+
+        for entry in entries:
+            self._retire(entry)
+
+    def _get_entry(
+        self,
+        key: tuple[str, str],
+        factory: Callable[[], Any],
+        health_check: Optional[Callable[[Any], bool]],
+        close: Optional[Callable[[Any], None]],
+        pool_stats: Optional[Callable[[Any], dict[str, int]]],
+    ) -> _VectorClientEntry:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                return entry
+            create_lock = self._create_locks.setdefault(key, threading.Lock())
+
+        # concurrent callers of the same configuration wait for a single client instead of opening duplicate pools
+        with create_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    return entry
+
+            now = time.monotonic()
+            entry = _VectorClientEntry(
+                backend=key[0],
+                client=factory(),
+                health_check=health_check,
+                close=close,
+                pool_stats=pool_stats,
+                created_at=now,
+                checked_at=now,
+            )
+            with self._lock:
+                self._entries[key] = entry
+
+        logger.info("Created shared %s client", key[0])
+        return entry
+
+    def _is_healthy(self, entry: _VectorClientEntry) -> bool:
+        try:
+            healthy = entry.health_check(entry.client)
+        except Exception:
+            logger.warning("Health check of the shared %s client failed", entry.backend, exc_info=True)
+            healthy = False
+
+        if not healthy:
+            entry.health_check_failures += 1
+        return healthy
+
+    def _evict(self, key: tuple[str, str], entry: _VectorClientEntry) -> None:
+        with self._lock:
+            if self._entries.get(key) is not entry:
+                # already replaced by another caller
+                return
+            del self._entries[key]
+            self._health_check_failures[key] = self._health_check_failures.get(key, 0) + entry.health_check_failures
+
+        logger.warning("Recreating the shared %s client", entry.backend)
+        self._retire(entry)
+
+    def _retire(self, entry: _VectorClientEntry) -> None:
+        with self._lock:
+            entry.evicted = True
+            close_needed = self._mark_closed(entry)
+
+        if close_needed:
+            self._close(entry)
+
+    def _release(self, entry: _VectorClientEntry) -> None:
+        with self._lock:
+            entry.users -= 1
+            close_needed = self._mark_closed(entry)
+
+        if close_needed:
+            self._close(entry)
+
+    @staticmethod
+    def _mark_closed(entry: _VectorClientEntry) -> bool:
+        # called under the lock, True if the caller has to close the client
+        if not entry.evicted or entry.users > 0 or entry.closed:
+            return False
+        entry.closed = True
+        return True
+
+    @staticmethod
+    def _close(entry: _VectorClientEntry) -> None:
+        if entry.close is None:
+            return
+        try:
+            entry.close(entry.client)
+        except Exception:
+            logger.warning("Failed to close the shared %s client", entry.backend, exc_info=True)
+
+    @staticmethod
+    def _config_hash(config: BaseModel | dict) -> str:
+        if isinstance(config, BaseModel):
+            config = config.model_dump()
+        serialized = json.dumps(config, sort_keys=True, default=str)
+        return hashlib.sha256(serialized.encode()).hexdigest()
+
+    def _reset(self) -> None:
+        # connections of the parent must not be used by the child process, they are dropped without closing
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._create_locks = {}
+
+
+def engine_pool_stats(engine: Any) -> dict[str, int]:
+    """
+    Get the pool sizes of a SQLAlchemy engine
+    :param engine: engine
+    :return: pool sizes
+    """
+    pool = engine.pool
+    return {"max": pool.size() + max(pool.overflow(), 0), "in_use": pool.checkedout(), "idle": pool.checkedin()}
+
+
+vector_client_registry = VectorClientRegistry(dify_config.VECTOR_CLIENT_HEALTH_CHECK_INTERVAL)
+
+register_fork_reset(vector_client_registry._reset)
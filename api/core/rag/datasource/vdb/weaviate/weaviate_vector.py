@@ -1,5 +1,6 @@
 import datetime
 import json
+import threading
 from typing import Any, Optional
 
 import requests
@@ -10,6 +11,7 @@ from configs import dify_config
 from core.rag.datasource.entity.embedding import Embeddings
 from core.rag.datasource.vdb.field import Field
 from core.rag.datasource.vdb.vector_base import BaseVector
+from core.rag.datasource.vdb.vector_client_registry import vector_client_registry
 from core.rag.datasource.vdb.vector_factory import AbstractVectorFactory
 from core.rag.datasource.vdb.vector_type import VectorType
 from core.rag.models.document import Document
@@ -33,7 +35,14 @@ class WeaviateConfig(BaseModel):
 class WeaviateVector(BaseVector):
     def __init__(self, collection_name: str, config: WeaviateConfig, attributes: list):
         super().__init__(collection_name)
-        self._client = self._init_client(config)
+        # the batch of the shared client buffers objects, threads must not add to it concurrently
+        self._client, self._batch_lock = vector_client_registry.get_client(
+            backend=VectorType.WEAVIATE,
+            config=config,
+            factory=lambda: (self._init_client(config), threading.Lock()),
+            health_check=lambda client_lock: client_lock[0].is_ready(),
+            owner=self,
+        )
         self._attributes = attributes
 
     def _init_client(self, config: WeaviateConfig) -> weaviate.Client:
@@ -103,7 +112,7 @@ class WeaviateVector(BaseVector):
 
         ids = []
 
-        with self._client.batch as batch:
+        with self._batch_lock, self._client.batch as batch:
             for i, text in enumerate(texts):
                 data_properties = {Field.TEXT_KEY.value: text}
                 if metadatas is not None:
@@ -0,0 +1,91 @@
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Optional
+
+from configs import dify_config
+from core.rag.models.document import Document
+from extensions.ext_storage import storage
+from models.model import UploadFile
+
+logger = logging.getLogger(__name__)
+
+# bumped when the extractors change the documents they return, so the documents extracted before are not used
+EXTRACT_CACHE_VERSION = 1
+
+
+class ExtractCache:
+    """
+    Documents extracted from an uploaded file, saved in the storage.
+
+    Entries are keyed by the hash of the file content and the settings selecting the extractor, so the
+    estimates, indexing runs and retries of a file, and the files uploaded again with the same content in the
+    tenant, only extract it once. Entries are deleted with the files they were extracted from.
+    """
+
+    def __init__(self, upload_file: UploadFile, is_automatic: bool = False):
+        settings = {
+            "version": EXTRACT_CACHE_VERSION,
+            "hash": upload_file.hash,
+            "extension": Path(upload_file.key).suffix.lower(),
+            "etl_type": dify_config.ETL_TYPE,
+            "is_automatic": is_automatic,
+        }
+        settings_hash = hashlib.sha256(json.dumps(settings, sort_keys=True).encode()).hexdigest()
+        self.cache_key = f"extract_cache/{upload_file.tenant_id}/{settings_hash}.json"
+
+    def get(self) -> Optional[list[Document]]:
+        """
+        Get the cached documents.
+
+        :return: documents, None if the file was not extracted yet
+        """
+        try:
+            if not storage.exists(self.cache_key):
+                return None
+
+            documents = json.loads(storage.load_once(self.cache_key))
+        except Exception:
+            logger.exception(f"Failed to load extracted documents {self.cache_key}")
+            return None
+
+        return [
+            Document(page_content=document["page_content"], metadata=document["metadata"]) for document in documents
+        ]
+
+    def set(self, documents: list[Document]) -> None:
+        """
+        Cache the extracted documents.
+
+        :param documents: documents
+        :return:
+        """
+        try:
+            data = json.dumps(
+                [{"page_content": document.page_content, "metadata": document.metadata} for document in documents]
+            )
+            storage.save(self.cache_key, data.encode("utf-8"))
+        except Exception:
+            logger.exception(f"Failed to save extracted documents {self.cache_key}")
+
+    @classmethod
+    def purge(cls, upload_file: UploadFile) -> None:
+        """
+        Delete the documents extracted from a file, in the automatic mode or not.
+
+        The entry is shared with the files uploaded with the same content in the tenant, they are extracted again.
+
+        :param upload_file: upload file
+        :return:
+        """
+        if not upload_file.hash:
+            return
+
+        for is_automatic in (False, True):
+            cache_key = cls(upload_file, is_automatic).cache_key
+            try:
+                if storage.exists(cache_key):
+                    storage.delete(cache_key)
+            except Exception:
+                logger.exception(f"Failed to delete extracted documents {cache_key}")
@@ -1,7 +1,8 @@
 import re
 import tempfile
+from concurrent.futures import Executor
 from pathlib import Path
-from typing import Union
+from typing import Optional, Union
 from urllib.parse import unquote
 
 from configs import dify_config
@@ -10,6 +11,7 @@ from core.rag.extractor.csv_extractor import CSVExtractor
 from core.rag.extractor.entity.datasource_type import DatasourceType
 from core.rag.extractor.entity.extract_setting import ExtractSetting
 from core.rag.extractor.excel_extractor import ExcelExtractor
+from core.rag.extractor.extract_cache import ExtractCache
 from core.rag.extractor.firecrawl.firecrawl_web_extractor import FirecrawlWebExtractor
 from core.rag.extractor.html_extractor import HtmlExtractor
 from core.rag.extractor.markdown_extractor import MarkdownExtractor
@@ -83,75 +85,25 @@ class ExtractProcessor:
 
     @classmethod
     def extract(
-        cls, extract_setting: ExtractSetting, is_automatic: bool = False, file_path: str = None
+        cls,
+        extract_setting: ExtractSetting,
+        is_automatic: bool = False,
+        file_path: str = None,
+        process_pool: Optional[Executor] = None,
     ) -> list[Document]:
         if extract_setting.datasource_type == DatasourceType.FILE.value:
-            with tempfile.TemporaryDirectory() as temp_dir:
-                if not file_path:
-                    upload_file: UploadFile = extract_setting.upload_file
-                    suffix = Path(upload_file.key).suffix
-                    file_path = f"{temp_dir}/{next(tempfile._get_candidate_names())}{suffix}"
-                    storage.download(upload_file.key, file_path)
-                input_file = Path(file_path)
-                file_extension = input_file.suffix.lower()
-                etl_type = dify_config.ETL_TYPE
-                unstructured_api_url = dify_config.UNSTRUCTURED_API_URL
-                unstructured_api_key = dify_config.UNSTRUCTURED_API_KEY
-                if etl_type == "Unstructured":
-                    if file_extension in {".xlsx", ".xls"}:
-                        extractor = ExcelExtractor(file_path)
-                    elif file_extension == ".pdf":
-                        extractor = PdfExtractor(file_path)
-                    elif file_extension in {".md", ".markdown"}:
-                        extractor = (
-                            UnstructuredMarkdownExtractor(file_path, unstructured_api_url)
-                            if is_automatic
-                            else MarkdownExtractor(file_path, autodetect_encoding=True)
-                        )
-                    elif file_extension in {".htm", ".html"}:
-                        extractor = HtmlExtractor(file_path)
-                    elif file_extension == ".docx":
-                        extractor = WordExtractor(file_path, upload_file.tenant_id, upload_file.created_by)
-                    elif file_extension == ".csv":
-                        extractor = CSVExtractor(file_path, autodetect_encoding=True)
-                    elif file_extension == ".msg":
-                        extractor = UnstructuredMsgExtractor(file_path, unstructured_api_url)
-                    elif file_extension == ".eml":
-                        extractor = UnstructuredEmailExtractor(file_path, unstructured_api_url)
-                    elif file_extension == ".ppt":
-                        extractor = UnstructuredPPTExtractor(file_path, unstructured_api_url, unstructured_api_key)
-                    elif file_extension == ".pptx":
-                        extractor = UnstructuredPPTXExtractor(file_path, unstructured_api_url)
-                    elif file_extension == ".xml":
-                        extractor = UnstructuredXmlExtractor(file_path, unstructured_api_url)
-                    elif file_extension == "epub":
-                        extractor = UnstructuredEpubExtractor(file_path, unstructured_api_url)
-                    else:
-                        # txt
-                        extractor = (
-                            UnstructuredTextExtractor(file_path, unstructured_api_url)
-                            if is_automatic
-                            else TextExtractor(file_path, autodetect_encoding=True)
-                        )
-                else:
-                    if file_extension in {".xlsx", ".xls"}:
-                        extractor = ExcelExtractor(file_path)
-                    elif file_extension == ".pdf":
-                        extractor = PdfExtractor(file_path)
-                    elif file_extension in {".md", ".markdown"}:
-                        extractor = MarkdownExtractor(file_path, autodetect_encoding=True)
-                    elif file_extension in {".htm", ".html"}:
-                        extractor = HtmlExtractor(file_path)
-                    elif file_extension == ".docx":
-                        extractor = WordExtractor(file_path, upload_file.tenant_id, upload_file.created_by)
-                    elif file_extension == ".csv":
-                        extractor = CSVExtractor(file_path, autodetect_encoding=True)
-                    elif file_extension == "epub":
-                        extractor = UnstructuredEpubExtractor(file_path)
-                    else:
-                        # txt
-                        extractor = TextExtractor(file_path, autodetect_encoding=True)
-                return extractor.extract()
+            upload_file: UploadFile = extract_setting.upload_file
+            # files uploaded as text have no content hash
+            if file_path or not upload_file.hash or not dify_config.EXTRACT_CACHE_ENABLED:
+                return cls._extract_file(extract_setting, is_automatic, file_path, process_pool)
+
+            extract_cache = ExtractCache(upload_file, is_automatic)
+            documents = extract_cache.get()
+            if documents is None:
+                documents = cls._extract_file(extract_setting, is_automatic, file_path, process_pool)
+                extract_cache.set(documents)
+
+            return documents
         elif extract_setting.datasource_type == DatasourceType.NOTION.value:
             extractor = NotionExtractor(
                 notion_workspace_id=extract_setting.notion_info.notion_workspace_id,
@@ -175,3 +127,94 @@ class ExtractProcessor:
                 raise ValueError(f"Unsupported website provider: {extract_setting.website_info.provider}")
         else:
             raise ValueError(f"Unsupported datasource type: {extract_setting.datasource_type}")
+
+    @classmethod
+    def _extract_file(
+        cls,
+        extract_setting: ExtractSetting,
+        is_automatic: bool = False,
+        file_path: str = None,
+        process_pool: Optional[Executor] = None,
+    ) -> list[Document]:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            if not file_path:
+                upload_file: UploadFile = extract_setting.upload_file
+                suffix = Path(upload_file.key).suffix
+                file_path = f"{temp_dir}/{next(tempfile._get_candidate_names())}{suffix}"
+                storage.download(upload_file.key, file_path)
+            input_file = Path(file_path)
+            file_extension = input_file.suffix.lower()
+            etl_type = dify_config.ETL_TYPE
+            unstructured_api_url = dify_config.UNSTRUCTURED_API_URL
+            unstructured_api_key = dify_config.UNSTRUCTURED_API_KEY
+            if etl_type == "Unstructured":
+                if file_extension in {".xlsx", ".xls"}:
+                    extractor = ExcelExtractor(file_path)
+                elif file_extension == ".pdf":
+                    extractor = PdfExtractor(file_path)
+                elif file_extension in {".md", ".markdown"}:
+                    extractor = (
+                        UnstructuredMarkdownExtractor(file_path, unstructured_api_url)
+                        if is_automatic
+                        else MarkdownExtractor(file_path, autodetect_encoding=True)
+                    )
+                elif file_extension in {".htm", ".html"}:
+                    extractor = HtmlExtractor(file_path)
+                elif file_extension == ".docx":
+                    extractor = WordExtractor(file_path, upload_file.tenant_id, upload_file.created_by)
+                elif file_extension == ".csv":
+                    extractor = CSVExtractor(file_path, autodetect_encoding=True)
+                elif file_extension == ".msg":
+                    extractor = UnstructuredMsgExtractor(file_path, unstructured_api_url)
+                elif file_extension == ".eml":
+                    extractor = UnstructuredEmailExtractor(file_path, unstructured_api_url)
+                elif file_extension == ".ppt":
+                    extractor = UnstructuredPPTExtractor(file_path, unstructured_api_url, unstructured_api_key)
+                elif file_extension == ".pptx":
+                    extractor = UnstructuredPPTXExtractor(file_path, unstructured_api_url)
+                elif file_extension == ".xml":
+                    extractor = UnstructuredXmlExtractor(file_path, unstructured_api_url)
+                elif file_extension == "epub":
+                    extractor = UnstructuredEpubExtractor(file_path, unstructured_api_url)
+                else:
+                    # txt
+                    extractor = (
+                        UnstructuredTextExtractor(file_path, unstructured_api_url)
+                        if is_automatic
+                        else TextExtractor(file_path, autodetect_encoding=True)
+                    )
+            else:
+                if file_extension == ".docx":
+                    extractor = WordExtractor(file_path, upload_file.tenant_id, upload_file.created_by)
+                elif file_extension == "epub":
+                    extractor = UnstructuredEpubExtractor(file_path)
+                elif process_pool:
+                    # CPU bound parsing, run it in a worker process to bypass the GIL
+                    return process_pool.submit(cls.extract_local_file, file_path).result()
+                else:
+                    return cls.extract_local_file(file_path)
+            return extractor.extract()
+
+    @staticmethod
+    def extract_local_file(file_path: str) -> list[Document]:
+        """
+        Extract a file with the parsers that only read the file itself,
+        safe to be called in a worker process without app context.
+        :param file_path: path of the file
+        :return: extracted documents
+        """
+        file_extension = Path(file_path).suffix.lower()
+        if file_extension in {".xlsx", ".xls"}:
+            extractor = ExcelExtractor(file_path)
+        elif file_extension == ".pdf":
+            extractor = PdfExtractor(file_path)
+        elif file_extension in {".md", ".markdown"}:
+            extractor = MarkdownExtractor(file_path, autodetect_encoding=True)
+        elif file_extension in {".htm", ".html"}:
+            extractor = HtmlExtractor(file_path)
+        elif file_extension == ".csv":
+            extractor = CSVExtractor(file_path, autodetect_encoding=True)
+        else:
+            # txt
+            extractor = TextExtractor(file_path, autodetect_encoding=True)
+        return extractor.extract()
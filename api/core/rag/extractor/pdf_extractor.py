@@ -1,12 +1,10 @@
 """Abstract interface for document loader implementations."""
 
 from collections.abc import Iterator
-from typing import Optional
 
 from core.rag.extractor.blob.blob import Blob
 from core.rag.extractor.extractor_base import BaseExtractor
 from core.rag.models.document import Document
-from extensions.ext_storage import storage
 
 
 class PdfExtractor(BaseExtractor):
@@ -17,32 +15,13 @@ class PdfExtractor(BaseExtractor):
         file_path: Path to the file to load.
     """
 
-    def __init__(self, file_path: str, file_cache_key: Optional[str] = None):
+    def __init__(self, file_path: str):
         """Initialize with file path."""
         self._file_path = file_path
-        self._file_cache_key = file_cache_key
 
     def extract(self) -> list[Document]:
-        plaintext_file_key = ""
-        plaintext_file_exists = False
-        if self._file_cache_key:
-            try:
-                text = storage.load(self._file_cache_key).decode("utf-8")
-                plaintext_file_exists = True
-                return [Document(page_content=text)]
-            except FileNotFoundError:
-                pass
-        documents = list(self.load())
-        text_list = []
-        for document in documents:
-            text_list.append(document.page_content)
-        text = "\n\n".join(text_list)
-
-        # save plaintext file for caching
-        if not plaintext_file_exists and plaintext_file_key:
-            storage.save(plaintext_file_key, text.encode("utf-8"))
-
-        return documents
+        # extracted documents are cached by ExtractCache, keyed by the hash of the upload file
+        return list(self.load())
 
     def load(
         self,
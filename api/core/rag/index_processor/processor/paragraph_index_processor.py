@@ -18,7 +18,9 @@ from models.dataset import Dataset
 class ParagraphIndexProcessor(BaseIndexProcessor):
     def extract(self, extract_setting: ExtractSetting, **kwargs) -> list[Document]:
         text_docs = ExtractProcessor.extract(
-            extract_setting=extract_setting, is_automatic=kwargs.get("process_rule_mode") == "automatic"
+            extract_setting=extract_setting,
+            is_automatic=kwargs.get("process_rule_mode") == "automatic",
+            process_pool=kwargs.get("process_pool"),
         )
 
         return text_docs
@@ -0,0 +1,114 @@
+import math
+from collections import Counter
+from collections.abc import Sequence
+
+import numpy as np
+
+from core.rag.datasource.keyword.jieba.jieba_keyword_table_handler import JiebaKeywordTableHandler
+from core.rag.models.document import Document
+from extensions.ext_database import db
+from models.dataset import DocumentSegment
+
+
+def get_documents_keywords(documents: list[Document]) -> list[list[str]]:
+    """
+    Get the keywords of documents, in order of preference from the document metadata,
+    the keywords stored on their segments, or extracted with jieba.
+    The keywords are kept in the document metadata for the next scoring.
+    :param documents: documents
+    :return: keywords of each document
+    """
+    documents_keywords: list[list[str] | None] = [document.metadata.get("keywords") for document in documents]
+
+    index_node_ids = [
+        document.metadata["doc_id"]
+        for document, document_keywords in zip(documents, documents_keywords)
+        if document_keywords is None and document.metadata.get("doc_id") and document.metadata.get("dataset_id")
+    ]
+    segments_keywords = {}
+    if index_node_ids:
+        dataset_ids = {document.metadata["dataset_id"] for document in documents if document.metadata.get("dataset_id")}
+        segments = (
+            db.session.query(DocumentSegment.index_node_id, DocumentSegment.keywords)
+            .filter(
+                DocumentSegment.dataset_id.in_(dataset_ids),
+                DocumentSegment.index_node_id.in_(index_node_ids),
+            )
+            .all()
+        )
+        segments_keywords = {index_node_id: keywords for index_node_id, keywords in segments if keywords}
+
+    keyword_table_handler = None
+    for i, document in enumerate(documents):
+        if documents_keywords[i] is not None:
+            continue
+
+        document_keywords = segments_keywords.get(document.metadata.get("doc_id"))
+        if document_keywords is None:
+            keyword_table_handler = keyword_table_handler or JiebaKeywordTableHandler()
+            document_keywords = keyword_table_handler.extract_keywords(document.page_content, None)
+
+        documents_keywords[i] = list(document_keywords)
+        document.metadata["keywords"] = documents_keywords[i]
+
+    return documents_keywords
+
+
+def calculate_keyword_scores(query_keywords: Sequence[str], documents_keywords: list[list[str]]) -> np.ndarray:
+    """
+    Calculate TF-IDF cosine similarities between the query and each document,
+    with IDF computed over the given documents
+    :param query_keywords: keywords of the query
+    :param documents_keywords: keywords of each document
+    :return: similarity of each document
+    """
+    total_documents = len(documents_keywords)
+    if not total_documents:
+        return np.zeros(0)
+
+    # sparse document-term matrix in coordinate format
+    vocabulary: dict[str, int] = {}
+    rows, columns, counts = [], [], []
+    for row, document_keywords in enumerate(documents_keywords):
+        for keyword, count in Counter(document_keywords).items():
+            rows.append(row)
+            columns.append(vocabulary.setdefault(keyword, len(vocabulary)))
+            counts.append(count)
+
+    rows = np.asarray(rows, dtype=np.intp)
+    columns = np.asarray(columns, dtype=np.intp)
+    counts = np.asarray(counts, dtype=np.float64)
+
+    document_frequency = np.bincount(columns, minlength=len(vocabulary))
+    idf = np.log((1 + total_documents) / (1 + document_frequency)) + 1
+    tfidf = counts * idf[columns]
+
+    # keywords that no document contains have an IDF of 0
+    query_tfidf = np.zeros(len(vocabulary))
+    for keyword, count in Counter(query_keywords).items():
+        column = vocabulary.get(keyword)
+        if column is not None:
+            query_tfidf[column] = count * idf[column]
+
+    numerators = np.bincount(rows, weights=tfidf * query_tfidf[columns], minlength=total_documents)
+    document_norms = np.sqrt(np.bincount(rows, weights=tfidf**2, minlength=total_documents))
+    denominators = document_norms * math.sqrt(float(query_tfidf @ query_tfidf))
+
+    scores = np.zeros(total_documents)
+    np.divide(numerators, denominators, out=scores, where=denominators != 0)
+    return scores
+
+
+def calculate_cosine_scores(query_vector: Sequence[float], document_vectors: Sequence[Sequence[float]]) -> np.ndarray:
+    """
+    Calculate cosine similarities between the query vector and each document vector in one batch
+    :param query_vector: query vector of dimension d
+    :param document_vectors: n document vectors of dimension d
+    :return: similarity of each document
+    """
+    if not len(document_vectors):
+        return np.zeros(0)
+
+    query = np.asarray(query_vector, dtype=np.float64)
+    matrix = np.asarray(document_vectors, dtype=np.float64)
+    return (matrix @ query) / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(query))
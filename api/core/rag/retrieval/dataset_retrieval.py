@@ -1,10 +1,8 @@
-import math
-import threading
-from collections import Counter
+import functools
+import logging
 from typing import Optional, cast
 
-from flask import Flask, current_app
-
+from configs import dify_config
 from core.app.app_config.entities import DatasetEntity, DatasetRetrieveConfigEntity
 from core.app.entities.app_invoke_entities import InvokeFrom, ModelConfigWithCredentialsEntity
 from core.callback_handler.index_tool_callback_handler import DatasetIndexToolCallbackHandler
@@ -19,8 +17,10 @@ from core.ops.ops_trace_manager import TraceQueueManager, TraceTask
 from core.ops.utils import measure_time
 from core.rag.data_post_processor.data_post_processor import DataPostProcessor
 from core.rag.datasource.keyword.jieba.jieba_keyword_table_handler import JiebaKeywordTableHandler
+from core.rag.datasource.retrieval_executor import dataset_retrieval_executor
 from core.rag.datasource.retrieval_service import RetrievalService
 from core.rag.models.document import Document
+from core.rag.rerank.scoring import calculate_keyword_scores, get_documents_keywords
 from core.rag.retrieval.retrieval_methods import RetrievalMethod
 from core.rag.retrieval.router.multi_dataset_function_call_router import FunctionCallMultiDatasetRouter
 from core.rag.retrieval.router.multi_dataset_react_route import ReactMultiDatasetRouter
@@ -310,26 +310,24 @@ class DatasetRetrieval:
         reranking_enable: bool = True,
         message_id: Optional[str] = None,
     ):
-        threads = []
         all_documents = []
         dataset_ids = [dataset.id for dataset in available_datasets]
         index_type = None
+        tasks = []
         for dataset in available_datasets:
             index_type = dataset.indexing_technique
-            retrieval_thread = threading.Thread(
-                target=self._retriever,
-                kwargs={
-                    "flask_app": current_app._get_current_object(),
-                    "dataset_id": dataset.id,
-                    "query": query,
-                    "top_k": top_k,
-                    "all_documents": all_documents,
-                },
+            tasks.append(
+                (
+                    f"dataset:{dataset.indexing_technique}",
+                    functools.partial(self._retriever, dataset=dataset, query=query, top_k=top_k),
+                )
             )
-            threads.append(retrieval_thread)
-            retrieval_thread.start()
-        for thread in threads:
-            thread.join()
+        results = dataset_retrieval_executor.run(tasks, timeout=dify_config.RETRIEVAL_SOURCE_TIMEOUT)
+        for dataset, result in zip(available_datasets, results):
+            if result.error:
+                logging.error("Failed to retrieve from dataset %s: %s", dataset.id, result.error)
+            elif result.result:
+                all_documents.extend(result.result)
 
         with measure_time() as timer:
             if reranking_enable:
@@ -402,42 +400,37 @@ class DatasetRetrieval:
             db.session.add_all(dataset_queries)
         db.session.commit()
 
-    def _retriever(self, flask_app: Flask, dataset_id: str, query: str, top_k: int, all_documents: list):
-        with flask_app.app_context():
-            dataset = db.session.query(Dataset).filter(Dataset.id == dataset_id).first()
+    def _retriever(self, dataset: Dataset, query: str, top_k: int) -> list[Document]:
+        # the dataset row is shared by the retrieval threads, attach a copy to the session of this thread
+        dataset = db.session.merge(dataset, load=False)
 
-            if not dataset:
-                return []
+        # get retrieval model , if the model is not setting , using default
+        retrieval_model = dataset.retrieval_model or default_retrieval_model
 
-            # get retrieval model , if the model is not setting , using default
-            retrieval_model = dataset.retrieval_model or default_retrieval_model
-
-            if dataset.indexing_technique == "economy":
-                # use keyword table query
-                documents = RetrievalService.retrieve(
-                    retrieval_method="keyword_search", dataset_id=dataset.id, query=query, top_k=top_k
-                )
-                if documents:
-                    all_documents.extend(documents)
-            else:
-                if top_k > 0:
-                    # retrieval source
-                    documents = RetrievalService.retrieve(
-                        retrieval_method=retrieval_model["search_method"],
-                        dataset_id=dataset.id,
-                        query=query,
-                        top_k=retrieval_model.get("top_k") or 2,
-                        score_threshold=retrieval_model.get("score_threshold", 0.0)
-                        if retrieval_model["score_threshold_enabled"]
-                        else 0.0,
-                        reranking_model=retrieval_model.get("reranking_model", None)
-                        if retrieval_model["reranking_enable"]
-                        else None,
-                        reranking_mode=retrieval_model.get("reranking_mode") or "reranking_model",
-                        weights=retrieval_model.get("weights", None),
-                    )
+        if dataset.indexing_technique == "economy":
+            # use keyword table query
+            return RetrievalService.retrieve(
+                retrieval_method="keyword_search", dataset_id=dataset.id, query=query, top_k=top_k, dataset=dataset
+            )
+        elif top_k > 0:
+            # retrieval source
+            return RetrievalService.retrieve(
+                retrieval_method=retrieval_model["search_method"],
+                dataset_id=dataset.id,
+                query=query,
+                top_k=retrieval_model.get("top_k") or 2,
+                score_threshold=retrieval_model.get("score_threshold", 0.0)
+                if retrieval_model["score_threshold_enabled"]
+                else 0.0,
+                reranking_model=retrieval_model.get("reranking_model", None)
+                if retrieval_model["reranking_enable"]
+                else None,
+                reranking_mode=retrieval_model.get("reranking_mode") or "reranking_model",
+                weights=retrieval_model.get("weights", None),
+                dataset=dataset,
+            )
 
-                    all_documents.extend(documents)
+        return []
 
     def to_dataset_retriever_tool(
         self,
@@ -532,66 +525,8 @@ class DatasetRetrieval:
         """
         keyword_table_handler = JiebaKeywordTableHandler()
         query_keywords = keyword_table_handler.extract_keywords(query, None)
-        documents_keywords = []
-        for document in documents:
-            # get the document keywords
-            document_keywords = keyword_table_handler.extract_keywords(document.page_content, None)
-            document.metadata["keywords"] = document_keywords
-            documents_keywords.append(document_keywords)
-
-        # Counter query keywords(TF)
-        query_keyword_counts = Counter(query_keywords)
-
-        # total documents
-        total_documents = len(documents)
-
-        # calculate all documents' keywords IDF
-        all_keywords = set()
-        for document_keywords in documents_keywords:
-            all_keywords.update(document_keywords)
-
-        keyword_idf = {}
-        for keyword in all_keywords:
-            # calculate include query keywords' documents
-            doc_count_containing_keyword = sum(1 for doc_keywords in documents_keywords if keyword in doc_keywords)
-            # IDF
-            keyword_idf[keyword] = math.log((1 + total_documents) / (1 + doc_count_containing_keyword)) + 1
-
-        query_tfidf = {}
-
-        for keyword, count in query_keyword_counts.items():
-            tf = count
-            idf = keyword_idf.get(keyword, 0)
-            query_tfidf[keyword] = tf * idf
-
-        # calculate all documents' TF-IDF
-        documents_tfidf = []
-        for document_keywords in documents_keywords:
-            document_keyword_counts = Counter(document_keywords)
-            document_tfidf = {}
-            for keyword, count in document_keyword_counts.items():
-                tf = count
-                idf = keyword_idf.get(keyword, 0)
-                document_tfidf[keyword] = tf * idf
-            documents_tfidf.append(document_tfidf)
-
-        def cosine_similarity(vec1, vec2):
-            intersection = set(vec1.keys()) & set(vec2.keys())
-            numerator = sum(vec1[x] * vec2[x] for x in intersection)
-
-            sum1 = sum(vec1[x] ** 2 for x in vec1)
-            sum2 = sum(vec2[x] ** 2 for x in vec2)
-            denominator = math.sqrt(sum1) * math.sqrt(sum2)
-
-            if not denominator:
-                return 0.0
-            else:
-                return float(numerator) / denominator
-
-        similarities = []
-        for document_tfidf in documents_tfidf:
-            similarity = cosine_similarity(query_tfidf, document_tfidf)
-            similarities.append(similarity)
+        documents_keywords = get_documents_keywords(documents)
+        similarities = calculate_keyword_scores(list(query_keywords), documents_keywords).tolist()
 
         for document, score in zip(documents, similarities):
             # format document
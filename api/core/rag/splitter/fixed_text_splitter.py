@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import Any, Optional
 
 from core.model_manager import ModelInstance
@@ -16,6 +17,13 @@ from core.rag.splitter.text_splitter import (
     Union,
 )
 
+# splits repeat within and across the documents of an indexing run, e.g. separators, words, and characters
+# once a text is split to the character level, each distinct split is only tokenized once
+TOKEN_COUNT_CACHE_SIZE = 4096
+# a text this many times longer than the chunk size in characters is measured by a prefix first, a text longer
+# than a chunk is split anyway, so it is tokenized in full only once, at the level where its splits fit in chunks
+LENGTH_PROBE_SIZE_FACTOR = 8
+
 
 class EnhanceRecursiveCharacterTextSplitter(RecursiveCharacterTextSplitter):
     """
@@ -30,6 +38,7 @@ class EnhanceRecursiveCharacterTextSplitter(RecursiveCharacterTextSplitter):
         disallowed_special: Union[Literal[all], Collection[str]] = "all",
         **kwargs: Any,
     ):
+        @lru_cache(maxsize=TOKEN_COUNT_CACHE_SIZE)
         def _token_encoder(text: str) -> int:
             if not text:
                 return 0
@@ -66,13 +75,30 @@ class FixedRecursiveCharacterTextSplitter(EnhanceRecursiveCharacterTextSplitter)
 
         final_chunks = []
         for chunk in chunks:
-            if self._length_function(chunk) > self._chunk_size:
+            if self._get_length(chunk) > self._chunk_size:
                 final_chunks.extend(self.recursive_split_text(chunk))
             else:
                 final_chunks.append(chunk)
 
         return final_chunks
 
+    def _get_length(self, text: str) -> int:
+        """
+        Get the number of tokens of a text, a long text is only measured by a prefix if the prefix is already
+        longer than a chunk.
+        :param text: text
+        :return: number of tokens, at least the number of tokens of the prefix for a long text
+        """
+        probe_size = self._chunk_size * LENGTH_PROBE_SIZE_FACTOR
+        if len(text) > probe_size:
+            # end the prefix at a whitespace, so the tokens of the prefix are tokens of the text
+            end = max(text.rfind(" ", 0, probe_size), text.rfind("\n", 0, probe_size))
+            prefix_length = self._length_function(text[: end if end > 0 else probe_size])
+            if prefix_length > self._chunk_size:
+                return prefix_length
+
+        return self._length_function(text)
+
     def recursive_split_text(self, text: str) -> list[str]:
         """Split incoming text and return chunks."""
         final_chunks = []
@@ -94,7 +120,7 @@ class FixedRecursiveCharacterTextSplitter(EnhanceRecursiveCharacterTextSplitter)
         _good_splits = []
         _good_splits_lengths = []  # cache the lengths of the splits
         for s in splits:
-            s_len = self._length_function(s)
+            s_len = self._get_length(s)
             if s_len < self._chunk_size:
                 _good_splits.append(s)
                 _good_splits_lengths.append(s_len)
@@ -4,6 +4,7 @@ import copy
 import logging
 import re
 from abc import ABC, abstractmethod
+from collections import deque
 from collections.abc import Callable, Collection, Iterable, Sequence, Set
 from dataclasses import dataclass
 from typing import (
@@ -109,18 +110,18 @@ class TextSplitter(BaseDocumentTransformer, ABC):
         separator_len = self._length_function(separator)
 
         docs = []
-        current_doc: list[str] = []
+        # the splits of the current doc and their lengths, popped from the left while keeping the overlap
+        current_doc: deque[str] = deque()
+        current_lengths: deque[int] = deque()
         total = 0
-        index = 0
-        for d in splits:
-            _len = lengths[index]
+        for d, _len in zip(splits, lengths):
             if total + _len + (separator_len if len(current_doc) > 0 else 0) > self._chunk_size:
                 if total > self._chunk_size:
                     logger.warning(
                         f"Created a chunk of size {total}, which is longer than the specified {self._chunk_size}"
                     )
                 if len(current_doc) > 0:
-                    doc = self._join_docs(current_doc, separator)
+                    doc = self._join_docs(list(current_doc), separator)
                     if doc is not None:
                         docs.append(doc)
                     # Keep on popping if:
@@ -129,12 +130,12 @@ class TextSplitter(BaseDocumentTransformer, ABC):
                     while total > self._chunk_overlap or (
                         total + _len + (separator_len if len(current_doc) > 0 else 0) > self._chunk_size and total > 0
                     ):
-                        total -= self._length_function(current_doc[0]) + (separator_len if len(current_doc) > 1 else 0)
-                        current_doc = current_doc[1:]
+                        total -= current_lengths.popleft() + (separator_len if len(current_doc) > 1 else 0)
+                        current_doc.popleft()
             current_doc.append(d)
+            current_lengths.append(_len)
             total += _len + (separator_len if len(current_doc) > 1 else 0)
-            index += 1
-        doc = self._join_docs(current_doc, separator)
+        doc = self._join_docs(list(current_doc), separator)
         if doc is not None:
             docs.append(doc)
         return docs
@@ -1,8 +1,8 @@
 from collections import defaultdict
 from collections.abc import Mapping, Sequence
-from typing import Any, Union
+from typing import Any, Optional, Union
 
-from pydantic import BaseModel, Field, model_validator
+from pydantic import BaseModel, Field, PrivateAttr, model_validator
 from typing_extensions import deprecated
 
 from core.app.segments import Segment, Variable, factory
@@ -17,12 +17,23 @@ ENVIRONMENT_VARIABLE_NODE_ID = "env"
 CONVERSATION_VARIABLE_NODE_ID = "conversation"
 
 
+class _LazySegment:
+    """
+    Raw value added to the pool, the segment is only built when the variable is read.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+
 class VariablePool(BaseModel):
     # Variable dictionary is a dictionary for looking up variables by their selector.
     # The first element of the selector is the node id, it's the first-level key in the dictionary.
-    # Other elements of the selector are the keys in the second-level dictionary. To get the key, we hash the
-    # elements of the selector except the first one.
-    variable_dictionary: dict[str, dict[int, Segment]] = Field(
+    # Other elements of the selector, as a tuple, are the keys in the second-level dictionary.
+    # Values are segments, or raw values whose segment has not been built yet.
+    variable_dictionary: dict[str, dict[tuple[str, ...], Any]] = Field(
         description="Variables mapping", default=defaultdict(dict)
     )
 
@@ -39,6 +50,12 @@ class VariablePool(BaseModel):
 
     conversation_variables: Sequence[Variable] | None = None
 
+    # Lookups missing in this pool fall through to the parent pool, see `fork`.
+    _parent: Optional["VariablePool"] = PrivateAttr(default=None)
+    # Node ids and selectors removed in this pool, they hide the variables of the parent pool.
+    _removed_node_ids: set[str] = PrivateAttr(default_factory=set)
+    _removed_selectors: set[tuple[str, ...]] = PrivateAttr(default_factory=set)
+
     @model_validator(mode="after")
     def val_model_after(self):
         """
@@ -81,11 +98,16 @@ class VariablePool(BaseModel):
 
         if isinstance(value, Segment):
             v = value
+        elif isinstance(value, dict | list):
+            # building segments of large objects and arrays is deferred until they are read
+            v = _LazySegment(value)
         else:
             v = factory.build_segment(value)
 
-        hash_key = hash(tuple(selector[1:]))
-        self.variable_dictionary[selector[0]][hash_key] = v
+        node_id, key = selector[0], tuple(selector[1:])
+        self.variable_dictionary[node_id][key] = v
+        if self._removed_selectors:
+            self._removed_selectors.discard((node_id, *key))
 
     def get(self, selector: Sequence[str], /) -> Segment | None:
         """
@@ -102,10 +124,25 @@ class VariablePool(BaseModel):
         """
         if len(selector) < 2:
             raise ValueError("Invalid selector")
-        hash_key = hash(tuple(selector[1:]))
-        value = self.variable_dictionary[selector[0]].get(hash_key)
 
-        return value
+        node_id, key = selector[0], tuple(selector[1:])
+        pool: Optional[VariablePool] = self
+        while pool is not None:
+            node_variables = pool.variable_dictionary.get(node_id)
+            if node_variables is not None and key in node_variables:
+                value = node_variables[key]
+                if isinstance(value, _LazySegment):
+                    value = factory.build_segment(value.value)
+                    node_variables[key] = value
+
+                return value
+
+            if node_id in pool._removed_node_ids or (node_id, *key) in pool._removed_selectors:
+                return None
+
+            pool = pool._parent
+
+        return None
 
     @deprecated("This method is deprecated, use `get` instead.")
     def get_any(self, selector: Sequence[str], /) -> Any | None:
@@ -121,10 +158,7 @@ class VariablePool(BaseModel):
         Raises:
             ValueError: If the selector is invalid.
         """
-        if len(selector) < 2:
-            raise ValueError("Invalid selector")
-        hash_key = hash(tuple(selector[1:]))
-        value = self.variable_dictionary[selector[0]].get(hash_key)
+        value = self.get(selector)
         return value.to_object() if value else None
 
     def remove(self, selector: Sequence[str], /):
@@ -140,10 +174,16 @@ class VariablePool(BaseModel):
         if not selector:
             return
         if len(selector) == 1:
-            self.variable_dictionary[selector[0]] = {}
+            self.remove_node(selector[0])
             return
-        hash_key = hash(tuple(selector[1:]))
-        self.variable_dictionary[selector[0]].pop(hash_key, None)
+
+        node_id, key = selector[0], tuple(selector[1:])
+        node_variables = self.variable_dictionary.get(node_id)
+        if node_variables is not None:
+            node_variables.pop(key, None)
+
+        if self._parent is not None:
+            self._removed_selectors.add((node_id, *key))
 
     def remove_node(self, node_id: str, /):
         """
@@ -156,3 +196,34 @@ class VariablePool(BaseModel):
             None
         """
         self.variable_dictionary.pop(node_id, None)
+
+        if self._parent is not None:
+            self._removed_node_ids.add(node_id)
+            self._removed_selectors = {selector for selector in self._removed_selectors if selector[0] != node_id}
+
+    @property
+    def parent(self) -> Optional["VariablePool"]:
+        """
+        The pool this pool was forked from, None for the variable pool of a workflow run.
+        """
+        return self._parent
+
+    def fork(self) -> "VariablePool":
+        """
+        Create a child variable pool in O(1).
+
+        The child reads through to this pool, while variables added to or removed from the child are only visible
+        in the child. Used to run iteration items and other sub graphs in isolation without copying the pool.
+
+        Returns:
+            VariablePool: The child variable pool.
+        """
+        child = VariablePool.model_construct(
+            variable_dictionary=defaultdict(dict),
+            user_inputs=self.user_inputs,
+            system_variables=self.system_variables,
+            environment_variables=self.environment_variables,
+            conversation_variables=self.conversation_variables,
+        )
+        child._parent = self
+        return child
@@ -3,11 +3,12 @@ import queue
 import time
 import uuid
 from collections.abc import Generator, Mapping
-from concurrent.futures import ThreadPoolExecutor, wait
+from concurrent.futures import wait
 from typing import Any, Optional
 
 from flask import Flask, current_app
 
+from configs import dify_config
 from core.app.apps.base_app_queue_manager import GenerateTaskStoppedError
 from core.app.entities.app_invoke_entities import InvokeFrom
 from core.workflow.entities.node_entities import (
@@ -36,6 +37,7 @@ from core.workflow.graph_engine.entities.graph import Graph, GraphEdge
 from core.workflow.graph_engine.entities.graph_init_params import GraphInitParams
 from core.workflow.graph_engine.entities.graph_runtime_state import GraphRuntimeState
 from core.workflow.graph_engine.entities.runtime_route_state import RouteNodeState
+from core.workflow.graph_engine.thread_pool import GraphEngineThreadPool
 from core.workflow.nodes.answer.answer_stream_processor import AnswerStreamProcessor
 from core.workflow.nodes.base_node import BaseNode
 from core.workflow.nodes.end.end_stream_processor import EndStreamProcessor
@@ -47,29 +49,6 @@ from models.workflow import WorkflowNodeExecutionStatus, WorkflowType
 logger = logging.getLogger(__name__)
 
 
-class GraphEngineThreadPool(ThreadPoolExecutor):
-    def __init__(
-        self, max_workers=None, thread_name_prefix="", initializer=None, initargs=(), max_submit_count=100
-    ) -> None:
-        super().__init__(max_workers, thread_name_prefix, initializer, initargs)
-        self.max_submit_count = max_submit_count
-        self.submit_count = 0
-
-    def submit(self, fn, *args, **kwargs):
-        self.submit_count += 1
-        self.check_is_full()
-
-        return super().submit(fn, *args, **kwargs)
-
-    def task_done_callback(self, future):
-        self.submit_count -= 1
-
-    def check_is_full(self) -> None:
-        print(f"submit_count: {self.submit_count}, max_submit_count: {self.max_submit_count}")
-        if self.submit_count > self.max_submit_count:
-            raise ValueError(f"Max submit count {self.max_submit_count} of workflow thread pool reached.")
-
-
 class GraphEngine:
     workflow_thread_pool_mapping: dict[str, GraphEngineThreadPool] = {}
 
@@ -90,20 +69,17 @@ class GraphEngine:
         max_execution_time: int,
         thread_pool_id: Optional[str] = None,
     ) -> None:
-        thread_pool_max_submit_count = 100
-        thread_pool_max_workers = 10
-
         # init thread pool
         if thread_pool_id:
             if thread_pool_id not in GraphEngine.workflow_thread_pool_mapping:
-                raise ValueError(f"Max submit count {thread_pool_max_submit_count} of workflow thread pool reached.")
+                raise ValueError(f"Workflow thread pool {thread_pool_id} not found.")
 
             self.thread_pool_id = thread_pool_id
             self.thread_pool = GraphEngine.workflow_thread_pool_mapping[thread_pool_id]
             self.is_main_thread_pool = False
         else:
             self.thread_pool = GraphEngineThreadPool(
-                max_workers=thread_pool_max_workers, max_submit_count=thread_pool_max_submit_count
+                tenant_id=tenant_id, max_submit_count=dify_config.WORKFLOW_MAX_SUBMIT_COUNT
             )
             self.thread_pool_id = str(uuid.uuid4())
             self.is_main_thread_pool = True
@@ -445,32 +421,22 @@ class GraphEngine:
                 },
             )
 
-            future.add_done_callback(self.thread_pool.task_done_callback)
-
             futures.append(future)
 
-        succeeded_count = 0
-        while True:
-            try:
-                event = q.get(timeout=1)
-                if event is None:
-                    break
-
+        # every branch worker ends with a succeeded or failed event, block until all branches reported
+        with self.thread_pool.managed_block():
+            succeeded_count = 0
+            while succeeded_count < len(futures):
+                event = q.get()
                 yield event
                 if event.parallel_id == parallel_id:
                     if isinstance(event, ParallelBranchRunSucceededEvent):
                         succeeded_count += 1
-                        if succeeded_count == len(futures):
-                            q.put(None)
-
-                        continue
                     elif isinstance(event, ParallelBranchRunFailedEvent):
                         raise GraphRunFailedError(event.error)
-            except queue.Empty:
-                continue
 
-        # wait all threads
-        wait(futures)
+            # wait all threads
+            wait(futures)
 
         # get final node id
         final_node_id = parallel.end_to_node_id
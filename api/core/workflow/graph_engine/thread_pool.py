@@ -0,0 +1,230 @@
+import logging
+import threading
+from collections import OrderedDict, deque
+from collections.abc import Callable, Generator
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Optional
+
+from configs import dify_config
+from core.helper.shared_thread_pool import register_fork_reset
+
+logger = logging.getLogger(__name__)
+
+
+class _WorkItem:
+    def __init__(
+        self,
+        future: Future,
+        fn: Callable[..., Any],
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+        on_start: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self.future = future
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.on_start = on_start
+
+    def run(self) -> None:
+        if self.on_start:
+            self.on_start()
+
+        if not self.future.set_running_or_notify_cancel():
+            return
+
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except BaseException as e:
+            self.future.set_exception(e)
+        else:
+            self.future.set_result(result)
+
+
+class WorkflowTaskScheduler:
+    """
+    Process-wide bounded worker pool shared by all workflow runs.
+
+    Ready tasks are queued per tenant and idle workers pick tenants round-robin, so a tenant fanning out many
+    branches cannot starve the others. A worker that waits for tasks it submitted itself (nested parallel branches,
+    parallel iterations) must wrap the wait in `managed_block`, which lets the pool start a compensating worker
+    instead of deadlocking once every worker is waiting.
+    """
+
+    _instance: Optional["WorkflowTaskScheduler"] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, max_workers: int) -> None:
+        self._max_workers = max_workers
+        self._condition = threading.Condition()
+        self._tenant_queues: OrderedDict[str, deque[_WorkItem]] = OrderedDict()
+        self._queued_count = 0
+        self._worker_count = 0
+        self._idle_worker_count = 0
+        self._blocked_worker_count = 0
+        self._local = threading.local()
+
+    @classmethod
+    def get_instance(cls) -> "WorkflowTaskScheduler":
+        """
+        Get the scheduler of current process
+        :return:
+        """
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls(max_workers=dify_config.WORKFLOW_THREAD_POOL_MAX_WORKERS)
+
+        return cls._instance
+
+    @classmethod
+    def _reset_instance(cls) -> None:
+        # worker threads do not survive fork, the child process starts with a fresh scheduler
+        cls._instance = None
+        cls._instance_lock = threading.Lock()
+
+    def submit(self, tenant_id: str, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Future:
+        """
+        Submit a task on behalf of a tenant
+        :param tenant_id: tenant id
+        :param fn: callable to run in a worker
+        :return: future of the task
+        """
+        future: Future = Future()
+        self.submit_work_item(tenant_id, _WorkItem(future, fn, args, kwargs))
+        return future
+
+    def submit_work_item(self, tenant_id: str, work_item: _WorkItem) -> None:
+        with self._condition:
+            self._tenant_queues.setdefault(tenant_id, deque()).append(work_item)
+            self._queued_count += 1
+            self._adjust_worker_count()
+            self._condition.notify()
+
+    @contextmanager
+    def managed_block(self) -> Generator[None, None, None]:
+        """
+        Mark current worker as waiting for other tasks of the pool.
+        No-op when called outside of a worker thread.
+        """
+        if not getattr(self._local, "is_worker", False) or getattr(self._local, "is_blocked", False):
+            yield
+            return
+
+        self._local.is_blocked = True
+        with self._condition:
+            self._blocked_worker_count += 1
+            self._adjust_worker_count()
+
+        try:
+            yield
+        finally:
+            self._local.is_blocked = False
+            with self._condition:
+                self._blocked_worker_count -= 1
+                # let a surplus idle worker exit
+                self._condition.notify()
+
+    def _adjust_worker_count(self) -> None:
+        # caller must hold self._condition
+        if self._queued_count <= self._idle_worker_count:
+            return
+
+        if self._worker_count >= self._max_workers + self._blocked_worker_count:
+            return
+
+        self._worker_count += 1
+        threading.Thread(
+            target=self._worker,
+            name=f"workflow-worker-{self._worker_count}",
+            daemon=True,
+        ).start()
+
+    def _worker(self) -> None:
+        self._local.is_worker = True
+        while True:
+            with self._condition:
+                while not self._tenant_queues:
+                    if self._worker_count > self._max_workers + self._blocked_worker_count:
+                        self._worker_count -= 1
+                        return
+
+                    self._idle_worker_count += 1
+                    self._condition.wait()
+                    self._idle_worker_count -= 1
+
+                # round-robin between tenants
+                tenant_id, tenant_queue = next(iter(self._tenant_queues.items()))
+                work_item = tenant_queue.popleft()
+                if tenant_queue:
+                    self._tenant_queues.move_to_end(tenant_id)
+                else:
+                    del self._tenant_queues[tenant_id]
+
+                self._queued_count -= 1
+
+            try:
+                work_item.run()
+            except Exception:
+                logger.exception("Unexpected error in workflow worker")
+
+
+register_fork_reset(WorkflowTaskScheduler._reset_instance)
+
+
+class GraphEngineThreadPool:
+    """
+    Thread pool of a single workflow run, backed by the process-wide `WorkflowTaskScheduler`.
+
+    At most `max_submit_count` tasks of a run wait in the shared ready queue at the same time, further submits
+    are held back and released as queued tasks get picked up by workers rather than being rejected.
+    """
+
+    def __init__(
+        self,
+        tenant_id: str,
+        max_submit_count: int = dify_config.WORKFLOW_MAX_SUBMIT_COUNT,
+        scheduler: Optional[WorkflowTaskScheduler] = None,
+    ) -> None:
+        self.tenant_id = tenant_id
+        self.max_submit_count = max_submit_count
+        self.submit_count = 0
+        self._scheduler = scheduler or WorkflowTaskScheduler.get_instance()
+        self._backlog: deque[_WorkItem] = deque()
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Future:
+        """
+        Submit a task
+        :param fn: callable to run in a worker
+        :return: future of the task
+        """
+        future: Future = Future()
+        work_item = _WorkItem(future, fn, args, kwargs, on_start=self._task_started_callback)
+        with self._lock:
+            if self.submit_count >= self.max_submit_count:
+                self._backlog.append(work_item)
+                return future
+
+            self.submit_count += 1
+
+        self._scheduler.submit_work_item(self.tenant_id, work_item)
+        return future
+
+    def managed_block(self):
+        """
+        Wrap waits on tasks of this pool, see `WorkflowTaskScheduler.managed_block`
+        """
+        return self._scheduler.managed_block()
+
+    def _task_started_callback(self) -> None:
+        with self._lock:
+            if not self._backlog:
+                self.submit_count -= 1
+                return
+
+            # hand the freed queue slot over to the oldest held back task
+            work_item = self._backlog.popleft()
+
+        self._scheduler.submit_work_item(self.tenant_id, work_item)
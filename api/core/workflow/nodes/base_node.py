@@ -2,6 +2,7 @@ from abc import ABC, abstractmethod
 from collections.abc import Generator, Mapping, Sequence
 from typing import Any, Optional
 
+from configs import dify_config
 from core.workflow.entities.base_node_data_entities import BaseNodeData
 from core.workflow.entities.node_entities import NodeRunResult, NodeType
 from core.workflow.graph_engine.entities.event import InNodeEvent
@@ -115,3 +116,52 @@ class BaseNode(ABC):
         :return:
         """
         return self._node_type
+
+    def _get_parallel_iteration_id(self) -> Optional[str]:
+        """
+        Get the id of the parallel iteration containing the node
+        :return: None if the node is not in a parallel iteration
+        """
+        nodes = {node.get("id"): node.get("data", {}) for node in self.graph_config.get("nodes", [])}
+        iteration_id = nodes.get(self.node_id, {}).get("iteration_id")
+        iteration_data = nodes.get(iteration_id) if iteration_id else None
+        if not iteration_data or not iteration_data.get("is_parallel"):
+            return None
+
+        return iteration_id
+
+    def _get_iteration_parallelism(self) -> int:
+        """
+        Get the number of items run at the same time by the iteration containing the node
+        :return: 1 if the node is not in a parallel iteration
+        """
+        iteration_id = self._get_parallel_iteration_id()
+        if not iteration_id:
+            return 1
+
+        nodes = {node.get("id"): node.get("data", {}) for node in self.graph_config.get("nodes", [])}
+        iteration_data = nodes[iteration_id]
+        parallelism = min(
+            max(int(iteration_data.get("parallel_nums", 10)), 1), dify_config.WORKFLOW_MAX_ITERATION_PARALLEL_NUMS
+        )
+
+        # an iteration of fewer items never runs more of them at the same time
+        iterator_selector = iteration_data.get("iterator_selector")
+        iterator_list = self.graph_runtime_state.variable_pool.get_any(iterator_selector) if iterator_selector else None
+        if isinstance(iterator_list, list):
+            parallelism = min(parallelism, max(len(iterator_list), 1))
+
+        return parallelism
+
+    def _get_iteration_run_scope(self) -> Optional[str]:
+        """
+        Get a key shared by the items of the same run of the parallel iteration containing the node
+        :return: None if the node is not in a parallel iteration
+        """
+        iteration_id = self._get_parallel_iteration_id()
+        # the items of an iteration run are forks of the same variable pool, which lives as long as the run
+        parent_pool = self.graph_runtime_state.variable_pool.parent
+        if not iteration_id or parent_pool is None:
+            return None
+
+        return f"{self.tenant_id}:{self.workflow_id}:{iteration_id}:{id(parent_pool)}"
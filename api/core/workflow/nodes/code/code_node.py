@@ -2,7 +2,8 @@ from collections.abc import Mapping, Sequence
 from typing import Any, Optional, Union, cast
 
 from configs import dify_config
-from core.helper.code_executor.code_executor import CodeExecutionError, CodeExecutor, CodeLanguage
+from core.helper.code_executor.code_execution_batcher import code_execution_batcher
+from core.helper.code_executor.code_executor import CodeExecutionError, CodeLanguage
 from core.helper.code_executor.code_node_provider import CodeNodeProvider
 from core.helper.code_executor.javascript.javascript_code_provider import JavascriptCodeProvider
 from core.helper.code_executor.python3.python3_code_provider import Python3CodeProvider
@@ -53,10 +54,12 @@ class CodeNode(BaseNode):
             variables[variable] = value
         # Run code
         try:
-            result = CodeExecutor.execute_workflow_code_template(
+            result = code_execution_batcher.execute(
                 language=code_language,
                 code=code,
                 inputs=variables,
+                max_batch_size=self._get_iteration_parallelism(),
+                batch_scope=self._get_iteration_run_scope(),
             )
 
             # Transform result
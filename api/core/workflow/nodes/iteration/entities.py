@@ -11,6 +11,8 @@ class IterationNodeData(BaseIterationNodeData):
     parent_loop_id: Optional[str] = None  # redundant field, not used currently
     iterator_selector: list[str]  # variable selector
     output_selector: list[str]  # output selector
+    is_parallel: bool = False  # run iteration items concurrently
+    parallel_nums: int = 10  # max number of items running at the same time in parallel mode
 
 
 class IterationStartNodeData(BaseNodeData):
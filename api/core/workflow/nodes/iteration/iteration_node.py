@@ -1,16 +1,23 @@
+import contextvars
 import logging
+import queue
 from collections.abc import Generator, Mapping, Sequence
+from concurrent.futures import Future
 from datetime import datetime, timezone
-from typing import Any, cast
+from typing import TYPE_CHECKING, Any, cast
+
+from flask import Flask, current_app
 
 from configs import dify_config
 from core.model_runtime.utils.encoders import jsonable_encoder
 from core.workflow.entities.node_entities import NodeRunMetadataKey, NodeRunResult, NodeType
+from core.workflow.entities.variable_pool import VariablePool
 from core.workflow.graph_engine.entities.event import (
     BaseGraphEvent,
     BaseNodeEvent,
     BaseParallelBranchEvent,
     GraphRunFailedEvent,
+    GraphRunSucceededEvent,
     InNodeEvent,
     IterationRunFailedEvent,
     IterationRunNextEvent,
@@ -20,11 +27,16 @@ from core.workflow.graph_engine.entities.event import (
     NodeRunSucceededEvent,
 )
 from core.workflow.graph_engine.entities.graph import Graph
+from core.workflow.graph_engine.thread_pool import GraphEngineThreadPool
 from core.workflow.nodes.base_node import BaseNode
 from core.workflow.nodes.event import RunCompletedEvent, RunEvent
 from core.workflow.nodes.iteration.entities import IterationNodeData
+from extensions.ext_database import db
 from models.workflow import WorkflowNodeExecutionStatus
 
+if TYPE_CHECKING:
+    from core.workflow.graph_engine.graph_engine import GraphEngine
+
 logger = logging.getLogger(__name__)
 
 
@@ -66,6 +78,17 @@ class IterationNode(BaseNode):
         if not iteration_graph:
             raise ValueError("iteration graph not found")
 
+        start_at = datetime.now(timezone.utc).replace(tzinfo=None)
+
+        if self.node_data.is_parallel and len(iterator_list_value) > 1:
+            yield from self._run_parallel(
+                iteration_graph=iteration_graph,
+                iterator_list_value=iterator_list_value,
+                inputs=inputs,
+                start_at=start_at,
+            )
+            return
+
         variable_pool = self.graph_runtime_state.variable_pool
 
         # append iteration variable (item, index) to variable pool
@@ -73,26 +96,7 @@ class IterationNode(BaseNode):
         variable_pool.add([self.node_id, "item"], iterator_list_value[0])
 
         # init graph engine
-        from core.workflow.graph_engine.graph_engine import GraphEngine
-
-        graph_engine = GraphEngine(
-            tenant_id=self.tenant_id,
-            app_id=self.app_id,
-            workflow_type=self.workflow_type,
-            workflow_id=self.workflow_id,
-            user_id=self.user_id,
-            user_from=self.user_from,
-            invoke_from=self.invoke_from,
-            call_depth=self.workflow_call_depth,
-            graph=iteration_graph,
-            graph_config=graph_config,
-            variable_pool=variable_pool,
-            max_execution_steps=dify_config.WORKFLOW_MAX_EXECUTION_STEPS,
-            max_execution_time=dify_config.WORKFLOW_MAX_EXECUTION_TIME,
-            thread_pool_id=self.thread_pool_id,
-        )
-
-        start_at = datetime.now(timezone.utc).replace(tzinfo=None)
+        graph_engine = self._create_graph_engine(iteration_graph=iteration_graph, variable_pool=variable_pool)
 
         yield IterationRunStartedEvent(
             iteration_id=self.id,
@@ -245,6 +249,287 @@ class IterationNode(BaseNode):
             variable_pool.remove([self.node_id, "index"])
             variable_pool.remove([self.node_id, "item"])
 
+    def _create_graph_engine(self, iteration_graph: Graph, variable_pool: VariablePool) -> "GraphEngine":
+        """
+        Create graph engine to run the sub graph of iteration
+        :param iteration_graph: iteration graph
+        :param variable_pool: variable pool the sub graph reads from and writes to
+        :return:
+        """
+        from core.workflow.graph_engine.graph_engine import GraphEngine
+
+        return GraphEngine(
+            tenant_id=self.tenant_id,
+            app_id=self.app_id,
+            workflow_type=self.workflow_type,
+            workflow_id=self.workflow_id,
+            user_id=self.user_id,
+            user_from=self.user_from,
+            invoke_from=self.invoke_from,
+            call_depth=self.workflow_call_depth,
+            graph=iteration_graph,
+            graph_config=self.graph_config,
+            variable_pool=variable_pool,
+            max_execution_steps=dify_config.WORKFLOW_MAX_EXECUTION_STEPS,
+            max_execution_time=dify_config.WORKFLOW_MAX_EXECUTION_TIME,
+            thread_pool_id=self.thread_pool_id,
+        )
+
+    def _create_item_variable_pool(self, index: int, item: Any) -> VariablePool:
+        """
+        Create an isolated variable pool for a single iteration item.
+        Variables of upstream nodes are shared with the workflow variable pool, variables written by the
+        sub graph (and the item / index of the iteration) only live in the returned pool.
+        :param index: item index
+        :param item: item value
+        :return:
+        """
+        item_variable_pool = self.graph_runtime_state.variable_pool.fork()
+        item_variable_pool.add([self.node_id, "index"], index)
+        item_variable_pool.add([self.node_id, "item"], item)
+
+        return item_variable_pool
+
+    def _run_parallel(
+        self, iteration_graph: Graph, iterator_list_value: list[Any], inputs: dict[str, Any], start_at: datetime
+    ) -> Generator[RunEvent | InNodeEvent, None, None]:
+        """
+        Run iteration items concurrently, every item runs its own graph engine on an isolated variable pool.
+        Events are streamed as soon as they are produced, outputs keep the order of the iterator list.
+        :param iteration_graph: iteration graph
+        :param iterator_list_value: iterator list
+        :param inputs: iteration inputs
+        :param start_at: iteration start time
+        :return:
+        """
+        self.node_data = cast(IterationNodeData, self.node_data)
+        max_workers = min(
+            max(self.node_data.parallel_nums, 1),
+            dify_config.WORKFLOW_MAX_ITERATION_PARALLEL_NUMS,
+            len(iterator_list_value),
+        )
+
+        yield IterationRunStartedEvent(
+            iteration_id=self.id,
+            iteration_node_id=self.node_id,
+            iteration_node_type=self.node_type,
+            iteration_node_data=self.node_data,
+            start_at=start_at,
+            inputs=inputs,
+            metadata={"iterator_length": len(iterator_list_value)},
+            predecessor_node_id=self.previous_node_id,
+        )
+
+        yield IterationRunNextEvent(
+            iteration_id=self.id,
+            iteration_node_id=self.node_id,
+            iteration_node_type=self.node_type,
+            iteration_node_data=self.node_data,
+            index=0,
+            pre_iteration_output=None,
+        )
+
+        thread_pool = self._get_thread_pool()
+        flask_app = current_app._get_current_object()  # type: ignore[attr-defined]
+        context = contextvars.copy_context()
+        item_variable_pools: dict[int, VariablePool] = {}
+        graph_engines: dict[int, GraphEngine] = {}
+        futures: list[Future] = []
+        outputs: list[Any] = [None] * len(iterator_list_value)
+        q: queue.Queue = queue.Queue()
+
+        def submit_next_item() -> None:
+            index = len(futures)
+            item_variable_pools[index] = self._create_item_variable_pool(index=index, item=iterator_list_value[index])
+            graph_engines[index] = self._create_graph_engine(
+                iteration_graph=iteration_graph, variable_pool=item_variable_pools[index]
+            )
+            futures.append(
+                thread_pool.submit(
+                    self._run_single_iteration,
+                    flask_app=flask_app,
+                    context=context,
+                    q=q,
+                    index=index,
+                    graph_engine=graph_engines[index],
+                )
+            )
+
+        completed_indexes: set[int] = set()
+        try:
+            # items are submitted as running ones complete, at most max_workers items run at the same time
+            for _ in range(max_workers):
+                submit_next_item()
+
+            with thread_pool.managed_block():
+                while len(completed_indexes) < len(iterator_list_value):
+                    index, event = q.get()
+                    if event is None:
+                        if index in completed_indexes:
+                            if len(futures) < len(iterator_list_value):
+                                submit_next_item()
+
+                            continue
+
+                        # worker exited without reporting the result of the sub graph
+                        raise ValueError(f"iteration {self.node_id} item {index} run failed")
+
+                    if isinstance(event, (BaseNodeEvent | BaseParallelBranchEvent)) and not event.in_iteration_id:
+                        event.in_iteration_id = self.node_id
+
+                    if (
+                        isinstance(event, BaseNodeEvent)
+                        and event.node_type == NodeType.ITERATION_START
+                        and not isinstance(event, NodeRunStreamChunkEvent)
+                    ):
+                        continue
+
+                    if isinstance(event, NodeRunSucceededEvent):
+                        if event.route_node_state.node_run_result:
+                            metadata = event.route_node_state.node_run_result.metadata
+                            if not metadata:
+                                metadata = {}
+
+                            if NodeRunMetadataKey.ITERATION_ID not in metadata:
+                                metadata[NodeRunMetadataKey.ITERATION_ID] = self.node_id
+                                metadata[NodeRunMetadataKey.ITERATION_INDEX] = index
+                                event.route_node_state.node_run_result.metadata = metadata
+
+                        yield event
+                    elif isinstance(event, BaseGraphEvent):
+                        if isinstance(event, GraphRunFailedEvent):
+                            # iteration run failed
+                            yield IterationRunFailedEvent(
+                                iteration_id=self.id,
+                                iteration_node_id=self.node_id,
+                                iteration_node_type=self.node_type,
+                                iteration_node_data=self.node_data,
+                                start_at=start_at,
+                                inputs=inputs,
+                                outputs={"output": jsonable_encoder(outputs)},
+                                steps=len(iterator_list_value),
+                                metadata={"total_tokens": self._sum_total_tokens(graph_engines)},
+                                error=event.error,
+                            )
+
+                            yield RunCompletedEvent(
+                                run_result=NodeRunResult(
+                                    status=WorkflowNodeExecutionStatus.FAILED,
+                                    error=event.error,
+                                )
+                            )
+                            return
+                        elif isinstance(event, GraphRunSucceededEvent):
+                            output_segment = item_variable_pools[index].get(self.node_data.output_selector)
+                            current_iteration_output = output_segment.to_object() if output_segment else None
+                            outputs[index] = current_iteration_output
+                            completed_indexes.add(index)
+
+                            yield IterationRunNextEvent(
+                                iteration_id=self.id,
+                                iteration_node_id=self.node_id,
+                                iteration_node_type=self.node_type,
+                                iteration_node_data=self.node_data,
+                                index=len(completed_indexes),
+                                pre_iteration_output=jsonable_encoder(current_iteration_output)
+                                if current_iteration_output
+                                else None,
+                            )
+                    else:
+                        event = cast(InNodeEvent, event)
+                        yield event
+
+            yield IterationRunSucceededEvent(
+                iteration_id=self.id,
+                iteration_node_id=self.node_id,
+                iteration_node_type=self.node_type,
+                iteration_node_data=self.node_data,
+                start_at=start_at,
+                inputs=inputs,
+                outputs={"output": jsonable_encoder(outputs)},
+                steps=len(iterator_list_value),
+                metadata={"total_tokens": self._sum_total_tokens(graph_engines)},
+            )
+
+            yield RunCompletedEvent(
+                run_result=NodeRunResult(
+                    status=WorkflowNodeExecutionStatus.SUCCEEDED, outputs={"output": jsonable_encoder(outputs)}
+                )
+            )
+        except Exception as e:
+            # iteration run failed
+            logger.exception("Iteration run failed")
+            yield IterationRunFailedEvent(
+                iteration_id=self.id,
+                iteration_node_id=self.node_id,
+                iteration_node_type=self.node_type,
+                iteration_node_data=self.node_data,
+                start_at=start_at,
+                inputs=inputs,
+                outputs={"output": jsonable_encoder(outputs)},
+                steps=len(iterator_list_value),
+                metadata={"total_tokens": self._sum_total_tokens(graph_engines)},
+                error=str(e),
+            )
+
+            yield RunCompletedEvent(
+                run_result=NodeRunResult(
+                    status=WorkflowNodeExecutionStatus.FAILED,
+                    error=str(e),
+                )
+            )
+        finally:
+            # items that have not started yet are dropped, running items finish in background
+            for future in futures:
+                future.cancel()
+
+    def _run_single_iteration(
+        self,
+        flask_app: Flask,
+        context: contextvars.Context,
+        q: queue.Queue,
+        index: int,
+        graph_engine: "GraphEngine",
+    ) -> None:
+        """
+        Run the sub graph of a single iteration item in a worker thread
+        :param flask_app: Flask app
+        :param context: context vars of the caller
+        :param q: queue to put (index, event) tuples to, (index, None) is put when the worker exits
+        :param index: item index
+        :param graph_engine: graph engine bound to the item variable pool
+        :return:
+        """
+        for var, val in context.items():
+            var.set(val)
+
+        with flask_app.app_context():
+            try:
+                for event in graph_engine.run():
+                    q.put((index, event))
+            except Exception:
+                logger.exception(f"Iteration {self.node_id} item {index} run failed")
+            finally:
+                q.put((index, None))
+                db.session.remove()
+
+    def _get_thread_pool(self) -> GraphEngineThreadPool:
+        """
+        Get thread pool of the workflow run, iteration items are scheduled on the same shared workers
+        :return:
+        """
+        from core.workflow.graph_engine.graph_engine import GraphEngine
+
+        thread_pool = GraphEngine.workflow_thread_pool_mapping.get(self.thread_pool_id) if self.thread_pool_id else None
+        if not thread_pool:
+            thread_pool = GraphEngineThreadPool(tenant_id=self.tenant_id)
+
+        return thread_pool
+
+    @staticmethod
+    def _sum_total_tokens(graph_engines: Mapping[int, "GraphEngine"]) -> int:
+        return sum(graph_engine.graph_runtime_state.total_tokens for graph_engine in graph_engines.values())
+
     @classmethod
     def _extract_variable_selector_to_variable_mapping(
         cls, graph_config: Mapping[str, Any], node_id: str, node_data: IterationNodeData
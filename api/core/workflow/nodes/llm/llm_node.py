@@ -4,11 +4,13 @@ from copy import deepcopy
 from typing import TYPE_CHECKING, Any, Optional, cast
 
 from pydantic import BaseModel
+from sqlalchemy import update
 
 from core.app.entities.app_invoke_entities import ModelConfigWithCredentialsEntity
 from core.entities.model_entities import ModelStatus
 from core.entities.provider_entities import QuotaUnit
 from core.errors.error import ModelCurrentlyNotSupportError, ProviderTokenNotInitError, QuotaExceededError
+from core.helper.provider_configurations_cache import ProviderConfigurationsCache
 from core.memory.token_buffer_memory import TokenBufferMemory
 from core.model_manager import ModelInstance, ModelManager
 from core.model_runtime.entities.llm_entities import LLMResult, LLMUsage
@@ -669,15 +671,25 @@ class LLMNode(BaseNode):
                 used_quota = 1
 
         if used_quota is not None:
-            db.session.query(Provider).filter(
-                Provider.tenant_id == tenant_id,
-                Provider.provider_name == model_instance.provider,
-                Provider.provider_type == ProviderType.SYSTEM.value,
-                Provider.quota_type == system_configuration.current_quota_type.value,
-                Provider.quota_limit > Provider.quota_used,
-            ).update({"quota_used": Provider.quota_used + used_quota})
+            quotas = db.session.execute(
+                update(Provider)
+                .where(
+                    Provider.tenant_id == tenant_id,
+                    Provider.provider_name == model_instance.provider,
+                    Provider.provider_type == ProviderType.SYSTEM.value,
+                    Provider.quota_type == system_configuration.current_quota_type.value,
+                    Provider.quota_limit > Provider.quota_used,
+                )
+                .values(quota_used=Provider.quota_used + used_quota)
+                .returning(Provider.quota_used, Provider.quota_limit)
+            ).first()
             db.session.commit()
 
+            # quotas decide the provider type in use, cached configurations must see the quota running out,
+            # the quota used they report is only refreshed by the other changes or their TTL
+            if quotas is None or quotas.quota_used >= quotas.quota_limit:
+                ProviderConfigurationsCache(tenant_id=tenant_id).delete()
+
     @classmethod
     def _extract_variable_selector_to_variable_mapping(
         cls, graph_config: Mapping[str, Any], node_id: str, node_data: LLMNodeData
@@ -2,7 +2,8 @@ import os
 from collections.abc import Mapping, Sequence
 from typing import Any, Optional, cast
 
-from core.helper.code_executor.code_executor import CodeExecutionError, CodeExecutor, CodeLanguage
+from core.helper.code_executor.code_execution_batcher import code_execution_batcher
+from core.helper.code_executor.code_executor import CodeExecutionError, CodeLanguage
 from core.workflow.entities.node_entities import NodeRunResult, NodeType
 from core.workflow.nodes.base_node import BaseNode
 from core.workflow.nodes.template_transform.entities import TemplateTransformNodeData
@@ -42,8 +43,12 @@ class TemplateTransformNode(BaseNode):
             variables[variable_name] = value
         # Run code
         try:
-            result = CodeExecutor.execute_workflow_code_template(
-                language=CodeLanguage.JINJA2, code=node_data.template, inputs=variables
+            result = code_execution_batcher.execute(
+                language=CodeLanguage.JINJA2,
+                code=node_data.template,
+                inputs=variables,
+                max_batch_size=self._get_iteration_parallelism(),
+                batch_scope=self._get_iteration_run_scope(),
             )
         except CodeExecutionError as e:
             return NodeRunResult(inputs=variables, status=WorkflowNodeExecutionStatus.FAILED, error=str(e))
@@ -1,5 +1,8 @@
+from sqlalchemy import update
+
 from core.app.entities.app_invoke_entities import AgentChatAppGenerateEntity, ChatAppGenerateEntity
 from core.entities.provider_entities import QuotaUnit
+from core.helper.provider_configurations_cache import ProviderConfigurationsCache
 from events.message_event import message_was_created
 from extensions.ext_database import db
 from models.provider import Provider, ProviderType
@@ -45,11 +48,21 @@ def handle(sender, **kwargs):
             used_quota = 1
 
     if used_quota is not None:
-        db.session.query(Provider).filter(
-            Provider.tenant_id == application_generate_entity.app_config.tenant_id,
-            Provider.provider_name == model_config.provider,
-            Provider.provider_type == ProviderType.SYSTEM.value,
-            Provider.quota_type == system_configuration.current_quota_type.value,
-            Provider.quota_limit > Provider.quota_used,
-        ).update({"quota_used": Provider.quota_used + used_quota})
+        quotas = db.session.execute(
+            update(Provider)
+            .where(
+                Provider.tenant_id == application_generate_entity.app_config.tenant_id,
+                Provider.provider_name == model_config.provider,
+                Provider.provider_type == ProviderType.SYSTEM.value,
+                Provider.quota_type == system_configuration.current_quota_type.value,
+                Provider.quota_limit > Provider.quota_used,
+            )
+            .values(quota_used=Provider.quota_used + used_quota)
+            .returning(Provider.quota_used, Provider.quota_limit)
+        ).first()
         db.session.commit()
+
+        # quotas decide the provider type in use, cached configurations must see the quota running out,
+        # the quota used they report is only refreshed by the other changes or their TTL
+        if quotas is None or quotas.quota_used >= quotas.quota_limit:
+            ProviderConfigurationsCache(tenant_id=application_generate_entity.app_config.tenant_id).delete()
@@ -1,6 +1,6 @@
 import logging
-from collections.abc import Generator
-from typing import Union
+from collections.abc import Generator, Iterable
+from typing import Optional, Union
 
 from flask import Flask
 
@@ -47,6 +47,13 @@ class Storage:
             logging.exception("Failed to save file: %s", e)
             raise e
 
+    def save_stream(self, filename: str, stream: Iterable[bytes]):
+        try:
+            self.storage_runner.save_stream(filename, stream)
+        except Exception as e:
+            logging.exception("Failed to save_stream file: %s", e)
+            raise e
+
     def load(self, filename: str, stream: bool = False) -> Union[bytes, Generator]:
         try:
             if stream:
@@ -71,6 +78,13 @@ class Storage:
             logging.exception("Failed to load_stream file: %s", e)
             raise e
 
+    def load_range(self, filename: str, offset: int, length: Optional[int] = None) -> bytes:
+        try:
+            return self.storage_runner.load_range(filename, offset, length)
+        except Exception as e:
+            logging.exception("Failed to load_range file: %s", e)
+            raise e
+
     def download(self, filename, target_filepath):
         try:
             self.storage_runner.download(filename, target_filepath)
@@ -1,10 +1,15 @@
-from collections.abc import Generator
+import itertools
+from collections.abc import Generator, Iterable
 from contextlib import closing
+from typing import Optional
 
 import oss2 as aliyun_s3
 from flask import Flask
+from oss2.models import PartInfo
 
-from extensions.storage.base_storage import BaseStorage
+from extensions.storage.base_storage import BaseStorage, iter_parts
+
+ALIYUN_OSS_MIN_PART_SIZE = 100 * 1024
 
 
 class AliyunStorage(BaseStorage):
@@ -33,6 +38,29 @@ class AliyunStorage(BaseStorage):
     def save(self, filename, data):
         self.client.put_object(self.__wrapper_folder_filename(filename), data)
 
+    def save_stream(self, filename: str, stream: Iterable[bytes]):
+        # every part of a multipart upload but the last one must be at least 100 KB
+        parts = iter_parts(stream, max(self.chunk_size, ALIYUN_OSS_MIN_PART_SIZE))
+        first_part = next(parts, b"")
+        second_part = next(parts, None)
+        if second_part is None:
+            # small enough for a single request
+            self.save(filename, first_part)
+            return
+
+        key = self.__wrapper_folder_filename(filename)
+        upload_id = self.client.init_multipart_upload(key).upload_id
+        try:
+            uploaded_parts = []
+            for part_number, part in enumerate(itertools.chain([first_part, second_part], parts), start=1):
+                result = self.client.upload_part(key, upload_id, part_number, part)
+                uploaded_parts.append(PartInfo(part_number, result.etag))
+
+            self.client.complete_multipart_upload(key, upload_id, uploaded_parts)
+        except Exception:
+            self.client.abort_multipart_upload(key, upload_id)
+            raise
+
     def load_once(self, filename: str) -> bytes:
         with closing(self.client.get_object(self.__wrapper_folder_filename(filename))) as obj:
             data = obj.read()
@@ -41,11 +69,28 @@ class AliyunStorage(BaseStorage):
     def load_stream(self, filename: str) -> Generator:
         def generate(filename: str = filename) -> Generator:
             with closing(self.client.get_object(self.__wrapper_folder_filename(filename))) as obj:
-                while chunk := obj.read(4096):
+                while chunk := obj.read(self.chunk_size):
                     yield chunk
 
         return generate()
 
+    def load_range(self, filename: str, offset: int, length: Optional[int] = None) -> bytes:
+        if length == 0:
+            return b""
+
+        byte_range = (offset, None if length is None else offset + length - 1)
+        # without standard range behavior, OSS returns the whole object for a range beyond its end
+        headers = {"x-oss-range-behavior": "standard"}
+        try:
+            with closing(
+                self.client.get_object(self.__wrapper_folder_filename(filename), byte_range=byte_range, headers=headers)
+            ) as obj:
+                return obj.read()
+        except aliyun_s3.exceptions.ServerError as ex:
+            if ex.status == 416:
+                return b""
+            raise
+
     def download(self, filename, target_filepath):
         self.client.get_object_to_file(self.__wrapper_folder_filename(filename), target_filepath)
 
@@ -1,11 +1,19 @@
-from collections.abc import Generator
+import base64
+from collections.abc import Generator, Iterable
 from datetime import datetime, timedelta, timezone
-
-from azure.storage.blob import AccountSasPermissions, BlobServiceClient, ResourceTypes, generate_account_sas
+from typing import Optional
+
+from azure.storage.blob import (
+    AccountSasPermissions,
+    BlobBlock,
+    BlobServiceClient,
+    ResourceTypes,
+    generate_account_sas,
+)
 from flask import Flask
 
 from extensions.ext_redis import redis_client
-from extensions.storage.base_storage import BaseStorage
+from extensions.storage.base_storage import BaseStorage, iter_parts
 
 
 class AzureStorage(BaseStorage):
@@ -24,6 +32,19 @@ class AzureStorage(BaseStorage):
         blob_container = client.get_container_client(container=self.bucket_name)
         blob_container.upload_blob(filename, data)
 
+    def save_stream(self, filename: str, stream: Iterable[bytes]):
+        client = self._sync_client()
+
+        blob = client.get_blob_client(container=self.bucket_name, blob=filename)
+        block_list = []
+        for part in iter_parts(stream, self.chunk_size):
+            block_id = base64.b64encode(f"{len(block_list):08d}".encode()).decode()
+            blob.stage_block(block_id=block_id, data=part)
+            block_list.append(BlobBlock(block_id=block_id))
+
+        # an empty block list commits an empty blob
+        blob.commit_block_list(block_list)
+
     def load_once(self, filename: str) -> bytes:
         client = self._sync_client()
         blob = client.get_container_client(container=self.bucket_name)
@@ -41,6 +62,15 @@ class AzureStorage(BaseStorage):
 
         return generate(filename)
 
+    def load_range(self, filename: str, offset: int, length: Optional[int] = None) -> bytes:
+        if length == 0:
+            return b""
+
+        client = self._sync_client()
+
+        blob = client.get_blob_client(container=self.bucket_name, blob=filename)
+        return blob.download_blob(offset=offset, length=length).readall()
+
     def download(self, filename, target_filepath):
         client = self._sync_client()
 
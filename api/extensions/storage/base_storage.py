@@ -1,7 +1,8 @@
 """Abstract interface for file storage implementations."""
 
 from abc import ABC, abstractmethod
-from collections.abc import Generator
+from collections.abc import Generator, Iterable
+from typing import Optional
 
 from flask import Flask
 
@@ -13,11 +14,19 @@ class BaseStorage(ABC):
 
     def __init__(self, app: Flask):
         self.app = app
+        self.chunk_size = app.config.get("STORAGE_STREAM_CHUNK_SIZE") or 8 * 1024 * 1024
 
     @abstractmethod
     def save(self, filename, data):
         raise NotImplementedError
 
+    def save_stream(self, filename: str, stream: Iterable[bytes]):
+        """
+        Save an object from an iterable of byte chunks.
+        Backends supporting multipart upload override it to upload chunks without buffering the whole object.
+        """
+        self.save(filename, b"".join(stream))
+
     @abstractmethod
     def load_once(self, filename: str) -> bytes:
         raise NotImplementedError
@@ -26,6 +35,25 @@ class BaseStorage(ABC):
     def load_stream(self, filename: str) -> Generator:
         raise NotImplementedError
 
+    def load_range(self, filename: str, offset: int, length: Optional[int] = None) -> bytes:
+        """
+        Load `length` bytes of an object starting at `offset`, up to the end of the object if `length` is None.
+        Backends supporting ranged reads override it to avoid reading the bytes before `offset`.
+        """
+        end = None if length is None else offset + length
+        data = bytearray()
+        position = 0
+        for chunk in self.load_stream(filename):
+            chunk_start = max(offset - position, 0)
+            chunk_end = len(chunk) if end is None else min(end - position, len(chunk))
+            if chunk_start < chunk_end:
+                data += chunk[chunk_start:chunk_end]
+            position += len(chunk)
+            if end is not None and position >= end:
+                break
+
+        return bytes(data)
+
     @abstractmethod
     def download(self, filename, target_filepath):
         raise NotImplementedError
@@ -37,3 +65,18 @@ class BaseStorage(ABC):
     @abstractmethod
     def delete(self, filename):
         raise NotImplementedError
+
+
+def iter_parts(stream: Iterable[bytes], part_size: int) -> Generator[bytes, None, None]:
+    """
+    Regroup a stream of byte chunks of any size into parts of `part_size` bytes, the last part may be smaller.
+    """
+    buffer = bytearray()
+    for chunk in stream:
+        buffer += chunk
+        while len(buffer) >= part_size:
+            yield bytes(buffer[:part_size])
+            del buffer[:part_size]
+
+    if buffer:
+        yield bytes(buffer)
@@ -1,14 +1,17 @@
 import base64
 import io
 import json
-from collections.abc import Generator
+from collections.abc import Generator, Iterable
 from contextlib import closing
+from typing import Optional
 
 from flask import Flask
 from google.cloud import storage as google_cloud_storage
 
 from extensions.storage.base_storage import BaseStorage
 
+GOOGLE_STORAGE_CHUNK_UNIT = 256 * 1024
+
 
 class GoogleStorage(BaseStorage):
     """Implementation for google storage."""
@@ -33,6 +36,15 @@ class GoogleStorage(BaseStorage):
         with io.BytesIO(data) as stream:
             blob.upload_from_file(stream)
 
+    def save_stream(self, filename: str, stream: Iterable[bytes]):
+        bucket = self.client.get_bucket(self.bucket_name)
+        blob = bucket.blob(filename)
+        # resumable upload, the chunk size must be a multiple of 256 KB
+        chunk_size = max(self.chunk_size // GOOGLE_STORAGE_CHUNK_UNIT, 1) * GOOGLE_STORAGE_CHUNK_UNIT
+        with blob.open(mode="wb", chunk_size=chunk_size) as blob_stream:
+            for chunk in stream:
+                blob_stream.write(chunk)
+
     def load_once(self, filename: str) -> bytes:
         bucket = self.client.get_bucket(self.bucket_name)
         blob = bucket.get_blob(filename)
@@ -44,11 +56,19 @@ class GoogleStorage(BaseStorage):
             bucket = self.client.get_bucket(self.bucket_name)
             blob = bucket.get_blob(filename)
             with closing(blob.open(mode="rb")) as blob_stream:
-                while chunk := blob_stream.read(4096):
+                while chunk := blob_stream.read(self.chunk_size):
                     yield chunk
 
         return generate()
 
+    def load_range(self, filename: str, offset: int, length: Optional[int] = None) -> bytes:
+        if length == 0:
+            return b""
+
+        bucket = self.client.get_bucket(self.bucket_name)
+        blob = bucket.blob(filename)
+        return blob.download_as_bytes(start=offset, end=None if length is None else offset + length - 1)
+
     def download(self, filename, target_filepath):
         bucket = self.client.get_bucket(self.bucket_name)
         blob = bucket.get_blob(filename)
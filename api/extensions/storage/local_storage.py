@@ -1,7 +1,8 @@
 import os
 import shutil
-from collections.abc import Generator
+from collections.abc import Generator, Iterable
 from pathlib import Path
+from typing import Optional
 
 from flask import Flask
 
@@ -29,6 +30,19 @@ class LocalStorage(BaseStorage):
 
         Path(os.path.join(os.getcwd(), filename)).write_bytes(data)
 
+    def save_stream(self, filename: str, stream: Iterable[bytes]):
+        if not self.folder or self.folder.endswith("/"):
+            filename = self.folder + filename
+        else:
+            filename = self.folder + "/" + filename
+
+        folder = os.path.dirname(filename)
+        os.makedirs(folder, exist_ok=True)
+
+        with open(os.path.join(os.getcwd(), filename), "wb") as f:
+            for chunk in stream:
+                f.write(chunk)
+
     def load_once(self, filename: str) -> bytes:
         if not self.folder or self.folder.endswith("/"):
             filename = self.folder + filename
@@ -52,11 +66,24 @@ class LocalStorage(BaseStorage):
                 raise FileNotFoundError("File not found")
 
             with open(filename, "rb") as f:
-                while chunk := f.read(4096):  # Read in chunks of 4KB
+                while chunk := f.read(self.chunk_size):
                     yield chunk
 
         return generate()
 
+    def load_range(self, filename: str, offset: int, length: Optional[int] = None) -> bytes:
+        if not self.folder or self.folder.endswith("/"):
+            filename = self.folder + filename
+        else:
+            filename = self.folder + "/" + filename
+
+        if not os.path.exists(filename):
+            raise FileNotFoundError("File not found")
+
+        with open(filename, "rb") as f:
+            f.seek(offset)
+            return f.read() if length is None else f.read(length)
+
     def download(self, filename, target_filepath):
         if not self.folder or self.folder.endswith("/"):
             filename = self.folder + filename
@@ -1,12 +1,16 @@
-from collections.abc import Generator
+import itertools
+from collections.abc import Generator, Iterable
 from contextlib import closing
+from typing import Optional
 
 import boto3
 from botocore.client import Config
 from botocore.exceptions import ClientError
 from flask import Flask
 
-from extensions.storage.base_storage import BaseStorage
+from extensions.storage.base_storage import BaseStorage, iter_parts
+
+S3_MIN_PART_SIZE = 5 * 1024 * 1024
 
 
 class S3Storage(BaseStorage):
@@ -45,6 +49,35 @@ class S3Storage(BaseStorage):
     def save(self, filename, data):
         self.client.put_object(Bucket=self.bucket_name, Key=filename, Body=data)
 
+    def save_stream(self, filename: str, stream: Iterable[bytes]):
+        # every part of a multipart upload but the last one must be at least 5 MB
+        parts = iter_parts(stream, max(self.chunk_size, S3_MIN_PART_SIZE))
+        first_part = next(parts, b"")
+        second_part = next(parts, None)
+        if second_part is None:
+            # small enough for a single request
+            self.save(filename, first_part)
+            return
+
+        upload_id = self.client.create_multipart_upload(Bucket=self.bucket_name, Key=filename)["UploadId"]
+        try:
+            uploaded_parts = []
+            for part_number, part in enumerate(itertools.chain([first_part, second_part], parts), start=1):
+                response = self.client.upload_part(
+                    Bucket=self.bucket_name, Key=filename, UploadId=upload_id, PartNumber=part_number, Body=part
+                )
+                uploaded_parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+
+            self.client.complete_multipart_upload(
+                Bucket=self.bucket_name,
+                Key=filename,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": uploaded_parts},
+            )
+        except Exception:
+            self.client.abort_multipart_upload(Bucket=self.bucket_name, Key=filename, UploadId=upload_id)
+            raise
+
     def load_once(self, filename: str) -> bytes:
         try:
             with closing(self.client) as client:
@@ -70,6 +103,22 @@ class S3Storage(BaseStorage):
 
         return generate()
 
+    def load_range(self, filename: str, offset: int, length: Optional[int] = None) -> bytes:
+        if length == 0:
+            return b""
+
+        byte_range = f"bytes={offset}-" if length is None else f"bytes={offset}-{offset + length - 1}"
+        try:
+            response = self.client.get_object(Bucket=self.bucket_name, Key=filename, Range=byte_range)
+            return response["Body"].read()
+        except ClientError as ex:
+            if ex.response["Error"]["Code"] == "NoSuchKey":
+                raise FileNotFoundError("File not found")
+            elif ex.response["Error"]["Code"] == "InvalidRange":
+                return b""
+            else:
+                raise
+
     def download(self, filename, target_filepath):
         with closing(self.client) as client:
             client.download_file(self.bucket_name, filename, target_filepath)
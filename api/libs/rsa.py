@@ -1,4 +1,6 @@
 import hashlib
+import threading
+import time
 
 from Crypto.Cipher import AES
 from Crypto.PublicKey import RSA
@@ -20,6 +22,9 @@ def generate_key_pair(tenant_id):
 
     storage.save(filepath, pem_private)
 
+    # the previous private key of the tenant must not decrypt anymore
+    invalidate_decrypt_decoding(tenant_id)
+
     return pem_public.decode()
 
 
@@ -45,10 +50,23 @@ def encrypt(text, public_key):
     return prefix_hybrid + encrypted_data
 
 
-def get_decrypt_decoding(tenant_id):
+# imported private keys, tenant id -> (rsa key, cipher, expiry time), importing a key costs more than decrypting
+_decoding_cache: dict[str, tuple] = {}
+_decoding_cache_lock = threading.Lock()
+DECODING_CACHE_TTL = 120
+
+
+def _get_private_key_cache_key(tenant_id):
     filepath = "privkeys/{tenant_id}".format(tenant_id=tenant_id) + "/private.pem"
+    return filepath, "tenant_privkey:{hash}".format(hash=hashlib.sha3_256(filepath.encode()).hexdigest())
+
 
-    cache_key = "tenant_privkey:{hash}".format(hash=hashlib.sha3_256(filepath.encode()).hexdigest())
+def get_decrypt_decoding(tenant_id):
+    cached = _decoding_cache.get(tenant_id)
+    if cached and cached[2] > time.monotonic():
+        return cached[0], cached[1]
+
+    filepath, cache_key = _get_private_key_cache_key(tenant_id)
     private_key = redis_client.get(cache_key)
     if not private_key:
         try:
@@ -56,14 +74,31 @@ def get_decrypt_decoding(tenant_id):
         except FileNotFoundError:
             raise PrivkeyNotFoundError("Private key not found, tenant_id: {tenant_id}".format(tenant_id=tenant_id))
 
-        redis_client.setex(cache_key, 120, private_key)
+        redis_client.setex(cache_key, DECODING_CACHE_TTL, private_key)
 
     rsa_key = RSA.import_key(private_key)
     cipher_rsa = gmpy2_pkcs10aep_cipher.new(rsa_key)
 
+    now = time.monotonic()
+    with _decoding_cache_lock:
+        # drop the keys of the tenants not seen since they expired
+        for expired_tenant_id in [key for key, value in _decoding_cache.items() if value[2] <= now]:
+            del _decoding_cache[expired_tenant_id]
+        _decoding_cache[tenant_id] = (rsa_key, cipher_rsa, now + DECODING_CACHE_TTL)
+
     return rsa_key, cipher_rsa
 
 
+def invalidate_decrypt_decoding(tenant_id):
+    """
+    Drop the cached private key of a tenant, e.g. after its key pair is reset
+    """
+    _, cache_key = _get_private_key_cache_key(tenant_id)
+    with _decoding_cache_lock:
+        _decoding_cache.pop(tenant_id, None)
+    redis_client.delete(cache_key)
+
+
 def decrypt_token_with_decoding(encrypted_text, rsa_key, cipher_rsa):
     if encrypted_text.startswith(prefix_hybrid):
         encrypted_text = encrypted_text[len(prefix_hybrid) :]
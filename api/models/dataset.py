@@ -10,6 +10,7 @@ import re
 import time
 from json import JSONDecodeError
 
+import numpy as np
 from sqlalchemy import func
 from sqlalchemy.dialects.postgresql import JSONB
 
@@ -633,6 +634,23 @@ class DatasetKeywordTable(db.Model):
                 return None
 
 
+class DatasetKeywordPosting(db.Model):
+    __tablename__ = "dataset_keyword_postings"
+    __table_args__ = (
+        db.PrimaryKeyConstraint("id", name="dataset_keyword_posting_pkey"),
+        db.UniqueConstraint("dataset_id", "keyword", "index_node_id", name="dataset_keyword_posting_keyword_idx"),
+        db.Index("dataset_keyword_posting_index_node_idx", "dataset_id", "index_node_id"),
+    )
+
+    id = db.Column(StringUUID, primary_key=True, server_default=db.text("uuid_generate_v4()"))
+    dataset_id = db.Column(StringUUID, nullable=False)
+    keyword = db.Column(db.String(255), nullable=False)
+    index_node_id = db.Column(db.String(255), nullable=False)
+    # number of keywords of the segment, the document length used by BM25
+    keyword_count = db.Column(db.Integer, nullable=False, server_default=db.text("1"))
+    created_at = db.Column(db.DateTime, nullable=False, server_default=db.text("CURRENT_TIMESTAMP(0)"))
+
+
 class Embedding(db.Model):
     __tablename__ = "embeddings"
     __table_args__ = (
@@ -650,11 +668,25 @@ class Embedding(db.Model):
     created_at = db.Column(db.DateTime, nullable=False, server_default=db.text("CURRENT_TIMESTAMP(0)"))
     provider_name = db.Column(db.String(255), nullable=False, server_default=db.text("''::character varying"))
 
+    # vectors are stored as raw float32 bytes behind this prefix, rows written before are pickled lists
+    FLOAT32_PREFIX = b"f32:"
+
     def set_embedding(self, embedding_data: list[float]):
-        self.embedding = pickle.dumps(embedding_data, protocol=pickle.HIGHEST_PROTOCOL)
+        self.embedding = self.encode_embedding(embedding_data)
 
     def get_embedding(self) -> list[float]:
-        return pickle.loads(self.embedding)
+        return self.decode_embedding(self.embedding)
+
+    @classmethod
+    def encode_embedding(cls, embedding_data: list[float]) -> bytes:
+        return cls.FLOAT32_PREFIX + np.asarray(embedding_data, dtype=np.float32).tobytes()
+
+    @classmethod
+    def decode_embedding(cls, data: bytes) -> list[float]:
+        if data.startswith(cls.FLOAT32_PREFIX):
+            return np.frombuffer(data, dtype=np.float32, offset=len(cls.FLOAT32_PREFIX)).tolist()
+
+        return pickle.loads(data)
 
 
 class DatasetCollectionBinding(db.Model):
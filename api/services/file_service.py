@@ -59,20 +59,21 @@ class FileService:
         if extension.lower() not in allowed_extensions or only_image and extension.lower() not in IMAGE_EXTENSIONS:
             raise UnsupportedFileTypeError()
 
-        # read file content
-        file_content = file.read()
-
-        # get file size
-        file_size = len(file_content)
-
         if extension.lower() in IMAGE_EXTENSIONS:
             file_size_limit = dify_config.UPLOAD_IMAGE_FILE_SIZE_LIMIT * 1024 * 1024
         else:
             file_size_limit = dify_config.UPLOAD_FILE_SIZE_LIMIT * 1024 * 1024
 
-        if file_size > file_size_limit:
-            message = f"File size exceeded. {file_size} > {file_size_limit}"
-            raise FileTooLargeError(message)
+        # get file size and hash without reading the whole file into memory
+        file_size = 0
+        file_hash = hashlib.sha3_256()
+        for chunk in iter(lambda: file.stream.read(dify_config.STORAGE_STREAM_CHUNK_SIZE), b""):
+            file_size += len(chunk)
+            if file_size > file_size_limit:
+                message = f"File size exceeded. {file_size} > {file_size_limit}"
+                raise FileTooLargeError(message)
+            file_hash.update(chunk)
+        file.stream.seek(0)
 
         # user uuid as file name
         file_uuid = str(uuid.uuid4())
@@ -86,7 +87,7 @@ class FileService:
         file_key = "upload_files/" + current_tenant_id + "/" + file_uuid + "." + extension
 
         # save file to storage
-        storage.save(file_key, file_content)
+        storage.save_stream(file_key, iter(lambda: file.stream.read(dify_config.STORAGE_STREAM_CHUNK_SIZE), b""))
 
         # save file to db
         upload_file = UploadFile(
@@ -101,7 +102,7 @@ class FileService:
             created_by=user.id,
             created_at=datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None),
             used=False,
-            hash=hashlib.sha3_256(file_content).hexdigest(),
+            hash=file_hash.hexdigest(),
         )
 
         db.session.add(upload_file)
@@ -8,6 +8,7 @@ from constants import HIDDEN_VALUE
 from core.entities.provider_configuration import ProviderConfiguration
 from core.helper import encrypter
 from core.helper.model_provider_cache import ProviderCredentialsCache, ProviderCredentialsCacheType
+from core.helper.provider_configurations_cache import ProviderConfigurationsCache
 from core.model_manager import LBModelManager
 from core.model_runtime.entities.model_entities import ModelType
 from core.model_runtime.entities.provider_entities import (
@@ -277,6 +278,8 @@ class ModelLoadBalancingService:
         db.session.add(inherit_config)
         db.session.commit()
 
+        ProviderConfigurationsCache(tenant_id=tenant_id).delete()
+
         return inherit_config
 
     def update_load_balancing_configs(
@@ -414,6 +417,8 @@ class ModelLoadBalancingService:
                 db.session.add(load_balancing_model_config)
                 db.session.commit()
 
+                ProviderConfigurationsCache(tenant_id=tenant_id).delete()
+
         # get deleted config ids
         deleted_config_ids = set(current_load_balancing_configs_dict.keys()) - updated_config_ids
         for config_id in deleted_config_ids:
@@ -573,3 +578,6 @@ class ModelLoadBalancingService:
         )
 
         provider_model_credentials_cache.delete()
+
+        # load balancing configs are part of the provider configurations of the tenant
+        ProviderConfigurationsCache(tenant_id=tenant_id).delete()
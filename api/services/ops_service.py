@@ -1,3 +1,4 @@
+from core.helper import encrypter
 from core.ops.ops_trace_manager import OpsTraceManager, provider_config_map
 from extensions.ext_database import db
 from models.model import App, TraceAppConfig
@@ -152,6 +153,7 @@ class OpsService:
 
         current_trace_config.tracing_config = tracing_config
         db.session.commit()
+        encrypter.clear_decrypted_tokens(tenant_id)
 
         return current_trace_config.to_dict()
 
@@ -1,20 +1,29 @@
 import datetime
+import json
 import logging
 import time
 import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
 
 import click
 from celery import shared_task
-from sqlalchemy import func
+from flask import Flask, current_app
+from sqlalchemy import func, insert
 
-from core.indexing_runner import IndexingRunner
 from core.model_manager import ModelManager
 from core.model_runtime.entities.model_entities import ModelType
+from core.rag.index_processor.index_processor_base import BaseIndexProcessor
+from core.rag.index_processor.index_processor_factory import IndexProcessorFactory
+from core.rag.models.document import Document as RagDocument
 from extensions.ext_database import db
 from extensions.ext_redis import redis_client
 from libs import helper
 from models.dataset import Dataset, Document, DocumentSegment
 
+# segments inserted and indexed together
+SEGMENT_BATCH_IMPORT_CHUNK_SIZE = 500
+
 
 @shared_task(queue="dataset")
 def batch_create_segment_to_index_task(
@@ -29,12 +38,21 @@ def batch_create_segment_to_index_task(
     :param tenant_id:
     :param user_id:
 
+    Segments are inserted and committed by chunks. The index of a chunk is loaded in its own session, where the
+    keyword index updates the committed segments, while the next chunk is inserted, and the number of segments
+    indexed is reported in `segment_batch_import_{job_id}_progress`. If the import fails, the segments already
+    committed are deleted and removed from the index.
+
     Usage: batch_create_segment_to_index_task.delay(segment_id)
     """
     logging.info(click.style("Start batch create segment jobId: {}".format(job_id), fg="green"))
     start_at = time.perf_counter()
 
     indexing_cache_key = "segment_batch_import_{}".format(job_id)
+    progress_cache_key = "segment_batch_import_{}_progress".format(job_id)
+    index_processor = None
+    # nodes loaded in the index, removed if the import fails
+    index_node_ids: list[str] = []
 
     try:
         dataset = db.session.query(Dataset).filter(Dataset.id == dataset_id).first()
@@ -47,7 +65,6 @@ def batch_create_segment_to_index_task(
 
         if not dataset_document.enabled or dataset_document.archived or dataset_document.indexing_status != "completed":
             raise ValueError("Document is not available.")
-        document_segments = []
         embedding_model = None
         if dataset.indexing_technique == "high_quality":
             model_manager = ModelManager()
@@ -58,40 +75,75 @@ def batch_create_segment_to_index_task(
                 model=dataset.embedding_model,
             )
 
-        for segment in content:
-            content = segment["content"]
-            doc_id = str(uuid.uuid4())
-            segment_hash = helper.generate_text_hash(content)
-            # calc embedding use tokens
-            tokens = embedding_model.get_text_embedding_num_tokens(texts=[content]) if embedding_model else 0
-            max_position = (
-                db.session.query(func.max(DocumentSegment.position))
-                .filter(DocumentSegment.document_id == dataset_document.id)
-                .scalar()
-            )
-            segment_document = DocumentSegment(
-                tenant_id=tenant_id,
-                dataset_id=dataset_id,
-                document_id=document_id,
-                index_node_id=doc_id,
-                index_node_hash=segment_hash,
-                position=max_position + 1 if max_position else 1,
-                content=content,
-                word_count=len(content),
-                tokens=tokens,
-                created_by=user_id,
-                indexing_at=datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None),
-                status="completed",
-                completed_at=datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None),
-            )
-            if dataset_document.doc_form == "qa_model":
-                segment_document.answer = segment["answer"]
-            db.session.add(segment_document)
-            document_segments.append(segment_document)
-        # add index to db
-        indexing_runner = IndexingRunner()
-        indexing_runner.batch_add_segments(document_segments, dataset)
-        db.session.commit()
+        redis_client.setex(indexing_cache_key, 600, "processing")
+        index_processor = IndexProcessorFactory(dataset.doc_form).init_index_processor()
+        max_position = (
+            db.session.query(func.max(DocumentSegment.position))
+            .filter(DocumentSegment.document_id == dataset_document.id)
+            .scalar()
+        )
+        position = max_position or 0
+        flask_app = current_app._get_current_object()
+
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="segment_batch_import") as executor:
+            loading: Optional[Future] = None
+            for chunk_start in range(0, len(content), SEGMENT_BATCH_IMPORT_CHUNK_SIZE):
+                now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+                segments = []
+                documents = []
+                for segment in content[chunk_start : chunk_start + SEGMENT_BATCH_IMPORT_CHUNK_SIZE]:
+                    segment_content = segment["content"]
+                    doc_id = str(uuid.uuid4())
+                    segment_hash = helper.generate_text_hash(segment_content)
+                    # calc embedding use tokens, the model counts the tokens of a list of texts as a whole
+                    tokens = (
+                        embedding_model.get_text_embedding_num_tokens(texts=[segment_content]) if embedding_model else 0
+                    )
+                    position += 1
+                    segments.append(
+                        {
+                            "tenant_id": tenant_id,
+                            "dataset_id": dataset_id,
+                            "document_id": document_id,
+                            "index_node_id": doc_id,
+                            "index_node_hash": segment_hash,
+                            "position": position,
+                            "content": segment_content,
+                            "answer": segment["answer"] if dataset_document.doc_form == "qa_model" else None,
+                            "word_count": len(segment_content),
+                            "tokens": tokens,
+                            "created_by": user_id,
+                            "indexing_at": now,
+                            "status": "completed",
+                            "completed_at": now,
+                        }
+                    )
+                    documents.append(
+                        RagDocument(
+                            page_content=segment_content,
+                            metadata={
+                                "doc_id": doc_id,
+                                "doc_hash": segment_hash,
+                                "document_id": document_id,
+                                "dataset_id": dataset_id,
+                            },
+                        )
+                    )
+                db.session.execute(insert(DocumentSegment), segments)
+                index_node_ids.extend(document.metadata["doc_id"] for document in documents)
+                # the loading thread reads the segments in its own session
+                db.session.commit()
+
+                # the index of the previous chunk is loaded while this one is inserted
+                if loading:
+                    loading.result()
+                    _report_progress(indexing_cache_key, progress_cache_key, chunk_start, len(content))
+                loading = executor.submit(_load_segments, flask_app, index_processor, dataset_id, documents)
+
+            if loading:
+                loading.result()
+                _report_progress(indexing_cache_key, progress_cache_key, len(content), len(content))
+
         redis_client.setex(indexing_cache_key, 600, "completed")
         end_at = time.perf_counter()
         logging.info(
@@ -99,4 +151,43 @@ def batch_create_segment_to_index_task(
         )
     except Exception as e:
         logging.exception("Segments batch created index failed:{}".format(str(e)))
+        db.session.rollback()
+        if index_processor and index_node_ids:
+            try:
+                dataset = db.session.query(Dataset).filter(Dataset.id == dataset_id).first()
+                index_processor.clean(dataset, index_node_ids)
+            except Exception:
+                logging.exception("Clean segments batch index failed, jobId: {}".format(job_id))
+        if index_node_ids:
+            try:
+                db.session.query(DocumentSegment).filter(
+                    DocumentSegment.document_id == document_id, DocumentSegment.index_node_id.in_(index_node_ids)
+                ).delete(synchronize_session=False)
+                db.session.commit()
+            except Exception:
+                logging.exception("Delete segments batch failed, jobId: {}".format(job_id))
+                db.session.rollback()
         redis_client.setex(indexing_cache_key, 600, "error")
+
+
+def _load_segments(
+    flask_app: Flask, index_processor: BaseIndexProcessor, dataset_id: str, documents: list[RagDocument]
+) -> None:
+    with flask_app.app_context():
+        try:
+            dataset = db.session.query(Dataset).filter(Dataset.id == dataset_id).first()
+            index_processor.load(dataset, documents)
+            # the index struct initialized by the vector store
+            db.session.commit()
+        finally:
+            db.session.close()
+
+
+def _report_progress(indexing_cache_key: str, progress_cache_key: str, processed_count: int, total_count: int) -> None:
+    with redis_client.pipeline() as pipe:
+        # the status of a long import does not expire while it runs
+        pipe.setex(indexing_cache_key, 600, "processing")
+        pipe.setex(
+            progress_cache_key, 600, json.dumps({"processed_count": processed_count, "total_count": total_count})
+        )
+        pipe.execute()
@@ -29,6 +29,16 @@ def test_python3_with_code_template():
     assert result == {"result": "HelloWorld"}
 
 
+def test_python3_with_code_template_batch():
+    results = CodeExecutor.execute_workflow_code_template_batch(
+        language=CODE_LANGUAGE,
+        code=Python3CodeProvider.get_default_code(),
+        inputs_list=[{"arg1": "Hello", "arg2": "World"}, {"arg1": "Hello"}],
+    )
+    assert results[0] == {"result": "HelloWorld"}
+    assert "TypeError" in str(results[1])
+
+
 def test_python3_get_runner_script():
     runner_script = Python3TemplateTransformer.get_runner_script()
     assert runner_script.count(Python3TemplateTransformer._code_placeholder) == 1
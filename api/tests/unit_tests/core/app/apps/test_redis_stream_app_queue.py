@@ -0,0 +1,202 @@
+import queue
+from unittest.mock import MagicMock
+
+import pytest
+
+from core.app.apps.base_app_queue_manager import GenerateTaskStoppedError, PublishFrom
+from core.app.apps.message_based_app_queue_manager import MessageBasedAppQueueManager
+from core.app.apps.redis_stream_app_queue import RedisStreamAppQueue
+from core.app.entities.app_invoke_entities import InvokeFrom
+from core.app.entities.queue_entities import (
+    MessageQueueMessage,
+    QueueErrorEvent,
+    QueueLLMChunkEvent,
+    QueueMessageEndEvent,
+    QueueMessageReplaceEvent,
+    QueueStopEvent,
+)
+from core.model_runtime.entities.llm_entities import LLMResult, LLMResultChunk, LLMResultChunkDelta, LLMUsage
+from core.model_runtime.entities.message_entities import (
+    AssistantPromptMessage,
+    ImagePromptMessageContent,
+    TextPromptMessageContent,
+    ToolPromptMessage,
+    UserPromptMessage,
+)
+from core.model_runtime.errors.invoke import InvokeRateLimitError
+
+
+class FakeStreamRedis:
+    def __init__(self):
+        self.streams = {}
+
+    def pipeline(self):
+        pipe = MagicMock()
+        pipe.__enter__.return_value = pipe
+        pipe.xadd.side_effect = self.xadd
+        return pipe
+
+    def xadd(self, key, fields, **kwargs):
+        entries = self.streams.setdefault(key, [])
+        entry_id = f"1-{len(entries) + 1}"
+        entries.append((entry_id.encode(), {k.encode(): v.encode() for k, v in fields.items()}))
+        return entry_id
+
+    def xread(self, streams, count=None, block=None):
+        key, last_id = next(iter(streams.items()))
+        last_seq = int(last_id.split("-")[-1]) if last_id != "0" else 0
+        entries = self.streams.get(key, [])[last_seq : last_seq + count]
+        return [(key.encode(), entries)] if entries else []
+
+    def setex(self, *args):
+        pass
+
+    def get(self, key):
+        return None
+
+
+@pytest.fixture
+def redis(mocker):
+    redis = FakeStreamRedis()
+    mocker.patch("core.app.apps.redis_stream_app_queue.redis_client", redis)
+    mocker.patch("core.app.apps.base_app_queue_manager.redis_client", redis)
+    mocker.patch(
+        "core.app.apps.redis_stream_app_queue.dify_config", APP_QUEUE_STREAM_MAX_LEN=100, APP_QUEUE_STREAM_TTL=60
+    )
+    return redis
+
+
+def _message(event) -> MessageQueueMessage:
+    return MessageQueueMessage(task_id="task", app_mode="chat", message_id="m", conversation_id="c", event=event)
+
+
+def test_messages_pass_through_stream(redis):
+    publisher = RedisStreamAppQueue("task")
+    publisher.put(_message(QueueMessageReplaceEvent(text="replaced")))
+    publisher.put(_message(QueueErrorEvent(error=InvokeRateLimitError("slow down"))))
+    publisher.put(_message(QueueStopEvent(stopped_by=QueueStopEvent.StopBy.OUTPUT_MODERATION)))
+    publisher.put(None)
+
+    listener = RedisStreamAppQueue("task")
+    assert listener.get(timeout=1) == _message(QueueMessageReplaceEvent(text="replaced"))
+    error = listener.get(timeout=1).event.error
+    assert isinstance(error, InvokeRateLimitError)
+    assert str(error) == "slow down"
+    assert listener.get(timeout=1).event.stopped_by == QueueStopEvent.StopBy.OUTPUT_MODERATION
+    assert listener.get(timeout=1) is None
+
+    # a listener created again reads the messages after the last one read
+    resumed = RedisStreamAppQueue("task", last_id="1-3")
+    assert resumed.get(timeout=1) is None
+
+
+def test_prompt_messages_pass_through_stream(redis):
+    prompt_messages = [
+        UserPromptMessage(
+            content=[
+                TextPromptMessageContent(data="what is in the image?"),
+                ImagePromptMessageContent(
+                    data="https://example.com/a.png", detail=ImagePromptMessageContent.DETAIL.HIGH
+                ),
+            ]
+        ),
+        AssistantPromptMessage(
+            content="",
+            tool_calls=[
+                AssistantPromptMessage.ToolCall(
+                    id="call",
+                    type="function",
+                    function=AssistantPromptMessage.ToolCall.ToolCallFunction(name="vision", arguments="{}"),
+                )
+            ],
+        ),
+        ToolPromptMessage(content="a cat", tool_call_id="call"),
+    ]
+    chunk_event = QueueLLMChunkEvent(
+        chunk=LLMResultChunk(
+            model="gpt-4o",
+            prompt_messages=prompt_messages,
+            delta=LLMResultChunkDelta(index=0, message=AssistantPromptMessage(content="a cat")),
+        )
+    )
+    end_event = QueueMessageEndEvent(
+        llm_result=LLMResult(
+            model="gpt-4o",
+            prompt_messages=prompt_messages,
+            message=AssistantPromptMessage(content="a cat"),
+            usage=LLMUsage.empty_usage(),
+        )
+    )
+    publisher = RedisStreamAppQueue("task")
+    publisher.put(_message(chunk_event))
+    publisher.put(_message(end_event))
+
+    listener = RedisStreamAppQueue("task")
+    chunk = listener.get(timeout=1).event.chunk
+    llm_result = listener.get(timeout=1).event.llm_result
+    for loaded_prompt_messages in (chunk.prompt_messages, llm_result.prompt_messages):
+        assert loaded_prompt_messages == prompt_messages
+        assert [type(prompt_message) for prompt_message in loaded_prompt_messages] == [
+            UserPromptMessage,
+            AssistantPromptMessage,
+            ToolPromptMessage,
+        ]
+        assert loaded_prompt_messages[0].content[1].detail == ImagePromptMessageContent.DETAIL.HIGH
+        assert loaded_prompt_messages[1].tool_calls[0].function.name == "vision"
+
+
+def test_stop_signal_pushed_to_listener(redis, mocker):
+    mocker.patch("core.app.apps.base_app_queue_manager.dify_config", APP_QUEUE_REDIS_STREAM_ENABLED=True)
+    mocker.patch("core.app.apps.message_based_app_queue_manager.dify_config", APP_QUEUE_REDIS_STREAM_ENABLED=True)
+    queue_manager = MessageBasedAppQueueManager(
+        task_id="task",
+        user_id="user",
+        invoke_from=InvokeFrom.WEB_APP,
+        conversation_id="c",
+        app_mode="chat",
+        message_id="m",
+    )
+    assert isinstance(queue_manager._q, RedisStreamAppQueue)
+    queue_manager.publish(QueueMessageReplaceEvent(text="replaced"), PublishFrom.APPLICATION_MANAGER)
+    assert queue_manager._q.get(timeout=1).event.text == "replaced"
+
+    RedisStreamAppQueue.signal_stop("task")
+    with pytest.raises(queue.Empty):
+        queue_manager._q.get(timeout=1)
+    with pytest.raises(GenerateTaskStoppedError):
+        queue_manager.publish(QueueMessageReplaceEvent(text="replaced"), PublishFrom.APPLICATION_MANAGER)
+
+
+def test_stop_signal_before_first_message(redis, mocker):
+    mocker.patch("core.app.apps.base_app_queue_manager.dify_config", APP_QUEUE_REDIS_STREAM_ENABLED=True)
+    mocker.patch("core.app.apps.message_based_app_queue_manager.dify_config", APP_QUEUE_REDIS_STREAM_ENABLED=True)
+    queue_manager = MessageBasedAppQueueManager(
+        task_id="task",
+        user_id="user",
+        invoke_from=InvokeFrom.WEB_APP,
+        conversation_id="c",
+        app_mode="chat",
+        message_id="m",
+    )
+    # the listener waits for the first message, e.g. during the retrieval
+    with pytest.raises(queue.Empty):
+        queue_manager._q.get(timeout=1)
+
+    RedisStreamAppQueue.signal_stop("task")
+    with pytest.raises(queue.Empty):
+        queue_manager._q.get(timeout=1)
+    assert queue_manager._is_stopped()
+
+
+def test_advanced_chat_kept_in_process(redis, mocker):
+    mocker.patch("core.app.apps.message_based_app_queue_manager.dify_config", APP_QUEUE_REDIS_STREAM_ENABLED=True)
+    queue_manager = MessageBasedAppQueueManager(
+        task_id="task",
+        user_id="user",
+        invoke_from=InvokeFrom.WEB_APP,
+        conversation_id="c",
+        app_mode="advanced-chat",
+        message_id="m",
+    )
+
+    assert isinstance(queue_manager._q, queue.Queue)
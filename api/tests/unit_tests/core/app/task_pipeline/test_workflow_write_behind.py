@@ -0,0 +1,156 @@
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+from flask import Flask
+
+from core.app.task_pipeline.workflow_write_behind import (
+    WorkflowWriteBehindBuffer,
+    get_next_workflow_run_sequence_number,
+)
+from models.workflow import WorkflowNodeExecution, WorkflowRun
+
+
+def _node_execution(id: str, status: str = "running") -> WorkflowNodeExecution:
+    workflow_node_execution = WorkflowNodeExecution()
+    workflow_node_execution.id = id
+    workflow_node_execution.node_id = "node"
+    workflow_node_execution.status = status
+    return workflow_node_execution
+
+
+@pytest.fixture
+def mock_db(mocker):
+    return mocker.patch("core.app.task_pipeline.workflow_write_behind.db")
+
+
+def _executed_rows(mock_db) -> list[tuple[str, str, list[dict]]]:
+    return [
+        (call.args[0].is_insert and "insert" or "update", call.args[0].table.name, call.args[1])
+        for call in mock_db.session.execute.call_args_list
+    ]
+
+
+def test_updates_before_flush_are_merged_into_insert(mocker, mock_db):
+    mocker.patch(
+        "core.app.task_pipeline.workflow_write_behind.dify_config",
+        WORKFLOW_WRITE_BEHIND_ENABLED=True,
+        WORKFLOW_WRITE_BEHIND_MAX_WORKERS=2,
+    )
+    # keep the background flush from running so all changes stay pending
+    mocker.patch("core.app.task_pipeline.workflow_write_behind._flush_pool")
+    buffer = WorkflowWriteBehindBuffer(flask_app=Flask(__name__))
+
+    workflow_node_execution = _node_execution("1")
+    buffer.add(workflow_node_execution)
+    workflow_node_execution.status = "succeeded"
+    buffer.update(workflow_node_execution)
+    buffer.add(_node_execution("2"))
+    buffer.flush(wait=True)
+
+    assert _executed_rows(mock_db) == [
+        (
+            "insert",
+            "workflow_node_executions",
+            [
+                {"id": "1", "node_id": "node", "status": "succeeded"},
+                {"id": "2", "node_id": "node", "status": "running"},
+            ],
+        )
+    ]
+    mock_db.session.commit.assert_called_once()
+
+
+def test_rows_already_inserted_are_updated(mocker, mock_db):
+    mocker.patch(
+        "core.app.task_pipeline.workflow_write_behind.dify_config",
+        WORKFLOW_WRITE_BEHIND_ENABLED=False,
+        WORKFLOW_WRITE_BEHIND_MAX_WORKERS=2,
+    )
+    buffer = WorkflowWriteBehindBuffer(flask_app=Flask(__name__))
+
+    workflow_node_execution = _node_execution("1")
+    buffer.add(workflow_node_execution)
+    workflow_node_execution.status = "succeeded"
+    buffer.update(workflow_node_execution)
+
+    assert _executed_rows(mock_db) == [
+        ("insert", "workflow_node_executions", [{"id": "1", "node_id": "node", "status": "running"}]),
+        ("update", "workflow_node_executions", [{"id": "1", "node_id": "node", "status": "succeeded"}]),
+    ]
+
+
+def test_failed_flush_keeps_rows_pending(mocker, mock_db):
+    mocker.patch(
+        "core.app.task_pipeline.workflow_write_behind.dify_config",
+        WORKFLOW_WRITE_BEHIND_ENABLED=True,
+        WORKFLOW_WRITE_BEHIND_MAX_WORKERS=2,
+    )
+    mocker.patch("core.app.task_pipeline.workflow_write_behind._flush_pool")
+    buffer = WorkflowWriteBehindBuffer(flask_app=Flask(__name__))
+    buffer.add(_node_execution("1"))
+
+    mock_db.session.commit.side_effect = [ConnectionError, None]
+    with pytest.raises(ConnectionError):
+        buffer.flush(wait=True)
+    mock_db.session.rollback.assert_called_once()
+
+    buffer.flush(wait=True)
+    assert [row[0] for row in _executed_rows(mock_db)] == ["insert", "insert"]
+
+
+def test_background_flush_writes_all_changes(mocker, mock_db):
+    mocker.patch(
+        "core.app.task_pipeline.workflow_write_behind.dify_config",
+        WORKFLOW_WRITE_BEHIND_ENABLED=True,
+        WORKFLOW_WRITE_BEHIND_MAX_WORKERS=2,
+    )
+    flushed = threading.Event()
+    mock_db.session.commit.side_effect = flushed.set
+    buffer = WorkflowWriteBehindBuffer(flask_app=Flask(__name__))
+
+    buffer.add(_node_execution("1"))
+
+    assert flushed.wait(timeout=5)
+    buffer.flush(wait=True)
+    assert _executed_rows(mock_db) == [
+        ("insert", "workflow_node_executions", [{"id": "1", "node_id": "node", "status": "running"}])
+    ]
+
+
+def test_sequence_number_initialized_from_database(mocker, mock_db):
+    redis_client = mocker.patch("core.app.task_pipeline.workflow_write_behind.redis_client", new=MagicMock())
+    redis_client.exists.return_value = False
+    redis_client.incr.return_value = 8
+    mock_db.session.query.return_value.filter.return_value.scalar.return_value = 7
+
+    assert get_next_workflow_run_sequence_number("tenant", "app") == 8
+    redis_client.set.assert_called_once_with("workflow_run_sequence:tenant:app", 7, nx=True)
+
+    redis_client.exists.return_value = True
+    mock_db.session.query.reset_mock()
+    redis_client.incr.return_value = 9
+    assert get_next_workflow_run_sequence_number("tenant", "app") == 9
+    mock_db.session.query.assert_not_called()
+
+
+def test_workflow_run_and_node_executions_are_batched_per_table(mocker, mock_db):
+    mocker.patch(
+        "core.app.task_pipeline.workflow_write_behind.dify_config",
+        WORKFLOW_WRITE_BEHIND_ENABLED=True,
+        WORKFLOW_WRITE_BEHIND_MAX_WORKERS=2,
+    )
+    mocker.patch("core.app.task_pipeline.workflow_write_behind._flush_pool")
+    buffer = WorkflowWriteBehindBuffer(flask_app=Flask(__name__))
+
+    workflow_run = WorkflowRun()
+    workflow_run.id = "run"
+    buffer.add(workflow_run)
+    for i in range(3):
+        buffer.add(_node_execution(str(i)))
+    buffer.flush(wait=True)
+
+    assert [(kind, table, len(rows)) for kind, table, rows in _executed_rows(mock_db)] == [
+        ("insert", "workflow_runs", 1),
+        ("insert", "workflow_node_executions", 3),
+    ]
@@ -0,0 +1,49 @@
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from core.embedding.cached_embedding import CacheEmbedding
+from core.model_runtime.entities.text_embedding_entities import TextEmbeddingResult
+
+
+def _model_instance(provider: str, model: str) -> MagicMock:
+    model_instance = MagicMock()
+    model_instance.provider = provider
+    model_instance.model = model
+    model_instance.invoke_text_embedding.return_value = TextEmbeddingResult.model_construct(
+        model=model, embeddings=[[3.0, 4.0]]
+    )
+    return model_instance
+
+
+def test_embed_query_cached_in_process(mocker):
+    redis_client = mocker.patch("core.embedding.cached_embedding.redis_client", new=MagicMock())
+    redis_client.get.return_value = None
+    model_instance = _model_instance("openai", "local-cache-test")
+    cache_embedding = CacheEmbedding(model_instance)
+
+    embedding = cache_embedding.embed_query_array("hello")
+
+    assert embedding.dtype == np.float32
+    assert not embedding.flags.writeable
+    assert embedding.tolist() == [0.6000000238418579, 0.800000011920929]
+    key, ttl, value = redis_client.setex.call_args.args
+    assert ttl == 600
+    assert np.frombuffer(value, dtype=np.float32).tolist() == embedding.tolist()
+
+    # served by the in-process tier
+    assert cache_embedding.embed_query("hello") == embedding.tolist()
+    assert model_instance.invoke_text_embedding.call_count == 1
+    assert redis_client.get.call_count == 1
+
+
+def test_embed_query_cached_in_redis(mocker):
+    redis_client = mocker.patch("core.embedding.cached_embedding.redis_client", new=MagicMock())
+    redis_client.get.return_value = np.array([1.0, 0.0], dtype=np.float32).tobytes()
+    model_instance = _model_instance("openai", "redis-cache-test")
+
+    embedding = CacheEmbedding(model_instance).embed_query_array("hello")
+
+    assert embedding.tolist() == [1.0, 0.0]
+    model_instance.invoke_text_embedding.assert_not_called()
+    redis_client.expire.assert_called_once()
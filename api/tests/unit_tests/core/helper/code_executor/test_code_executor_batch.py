@@ -0,0 +1,223 @@
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from core.helper.code_executor.code_execution_batcher import CodeExecutionBatcher
+from core.helper.code_executor.code_executor import CodeExecutionError, CodeExecutor, CodeLanguage
+from core.helper.code_executor.jinja2.jinja2_transformer import Jinja2TemplateTransformer
+from core.helper.code_executor.python3.python3_transformer import Python3TemplateTransformer
+
+
+def _run_locally(language: CodeLanguage, preload: str, code: str) -> str:
+    return subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+
+
+def _patch_config(mocker, **kwargs):
+    config = {"CODE_EXECUTION_BATCH_MAX_SIZE": 50, "TEMPLATE_TRANSFORM_LOCAL_SANDBOX_ENABLED": False, **kwargs}
+    mocker.patch("core.helper.code_executor.code_executor.dify_config", **config)
+    mocker.patch("core.helper.code_executor.code_execution_batcher.dify_config", **config)
+
+
+def test_python3_batch_results_per_input_set(mocker):
+    _patch_config(mocker, CODE_EXECUTION_BATCH_MAX_SIZE=2)
+    execute_code = mocker.patch.object(CodeExecutor, "execute_code", side_effect=_run_locally)
+
+    results = CodeExecutor.execute_workflow_code_template_batch(
+        language=CodeLanguage.PYTHON3,
+        code="def main(a: int) -> dict:\n    return {'result': 10 // a}",
+        inputs_list=[{"a": 1}, {"a": 0}, {"a": 5}],
+    )
+
+    assert results[0] == {"result": 10}
+    assert isinstance(results[1], CodeExecutionError)
+    assert "ZeroDivisionError" in str(results[1])
+    assert results[2] == {"result": 2}
+    assert execute_code.call_count == 2
+
+
+def test_jinja2_batch_runner_keeps_inputs_placeholder_in_template(mocker):
+    _patch_config(mocker)
+    mocker.patch.object(CodeExecutor, "execute_code", side_effect=_run_locally)
+
+    results = CodeExecutor.execute_workflow_code_template_batch(
+        language=CodeLanguage.JINJA2,
+        code="Hello {{ name }} {{inputs}}",
+        inputs_list=[{"name": "World"}, {"name": "Dify"}],
+    )
+
+    assert results == [{"result": "Hello World "}, {"result": "Hello Dify "}]
+    script = Jinja2TemplateTransformer.get_batch_runner_script()
+    assert script.count(Jinja2TemplateTransformer._inputs_placeholder) == 1
+    assert Python3TemplateTransformer.get_batch_runner_script().count(Python3TemplateTransformer._result_tag) == 2
+
+
+def test_batch_failure_is_reported_for_every_input_set(mocker):
+    _patch_config(mocker)
+    mocker.patch.object(CodeExecutor, "execute_code", side_effect=CodeExecutionError("SyntaxError"))
+
+    results = CodeExecutor.execute_workflow_code_template_batch(
+        language=CodeLanguage.PYTHON3, code="def main(", inputs_list=[{}, {}]
+    )
+
+    assert [str(result) for result in results] == ["SyntaxError", "SyntaxError"]
+
+
+def test_unparsed_batch_executed_one_by_one(mocker):
+    _patch_config(mocker)
+
+    def execute_code(language: CodeLanguage, preload: str, code: str) -> str:
+        # the batch runner exits the sandbox process before printing the results
+        if "inputs_list" in code:
+            return ""
+        return _run_locally(language, preload, code)
+
+    mocker.patch.object(CodeExecutor, "execute_code", side_effect=execute_code)
+
+    results = CodeExecutor.execute_workflow_code_template_batch(
+        language=CodeLanguage.PYTHON3,
+        code="def main(a: int) -> dict:\n    return {'result': 10 // a}",
+        inputs_list=[{"a": 1}, {"a": 0}],
+    )
+
+    assert results[0] == {"result": 10}
+    assert isinstance(results[1], CodeExecutionError)
+
+
+def test_timed_out_batch_not_executed_again(mocker):
+    _patch_config(mocker)
+    execute_code = mocker.patch.object(CodeExecutor, "execute_code", side_effect=CodeExecutionError("timeout"))
+
+    results = CodeExecutor.execute_workflow_code_template_batch(
+        language=CodeLanguage.PYTHON3, code="def main() -> dict:\n    return {}", inputs_list=[{}, {}]
+    )
+
+    assert [str(result) for result in results] == ["timeout", "timeout"]
+    execute_code.assert_called_once()
+
+
+@pytest.mark.parametrize(
+    ("language", "code"),
+    [
+        (
+            CodeLanguage.PYTHON3,
+            "calls = []\ndef main(a: int) -> dict:\n    calls.append(a)\n    return {'result': len(calls)}",
+        ),
+        (
+            CodeLanguage.JAVASCRIPT,
+            "var calls = []\nfunction main({a}) {\n    calls.push(a)\n    return {result: calls.length}\n}",
+        ),
+    ],
+)
+def test_batch_input_sets_do_not_share_state(mocker, language, code):
+    _patch_config(mocker)
+
+    def run_locally(language: CodeLanguage, preload: str, code: str) -> str:
+        if language == CodeLanguage.JAVASCRIPT:
+            return subprocess.run(["node", "-e", code], capture_output=True, text=True, check=True).stdout
+        return _run_locally(language, preload, code)
+
+    mocker.patch.object(CodeExecutor, "execute_code", side_effect=run_locally)
+
+    results = CodeExecutor.execute_workflow_code_template_batch(
+        language=language, code=code, inputs_list=[{"a": 1}, {"a": 2}]
+    )
+
+    assert results == [{"result": 1}, {"result": 1}]
+
+
+def test_jinja2_rendered_locally(mocker):
+    _patch_config(mocker, TEMPLATE_TRANSFORM_LOCAL_SANDBOX_ENABLED=True)
+    execute_code = mocker.patch.object(CodeExecutor, "execute_code")
+
+    result = CodeExecutor.execute_workflow_code_template(
+        language=CodeLanguage.JINJA2, code="{{ items | join(',') }}", inputs={"items": [1, 2]}
+    )
+
+    assert result == {"result": "1,2"}
+    execute_code.assert_not_called()
+    with pytest.raises(CodeExecutionError, match="SecurityError"):
+        CodeExecutor.execute_workflow_code_template(
+            language=CodeLanguage.JINJA2, code="{{ items.append(3) }}", inputs={"items": [1, 2]}
+        )
+
+
+def test_jinja2_loops_rendered_by_sandbox(mocker):
+    _patch_config(mocker, TEMPLATE_TRANSFORM_LOCAL_SANDBOX_ENABLED=True)
+    execute_code = mocker.patch.object(CodeExecutor, "execute_code", side_effect=_run_locally)
+
+    result = CodeExecutor.execute_workflow_code_template(
+        language=CodeLanguage.JINJA2, code="{% for i in items %}{{ i }},{% endfor %}", inputs={"items": [1, 2]}
+    )
+
+    assert result == {"result": "1,2,"}
+    execute_code.assert_called_once()
+
+
+def test_concurrent_executions_coalesced(mocker):
+    _patch_config(mocker)
+    execute_batch = mocker.patch.object(
+        CodeExecutor,
+        "execute_workflow_code_template_batch",
+        side_effect=lambda language, code, inputs_list: [{"result": inputs["a"]} for inputs in inputs_list],
+    )
+    batcher = CodeExecutionBatcher(max_wait_time=5)
+    results = {}
+
+    def execute(a: int):
+        results[a] = batcher.execute(CodeLanguage.PYTHON3, "code", {"a": a}, max_batch_size=4, batch_scope="run")
+
+    threads = [threading.Thread(target=execute, args=(a,)) for a in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == {a: {"result": a} for a in range(4)}
+    execute_batch.assert_called_once()
+
+
+def test_single_execution_not_batched(mocker):
+    _patch_config(mocker)
+    execute = mocker.patch.object(CodeExecutor, "execute_workflow_code_template", return_value={"result": 1})
+    batcher = CodeExecutionBatcher(max_wait_time=5)
+
+    assert batcher.execute(CodeLanguage.PYTHON3, "code", {}, max_batch_size=1) == {"result": 1}
+    execute.assert_called_once()
+
+
+def test_executions_of_different_scopes_not_batched(mocker):
+    _patch_config(mocker)
+    execute_batch = mocker.patch.object(
+        CodeExecutor,
+        "execute_workflow_code_template_batch",
+        side_effect=lambda language, code, inputs_list: [{"result": inputs["a"]} for inputs in inputs_list],
+    )
+    batcher = CodeExecutionBatcher(max_wait_time=5)
+    results = {}
+
+    def execute(a: int):
+        results[a] = batcher.execute(
+            CodeLanguage.PYTHON3, "code", {"a": a}, max_batch_size=2, batch_scope=f"run-{a % 2}"
+        )
+
+    threads = [threading.Thread(target=execute, args=(a,)) for a in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == {a: {"result": a} for a in range(4)}
+    assert sorted(
+        sorted(inputs["a"] for inputs in call.kwargs["inputs_list"]) for call in execute_batch.call_args_list
+    ) == [[0, 2], [1, 3]]
+
+
+def test_execution_without_scope_not_batched(mocker):
+    _patch_config(mocker)
+    execute = mocker.patch.object(CodeExecutor, "execute_workflow_code_template", return_value={"result": 1})
+    batcher = CodeExecutionBatcher(max_wait_time=5)
+
+    assert batcher.execute(CodeLanguage.PYTHON3, "code", {}, max_batch_size=4) == {"result": 1}
+    execute.assert_called_once()
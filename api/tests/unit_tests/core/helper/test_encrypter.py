@@ -0,0 +1,77 @@
+import base64
+from unittest.mock import MagicMock
+
+import pytest
+from Crypto.PublicKey import RSA
+
+from core.helper import encrypter
+from core.helper.encrypter import DecryptedTokenCache
+from libs import rsa
+
+
+@pytest.fixture(scope="module")
+def private_key() -> RSA.RsaKey:
+    return RSA.generate(2048)
+
+
+@pytest.fixture
+def tenant_key(mocker, private_key):
+    mocker.patch("libs.rsa.redis_client", new=MagicMock(get=MagicMock(return_value=private_key.export_key())))
+    mocker.patch.object(rsa, "_decoding_cache", {})
+    mocker.patch.object(encrypter, "decrypted_token_cache", DecryptedTokenCache(max_size=10, ttl=60))
+    return mocker.spy(rsa.RSA, "import_key")
+
+
+def _encrypt(private_key: RSA.RsaKey, text: str) -> str:
+    return base64.b64encode(rsa.encrypt(text, private_key.publickey().export_key())).decode()
+
+
+def test_decrypted_token_cached(mocker, private_key, tenant_key):
+    token = _encrypt(private_key, "sk-secret")
+    tenant_key.reset_mock()
+    decrypt = mocker.spy(rsa, "decrypt_token_with_decoding")
+
+    assert encrypter.decrypt_token("tenant", token) == "sk-secret"
+    assert encrypter.decrypt_token("tenant", token) == "sk-secret"
+    assert decrypt.call_count == 1
+
+    encrypter.clear_decrypted_tokens("tenant")
+    assert encrypter.decrypt_token("tenant", token) == "sk-secret"
+    assert decrypt.call_count == 2
+    # the private key is imported once per tenant
+    assert tenant_key.call_count == 1
+
+
+def test_decrypt_secret_variables(private_key, tenant_key):
+    credentials = {
+        "api_key": _encrypt(private_key, "sk-secret"),
+        "secret": "not-encrypted",
+        "base_url": "https://example.com",
+    }
+    tenant_key.reset_mock()
+
+    encrypter.decrypt_secret_variables("tenant", credentials, ["api_key", "secret", "missing"])
+
+    assert credentials == {"api_key": "sk-secret", "secret": "not-encrypted", "base_url": "https://example.com"}
+    assert tenant_key.call_count == 1
+
+
+def test_batch_decrypt_token_skips_key_when_cached(mocker, private_key, tenant_key):
+    tokens = [_encrypt(private_key, "a"), _encrypt(private_key, "b")]
+    assert encrypter.batch_decrypt_token("tenant", tokens) == ["a", "b"]
+
+    get_decrypt_decoding = mocker.spy(rsa, "get_decrypt_decoding")
+    assert encrypter.batch_decrypt_token("tenant", tokens) == ["a", "b"]
+    get_decrypt_decoding.assert_not_called()
+
+
+def test_evicted_values_zeroized():
+    cache = DecryptedTokenCache(max_size=1, ttl=60)
+    cache.set("tenant", "token-1", "secret-1")
+    value = cache._values[("tenant", cache._hash_token("token-1"))][0]
+
+    cache.set("tenant", "token-2", "secret-2")
+
+    assert cache.get("tenant", "token-1") is None
+    assert value == bytearray(len("secret-1"))
+    assert cache.get("tenant", "token-2") == "secret-2"
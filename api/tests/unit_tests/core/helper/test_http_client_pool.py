@@ -0,0 +1,71 @@
+import threading
+
+import httpx
+
+from core.helper.http_client_pool import HttpClientPool
+
+
+def _pool(max_connections_per_host: int = 0) -> HttpClientPool:
+    return HttpClientPool(
+        max_connections=10,
+        max_keepalive_connections=5,
+        keepalive_expiry=5,
+        max_connections_per_host=max_connections_per_host,
+        http2=False,
+    )
+
+
+def test_client_shared_per_transport_config():
+    pool = _pool()
+
+    client = pool.get_client()
+    assert pool.get_client() is client
+    assert pool.get_client(verify=False) is not client
+    assert pool.get_client(proxy="http://proxy:3128") is not client
+    assert pool.get_client(proxies={"http://": "http://proxy:3128"}) is not client
+
+    pool.close()
+
+
+def test_cookies_not_shared_between_requests():
+    pool = _pool()
+    sent_cookies = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent_cookies.append(request.headers.get("cookie"))
+        return httpx.Response(200, headers={"set-cookie": "session=user-1; Path=/"})
+
+    pool.get_client()._transport = httpx.MockTransport(handler)
+
+    pool.request("GET", "http://example.com/")
+    pool.request("GET", "http://example.com/", cookies={"theme": "dark"})
+    pool.request("GET", "http://example.com/")
+
+    assert sent_cookies == [None, "theme=dark", None]
+
+
+def test_requests_per_host_limited():
+    pool = _pool(max_connections_per_host=1)
+    lock = threading.Lock()
+    concurrent = 0
+    max_concurrent = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal concurrent, max_concurrent
+        with lock:
+            concurrent += 1
+            max_concurrent = max(max_concurrent, concurrent)
+        threading.Event().wait(0.02)
+        with lock:
+            concurrent -= 1
+        return httpx.Response(200)
+
+    pool.get_client()._transport = httpx.MockTransport(handler)
+    threads = [threading.Thread(target=pool.request, args=("GET", "http://example.com/")) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max_concurrent == 1
+    assert pool.get_metrics()["direct"].requests == 5
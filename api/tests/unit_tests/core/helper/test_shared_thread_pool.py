@@ -0,0 +1,48 @@
+import threading
+
+from core.helper.shared_thread_pool import SharedThreadPool
+
+
+def test_pool_created_once_and_shared():
+    shared_pool = SharedThreadPool(max_workers=2, thread_name_prefix="test")
+
+    with shared_pool.acquire() as pool:
+        pass
+    with shared_pool.acquire() as same_pool:
+        assert same_pool is pool
+
+    assert shared_pool.submit(threading.current_thread).result(timeout=5).name.startswith("test")
+    pool.shutdown()
+
+
+def test_retired_pool_runs_its_tasks_and_is_replaced():
+    shared_pool = SharedThreadPool(max_workers=1, thread_name_prefix="test")
+    release = threading.Event()
+
+    with shared_pool.acquire() as pool:
+        blocked = pool.submit(release.wait, 5)
+
+    assert shared_pool.retire(pool)
+    assert not shared_pool.retire(pool)
+
+    # the new pool does not wait for the task holding the worker of the retired one
+    assert shared_pool.submit(lambda: "done").result(timeout=5) == "done"
+
+    release.set()
+    assert blocked.result(timeout=5)
+    with shared_pool.acquire() as new_pool:
+        assert new_pool is not pool
+    new_pool.shutdown()
+
+
+def test_reset_in_child_drops_pool():
+    shared_pool = SharedThreadPool(max_workers=1, thread_name_prefix="test")
+    with shared_pool.acquire() as pool:
+        pass
+
+    shared_pool._reset()
+
+    with shared_pool.acquire() as new_pool:
+        assert new_pool is not pool
+    pool.shutdown()
+    new_pool.shutdown()
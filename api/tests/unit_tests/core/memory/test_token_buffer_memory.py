@@ -0,0 +1,106 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from core.memory.token_buffer_memory import TokenBufferMemory
+from core.model_runtime.entities.message_entities import AssistantPromptMessage, UserPromptMessage
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def pipeline(self):
+        pipe = MagicMock()
+        pipe.__enter__.return_value = pipe
+        pipe.setex.side_effect = lambda key, ttl, value: self.data.__setitem__(key, str(value).encode())
+        return pipe
+
+
+def _create_memory(mocker, messages):
+    db = mocker.patch("core.memory.token_buffer_memory.db")
+    query = db.session.query.return_value
+    query.filter.return_value.order_by.return_value.limit.return_value.all.return_value = messages
+    # no message has files
+    query.filter.return_value.all.return_value = []
+    mocker.patch("core.memory.token_buffer_memory.MessageFileParser")
+    redis = FakeRedis()
+    mocker.patch("core.memory.token_buffer_memory.redis_client", redis)
+
+    model_instance = MagicMock(provider="openai", model="gpt-4o")
+    # one token per character of the message content
+    model_instance.get_llm_num_tokens.side_effect = lambda prompt_messages: sum(
+        len(prompt_message.content) for prompt_message in prompt_messages
+    )
+    conversation = MagicMock(id="conversation", mode="chat")
+    return TokenBufferMemory(conversation=conversation, model_instance=model_instance), db, redis
+
+
+def _messages(count):
+    # newest first, the last message is the one being answered
+    return [
+        SimpleNamespace(
+            id=str(i),
+            query=f"q{i:02d}",
+            answer=f"a{i:02d}",
+            workflow_run_id=None,
+            parent_message_id=str(i - 1) if i > 0 else None,
+        )
+        for i in reversed(range(count))
+    ]
+
+
+def test_history_pruned_by_cached_message_tokens(mocker):
+    memory, db, redis = _create_memory(mocker, _messages(11))
+
+    prompt_messages = memory.get_history_prompt_messages(max_token_limit=20)
+
+    assert prompt_messages == [
+        UserPromptMessage(content="q07"),
+        AssistantPromptMessage(content="a07"),
+        UserPromptMessage(content="q08"),
+        AssistantPromptMessage(content="a08"),
+        UserPromptMessage(content="q09"),
+        AssistantPromptMessage(content="a09"),
+    ]
+    # the messages are counted with one call, files of all the messages are loaded with one query
+    assert memory.model_instance.get_llm_num_tokens.call_count == 1
+    assert len(redis.data) == 20
+    assert db.session.query.return_value.filter.return_value.all.call_count == 1
+
+    memory.model_instance.get_llm_num_tokens.reset_mock()
+    assert memory.get_history_prompt_messages(max_token_limit=20) == prompt_messages
+    memory.model_instance.get_llm_num_tokens.assert_not_called()
+
+
+def test_last_message_kept_when_over_limit(mocker):
+    memory, _, _ = _create_memory(mocker, _messages(3))
+
+    assert memory.get_history_prompt_messages(max_token_limit=1) == [AssistantPromptMessage(content="a01")]
+
+
+def test_only_new_messages_counted(mocker):
+    memory, db, _ = _create_memory(mocker, _messages(3))
+    memory.get_history_prompt_messages(max_token_limit=100)
+
+    query = db.session.query.return_value
+    query.filter.return_value.order_by.return_value.limit.return_value.all.return_value = _messages(5)
+    memory.model_instance.get_llm_num_tokens.reset_mock()
+
+    assert len(memory.get_history_prompt_messages(max_token_limit=100)) == 8
+    memory.model_instance.get_llm_num_tokens.assert_called_once_with(
+        [
+            UserPromptMessage(content="q02"),
+            AssistantPromptMessage(content="a02"),
+            UserPromptMessage(content="q03"),
+            AssistantPromptMessage(content="a03"),
+        ]
+    )
+
+
+def test_split_tokens_adds_up():
+    assert TokenBufferMemory._split_tokens(10, [1, 1, 1]) == [4, 3, 3]
+    assert TokenBufferMemory._split_tokens(7, [100, 300]) == [2, 5]
+    assert TokenBufferMemory._split_tokens(5, [0, 0]) == [3, 2]
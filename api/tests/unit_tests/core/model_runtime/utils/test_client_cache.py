@@ -0,0 +1,43 @@
+from httpx import Timeout
+from openai import OpenAI
+
+from core.model_runtime.utils.client_cache import ModelClientCache
+
+
+def _credentials_kwargs(api_key: str = "sk-1", base_url: str = "https://api.openai.com/v1") -> dict:
+    return {"api_key": api_key, "base_url": base_url, "timeout": Timeout(315.0, read=300.0), "max_retries": 1}
+
+
+def test_client_shared_by_same_credentials():
+    cache = ModelClientCache()
+
+    client = cache.get_client("openai", OpenAI, _credentials_kwargs())
+
+    assert isinstance(client, OpenAI)
+    assert cache.get_client("openai", OpenAI, _credentials_kwargs()) is client
+    assert cache.get_client("openai", OpenAI, _credentials_kwargs(api_key="sk-2")) is not client
+    assert cache.get_client("openai", OpenAI, _credentials_kwargs(base_url="http://localhost/v1")) is not client
+    assert cache.get_client("fireworks", OpenAI, _credentials_kwargs()) is not client
+
+
+def test_clients_expire(mocker):
+    monotonic = mocker.patch("core.model_runtime.utils.client_cache.time.monotonic", return_value=0)
+    cache = ModelClientCache(ttl=60)
+
+    client = cache.get_client("openai", OpenAI, _credentials_kwargs())
+    monotonic.return_value = 59
+    assert cache.get_client("openai", OpenAI, _credentials_kwargs()) is client
+    monotonic.return_value = 61
+    assert cache.get_client("openai", OpenAI, _credentials_kwargs()) is not client
+
+
+def test_least_recently_used_client_evicted():
+    cache = ModelClientCache(max_size=2)
+
+    first = cache.get_client("test", dict, credentials={"api_key": "1"})
+    second = cache.get_client("test", dict, credentials={"api_key": "2"})
+    assert cache.get_client("test", dict, credentials={"api_key": "1"}) is first
+    cache.get_client("test", dict, credentials={"api_key": "3"})
+
+    assert cache.get_client("test", dict, credentials={"api_key": "1"}) is first
+    assert cache.get_client("test", dict, credentials={"api_key": "2"}) is not second
@@ -0,0 +1,36 @@
+import random
+
+from core.moderation.keywords.keyword_matcher import KeywordMatcher, get_keyword_matcher
+from core.moderation.keywords.keywords import KeywordsModeration
+
+
+def test_matches_substring_search():
+    rng = random.Random(0)
+    for _ in range(200):
+        keywords = ["".join(rng.choices("abcAB", k=rng.randint(1, 4))) for _ in range(rng.randint(1, 8))]
+        text = "".join(rng.choices("abcdAB", k=rng.randint(0, 30)))
+        matcher = KeywordMatcher(keywords)
+
+        assert matcher.search(text) == any(keyword.lower() in text.lower() for keyword in keywords)
+
+
+def test_thousands_of_keywords():
+    matcher = KeywordMatcher([f"forbidden{i}" for i in range(5000)])
+
+    assert matcher.search("this text says FORBIDDEN4321 somewhere")
+    assert not matcher.search("forbidden " * 1000)
+
+
+def test_keywords_moderation_compiles_config_once():
+    config = {
+        "keywords": "bad\n\nWorse",
+        "inputs_config": {"enabled": True, "preset_response": "inputs blocked"},
+        "outputs_config": {"enabled": True, "preset_response": "outputs blocked"},
+    }
+    moderation = KeywordsModeration(app_id="app", tenant_id="tenant", config=config)
+    get_keyword_matcher.cache_clear()
+
+    assert moderation.moderation_for_inputs({"name": "fine"}, query="even worse").flagged
+    assert not moderation.moderation_for_outputs("all good").flagged
+    assert moderation.moderation_for_outputs("Bad output").preset_response == "outputs blocked"
+    assert get_keyword_matcher.cache_info().misses == 1
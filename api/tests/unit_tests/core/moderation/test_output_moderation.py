@@ -0,0 +1,76 @@
+from unittest.mock import MagicMock
+
+import pytest
+from flask import Flask
+
+from core.app.apps.base_app_queue_manager import AppQueueManager
+from core.moderation.base import ModerationAction, ModerationOutputsResult
+from core.moderation.output_moderation import ModerationRule, OutputModeration, output_moderation_executor
+
+
+@pytest.fixture
+def output_moderation(mocker):
+    mocker.patch(
+        "core.moderation.output_moderation.dify_config", MODERATION_BUFFER_SIZE=10, MODERATION_BUFFER_OVERLAP=3
+    )
+    # run the checks in the caller thread
+    mocker.patch.object(output_moderation_executor, "submit", side_effect=lambda fn, *args: fn(*args))
+    output_moderation = OutputModeration(
+        tenant_id="tenant",
+        app_id="app",
+        rule=ModerationRule(type="keywords", config={}),
+        queue_manager=MagicMock(spec=AppQueueManager),
+    )
+    with Flask(__name__).app_context():
+        yield output_moderation
+
+
+def _flag(keyword: str, action: ModerationAction = ModerationAction.DIRECT_OUTPUT):
+    def moderation(tenant_id: str, app_id: str, moderation_buffer: str) -> ModerationOutputsResult:
+        flagged = keyword in moderation_buffer
+        return ModerationOutputsResult(
+            flagged=flagged,
+            action=action,
+            preset_response="blocked",
+            text=moderation_buffer.replace(keyword, "*" * len(keyword)),
+        )
+
+    return moderation
+
+
+def test_only_new_text_checked(output_moderation, mocker):
+    moderation = mocker.patch.object(OutputModeration, "moderation", side_effect=_flag("bad"))
+
+    for token in "0123456789abcdefghijklmno":
+        output_moderation.append_new_token(token)
+    completion = output_moderation.moderation_completion("0123456789abcdefghijklmnopq")
+
+    assert completion == "0123456789abcdefghijklmnopq"
+    assert [call.kwargs["moderation_buffer"] for call in moderation.call_args_list] == [
+        "0123456789",
+        "789abcdefghij",
+        "hijklmnopq",
+    ]
+    assert output_moderation_executor.get_metrics()["app"].checks >= 3
+
+
+def test_keyword_across_windows_flagged(output_moderation, mocker):
+    mocker.patch.object(OutputModeration, "moderation", side_effect=_flag("89ab"))
+
+    for token in "0123456789abcdefghij":
+        output_moderation.append_new_token(token)
+
+    assert output_moderation.should_direct_output()
+    assert output_moderation.get_final_output() == "blocked"
+    output_moderation.queue_manager.publish.assert_called_once()
+
+
+def test_overridden_text_replaces_whole_answer(output_moderation, mocker):
+    mocker.patch.object(OutputModeration, "moderation", side_effect=_flag("cd", ModerationAction.OVERRIDDEN))
+
+    for token in "0123456789abcdefghij":
+        output_moderation.append_new_token(token)
+
+    event = output_moderation.queue_manager.publish.call_args.args[0]
+    assert event.text == "0123456789ab**efghij"
+    assert output_moderation.moderation_completion("0123456789abcdefghijkl") == "0123456789ab**efghijkl"
@@ -0,0 +1,31 @@
+from core.rag.datasource.keyword.jieba.jieba_inverted_index import JiebaInvertedIndex
+
+
+def test_bm25_scores_prefer_rare_keywords_and_more_matches():
+    postings = {
+        # common keyword, in 3 of 4 segments
+        "dify": {"segment-1": 10, "segment-2": 10, "segment-3": 10},
+        # rare keyword
+        "workflow": {"segment-2": 10},
+        "missing": {},
+    }
+
+    scores = JiebaInvertedIndex._bm25_scores(
+        postings=postings, total_documents=4, average_document_length=10, k1=1.2, b=0.75
+    )
+
+    assert set(scores.keys()) == {"segment-1", "segment-2", "segment-3"}
+    assert scores["segment-1"] == scores["segment-3"]
+    assert scores["segment-2"] > scores["segment-1"]
+    # the rare keyword alone outweighs the common one
+    assert scores["segment-2"] - scores["segment-1"] > scores["segment-1"]
+
+
+def test_bm25_scores_favor_shorter_segments():
+    postings = {"dify": {"short": 2, "long": 20}}
+
+    scores = JiebaInvertedIndex._bm25_scores(
+        postings=postings, total_documents=10, average_document_length=10, k1=1.2, b=0.75
+    )
+
+    assert scores["short"] > scores["long"]
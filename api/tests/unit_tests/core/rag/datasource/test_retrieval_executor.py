@@ -0,0 +1,79 @@
+import threading
+
+from flask import Flask
+
+from core.rag.datasource.retrieval_executor import RetrievalExecutor
+
+
+def _raise():
+    raise ValueError("backend unavailable")
+
+
+def test_run_returns_partial_results_on_timeout():
+    executor = RetrievalExecutor("test", max_workers=4)
+    release = threading.Event()
+
+    with Flask(__name__).app_context():
+        results = executor.run(
+            [
+                ("fast", lambda: ["document"]),
+                ("slow", lambda: release.wait(5)),
+                ("broken", _raise),
+            ],
+            timeout=0.5,
+        )
+    release.set()
+
+    fast, slow, broken = results
+    assert fast.result == ["document"]
+    assert not fast.timed_out
+    assert slow.timed_out
+    assert slow.result is None
+    assert isinstance(broken.error, ValueError)
+
+    metrics = executor.get_metrics()
+    assert metrics["fast"].count == 1
+    assert metrics["slow"].timeouts == 1
+    assert metrics["broken"].errors == 1
+
+
+def test_run_reuses_worker_threads():
+    executor = RetrievalExecutor("test", max_workers=2)
+    thread_names = set()
+
+    with Flask(__name__).app_context():
+        for _ in range(5):
+            executor.run([("source", lambda: thread_names.add(threading.current_thread().name))], timeout=5)
+
+    assert len(thread_names) == 1
+
+
+def test_nested_run_ends_before_outer_deadline():
+    outer_executor = RetrievalExecutor("outer", max_workers=2)
+    inner_executor = RetrievalExecutor("inner", max_workers=2)
+    release = threading.Event()
+
+    def retrieve_dataset():
+        results = inner_executor.run([("fast", lambda: ["document"]), ("slow", lambda: release.wait(5))], timeout=1)
+        return [document for result in results if result.result for document in result.result]
+
+    with Flask(__name__).app_context():
+        (dataset,) = outer_executor.run([("dataset", retrieve_dataset)], timeout=1)
+    release.set()
+
+    # the partial results of the inner batch reach the caller of the outer one
+    assert not dataset.timed_out
+    assert dataset.result == ["document"]
+
+
+def test_timed_out_task_does_not_hold_the_pool():
+    executor = RetrievalExecutor("test", max_workers=1)
+    release = threading.Event()
+
+    with Flask(__name__).app_context():
+        (slow,) = executor.run([("slow", lambda: release.wait(5))], timeout=0.2)
+        (fast,) = executor.run([("fast", lambda: ["document"])], timeout=1)
+    release.set()
+
+    assert slow.timed_out
+    assert fast.result == ["document"]
@@ -0,0 +1,127 @@
+from unittest.mock import MagicMock
+
+import numpy as np
+import psycopg2.pool
+import pytest
+
+from core.rag.datasource.vdb.pgvector.pgvector import BlockingConnectionPool, PGVector, PGVectorConfig
+
+
+def _pgvector(mocker, rows=(), table_exists=False, **config_kwargs) -> tuple[PGVector, MagicMock]:
+    cursor = MagicMock()
+    cursor.__iter__.return_value = iter(rows)
+    cursor.fetchone.return_value = ("embedding_vector_index_test_node" if table_exists else None,)
+    pool = MagicMock()
+    pool.getconn.return_value.cursor.return_value = cursor
+    pool.getconn.return_value.closed = 0
+    mocker.patch("core.rag.datasource.vdb.pgvector.pgvector.vector_client_registry.get_client", return_value=pool)
+
+    config = PGVectorConfig(
+        host="localhost",
+        port=5432,
+        user="postgres",
+        password="postgres",
+        database="dify",
+        hnsw_ef_search=40,
+        **config_kwargs,
+    )
+    return PGVector(collection_name="Vector_index_test_Node", config=config), cursor
+
+
+def test_vector_literal_is_exact_float32():
+    vector = np.random.default_rng(0).standard_normal(1536)
+
+    literal = PGVector._vector_literal(vector.tolist())
+
+    parsed = np.asarray(literal[1:-1].split(","), dtype=np.float32)
+    assert np.array_equal(parsed, vector.astype(np.float32))
+    assert len(literal) < len(str(vector.tolist()))
+
+
+def test_search_by_vector_sets_ef_search(mocker):
+    vector, cursor = _pgvector(mocker, rows=[({"doc_id": "1"}, "text", 0.25)])
+
+    documents = vector.search_by_vector([0.5, 0.25], top_k=100)
+
+    assert cursor.execute.call_args_list[0].args == ("SET LOCAL hnsw.ef_search = %s", (100,))
+    assert cursor.execute.call_args_list[1].args[1] == ("[0.5,0.25]",)
+    assert documents[0].metadata["score"] == 0.75
+
+
+def test_create_collection_creates_indexes(mocker):
+    mocker.patch("core.rag.datasource.vdb.pgvector.pgvector.redis_client", new=MagicMock(get=lambda _: None))
+    vector, cursor = _pgvector(mocker)
+
+    vector._create_collection(1536)
+
+    statements = [call.args[0] for call in cursor.execute.call_args_list]
+    assert any("USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64)" in s for s in statements)
+    # the default text search configuration of the database cannot be indexed
+    assert not any("USING gin" in s for s in statements)
+
+
+def test_create_collection_indexes_texts_with_text_search_config(mocker):
+    mocker.patch("core.rag.datasource.vdb.pgvector.pgvector.redis_client", new=MagicMock(get=lambda _: None))
+    vector, cursor = _pgvector(mocker, text_search_config="english")
+
+    vector._create_collection(1536)
+
+    statements = [call.args[0] for call in cursor.execute.call_args_list]
+    assert any("USING gin (to_tsvector('english', text))" in s for s in statements)
+
+
+def test_create_collection_leaves_existing_table_indexes_to_the_command(mocker):
+    mocker.patch("core.rag.datasource.vdb.pgvector.pgvector.redis_client", new=MagicMock(get=lambda _: None))
+    vector, cursor = _pgvector(mocker, table_exists=True, text_search_config="english")
+
+    vector._create_collection(1536)
+
+    statements = [call.args[0] for call in cursor.execute.call_args_list]
+    assert not any("CREATE INDEX" in s for s in statements)
+
+
+def test_create_indexes_concurrently(mocker):
+    vector, cursor = _pgvector(mocker, text_search_config="english")
+    cursor.fetchone.return_value = (1536,)
+    cursor.fetchall.return_value = [("embedding_cosine_v1_idx_invalid",)]
+    conn = vector.pool.getconn.return_value
+    conn.cursor.return_value.__enter__.return_value = cursor
+
+    assert vector.create_indexes_concurrently()
+
+    statements = [call.args[0] for call in cursor.execute.call_args_list]
+    assert "DROP INDEX CONCURRENTLY IF EXISTS embedding_cosine_v1_idx_invalid" in statements
+    assert any("CREATE INDEX CONCURRENTLY IF NOT EXISTS embedding_cosine_v1_idx_" in s for s in statements)
+    assert any("CREATE INDEX CONCURRENTLY IF NOT EXISTS text_gin_v1_idx_" in s for s in statements)
+    assert conn.autocommit is False
+
+
+def test_search_by_full_text_uses_text_search_config(mocker):
+    vector, cursor = _pgvector(mocker)
+    vector.search_by_full_text("hello")
+    assert "to_tsvector(text)" in cursor.execute.call_args.args[0]
+
+    vector, cursor = _pgvector(mocker, text_search_config="english")
+    vector.search_by_full_text("hello")
+    assert "to_tsvector(%s::regconfig, text)" in cursor.execute.call_args.args[0]
+    assert cursor.execute.call_args.args[1][0] == "english"
+
+
+def test_create_collection_skips_hnsw_above_max_dimension(mocker):
+    mocker.patch("core.rag.datasource.vdb.pgvector.pgvector.redis_client", new=MagicMock(get=lambda _: None))
+    vector, cursor = _pgvector(mocker, text_search_config="english")
+
+    vector._create_collection(3072)
+
+    statements = [call.args[0] for call in cursor.execute.call_args_list]
+    assert not any("USING hnsw" in s for s in statements)
+    assert any("USING gin" in s for s in statements)
+
+
+def test_pool_wait_for_connection_times_out():
+    pool = BlockingConnectionPool(0, 1, wait_timeout=0.01)
+    # the only connection of the pool is in use
+    pool._semaphore.acquire()
+
+    with pytest.raises(psycopg2.pool.PoolError):
+        pool.getconn()
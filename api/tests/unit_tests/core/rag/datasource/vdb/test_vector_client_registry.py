@@ -0,0 +1,124 @@
+import gc
+import threading
+from unittest.mock import MagicMock
+
+from core.rag.datasource.vdb.vector_client_registry import VectorClientRegistry
+
+
+def test_client_shared_per_config():
+    registry = VectorClientRegistry(health_check_interval=30)
+    factory = MagicMock(side_effect=lambda: object())
+
+    client = registry.get_client("pgvector", {"host": "a"}, factory)
+    assert registry.get_client("pgvector", {"host": "a"}, factory) is client
+    assert registry.get_client("pgvector", {"host": "b"}, factory) is not client
+    assert registry.get_client("qdrant", {"host": "a"}, factory) is not client
+    assert factory.call_count == 3
+
+
+def test_client_created_once_by_concurrent_callers():
+    registry = VectorClientRegistry(health_check_interval=30)
+    factory = MagicMock(side_effect=lambda: object())
+    clients = []
+
+    def get_client():
+        clients.append(registry.get_client("pgvector", {"host": "a"}, factory))
+
+    threads = [threading.Thread(target=get_client) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert factory.call_count == 1
+    assert all(client is clients[0] for client in clients)
+
+
+def test_unhealthy_client_recreated():
+    registry = VectorClientRegistry(health_check_interval=0)
+    factory = MagicMock(side_effect=lambda: object())
+    close = MagicMock()
+    healthy = True
+
+    def health_check(_):
+        if not healthy:
+            raise ConnectionError
+        return True
+
+    client = registry.get_client("milvus", {"uri": "a"}, factory, health_check=health_check, close=close)
+    assert registry.get_client("milvus", {"uri": "a"}, factory, health_check=health_check, close=close) is client
+
+    healthy = False
+    new_client = registry.get_client("milvus", {"uri": "a"}, factory, health_check=health_check, close=close)
+    assert new_client is not client
+    close.assert_called_once_with(client)
+
+    metrics = next(iter(registry.get_metrics().values()))
+    assert metrics.backend == "milvus"
+    assert metrics.health_check_failures == 1
+
+
+def test_client_of_down_backend_recreated_once():
+    registry = VectorClientRegistry(health_check_interval=0)
+    factory = MagicMock(side_effect=lambda: object())
+
+    registry.get_client("milvus", {"uri": "a"}, factory, health_check=lambda _: False)
+    assert factory.call_count == 2
+
+    registry.get_client("milvus", {"uri": "a"}, factory, health_check=lambda _: False)
+    assert factory.call_count == 3
+
+
+def test_metrics_report_pool_stats():
+    registry = VectorClientRegistry(health_check_interval=30)
+    for _ in range(3):
+        registry.get_client("pgvector", {"host": "a"}, object, pool_stats=lambda _: {"max": 5, "in_use": 1})
+
+    metrics = list(registry.get_metrics().values())
+    assert len(metrics) == 1
+    assert metrics[0].hits == 3
+    assert metrics[0].pool == {"max": 5, "in_use": 1}
+
+
+def test_evicted_client_closed_after_its_owners():
+    registry = VectorClientRegistry(health_check_interval=0)
+    factory = MagicMock(side_effect=lambda: object())
+    close = MagicMock()
+    healthy = True
+
+    class Owner:
+        pass
+
+    owner = Owner()
+    client = registry.get_client(
+        "milvus", {"uri": "a"}, factory, health_check=lambda _: healthy, close=close, owner=owner
+    )
+
+    healthy = False
+    new_client = registry.get_client("milvus", {"uri": "a"}, factory, health_check=lambda _: healthy, close=close)
+    assert new_client is not client
+    # the owner is still querying with the evicted client
+    close.assert_not_called()
+
+    del owner
+    gc.collect()
+    close.assert_called_once_with(client)
+
+
+def test_slow_client_creation_does_not_block_other_configs():
+    registry = VectorClientRegistry(health_check_interval=30)
+    creating = threading.Event()
+    release = threading.Event()
+
+    def slow_factory():
+        creating.set()
+        release.wait(5)
+        return object()
+
+    thread = threading.Thread(target=registry.get_client, args=("pgvector", {"host": "down"}, slow_factory))
+    thread.start()
+    assert creating.wait(5)
+
+    assert registry.get_client("qdrant", {"host": "a"}, object) is not None
+    release.set()
+    thread.join()
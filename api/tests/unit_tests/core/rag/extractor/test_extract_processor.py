@@ -0,0 +1,56 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+
+from core.rag.extractor.entity.extract_setting import ExtractSetting
+from core.rag.extractor.extract_processor import ExtractProcessor
+from core.rag.models.document import Document
+
+
+def test_extract_local_file(tmp_path):
+    file_path = tmp_path / "test.txt"
+    file_path.write_text("hello dify")
+
+    documents = ExtractProcessor.extract_local_file(str(file_path))
+
+    assert [document.page_content for document in documents] == ["hello dify"]
+
+
+def test_extract_local_file_in_process_pool(tmp_path):
+    file_path = tmp_path / "test.csv"
+    file_path.write_text("name,value\ndify,1\n")
+
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as process_pool:
+        documents = process_pool.submit(ExtractProcessor.extract_local_file, str(file_path)).result()
+
+    assert len(documents) == 1
+    assert "dify" in documents[0].page_content
+
+
+def test_extract_upload_file_cached_by_content(mocker):
+    saved_files = {}
+    storage = mocker.patch("core.rag.extractor.extract_cache.storage")
+    storage.exists.side_effect = lambda key: key in saved_files
+    storage.load_once.side_effect = lambda key: saved_files[key]
+    storage.save.side_effect = saved_files.__setitem__
+    mocker.patch("core.rag.extractor.extract_processor.dify_config", EXTRACT_CACHE_ENABLED=True)
+    mocker.patch("core.rag.extractor.extract_cache.dify_config", ETL_TYPE="dify")
+    extract_file = mocker.patch.object(
+        ExtractProcessor,
+        "_extract_file",
+        return_value=[Document(page_content="page 1", metadata={"page": 0})],
+    )
+
+    def extract(key: str, file_hash: str) -> list[Document]:
+        upload_file = SimpleNamespace(tenant_id="tenant", key=key, hash=file_hash)
+        extract_setting = ExtractSetting.model_construct(datasource_type="upload_file", upload_file=upload_file)
+        return ExtractProcessor.extract(extract_setting)
+
+    documents = extract("upload_files/tenant/a.pdf", "hash")
+    # uploaded again with the same content
+    assert extract("upload_files/tenant/b.pdf", "hash") == documents
+    assert documents == [Document(page_content="page 1", metadata={"page": 0})]
+    extract_file.assert_called_once()
+
+    extract("upload_files/tenant/c.pdf", "other hash")
+    assert extract_file.call_count == 2
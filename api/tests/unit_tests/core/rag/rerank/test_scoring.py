@@ -0,0 +1,59 @@
+import math
+
+import numpy as np
+import pytest
+
+from core.rag.models.document import Document
+from core.rag.rerank.scoring import calculate_cosine_scores, calculate_keyword_scores, get_documents_keywords
+
+
+def _reference_keyword_scores(query_keywords, documents_keywords):
+    total_documents = len(documents_keywords)
+    all_keywords = {keyword for document_keywords in documents_keywords for keyword in document_keywords}
+    keyword_idf = {
+        keyword: math.log((1 + total_documents) / (1 + sum(1 for d in documents_keywords if keyword in d))) + 1
+        for keyword in all_keywords
+    }
+    query_tfidf = {keyword: keyword_idf.get(keyword, 0) for keyword in query_keywords}
+
+    scores = []
+    for document_keywords in documents_keywords:
+        document_tfidf = {keyword: keyword_idf[keyword] for keyword in document_keywords}
+        numerator = sum(query_tfidf[k] * document_tfidf[k] for k in set(query_tfidf) & set(document_tfidf))
+        denominator = math.sqrt(sum(v**2 for v in query_tfidf.values())) * math.sqrt(
+            sum(v**2 for v in document_tfidf.values())
+        )
+        scores.append(numerator / denominator if denominator else 0.0)
+    return scores
+
+
+def test_keyword_scores_match_reference():
+    query_keywords = ["dify", "workflow", "unknown"]
+    documents_keywords = [
+        ["dify", "workflow", "node"],
+        ["dify", "agent"],
+        ["knowledge", "retrieval"],
+        [],
+    ]
+
+    scores = calculate_keyword_scores(query_keywords, documents_keywords)
+
+    assert scores.tolist() == pytest.approx(_reference_keyword_scores(query_keywords, documents_keywords))
+    assert scores[2] == 0.0
+    assert scores[3] == 0.0
+
+
+def test_keyword_scores_without_documents():
+    assert calculate_keyword_scores(["dify"], []).tolist() == []
+
+
+def test_cosine_scores():
+    scores = calculate_cosine_scores([1.0, 0.0], [[2.0, 0.0], [0.0, 3.0], [1.0, 1.0]])
+
+    assert scores == pytest.approx(np.array([1.0, 0.0, math.sqrt(0.5)]))
+
+
+def test_documents_keywords_from_metadata():
+    documents = [Document(page_content="dify", metadata={"keywords": ["dify", "llm"]})]
+
+    assert get_documents_keywords(documents) == [["dify", "llm"]]
@@ -0,0 +1,51 @@
+from collections import Counter
+from unittest.mock import MagicMock
+
+from core.rag.splitter.fixed_text_splitter import FixedRecursiveCharacterTextSplitter
+
+
+def _create_splitter(chunk_size: int, chunk_overlap: int):
+    counted_texts = Counter()
+
+    def get_text_embedding_num_tokens(texts: list[str]) -> int:
+        counted_texts.update(texts)
+        return len(texts[0])
+
+    embedding_model_instance = MagicMock()
+    embedding_model_instance.model = "text-embedding"
+    embedding_model_instance.get_text_embedding_num_tokens.side_effect = get_text_embedding_num_tokens
+    splitter = FixedRecursiveCharacterTextSplitter.from_encoder(
+        embedding_model_instance=embedding_model_instance, chunk_size=chunk_size, chunk_overlap=chunk_overlap
+    )
+    return splitter, counted_texts
+
+
+def test_split_with_overlap():
+    splitter, _ = _create_splitter(chunk_size=12, chunk_overlap=5)
+
+    chunks = splitter.split_text("aa bb cc dd ee ff\n\ngg")
+
+    assert chunks == ["aa bb cc dd", "cc dd ee ff", "gg"]
+
+
+def test_each_split_tokenized_once():
+    splitter, counted_texts = _create_splitter(chunk_size=10, chunk_overlap=4)
+    text = " ".join(["word"] * 200) + "\n\n" + "x" * 50
+
+    chunks = splitter.split_text(text)
+
+    assert chunks[0] == "word word"
+    assert chunks[-2:] == ["xxxxxxxxxx", "xxxxxxxx"]
+    assert set(counted_texts.values()) == {1}
+
+
+def test_long_text_measured_by_prefix():
+    splitter, counted_texts = _create_splitter(chunk_size=10, chunk_overlap=0)
+    text = "\n".join(" ".join(["word"] * 50) for _ in range(4))
+
+    chunks = splitter.split_text(text)
+
+    assert chunks[0] == "word word"
+    assert len(chunks) == 100
+    # neither the text nor its lines are tokenized in full
+    assert max(len(counted_text) for counted_text in counted_texts) <= 80
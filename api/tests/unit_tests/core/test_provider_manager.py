@@ -1,4 +1,7 @@
+from unittest.mock import MagicMock
+
 from core.entities.provider_entities import ModelSettings
+from core.helper.provider_configurations_cache import ProviderConfigurationsCache
 from core.model_runtime.entities.model_entities import ModelType
 from core.model_runtime.model_providers import model_provider_factory
 from core.provider_manager import ProviderManager
@@ -181,3 +184,28 @@ def test__to_model_settings_lb_disabled(mocker):
     assert result[0].model_type == ModelType.LLM
     assert result[0].enabled is True
     assert len(result[0].load_balancing_configs) == 0
+
+
+def test_get_configurations_cached_until_version_changes(mocker):
+    redis_client = mocker.patch("core.helper.provider_configurations_cache.redis_client", new=MagicMock())
+    redis_client.get.return_value = b"1"
+    mocker.patch("core.provider_manager.model_provider_factory.get_providers", return_value=[])
+    get_all_providers = mocker.patch.object(ProviderManager, "_get_all_providers", return_value={})
+    mocker.patch.object(ProviderManager, "_init_trial_provider_records", return_value={})
+    mocker.patch.object(ProviderManager, "_get_all_provider_models", return_value={})
+    mocker.patch.object(ProviderManager, "_get_all_preferred_model_providers", return_value={})
+    mocker.patch.object(ProviderManager, "_get_all_provider_model_settings", return_value={})
+    mocker.patch.object(ProviderManager, "_get_all_provider_load_balancing_configs", return_value={})
+
+    configurations = ProviderManager().get_configurations("cached_tenant_id")
+    assert ProviderManager().get_configurations("cached_tenant_id") is configurations
+    assert get_all_providers.call_count == 1
+
+    ProviderConfigurationsCache(tenant_id="cached_tenant_id").delete()
+    redis_client.pipeline.return_value.__enter__.return_value.incr.assert_called_once_with(
+        "provider_configurations_version:tenant_id:cached_tenant_id"
+    )
+
+    redis_client.get.return_value = b"2"
+    assert ProviderManager().get_configurations("cached_tenant_id") is not configurations
+    assert get_all_providers.call_count == 2
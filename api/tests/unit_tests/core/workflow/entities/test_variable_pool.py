@@ -0,0 +1,58 @@
+from core.app.segments import ArrayAnySegment, ObjectSegment, StringSegment
+from core.workflow.entities.variable_pool import VariablePool
+
+
+def _build_pool() -> VariablePool:
+    return VariablePool(
+        system_variables={},
+        user_inputs={},
+        environment_variables=[],
+    )
+
+
+def test_get_uses_full_selector():
+    pool = _build_pool()
+    pool.add(["node", "a", "b"], "ab")
+    pool.add(["node", "b", "a"], "ba")
+
+    assert pool.get(["node", "a", "b"]) == StringSegment(value="ab")
+    assert pool.get(["node", "b", "a"]) == StringSegment(value="ba")
+    assert pool.get(["node", "a"]) is None
+    assert pool.get(["other", "a", "b"]) is None
+
+
+def test_objects_and_arrays_are_built_on_read():
+    pool = _build_pool()
+    pool.add(["node", "object"], {"key": "value"})
+    pool.add(["node", "array"], [1, 2])
+
+    assert pool.get(["node", "object"]) == ObjectSegment(value={"key": "value"})
+    assert pool.get(["node", "array"]) == ArrayAnySegment(value=[1, 2])
+    assert pool.get_any(["node", "object"]) == {"key": "value"}
+
+
+def test_fork_reads_through_and_isolates_writes():
+    pool = _build_pool()
+    pool.add(["upstream", "output"], "upstream")
+    pool.add(["shared", "output"], "shared")
+
+    child = pool.fork()
+    child.add(["iteration", "item"], "item")
+    child.add(["upstream", "output"], "overridden")
+    child.remove_node("shared")
+
+    assert child.get(["iteration", "item"]) == StringSegment(value="item")
+    assert child.get(["upstream", "output"]) == StringSegment(value="overridden")
+    assert child.get(["shared", "output"]) is None
+
+    assert pool.get(["iteration", "item"]) is None
+    assert pool.get(["upstream", "output"]) == StringSegment(value="upstream")
+    assert pool.get(["shared", "output"]) == StringSegment(value="shared")
+
+    # variables added to the parent after forking are visible to the child
+    pool.add(["late", "output"], "late")
+    assert child.get(["late", "output"]) == StringSegment(value="late")
+
+    child.remove(["upstream", "output"])
+    assert child.get(["upstream", "output"]) is None
+    assert pool.get(["upstream", "output"]) == StringSegment(value="upstream")
@@ -0,0 +1,55 @@
+import threading
+
+from core.workflow.graph_engine.thread_pool import GraphEngineThreadPool, WorkflowTaskScheduler
+
+
+def test_submit_returns_result():
+    scheduler = WorkflowTaskScheduler(max_workers=2)
+    thread_pool = GraphEngineThreadPool(tenant_id="tenant-1", max_submit_count=10, scheduler=scheduler)
+
+    futures = [thread_pool.submit(lambda x: x * 2, i) for i in range(20)]
+
+    assert [future.result(timeout=5) for future in futures] == [i * 2 for i in range(20)]
+
+
+def test_backlog_instead_of_rejecting():
+    scheduler = WorkflowTaskScheduler(max_workers=1)
+    thread_pool = GraphEngineThreadPool(tenant_id="tenant-1", max_submit_count=2, scheduler=scheduler)
+
+    release = threading.Event()
+    futures = [thread_pool.submit(release.wait, 5) for _ in range(10)]
+    release.set()
+
+    assert all(future.result(timeout=5) for future in futures)
+    assert thread_pool.submit_count == 0
+
+
+def test_tenants_are_served_round_robin():
+    scheduler = WorkflowTaskScheduler(max_workers=1)
+    order = []
+    release = threading.Event()
+
+    # occupy the only worker so the following tasks queue up
+    blocker = scheduler.submit("tenant-0", release.wait, 5)
+    futures = [scheduler.submit("tenant-1", order.append, f"tenant-1-{i}") for i in range(3)]
+    futures += [scheduler.submit("tenant-2", order.append, f"tenant-2-{i}") for i in range(3)]
+    release.set()
+
+    blocker.result(timeout=5)
+    for future in futures:
+        future.result(timeout=5)
+
+    assert order == ["tenant-1-0", "tenant-2-0", "tenant-1-1", "tenant-2-1", "tenant-1-2", "tenant-2-2"]
+
+
+def test_managed_block_prevents_deadlock():
+    scheduler = WorkflowTaskScheduler(max_workers=1)
+    thread_pool = GraphEngineThreadPool(tenant_id="tenant-1", scheduler=scheduler)
+
+    def parent():
+        child = thread_pool.submit(lambda: "child")
+        # the only worker waits for its child, a compensating worker must run it
+        with thread_pool.managed_block():
+            return child.result(timeout=5)
+
+    assert thread_pool.submit(parent).result(timeout=10) == "child"
@@ -3,9 +3,10 @@ import uuid
 from unittest.mock import patch
 
 from core.app.entities.app_invoke_entities import InvokeFrom
-from core.workflow.entities.node_entities import NodeRunResult, UserFrom
+from core.workflow.entities.node_entities import NodeRunMetadataKey, NodeRunResult, UserFrom
 from core.workflow.entities.variable_pool import VariablePool
 from core.workflow.enums import SystemVariableKey
+from core.workflow.graph_engine.entities.event import IterationRunNextEvent, NodeRunSucceededEvent
 from core.workflow.graph_engine.entities.graph import Graph
 from core.workflow.graph_engine.entities.graph_init_params import GraphInitParams
 from core.workflow.graph_engine.entities.graph_runtime_state import GraphRuntimeState
@@ -418,3 +419,145 @@ def test_run_parallel():
                 assert item.run_result.outputs == {"output": ["dify 123", "dify 123"]}
 
         assert count == 32
+
+
+def test_run_parallel_mode():
+    graph_config = {
+        "edges": [
+            {
+                "id": "start-source-pe-target",
+                "source": "start",
+                "target": "pe",
+            },
+            {
+                "id": "pe-source-iteration-1-target",
+                "source": "pe",
+                "target": "iteration-1",
+            },
+            {
+                "id": "iteration-1-source-answer-3-target",
+                "source": "iteration-1",
+                "target": "answer-3",
+            },
+        ],
+        "nodes": [
+            {"data": {"title": "Start", "type": "start", "variables": []}, "id": "start"},
+            {
+                "data": {
+                    "iterator_selector": ["pe", "list_output"],
+                    "output_selector": ["tt", "output"],
+                    "output_type": "array[string]",
+                    "startNodeType": "template-transform",
+                    "start_node_id": "tt",
+                    "is_parallel": True,
+                    "parallel_nums": 3,
+                    "title": "iteration",
+                    "type": "iteration",
+                },
+                "id": "iteration-1",
+            },
+            {
+                "data": {
+                    "iteration_id": "iteration-1",
+                    "template": "{{ arg1 }} 123",
+                    "title": "template transform",
+                    "type": "template-transform",
+                    "variables": [{"value_selector": ["iteration-1", "item"], "variable": "arg1"}],
+                },
+                "id": "tt",
+            },
+            {
+                "data": {"answer": "{{#iteration-1.output#}}88888", "title": "answer 3", "type": "answer"},
+                "id": "answer-3",
+            },
+            {
+                "data": {
+                    "instruction": "test1",
+                    "model": {
+                        "completion_params": {"temperature": 0.7},
+                        "mode": "chat",
+                        "name": "gpt-4o",
+                        "provider": "openai",
+                    },
+                    "parameters": [
+                        {"description": "test", "name": "list_output", "required": False, "type": "array[string]"}
+                    ],
+                    "query": ["sys", "query"],
+                    "reasoning_mode": "prompt",
+                    "title": "pe",
+                    "type": "parameter-extractor",
+                },
+                "id": "pe",
+            },
+        ],
+    }
+
+    graph = Graph.init(graph_config=graph_config)
+
+    init_params = GraphInitParams(
+        tenant_id="1",
+        app_id="1",
+        workflow_type=WorkflowType.WORKFLOW,
+        workflow_id="1",
+        graph_config=graph_config,
+        user_id="1",
+        user_from=UserFrom.ACCOUNT,
+        invoke_from=InvokeFrom.DEBUGGER,
+        call_depth=0,
+    )
+
+    # construct variable pool
+    pool = VariablePool(
+        system_variables={
+            SystemVariableKey.QUERY: "dify",
+            SystemVariableKey.FILES: [],
+            SystemVariableKey.CONVERSATION_ID: "abababa",
+            SystemVariableKey.USER_ID: "1",
+        },
+        user_inputs={},
+        environment_variables=[],
+    )
+    pool.add(["pe", "list_output"], ["dify-1", "dify-2", "dify-3", "dify-4"])
+
+    iteration_node = IterationNode(
+        id=str(uuid.uuid4()),
+        graph_init_params=init_params,
+        graph=graph,
+        graph_runtime_state=GraphRuntimeState(variable_pool=pool, start_at=time.perf_counter()),
+        config=graph_config["nodes"][1],
+    )
+
+    def tt_generator(self):
+        index = self.graph_runtime_state.variable_pool.get(["iteration-1", "index"]).to_object()
+        item = self.graph_runtime_state.variable_pool.get(["iteration-1", "item"]).to_object()
+        # finish items in reverse order
+        time.sleep(0.05 * (4 - index))
+        return NodeRunResult(
+            status=WorkflowNodeExecutionStatus.SUCCEEDED,
+            inputs={"arg1": item},
+            outputs={"output": f"{item} 123"},
+        )
+
+    with patch.object(TemplateTransformNode, "_run", new=tt_generator):
+        # execute node
+        result = iteration_node._run()
+
+        next_indexes = []
+        iteration_indexes = set()
+        for item in result:
+            if isinstance(item, IterationRunNextEvent):
+                next_indexes.append(item.index)
+            elif isinstance(item, NodeRunSucceededEvent):
+                assert item.in_iteration_id == "iteration-1"
+                metadata = item.route_node_state.node_run_result.metadata
+                iteration_indexes.add(metadata[NodeRunMetadataKey.ITERATION_INDEX])
+            elif isinstance(item, RunCompletedEvent):
+                assert item.run_result.status == WorkflowNodeExecutionStatus.SUCCEEDED
+                assert item.run_result.outputs == {"output": ["dify-1 123", "dify-2 123", "dify-3 123", "dify-4 123"]}
+
+        assert next_indexes == [0, 1, 2, 3, 4]
+        assert iteration_indexes == {0, 1, 2, 3}
+
+    # iteration variables must not leak into the workflow variable pool
+    assert pool.get(["iteration-1", "item"]) is None
+    assert pool.get(["tt", "output"]) is None
@@ -0,0 +1,43 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from core.app.entities.app_invoke_entities import ChatAppGenerateEntity
+from core.entities.provider_entities import QuotaUnit
+from events.event_handlers import deduct_quota_when_message_created
+from models.provider import ProviderQuotaType, ProviderType
+
+
+@pytest.mark.parametrize(
+    ("quotas", "invalidated"),
+    [
+        (SimpleNamespace(quota_used=60, quota_limit=100), False),
+        (SimpleNamespace(quota_used=100, quota_limit=100), True),
+        # the quota had already run out
+        (None, True),
+    ],
+)
+def test_cached_configurations_invalidated_when_quota_runs_out(mocker, quotas, invalidated):
+    db = mocker.patch.object(deduct_quota_when_message_created, "db")
+    db.session.execute.return_value.first.return_value = quotas
+    cache = mocker.patch.object(deduct_quota_when_message_created, "ProviderConfigurationsCache")
+
+    application_generate_entity = MagicMock()
+    application_generate_entity.__class__ = ChatAppGenerateEntity
+    application_generate_entity.app_config.tenant_id = "tenant"
+    model_config = application_generate_entity.model_conf
+    model_config.model = "gpt-3.5-turbo"
+    provider_configuration = model_config.provider_model_bundle.configuration
+    provider_configuration.using_provider_type = ProviderType.SYSTEM
+    provider_configuration.system_configuration.current_quota_type = ProviderQuotaType.TRIAL
+    provider_configuration.system_configuration.quota_configurations = [
+        SimpleNamespace(quota_type=ProviderQuotaType.TRIAL, quota_unit=QuotaUnit.TOKENS, quota_limit=100)
+    ]
+
+    deduct_quota_when_message_created.handle(
+        SimpleNamespace(message_tokens=6, answer_tokens=4), application_generate_entity=application_generate_entity
+    )
+
+    db.session.commit.assert_called_once()
+    assert cache.return_value.delete.called == invalidated
@@ -0,0 +1,26 @@
+import pickle
+
+import pytest
+
+from models.dataset import Embedding
+
+
+def test_embedding_encoded_as_float32():
+    embedding = Embedding()
+    embedding.set_embedding([0.5, -0.25, 1.0])
+
+    assert embedding.embedding.startswith(Embedding.FLOAT32_PREFIX)
+    assert len(embedding.embedding) == len(Embedding.FLOAT32_PREFIX) + 3 * 4
+    assert embedding.get_embedding() == [0.5, -0.25, 1.0]
+
+
+def test_pickled_embedding_still_readable():
+    embedding = Embedding(embedding=pickle.dumps([0.1, 0.2], protocol=pickle.HIGHEST_PROTOCOL))
+
+    assert embedding.get_embedding() == [0.1, 0.2]
+
+
+def test_float32_precision():
+    decoded = Embedding.decode_embedding(Embedding.encode_embedding([0.1, 0.2]))
+
+    assert decoded == pytest.approx([0.1, 0.2], rel=1e-6)
@@ -0,0 +1,38 @@
+from flask import Flask
+
+from extensions.storage.base_storage import BaseStorage, iter_parts
+from extensions.storage.local_storage import LocalStorage
+
+
+def _local_storage(tmp_path, chunk_size: int) -> LocalStorage:
+    app = Flask(__name__)
+    app.config.update(STORAGE_LOCAL_PATH=str(tmp_path), STORAGE_STREAM_CHUNK_SIZE=chunk_size)
+    return LocalStorage(app=app)
+
+
+def test_iter_parts():
+    assert list(iter_parts([b"ab", b"cde", b"", b"f"], 4)) == [b"abcd", b"ef"]
+    assert list(iter_parts([], 4)) == []
+
+
+def test_save_stream_and_load_stream(tmp_path):
+    storage = _local_storage(tmp_path, chunk_size=4)
+
+    storage.save_stream("files/test.txt", iter([b"hello ", b"dify"]))
+
+    assert storage.load_once("files/test.txt") == b"hello dify"
+    assert list(storage.load_stream("files/test.txt")) == [b"hell", b"o di", b"fy"]
+
+
+def test_load_range(tmp_path):
+    storage = _local_storage(tmp_path, chunk_size=4)
+    storage.save("test.txt", b"hello dify")
+
+    assert storage.load_range("test.txt", 6, 4) == b"dify"
+    assert storage.load_range("test.txt", 6) == b"dify"
+    assert storage.load_range("test.txt", 20, 4) == b""
+
+    # the fallback for backends without ranged reads gives the same result
+    assert BaseStorage.load_range(storage, "test.txt", 3, 5) == b"lo di"
+    assert BaseStorage.load_range(storage, "test.txt", 6) == b"dify"
+    assert BaseStorage.load_range(storage, "test.txt", 20, 4) == b""
@@ -0,0 +1,18 @@
+from flask import Flask
+
+from extensions.storage.s3_storage import S3_MIN_PART_SIZE, S3Storage
+
+
+def test_save_stream_parts_have_the_minimum_size(mocker):
+    client = mocker.patch("extensions.storage.s3_storage.boto3").client.return_value
+    client.create_multipart_upload.return_value = {"UploadId": "upload"}
+    client.upload_part.return_value = {"ETag": "etag"}
+    app = Flask(__name__)
+    app.config.update(S3_BUCKET_NAME="bucket", STORAGE_STREAM_CHUNK_SIZE=1024)
+    storage = S3Storage(app=app)
+
+    storage.save_stream("files/test.bin", iter([b"a" * 1024] * (6 * 1024)))
+
+    part_sizes = [len(call.kwargs["Body"]) for call in client.upload_part.call_args_list]
+    assert part_sizes == [S3_MIN_PART_SIZE, 1024 * 1024]
+    client.complete_multipart_upload.assert_called_once()
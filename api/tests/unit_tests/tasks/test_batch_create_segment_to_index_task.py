@@ -0,0 +1,96 @@
+import io
+import threading
+from unittest.mock import MagicMock
+
+import pandas as pd
+import pytest
+
+from models.dataset import Dataset, Document
+from tasks import batch_create_segment_to_index_task as task_module
+
+
+class _Session:
+    """Rows executed in a session are only visible to the other sessions once committed."""
+
+    def __init__(self, dataset, document):
+        self._models = {Dataset: dataset, Document: document}
+        self._pending: list[dict] = []
+        self._lock = threading.Lock()
+        self.committed: dict[str, dict] = {}
+
+    def query(self, model):
+        return MagicMock(
+            filter=MagicMock(
+                return_value=MagicMock(first=MagicMock(return_value=self._models.get(model)), scalar=lambda: None)
+            )
+        )
+
+    def execute(self, statement, rows):
+        self._pending.extend(rows)
+
+    def commit(self):
+        with self._lock:
+            self.committed.update({row["index_node_id"]: row for row in self._pending})
+            self._pending = []
+
+    def rollback(self):
+        self._pending = []
+
+    def close(self):
+        pass
+
+
+class _IndexProcessor:
+    def __init__(self, session: _Session):
+        self._session = session
+        self.loaded: list[list[str]] = []
+
+    def load(self, dataset, documents, with_keywords=True):
+        self.loaded.append([document.metadata["doc_id"] for document in documents])
+        # the keyword index updates the segments from the session of the loading thread
+        for document in documents:
+            segment = self._session.committed.get(document.metadata["doc_id"])
+            if segment:
+                segment["keywords"] = document.page_content.split()
+
+    def clean(self, dataset, node_ids, with_keywords=True):
+        pass
+
+
+@pytest.fixture
+def session(mocker):
+    dataset = MagicMock(id="dataset", tenant_id="tenant", indexing_technique="economy", doc_form="text_model")
+    document = MagicMock(
+        id="document", enabled=True, archived=False, indexing_status="completed", doc_form="text_model"
+    )
+    session = _Session(dataset, document)
+    mocker.patch.object(task_module, "db", MagicMock(session=session))
+    mocker.patch.object(task_module, "redis_client", MagicMock())
+    mocker.patch.object(task_module, "SEGMENT_BATCH_IMPORT_CHUNK_SIZE", 2)
+    return session
+
+
+def test_batch_import_indexes_every_chunk(mocker, session):
+    index_processor = _IndexProcessor(session)
+    mocker.patch.object(
+        task_module,
+        "IndexProcessorFactory",
+        return_value=MagicMock(init_index_processor=MagicMock(return_value=index_processor)),
+    )
+    df = pd.read_csv(io.StringIO("content\nfirst segment\nsecond segment\nthird segment\nfourth segment\nfifth\n"))
+    content = [{"content": content} for content in df.iloc[:, 0]]
+
+    task_module.batch_create_segment_to_index_task("job", content, "dataset", "document", "tenant", "user")
+
+    assert [len(chunk) for chunk in index_processor.loaded] == [2, 2, 1]
+    assert [node_id for chunk in index_processor.loaded for node_id in chunk] == list(session.committed)
+    segments = sorted(session.committed.values(), key=lambda segment: segment["position"])
+    assert [segment["position"] for segment in segments] == [1, 2, 3, 4, 5]
+    assert [segment["keywords"] for segment in segments] == [
+        ["first", "segment"],
+        ["second", "segment"],
+        ["third", "segment"],
+        ["fourth", "segment"],
+        ["fifth"],
+    ]
+    task_module.redis_client.setex.assert_called_with("segment_batch_import_job", 600, "completed")
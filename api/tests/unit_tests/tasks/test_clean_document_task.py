@@ -0,0 +1,39 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from core.rag.extractor.extract_cache import ExtractCache
+from core.rag.models.document import Document
+from models.dataset import Dataset, DocumentSegment
+from models.model import UploadFile
+from tasks.clean_document_task import clean_document_task
+
+
+def test_clean_document_deletes_extracted_documents(mocker):
+    saved_files = {}
+    storage = MagicMock()
+    storage.exists.side_effect = lambda key: key in saved_files
+    storage.save.side_effect = saved_files.__setitem__
+    storage.delete.side_effect = saved_files.pop
+    mocker.patch("core.rag.extractor.extract_cache.storage", storage)
+    mocker.patch("tasks.clean_document_task.storage", storage)
+    mocker.patch("core.rag.extractor.extract_cache.dify_config", ETL_TYPE="dify")
+
+    upload_file = SimpleNamespace(tenant_id="tenant", key="upload_files/tenant/a.pdf", hash="hash")
+    saved_files[upload_file.key] = b"%PDF"
+    ExtractCache(upload_file).set([Document(page_content="page 1", metadata={"page": 0})])
+    ExtractCache(upload_file, is_automatic=True).set([Document(page_content="page 1", metadata={"page": 0})])
+    assert len(saved_files) == 3
+
+    results = {
+        Dataset: MagicMock(first=MagicMock(return_value=MagicMock(id="dataset"))),
+        DocumentSegment: MagicMock(all=MagicMock(return_value=[])),
+        UploadFile: MagicMock(first=MagicMock(return_value=upload_file)),
+    }
+    session = MagicMock()
+    session.query.side_effect = lambda model: MagicMock(filter=MagicMock(return_value=results[model]))
+    mocker.patch("tasks.clean_document_task.db", MagicMock(session=session))
+
+    clean_document_task("document", "dataset", "text_model", "file")
+
+    assert saved_files == {}
+    assert ExtractCache(upload_file).get() is None